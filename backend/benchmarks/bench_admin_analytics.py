@@ -0,0 +1,247 @@
+"""
+Admin analytics query benchmark
+
+Seeds a throwaway SQLite database (default 1M usage_tracking rows) and times the
+AdminAnalyticsService metric methods with and without the composite indexes from
+migration 003. The per-metric COUNT implementation that get_subscription_metrics
+used before it was collapsed into grouped aggregates is included as the baseline.
+Finally the full admin dashboard is timed sequentially on one session (the old
+get_admin_dashboard) against the concurrent section assembler, cold and cached.
+
+Usage (from backend/):
+    python -m benchmarks.bench_admin_analytics --usage-rows 1000000 --users 50000
+"""
+
+import argparse
+import asyncio
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parents[1]
+if str(BACKEND) not in sys.path:
+    sys.path.insert(0, str(BACKEND))
+
+from sqlalchemy import and_, create_engine, func, text
+from sqlalchemy.orm import sessionmaker
+
+from models.user import (
+    Base, User, Subscription, SubscriptionTier, SubscriptionStatus, UsageType
+)
+import models.file_metadata  # noqa: F401  (registers FileMetadata for User relationships)
+from services.admin_analytics_service import AdminAnalyticsService
+from services.admin_dashboard import SECTIONS, AdminDashboardAssembler
+
+COMPOSITE_INDEXES = [
+    ("idx_usage_tracking_user_date", "usage_tracking", "user_id, usage_date"),
+    ("idx_usage_tracking_type_date", "usage_tracking", "usage_type, usage_date"),
+    ("idx_subscriptions_status_created", "subscriptions", "status, created_at"),
+    ("idx_subscriptions_canceled_at", "subscriptions", "canceled_at"),
+]
+
+
+def _ts(value: datetime) -> str:
+    return value.strftime("%Y-%m-%d %H:%M:%S.%f")
+
+
+def seed(db_path: Path, users: int, usage_rows: int, seed_value: int = 7) -> None:
+    """Create the schema through the models and bulk-load rows with sqlite3"""
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(engine)
+    engine.dispose()
+
+    rng = random.Random(seed_value)
+    now = datetime.utcnow()
+    usage_types = [member.name for member in UsageType]
+    user_ids = [str(uuid.uuid4()) for _ in range(users)]
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=OFF")
+    conn.execute("PRAGMA synchronous=OFF")
+
+    user_rows = []
+    subscription_rows = []
+    for i, user_id in enumerate(user_ids):
+        is_pro = rng.random() < 0.12
+        status = rng.choices(["ACTIVE", "CANCELED", "PAST_DUE"], weights=[85, 10, 5])[0]
+        created = now - timedelta(days=rng.uniform(0, 400))
+        user_rows.append((
+            user_id, f"user{i}@example.com", "PRO" if is_pro else "FREE", status,
+            rng.randint(0, 8), rng.randint(0, 120), _ts(created),
+        ))
+        if is_pro or status == "CANCELED":
+            sub_created = created + timedelta(days=rng.uniform(0, 30))
+            canceled_at = _ts(sub_created + timedelta(days=rng.uniform(1, 60))) if status == "CANCELED" else None
+            subscription_rows.append((
+                str(uuid.uuid4()), user_id, f"cus_{i}", status, "PRO", canceled_at, _ts(sub_created),
+            ))
+
+    conn.executemany(
+        "INSERT INTO users (id, email, subscription_tier, subscription_status, weekly_usage_count, "
+        "total_usage_count, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        user_rows,
+    )
+    conn.executemany(
+        "INSERT INTO subscriptions (id, user_id, stripe_customer_id, status, tier, canceled_at, created_at) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        subscription_rows,
+    )
+
+    batch = []
+    for _ in range(usage_rows):
+        batch.append((
+            str(uuid.uuid4()), rng.choice(user_ids), rng.choice(usage_types),
+            _ts(now - timedelta(seconds=rng.uniform(0, 365 * 86400))), rng.randint(1, 3),
+        ))
+        if len(batch) >= 100_000:
+            conn.executemany(
+                "INSERT INTO usage_tracking (id, user_id, usage_type, usage_date, count) VALUES (?, ?, ?, ?, ?)",
+                batch,
+            )
+            batch.clear()
+    if batch:
+        conn.executemany(
+            "INSERT INTO usage_tracking (id, user_id, usage_type, usage_date, count) VALUES (?, ?, ?, ?, ?)",
+            batch,
+        )
+    conn.commit()
+    conn.execute("ANALYZE")
+    conn.close()
+
+
+def set_composite_indexes(engine, enabled: bool) -> None:
+    with engine.begin() as conn:
+        for name, table, columns in COMPOSITE_INDEXES:
+            if enabled:
+                conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table}({columns})"))
+            else:
+                conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+        conn.execute(text("ANALYZE"))
+
+
+async def legacy_subscription_metrics(db, days: int = 30) -> dict:
+    """The previous one-COUNT-per-metric implementation, kept for comparison"""
+    start_date = datetime.utcnow() - timedelta(days=days)
+    return {
+        "tiers": db.query(User.subscription_tier, func.count(User.id)).group_by(User.subscription_tier).all(),
+        "free": db.query(User).filter(User.subscription_tier == SubscriptionTier.FREE).count(),
+        "pro": db.query(User).filter(and_(
+            User.subscription_tier == SubscriptionTier.PRO,
+            User.subscription_status == SubscriptionStatus.ACTIVE,
+        )).count(),
+        "active": db.query(Subscription).filter(Subscription.status == SubscriptionStatus.ACTIVE).count(),
+        "new": db.query(Subscription).filter(Subscription.created_at >= start_date).count(),
+        "canceled": db.query(Subscription).filter(and_(
+            Subscription.status == SubscriptionStatus.CANCELED,
+            Subscription.canceled_at >= start_date,
+        )).count(),
+        "previous": db.query(Subscription).filter(and_(
+            Subscription.created_at >= start_date - timedelta(days=days),
+            Subscription.created_at < start_date,
+        )).count(),
+    }
+
+
+def time_call(factory, repeats: int) -> float:
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        asyncio.run(factory())
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def run_suite(Session, repeats: int) -> dict:
+    db = Session()
+    service = AdminAnalyticsService(db)
+    try:
+        return {
+            "legacy_subscription_metrics": time_call(lambda: legacy_subscription_metrics(db), repeats),
+            "get_subscription_metrics": time_call(lambda: service.get_subscription_metrics("30d"), repeats),
+            "get_conversion_funnel_analysis": time_call(service.get_conversion_funnel_analysis, repeats),
+            "get_revenue_analytics": time_call(lambda: service.get_revenue_analytics("30d"), repeats),
+            "get_user_behavior_analytics": time_call(lambda: service.get_user_behavior_analytics("30d"), repeats),
+            "get_capacity_analytics": time_call(service.get_capacity_analytics, repeats),
+        }
+    finally:
+        db.close()
+
+
+def run_dashboard(engine, Session, repeats: int) -> dict:
+    db = Session()
+    service = AdminAnalyticsService(db)
+
+    async def sequential():
+        for method_name, takes_range, _ in SECTIONS.values():
+            method = getattr(service, method_name)
+            await (method("30d") if takes_range else method())
+
+    assembler = AdminDashboardAssembler(sessionmaker(bind=engine), max_workers=len(SECTIONS))
+
+    async def cold():
+        assembler.invalidate()
+        return await assembler.assemble("30d")
+
+    try:
+        timings = {
+            "dashboard sequential": time_call(sequential, repeats),
+            "dashboard concurrent (cold)": time_call(cold, repeats),
+            "dashboard concurrent (cached)": time_call(lambda: assembler.assemble("30d"), repeats),
+        }
+        sections = asyncio.run(cold())["metadata"]["sections"]
+        slowest = sorted(sections.items(), key=lambda item: -item[1]["duration_ms"])[:3]
+        timings["slowest sections"] = ", ".join(f"{name} {timing['duration_ms']:.0f} ms" for name, timing in slowest)
+        return timings
+    finally:
+        assembler.shutdown()
+        db.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--usage-rows", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=50_000)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--db", type=Path, default=None, help="Reuse/keep the seeded database at this path")
+    args = parser.parse_args()
+
+    tmp_dir = None
+    db_path = args.db
+    if db_path is None:
+        tmp_dir = tempfile.TemporaryDirectory()
+        db_path = Path(tmp_dir.name) / "bench_admin_analytics.db"
+
+    if not db_path.exists():
+        started = time.perf_counter()
+        seed(db_path, args.users, args.usage_rows)
+        print(f"Seeded {args.users:,} users / {args.usage_rows:,} usage rows in {time.perf_counter() - started:.1f}s")
+
+    engine = create_engine(f"sqlite:///{db_path}")
+    Session = sessionmaker(bind=engine)
+
+    results = {}
+    for label, enabled in (("without composite indexes", False), ("with composite indexes", True)):
+        set_composite_indexes(engine, enabled)
+        results[label] = run_suite(Session, args.repeats)
+
+    print(f"\n{'median ms':<34}" + "".join(f"{label:>28}" for label in results))
+    for name in next(iter(results.values())):
+        print(f"{name:<34}" + "".join(f"{timings[name]:>28.1f}" for timings in results.values()))
+
+    print()
+    for name, value in run_dashboard(engine, Session, args.repeats).items():
+        print(f"{name:<34}{value:>28.1f}" if isinstance(value, float) else f"{name:<34}{value}")
+
+    engine.dispose()
+    if tmp_dir is not None:
+        tmp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Analytics dashboard benchmark
+
+For growing per-user histories (default 10k/100k/400k events over two years),
+writes the events through ``AnalyticsEventWriter`` (which maintains the daily
+rollups) and times ``AnalyticsService.get_user_analytics_dashboard`` for a 30d
+range: cold (rollup query) and warm (dashboard cache), next to a full scan of
+the raw events in the same range.
+
+Usage (from backend/):
+    python -m benchmarks.bench_analytics_dashboard --sizes 10000 100000 400000
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parents[1]
+if str(BACKEND) not in sys.path:
+    sys.path.insert(0, str(BACKEND))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import models.file_metadata  # noqa: F401  (registers FileMetadata for User relationships)
+from models.user import Base, User, SubscriptionTier, SubscriptionStatus
+from services.analytics_events import AnalyticsEventWriter
+from services.analytics_service import AnalyticsEventType, AnalyticsService
+from services.dashboard_cache import get_dashboard_cache
+
+EVENT_TYPES = [event_type.value for event_type in AnalyticsEventType]
+TEMPLATES = ["modern", "classic", "executive", "technical", "creative"]
+
+
+def seed(factory, user_id, events: int) -> None:
+    rng = random.Random(events)
+    writer = AnalyticsEventWriter(session_factory=factory, batch_size=5000, max_pending=events + 1)
+    now = datetime.utcnow()
+    for _ in range(events):
+        event_type = rng.choice(EVENT_TYPES)
+        data = {}
+        if event_type == "keyword_optimization":
+            data = {"match_score": rng.random()}
+        elif event_type == "template_usage":
+            data = {"template": rng.choice(TEMPLATES)}
+        writer.record(user_id, event_type, data, timestamp=now - timedelta(seconds=rng.uniform(0, 730 * 86400)))
+    writer.stop()
+
+
+def timed(func, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 400_000])
+    args = parser.parse_args()
+
+    cache = get_dashboard_cache()
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = create_engine(f"sqlite:///{Path(tmp) / 'bench.db'}")
+            Base.metadata.create_all(engine)
+            factory = sessionmaker(bind=engine)
+            db = factory()
+            user = User(id=uuid.uuid4(), email="bench@example.com", subscription_tier=SubscriptionTier.PRO,
+                        subscription_status=SubscriptionStatus.ACTIVE)
+            db.add(user)
+            db.commit()
+
+            started = time.perf_counter()
+            seed(factory, user.id, size)
+            seeded = time.perf_counter() - started
+
+            service = AnalyticsService(db)
+            user_id = str(user.id)
+            end = datetime.utcnow()
+
+            def cold():
+                cache.clear()
+                asyncio.run(service.get_user_analytics_dashboard(user_id, "30d"))
+
+            raw = timed(lambda: service._get_user_events_in_range(user_id, end - timedelta(days=30), end))
+            cold_seconds = timed(cold)
+            warm = timed(lambda: asyncio.run(service.get_user_analytics_dashboard(user_id, "30d")))
+            print(f"{size:>8,} events (seeded in {seeded:.1f}s)  raw 30d scan {raw * 1000:8.2f} ms  "
+                  f"rollup dashboard {cold_seconds * 1000:8.2f} ms  cached {warm * 1000:6.3f} ms")
+            db.close()
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
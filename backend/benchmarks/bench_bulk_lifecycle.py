@@ -0,0 +1,134 @@
+"""
+Weekly usage reset / expiry processing benchmark
+
+Seeds a SQLite database (default 500k users) and compares the previous ORM
+implementation (load every due ``User``, mutate, single commit) against the
+set-based keyset-chunked UPDATEs used by ``SubscriptionService``.
+
+Usage (from backend/):
+    python -m benchmarks.bench_bulk_lifecycle --users 500000 --chunk-size 5000
+"""
+
+import argparse
+import asyncio
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parents[1]
+if str(BACKEND) not in sys.path:
+    sys.path.insert(0, str(BACKEND))
+
+from sqlalchemy import and_, create_engine, or_
+from sqlalchemy.orm import sessionmaker
+
+import models.file_metadata  # noqa: F401  (registers FileMetadata for User relationships)
+from models.user import Base, User, SubscriptionTier, SubscriptionStatus
+from services.subscription_service import SubscriptionService
+
+
+def _ts(value: datetime) -> str:
+    return value.strftime("%Y-%m-%d %H:%M:%S.%f")
+
+
+def seed(db_path: Path, users: int) -> None:
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(engine)
+    engine.dispose()
+
+    rng = random.Random(11)
+    now = datetime.utcnow()
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=OFF")
+    rows = []
+    for i in range(users):
+        is_pro = rng.random() < 0.1
+        rows.append((
+            str(uuid.uuid4()), f"user{i}@example.com",
+            "PRO" if is_pro else "FREE", "ACTIVE",
+            rng.randint(0, 5), _ts(now - timedelta(days=rng.uniform(0, 14))),
+            _ts(now + timedelta(days=rng.uniform(-10, 20))) if is_pro else None,
+        ))
+    conn.executemany(
+        "INSERT INTO users (id, email, subscription_tier, subscription_status, weekly_usage_count, "
+        "weekly_usage_reset, current_period_end) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        rows,
+    )
+    conn.commit()
+    conn.close()
+
+
+async def legacy_reset(db) -> int:
+    users = db.query(User).filter(or_(
+        User.weekly_usage_reset.is_(None),
+        User.weekly_usage_reset <= datetime.utcnow() - timedelta(days=7),
+    )).all()
+    for user in users:
+        user.reset_weekly_usage()
+    db.commit()
+    return len(users)
+
+
+async def legacy_expire(db) -> int:
+    users = db.query(User).filter(and_(
+        User.subscription_tier == SubscriptionTier.PRO,
+        User.current_period_end < datetime.utcnow(),
+        User.subscription_status == SubscriptionStatus.ACTIVE,
+    )).all()
+    for user in users:
+        user.subscription_tier = SubscriptionTier.FREE
+        user.subscription_status = SubscriptionStatus.CANCELED
+    db.commit()
+    return len(users)
+
+
+def timed(db_path: Path, label: str, func) -> None:
+    engine = create_engine(f"sqlite:///{db_path}")
+    db = sessionmaker(bind=engine)()
+    started = time.perf_counter()
+    rows = asyncio.run(func(db))
+    elapsed = time.perf_counter() - started
+    print(f"{label:<34} {rows:>8,} rows  {elapsed:>7.2f}s  {rows / elapsed:>10,.0f} rows/s")
+    db.close()
+    engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=500_000)
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    async def bulk_reset(db):
+        stats = SubscriptionService(db).bulk_reset_weekly_usage(chunk_size=args.chunk_size)
+        print(f"  max chunk {stats.max_chunk_ms:.1f} ms over {stats.chunks} chunks")
+        return stats.rows_updated
+
+    async def bulk_expire(db):
+        return await SubscriptionService(db).process_expired_subscriptions()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        seeded = Path(tmp) / "seed.db"
+        started = time.perf_counter()
+        seed(seeded, args.users)
+        print(f"Seeded {args.users:,} users in {time.perf_counter() - started:.1f}s")
+
+        for label, func in (
+            ("legacy ORM weekly reset", legacy_reset),
+            ("set-based weekly reset", bulk_reset),
+            ("legacy ORM expired downgrade", legacy_expire),
+            ("set-based expired downgrade", bulk_expire),
+        ):
+            run_db = Path(tmp) / "run.db"
+            shutil.copyfile(seeded, run_db)
+            timed(run_db, label, func)
+
+
+if __name__ == "__main__":
+    main()
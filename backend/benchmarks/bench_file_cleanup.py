@@ -0,0 +1,108 @@
+"""
+File cleanup benchmark
+
+Creates an uploads tree with tracked, expired and orphaned files plus a SQLite
+``file_metadata`` table, then compares the previous implementation (batch of
+100 per run with per-row ``db.delete``, ``rglob`` walk with one session and
+query per old file) against ``FileCleanupService``.
+
+Usage (from backend/):
+    python -m benchmarks.bench_file_cleanup --files 20000
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parents[1]
+if str(BACKEND) not in sys.path:
+    sys.path.insert(0, str(BACKEND))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from models.file_metadata import FileMetadata
+from models.user import Base
+from services.file_cleanup_service import FileCleanupService
+
+
+def seed(root: Path, files: int) -> sessionmaker:
+    engine = create_engine(f"sqlite:///{root / 'bench.db'}")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    uploads = root / "uploads"
+    old_stamp = time.time() - 48 * 3600
+    old = datetime.utcnow() - timedelta(hours=30)
+    for i in range(files):
+        path = uploads / f"d{i % 50}" / f"f{i}.pdf"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"x" * 256)
+        os.utime(path, (old_stamp, old_stamp))
+        kind = i % 4  # 0/1 expired record, 2 tracked fresh record, 3 orphan
+        if kind < 3:
+            created = old if kind < 2 else datetime.utcnow()
+            db.add(FileMetadata(file_path=str(path), original_filename=path.name, file_size_bytes=256,
+                                created_at=created, expires_at=created + timedelta(hours=24)))
+    db.commit()
+    db.close()
+    return Session
+
+
+def legacy_cleanup(Session, uploads: Path) -> int:
+    """One scheduled run of the previous implementation"""
+    deleted = 0
+    cutoff = datetime.utcnow() - timedelta(hours=24)
+    db = Session()
+    for record in db.query(FileMetadata).filter(FileMetadata.created_at < cutoff).limit(100).all():
+        path = Path(record.file_path)
+        if path.exists():
+            path.unlink()
+        db.delete(record)
+        deleted += 1
+    db.commit()
+    db.close()
+    for path in uploads.rglob("*"):
+        if path.is_file() and datetime.fromtimestamp(path.stat().st_mtime) < cutoff:
+            db = Session()
+            try:
+                if not db.query(FileMetadata).filter(FileMetadata.file_path == str(path)).first():
+                    path.unlink()
+                    deleted += 1
+            finally:
+                db.close()
+    return deleted
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=20000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    for label in ("legacy", "engine"):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            Session = seed(root, args.files)
+            started = time.perf_counter()
+            if label == "legacy":
+                deleted = legacy_cleanup(Session, root / "uploads")
+                remaining = Session().query(FileMetadata).filter(
+                    FileMetadata.created_at < datetime.utcnow() - timedelta(hours=24)).count()
+                print(f"legacy (one run)  {deleted:>7,} deleted  {time.perf_counter() - started:>6.2f}s  "
+                      f"{remaining:,} expired records left")
+            else:
+                service = FileCleanupService(str(root / "uploads"), session_factory=Session,
+                                             batch_size=args.batch_size)
+                stats = asyncio.run(service.cleanup_expired_files())
+                print(f"engine            {stats['files_deleted']:>7,} deleted  {stats['elapsed_seconds']:>6.2f}s  "
+                      f"{stats['records_per_second']:,.0f} records/s, {stats['entries_per_second']:,.0f} entries/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Job vector store benchmark
+
+Replays N tailoring requests (each carrying one job description, ~30% of them
+repeats) against the previous behaviour, rebuilding a FAISS index from the
+request's job and overwriting it on disk, and against the incremental
+``JobVectorStore``. The local hashing embedder is used with a simulated
+per-call embedding latency so the numbers don't depend on the network.
+
+Usage (from backend/):
+    python -m benchmarks.bench_job_vector_store --requests 200 --embed-latency-ms 150
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parents[1]
+if str(BACKEND) not in sys.path:
+    sys.path.insert(0, str(BACKEND))
+
+from langchain.schema import Document
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from langchain_community.vectorstores import FAISS
+
+from utils.job_vector_store import CachedEmbeddings, EmbeddingCache, JobVectorStore, LocalHashEmbedder
+
+WORDS = ("python sql spark airflow aws kubernetes react figma research roadmap stakeholder api postgres "
+         "design leadership analytics experimentation pipeline security compliance mobile backend").split()
+
+
+class SlowEmbedder(LocalHashEmbedder):
+    """Local embedder that sleeps like a remote embedding call"""
+
+    def __init__(self, latency: float):
+        super().__init__()
+        self.latency = latency
+        self.calls = 0
+
+    def embed_documents(self, texts):
+        self.calls += 1
+        time.sleep(self.latency)
+        return super().embed_documents(texts)
+
+    def embed_query(self, text):
+        time.sleep(self.latency)
+        return super().embed_query(text)
+
+
+def make_jobs(count: int, rng: random.Random):
+    unique = [
+        {"id": str(i), "job_title": f"Role {i}", "url": f"https://jobs.test/{i}",
+         "job_description": "\n\n".join(" ".join(rng.choices(WORDS, k=120)) for _ in range(4))}
+        for i in range(int(count * 0.7) or 1)
+    ]
+    return [unique[i] if i < len(unique) else rng.choice(unique) for i in range(count)]
+
+
+def legacy(jobs, path: Path, embedder) -> float:
+    splitter = RecursiveCharacterTextSplitter(chunk_size=1500, chunk_overlap=200,
+                                              separators=["\n\n", "\n", ".", "!", "?", ",", " ", ""])
+    started = time.perf_counter()
+    for job in jobs:
+        docs = splitter.split_documents([Document(page_content=job["job_description"],
+                                                  metadata={"job_title": job["job_title"]})])
+        store = FAISS.from_documents(docs, embedder)
+        store.save_local(str(path))
+        FAISS.load_local(str(path), embedder).similarity_search(job["job_description"], k=3)
+    return time.perf_counter() - started
+
+
+def incremental(jobs, path: Path, embedder) -> float:
+    store = JobVectorStore(str(path / "store"), CachedEmbeddings(embedder, EmbeddingCache(str(path / "cache.sqlite3"))))
+    started = time.perf_counter()
+    for job in jobs:
+        store.similarity_search(job["job_description"], k=3)
+        store.add_jobs([job])
+    print(f"  incremental store: {store.ntotal} chunks, {store.stats['duplicate_chunks']} duplicate chunks skipped")
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--embed-latency-ms", type=float, default=150.0)
+    args = parser.parse_args()
+
+    jobs = make_jobs(args.requests, random.Random(3))
+    latency = args.embed_latency_ms / 1000
+    with tempfile.TemporaryDirectory() as tmp:
+        old_embedder, new_embedder = SlowEmbedder(latency), SlowEmbedder(latency)
+        old = legacy(jobs, Path(tmp) / "legacy", old_embedder)
+        new = incremental(jobs, Path(tmp), new_embedder)
+    print(f"{args.requests} requests  rebuild-per-request {old:7.2f}s ({old_embedder.calls} embedding calls)  "
+          f"incremental {new:7.2f}s ({new_embedder.calls} embedding calls)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Outbound email benchmark
+
+Starts a local aiosmtpd server that adds latency to the connection handshake
+(standing in for TCP + STARTTLS + AUTH round trips to a remote relay) and to
+each DATA command, then sends a batch of lifecycle emails two ways: the
+previous approach (new smtplib connection per message, one after another) and
+``MailDelivery`` over a pooled ``SMTPConnectionPool``.
+
+Usage (from backend/):
+    python -m benchmarks.bench_mail_delivery --messages 300 --handshake-ms 60 --data-ms 10
+"""
+
+import argparse
+import asyncio
+import smtplib
+import socket
+import sys
+import time
+from email.message import EmailMessage
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parents[1]
+if str(BACKEND) not in sys.path:
+    sys.path.insert(0, str(BACKEND))
+
+from aiosmtpd.controller import Controller
+
+from utils.mail_delivery import MailDelivery, SMTPConnectionPool
+
+
+class SlowRelay:
+    def __init__(self, handshake: float, data: float):
+        self.handshake = handshake
+        self.data = data
+        self.received = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        await asyncio.sleep(self.handshake)
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        await asyncio.sleep(self.data)
+        self.received += 1
+        return "250 OK"
+
+
+def _message(i: int) -> EmailMessage:
+    message = EmailMessage()
+    message["From"] = "noreply@applyai.test"
+    message["To"] = f"user{i}@example.com"
+    message["Subject"] = "Your ApplyAI Pro Subscription Renews in 3 Days"
+    message.set_content("<p>Renewal reminder</p>", subtype="html")
+    return message
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=300)
+    parser.add_argument("--handshake-ms", type=float, default=60.0)
+    parser.add_argument("--data-ms", type=float, default=10.0)
+    parser.add_argument("--pool-size", type=int, default=4)
+    args = parser.parse_args()
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    relay = SlowRelay(args.handshake_ms / 1000, args.data_ms / 1000)
+    controller = Controller(relay, hostname="127.0.0.1", port=port)
+    controller.start()
+    try:
+        started = time.perf_counter()
+        for i in range(args.messages):
+            with smtplib.SMTP("127.0.0.1", port) as server:
+                server.send_message(_message(i))
+        legacy = time.perf_counter() - started
+        print(f"connection per message   {args.messages:>5} sent  {legacy:>6.2f}s  {args.messages / legacy:>7.1f} msg/s")
+
+        delivery = MailDelivery(SMTPConnectionPool("127.0.0.1", port, start_tls=False,
+                                                   max_connections=args.pool_size))
+        started = time.perf_counter()
+        futures = [delivery.submit(_message(i)) for i in range(args.messages)]
+        sent = sum(future.result() for future in futures)
+        pooled = time.perf_counter() - started
+        stats = delivery.get_stats()
+        delivery.stop()
+        print(f"pooled queue ({args.pool_size} conns)    {sent:>5} sent  {pooled:>6.2f}s  {sent / pooled:>7.1f} msg/s  "
+              f"({stats['pool']['connections_opened']} connections opened)")
+    finally:
+        controller.stop()
+
+
+if __name__ == "__main__":
+    main()
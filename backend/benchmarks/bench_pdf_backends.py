@@ -0,0 +1,116 @@
+"""
+PDF backend throughput benchmark
+
+Renders the same structured resume N times through the ReportLab process pool
+and (when Playwright + Chromium are installed) through the Chromium backend,
+then reports PDFs/second for each.
+
+Usage (from backend/):
+    python -m benchmarks.bench_pdf_backends --count 50 --concurrency 8
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parents[1]
+if str(BACKEND) not in sys.path:
+    sys.path.insert(0, str(BACKEND))
+
+from models.resume_schema import Resume
+from services.cleaners import clean_and_compact
+from services.renderers.html_renderer import render_html
+from services.renderers.pdf_renderer import render_pdf_from_html
+from services.renderers.reportlab_renderer import (
+    get_process_pool,
+    render_pdf_from_resume,
+    render_resume_pdf,
+    shutdown_process_pool,
+)
+
+
+def sample_resume() -> dict:
+    return {
+        "name": "Jordan Rivera",
+        "headline": "Staff Software Engineer",
+        "contact": {
+            "email": "jordan@example.com",
+            "phone": "(555) 010-2000",
+            "location": "Denver, CO",
+            "links": [{"label": "GitHub", "url": "https://github.com/jrivera"}],
+        },
+        "summary": "Engineer with ten years building distributed data platforms and developer tooling.",
+        "experience": [
+            {
+                "title": f"Engineer {i}",
+                "company": f"Company {i}",
+                "start": "2018",
+                "end": None if i == 0 else "2020",
+                "bullets": [f"Delivered project {i}.{j} reducing latency by {10 + j}%" for j in range(5)],
+            }
+            for i in range(4)
+        ],
+        "projects": [{"name": "Open source CLI", "bullets": ["Maintained plugin API", "Grew to 2k stars"]}],
+        "education": [{"school": "State University", "degree": "BS Computer Science", "end": "2014"}],
+        "skills": [{"name": s} for s in ["Python", "Go", "PostgreSQL", "Kafka", "Kubernetes", "AWS"]],
+    }
+
+
+async def _bounded(coros, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(coro):
+        async with semaphore:
+            return await coro
+
+    return await asyncio.gather(*(run(c) for c in coros))
+
+
+async def bench_reportlab(cleaned: dict, count: int, concurrency: int) -> float:
+    # Exclude worker spawn from the measurement
+    await asyncio.get_running_loop().run_in_executor(get_process_pool(), render_resume_pdf, cleaned)
+    start = time.perf_counter()
+    await _bounded([render_pdf_from_resume(cleaned) for _ in range(count)], concurrency)
+    return time.perf_counter() - start
+
+
+async def bench_chromium(cleaned: dict, count: int, concurrency: int) -> float:
+    validated = dict(cleaned)
+    validated["skills"] = [{"name": s} if isinstance(s, str) else s for s in cleaned.get("skills", [])]
+    html = render_html("executive_compact", Resume.model_validate(validated),
+                       request_params={"bypass_sanitization": True})
+    # Fail fast when Chromium is not installed instead of launching N browsers
+    await render_pdf_from_html(html)
+    start = time.perf_counter()
+    await _bounded([render_pdf_from_html(html) for _ in range(count)], concurrency)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--skip-chromium", action="store_true")
+    args = parser.parse_args()
+
+    cleaned = clean_and_compact(sample_resume())
+
+    try:
+        elapsed = asyncio.run(bench_reportlab(cleaned, args.count, args.concurrency))
+        print(f"reportlab pool : {args.count} PDFs in {elapsed:.2f}s -> {args.count / elapsed:.1f} PDFs/s")
+    finally:
+        shutdown_process_pool()
+
+    if args.skip_chromium:
+        return
+    try:
+        elapsed = asyncio.run(bench_chromium(cleaned, args.count, args.concurrency))
+        print(f"chromium       : {args.count} PDFs in {elapsed:.2f}s -> {args.count / elapsed:.1f} PDFs/s")
+    except Exception as e:
+        print(f"chromium       : unavailable ({e.__class__.__name__}: {str(e).splitlines()[0]})")
+
+
+if __name__ == "__main__":
+    main()
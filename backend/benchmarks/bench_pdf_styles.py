@@ -0,0 +1,101 @@
+"""
+PDF style registry benchmark
+
+Times the style setup that each PDF pays for, and a full build, with and
+without the shared style registry:
+
+- ``ResumeEditor()``: sample style sheet plus its custom styles
+- ``AdvancedFormattingService._create_custom_styles`` for every template,
+  color scheme and font family combination
+- ``ResumeEditor.create_tailored_resume_pdf`` (the /generate-resumes path)
+
+uncached: the registry is disabled, so every lookup rebuilds its style set.
+The old code also built a fresh ``getSampleStyleSheet()`` per PDF, which is
+reported on its own. cached: the registry is on.
+
+Usage (from backend/):
+    python -m benchmarks.bench_pdf_styles --pdfs 40
+"""
+
+import argparse
+import contextlib
+import io
+import itertools
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parents[1]
+if str(BACKEND) not in sys.path:
+    sys.path.insert(0, str(BACKEND))
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+from services.advanced_formatting_service import (
+    AdvancedFormattingService,
+    ColorScheme,
+    FontFamily,
+    FormattingOptions,
+    FormattingTemplate,
+)
+from services.hardcoded_resume_service import HardcodedResumeService
+from utils import pdf_styles
+from utils.resume_editor import ResumeEditor
+
+
+DEFAULT_ENTRIES = pdf_styles.get_style_registry().max_entries
+
+
+def configure(cached: bool) -> None:
+    registry = pdf_styles.get_style_registry()
+    registry.max_entries = DEFAULT_ENTRIES if cached else 0
+    registry.clear()
+
+
+def time_ms(func, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pdfs", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    service = AdvancedFormattingService()
+    combos = [FormattingOptions(template=t, color_scheme=c, font_family=f)
+              for t, c, f in itertools.product(FormattingTemplate, ColorScheme, FontFamily)]
+    text = HardcodedResumeService.generate_hardcoded_resume()
+
+    def advanced_styles():
+        for options in combos:
+            service._create_custom_styles(options, service.template_configs[options.template],
+                                          service.color_schemes[options.color_scheme],
+                                          service.font_mappings[options.font_family])
+
+    print(f"getSampleStyleSheet(): {time_ms(pdf_styles.getSampleStyleSheet, args.repeat):6.3f} ms per call")
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, cached in (("uncached", False), ("cached", True)):
+            configure(cached)
+            editor_ms = time_ms(ResumeEditor, args.repeat)
+            advanced_ms = time_ms(advanced_styles, max(1, args.repeat // 20)) / len(combos)
+            editor = ResumeEditor()
+            pdf_ms = []
+            with contextlib.redirect_stdout(io.StringIO()):
+                for i in range(args.pdfs):
+                    started = time.perf_counter()
+                    editor.create_tailored_resume_pdf(text, os.path.join(tmp, f"{label}_{i}.pdf"))
+                    pdf_ms.append((time.perf_counter() - started) * 1000)
+            print(f"{label:>8}: ResumeEditor() {editor_ms:6.3f} ms  "
+                  f"advanced style set {advanced_ms:6.3f} ms  "
+                  f"reference PDF mean {statistics.mean(pdf_ms):6.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Prompt token benchmark
+
+Builds tailoring prompts for a fixture corpus of resumes and scraped-style job
+descriptions. The descriptions include benefits, perks and EEO blocks, and
+some are very long. Two builders are covered:
+
+- ``GPTProcessor`` direct prompt (light and heavy modes)
+- ``LangChainResumeProcessor.create_enhanced_tailoring_prompt`` with similar
+  jobs
+
+Each prompt is built two ways:
+
+- before: raw JD, untrimmed similar-job context, ``max_tokens=8000``
+- after: boilerplate stripped, prompt token budget applied, ``max_tokens``
+  sized from the resume
+
+The benchmark reports input tokens and ``max_tokens``. For the new layout it
+also reports the prefix shared by every prompt of a kind. Providers can cache
+that prefix once it is at least 1024 tokens. The old layouts put per-request
+text (detected sections, similar jobs) ahead of most of the instructions.
+
+Usage (from backend/):
+    python -m benchmarks.bench_prompt_tokens --requests 50 --max-input-tokens 6000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parents[1]
+if str(BACKEND) not in sys.path:
+    sys.path.insert(0, str(BACKEND))
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+from langchain.schema import Document
+
+from models.user import TailoringMode
+from utils import gpt_prompt, langchain_processor, prompt_budget
+from utils.prompt_budget import PromptBudget, count_tokens
+
+SKILLS = ("Python SQL Spark Airflow AWS Kubernetes React Figma roadmap stakeholder API Postgres experimentation "
+          "analytics security compliance mobile backend pricing onboarding retention").split()
+BENEFITS = """Benefits:
+- Competitive salary and equity
+- Medical, dental and vision insurance for you and your dependents
+- 401(k) with company match
+- Unlimited paid time off and 16 weeks of parental leave
+- Home office stipend and monthly wellness stipend
+- Commuter benefits
+"""
+EEO = ("Acme is an equal opportunity employer. We celebrate diversity and are committed to an inclusive "
+       "environment. All qualified applicants will receive consideration for employment without regard to race, "
+       "color, religion, sex, sexual orientation, gender identity, national origin, disability or protected veteran "
+       "status. We provide reasonable accommodations to applicants with disabilities; contact us to request one. "
+       "We participate in E-Verify. We do not accept unsolicited resumes from agencies.")
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(SKILLS) for _ in range(words)).capitalize() + "."
+
+
+def make_resume(rng: random.Random) -> str:
+    lines = ["JANE DOE", "Senior Product Manager", "jane@example.com | 555-0100", ""]
+    if rng.random() < 0.5:
+        lines += ["PROFESSIONAL SUMMARY", sentence(rng, 60), ""]
+    lines.append("PROFESSIONAL EXPERIENCE")
+    for role in range(rng.randint(2, 5)):
+        lines += ["", f"Company {role} | Remote", f"Product Manager | 20{10 + role}-20{12 + role}"]
+        lines += [f"• {sentence(rng, rng.randint(12, 25))}" for _ in range(rng.randint(3, 6))]
+    lines += ["", "EDUCATION", "BS Computer Science, State University | 2012", "", "SKILLS",
+              ", ".join(rng.sample(SKILLS, 8))]
+    return "\n".join(lines)
+
+
+def make_job(rng: random.Random) -> str:
+    # A few postings are very long (pasted company pages) and hit the input budget
+    about = "\n".join(sentence(rng, 25) for _ in range(rng.randint(2, 30) if rng.random() < 0.8 else 150))
+    return "\n".join([
+        "About the role", about, "",
+        "Responsibilities:", *(f"- {sentence(rng, 12)}" for _ in range(rng.randint(4, 10))), "",
+        "Requirements:", *(f"- {sentence(rng, 10)}" for _ in range(rng.randint(4, 8))), "",
+        BENEFITS, EEO,
+    ])
+
+
+def shared_prefix_tokens(texts) -> int:
+    prefix = os.path.commonprefix(list(texts))
+    return count_tokens(prefix)
+
+
+def build(corpus, mode: str, after: bool, budget: PromptBudget):
+    strip = prompt_budget.strip_jd_boilerplate if after else (lambda text: text)
+    gpt_prompt.strip_jd_boilerplate = langchain_processor.strip_jd_boilerplate = strip
+    prompt_budget._budget = budget if after else PromptBudget(max_input_tokens=10 ** 9, rag_context_tokens=10 ** 9)
+
+    if mode == "rag":
+        processor = langchain_processor.LangChainResumeProcessor()
+        prompts = [processor.create_enhanced_tailoring_prompt(resume, job, "Product Manager", similar)
+                   for resume, job, similar in corpus]
+        return [(prompt, count_tokens(prompt), None) for prompt in prompts]
+
+    processor = gpt_prompt.GPTProcessor()
+    tailoring_mode = TailoringMode(mode)
+    results = []
+    for resume, job, _ in corpus:
+        assembled = processor._assemble_tailoring_prompt(resume, job, "Product Manager", {}, tailoring_mode)
+        results.append((assembled.text, assembled.input_tokens, assembled.max_tokens if after else 8000))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--max-input-tokens", type=int, default=6000)
+    parser.add_argument("--rag-context-tokens", type=int, default=300)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    corpus = []
+    for _ in range(args.requests):
+        similar = [Document(page_content=make_job(rng), metadata={"job_url": f"https://jobs.test/{rng.randint(1, 999)}"})
+                   for _ in range(3)]
+        corpus.append((make_resume(rng), make_job(rng), similar))
+    budget = PromptBudget(max_input_tokens=args.max_input_tokens, rag_context_tokens=args.rag_context_tokens)
+
+    print(f"{args.requests} requests, budget {args.max_input_tokens} input tokens "
+          f"(token counts {'exact' if prompt_budget._get_encoding() else 'estimated'})")
+    for mode in ("light", "heavy", "rag"):
+        for label, after in (("before", False), ("after", True)):
+            results = build(corpus, mode, after, budget)
+            tokens = sorted(result[1] for result in results)
+            line = (f"  {mode:>5} {label:>6}: input mean {statistics.mean(tokens):7.0f}  "
+                    f"p95 {tokens[int(len(tokens) * 0.95) - 1]:6d}  max {tokens[-1]:6d}")
+            if results[0][2] is not None:
+                line += f"  max_tokens mean {statistics.mean(result[2] for result in results):6.0f}"
+            if after:
+                line += f"  shared prefix {shared_prefix_tokens(result[0] for result in results):5d}"
+            print(line)
+    prompt_budget._budget = None
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Resume diff benchmark
+
+Times ``ResumeDiffAnalyzer.analyze_resume_diff`` (what
+``/api/resumes/analyze-diff`` runs) on generated 2-4 page resumes and tailored
+rewrites of them. The rewrites reword bullets, add keywords, insert new bullets
+and drop a few.
+
+- before: the previous analysis, reproduced below. It runs character-level
+  Levenshtein over each changed section and a ``difflib`` word diff that
+  re-splits both texts for every opcode. It re-tokenizes the whole text for
+  each metric and runs a ``difflib`` unified diff over the full resumes.
+- after: the current analyzer. Each text is tokenized once. Sections are
+  aligned first and diffed with the histogram/Myers engine in
+  ``utils.text_diff``. Similarity comes from the token edit script.
+
+Both use the same shared section parser. Segmentation is memoized, so that
+cost is excluded from both.
+
+Usage (from backend/):
+    python -m benchmarks.bench_resume_diff --pairs 30 --pages 2 3 4
+"""
+
+import argparse
+import difflib
+import random
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parents[1]
+if str(BACKEND) not in sys.path:
+    sys.path.insert(0, str(BACKEND))
+
+from Levenshtein import distance
+
+from utils.resume_diff import ResumeDiffAnalyzer
+
+WORDS = ("built launched led scaled reduced improved payments analytics platform pipeline roadmap the a and "
+         "with for of to experimentation pricing onboarding retention latency Python SQL Kafka React "
+         "stakeholders customers revenue growth teams engineers across global").split()
+KEYWORDS = "strategic cross-functional stakeholder optimization impact Looker dbt Airflow".split()
+LINES_PER_PAGE = 50
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def make_resume(rng: random.Random, pages: int) -> str:
+    lines = ["JANE DOE", "Senior Product Manager", "jane@example.com | (555) 123-4567 | Austin, TX", "",
+             "PROFESSIONAL SUMMARY", sentence(rng, 45) + ".", "", "PROFESSIONAL EXPERIENCE"]
+    role = 0
+    while len(lines) < pages * LINES_PER_PAGE - 8:
+        lines += ["", f"Company {role} | Remote", f"Product Manager | 20{10 + role % 10}-20{12 + role % 10}"]
+        lines += [f"• {sentence(rng, rng.randint(14, 26))}." for _ in range(rng.randint(4, 7))]
+        role += 1
+    lines += ["", "EDUCATION", "MBA, Stanford University | 2017", "", "SKILLS",
+              ", ".join(rng.sample(WORDS, 10)), ", ".join(rng.sample(WORDS, 10))]
+    return "\n".join(lines)
+
+
+def tailor(rng: random.Random, resume: str) -> str:
+    out = []
+    for line in resume.splitlines():
+        if line.startswith("•"):
+            roll = rng.random()
+            if roll < 0.05:
+                continue
+            words = line.split()
+            for _ in range(rng.randint(0, 3) if roll < 0.6 else 0):
+                words[rng.randrange(1, len(words))] = rng.choice(KEYWORDS)
+            if roll > 0.9:
+                out.append(f"• {sentence(rng, 18)}.")
+            line = " ".join(words)
+        elif line.startswith(("Python", "SQL")) or "," in line and "|" not in line:
+            line += ", " + ", ".join(rng.sample(KEYWORDS, 3))
+        out.append(line)
+    return "\n".join(out)
+
+
+class LegacyDiffAnalyzer(ResumeDiffAnalyzer):
+    """The analysis before the token diff engine, for comparison"""
+
+    def analyze_resume_diff(self, original_text, tailored_text, job_title=""):
+        original_sections = self._parse_resume_sections(original_text)
+        tailored_sections = self._parse_resume_sections(tailored_text)
+        return {
+            "summary": self._create_diff_summary(original_sections, tailored_sections),
+            "section_changes": self._legacy_section_changes(original_sections, tailored_sections),
+            "content_changes": self._legacy_content_changes(original_text, tailored_text),
+            "enhancement_score": self._calculate_enhancement_score(
+                original_text, tailored_text, original_text.lower().split(), tailored_text.lower().split()),
+            "detailed_diff": self._legacy_detailed_diff(original_text, tailored_text),
+        }
+
+    def _legacy_section_changes(self, original_sections, tailored_sections):
+        analysis = {}
+        for section in set(original_sections) | set(tailored_sections):
+            original, tailored = original_sections.get(section, ""), tailored_sections.get(section, "")
+            if original and tailored:
+                similarity = max(0.0, 1 - distance(original, tailored) / max(len(original), len(tailored)))
+                if similarity < 0.8:
+                    analysis[section] = self._legacy_specific_changes(original, tailored)
+                elif similarity < 0.95:
+                    analysis[section] = similarity
+        return analysis
+
+    def _legacy_specific_changes(self, original, tailored):
+        changes = []
+        matcher = difflib.SequenceMatcher(None, original.split(), tailored.split())
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag != "equal":
+                changes.append((" ".join(original.split()[i1:i2]), " ".join(tailored.split()[j1:j2])))
+        return changes[:10]
+
+    def _legacy_content_changes(self, original, tailored):
+        original_words, tailored_words = set(original.lower().split()), set(tailored.lower().split())
+        re.split(r"[.!?]+", original), re.split(r"[.!?]+", tailored)
+        return len(tailored.split()) - len(original.split()), tailored_words - original_words
+
+    def _legacy_detailed_diff(self, original, tailored):
+        return list(difflib.unified_diff(original.splitlines(), tailored.splitlines(), lineterm=""))[:50]
+
+
+def time_analyzer(analyzer, pairs, repeat: int):
+    timings = []
+    for original, tailored in pairs:
+        analyzer.analyze_resume_diff(original, tailored)  # warm the segmentation cache
+        started = time.perf_counter()
+        for _ in range(repeat):
+            analyzer.analyze_resume_diff(original, tailored)
+        timings.append((time.perf_counter() - started) / repeat * 1000)
+    return sorted(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pairs", type=int, default=30)
+    parser.add_argument("--pages", type=int, nargs="+", default=[2, 3, 4])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(17)
+    for pages in args.pages:
+        pairs = []
+        for _ in range(args.pairs):
+            resume = make_resume(rng, pages)
+            pairs.append((resume, tailor(rng, resume)))
+        words = statistics.mean(len(resume.split()) for resume, _ in pairs)
+        print(f"{pages} pages (~{words:.0f} words), {args.pairs} pairs")
+        for label, analyzer in (("before", LegacyDiffAnalyzer()), ("after", ResumeDiffAnalyzer())):
+            timings = time_analyzer(analyzer, pairs, args.repeat)
+            print(f"  {label:>6}: mean {statistics.mean(timings):8.2f} ms  "
+                  f"p95 {timings[int(len(timings) * 0.95) - 1]:8.2f} ms  max {timings[-1]:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
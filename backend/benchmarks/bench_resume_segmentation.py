@@ -0,0 +1,145 @@
+"""
+Resume segmentation benchmark
+
+Runs the resume parsing a tailor-and-render request does, for a corpus of
+generated resumes of varying length:
+
+- ``detect_existing_sections`` (tailoring prompt)
+- ``ResumeParser.parse`` (structured parse)
+- ``parse_resume_text_to_schema`` (template engine)
+- ``ResumeDiffAnalyzer._parse_resume_sections`` (original vs tailored diff)
+- ``ProfessionalOutputService._parse_resume_sections`` / ``_parse_docx_sections``
+
+Each consumer reads the shared ``segment_resume`` model. The benchmark
+reports the end-to-end parse cost per request in two modes:
+
+- uncached: the segment cache is disabled, so every consumer segments the
+  text again (the old behaviour, with one segmenter instead of six)
+- shared: the memoized segmentation is computed once and reused
+
+It also reports the cost of a single ``segment_resume`` call and the share of
+end-to-end time it accounts for.
+
+Usage (from backend/):
+    python -m benchmarks.bench_resume_segmentation --resumes 200 --max-roles 12
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parents[1]
+if str(BACKEND) not in sys.path:
+    sys.path.insert(0, str(BACKEND))
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+with contextlib.redirect_stdout(io.StringIO()):
+    from models.resume_schema import parse_resume_text_to_schema
+    from services.professional_output_service import ProfessionalOutputService
+    from services.resume_parser import ResumeParser
+    from utils.resume_diff import ResumeDiffAnalyzer
+    from utils.resume_segments import _segment, detect_existing_sections, get_segment_cache
+
+WORDS = ("built launched led scaled reduced improved payments analytics platform pipeline roadmap "
+         "experimentation pricing onboarding retention latency Python SQL Kafka React stakeholders").split()
+HEADERS = {
+    "summary": ("PROFESSIONAL SUMMARY", "Summary:", "Profile"),
+    "experience": ("PROFESSIONAL EXPERIENCE", "Work Experience", "EXPERIENCE"),
+    "projects": ("PROJECTS", "Key Projects"),
+    "education": ("EDUCATION", "Education"),
+    "skills": ("SKILLS", "Technical Skills"),
+    "awards": ("ACHIEVEMENTS", "Awards"),
+}
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def make_resume(rng: random.Random, max_roles: int) -> str:
+    lines = ["Jane Doe", "Senior Product Manager", "jane@example.com | (555) 123-4567 | Austin, TX", ""]
+    lines += [rng.choice(HEADERS["summary"]), sentence(rng, 40) + ".", ""]
+    lines.append(rng.choice(HEADERS["experience"]))
+    for role in range(rng.randint(2, max_roles)):
+        lines += ["", f"Company {role} | Remote", f"Product Manager | 20{10 + role % 10}-20{12 + role % 10}"]
+        lines += [f"• {sentence(rng, rng.randint(10, 20))}" for _ in range(rng.randint(3, 6))]
+    if rng.random() < 0.5:
+        lines += ["", rng.choice(HEADERS["projects"]), *(f"- {sentence(rng, 10)}" for _ in range(3))]
+    lines += ["", rng.choice(HEADERS["education"]), "MBA, Stanford University | 2017"]
+    skills = ", ".join(rng.sample(WORDS, 8))
+    lines += ["", f"Technical Skills: {skills}" if rng.random() < 0.5 else f"SKILLS\n{skills}"]
+    if rng.random() < 0.5:
+        lines += ["", f"{rng.choice(HEADERS['awards']).upper()} • {sentence(rng, 4)} • {sentence(rng, 4)}"]
+    return "\n".join(lines)
+
+
+def tailor(rng: random.Random, resume: str) -> str:
+    return "\n".join(line + (" " + rng.choice(WORDS) if line.startswith("•") else "") for line in resume.splitlines())
+
+
+def request(original: str, tailored: str, parser, diff, output) -> None:
+    """The parsing one tailor-and-render request does"""
+    detect_existing_sections(original)
+    parser.parse(original)
+    diff._parse_resume_sections(original)
+    diff._parse_resume_sections(tailored)
+    parse_resume_text_to_schema(tailored)
+    output._parse_resume_sections(tailored)
+    output._parse_docx_sections(tailored)
+
+
+def run(corpus, cache_entries: int):
+    cache = get_segment_cache()
+    cache.max_entries = cache_entries
+    cache.clear()
+    parser, diff = ResumeParser(), ResumeDiffAnalyzer()
+    output = ProfessionalOutputService.__new__(ProfessionalOutputService)
+
+    timings = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for original, tailored in corpus:
+            started = time.perf_counter()
+            request(original, tailored, parser, diff, output)
+            timings.append((time.perf_counter() - started) * 1000)
+    return sorted(timings), dict(cache.stats)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=200)
+    parser.add_argument("--max-roles", type=int, default=12)
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    corpus = []
+    for _ in range(args.resumes):
+        resume = make_resume(rng, args.max_roles)
+        corpus.append((resume, tailor(rng, resume)))
+    mean_lines = statistics.mean(len(resume.splitlines()) for resume, _ in corpus)
+
+    segment_ms = []
+    for resume, _ in corpus:
+        started = time.perf_counter()
+        _segment(resume, "")
+        segment_ms.append((time.perf_counter() - started) * 1000)
+
+    print(f"{args.resumes} requests, {mean_lines:.0f} lines per resume on average")
+    print(f"  segment_resume (one call): mean {statistics.mean(segment_ms):.3f} ms")
+    cache_size = get_segment_cache().max_entries
+    for label, entries in (("uncached", 0), ("shared", max(cache_size, 2))):
+        timings, stats = run(corpus, entries)
+        print(f"  {label:>8}: per request mean {statistics.mean(timings):7.3f} ms  "
+              f"p95 {timings[int(len(timings) * 0.95) - 1]:7.3f} ms  "
+              f"segmentations {stats['misses']:5d}  cache hits {stats['hits']:5d}")
+    get_segment_cache().max_entries = cache_size
+
+
+if __name__ == "__main__":
+    main()
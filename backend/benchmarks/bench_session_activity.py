@@ -0,0 +1,135 @@
+"""
+Authenticated request throughput: write-through vs write-behind session activity
+
+Spins up a minimal FastAPI app whose endpoint depends on ``get_current_user`` and
+hammers it from several client threads against a file-backed SQLite database.
+"write-through" is the previous behaviour (an UPDATE + COMMIT of
+``user_sessions.last_activity`` inside every request); "write-behind" records
+activity in memory and lets the tracker flush batched UPDATEs.
+
+Usage (from backend/):
+    python -m benchmarks.bench_session_activity --requests 4000 --threads 8 --sessions 200
+"""
+
+import argparse
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parents[1]
+if str(BACKEND) not in sys.path:
+    sys.path.insert(0, str(BACKEND))
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import models.file_metadata  # noqa: F401  (registers FileMetadata for User relationships)
+from config.database import get_db
+from models.user import Base, User, UserSession
+from utils import session_activity
+from utils.auth import AuthManager, get_current_user
+from utils.session_activity import SessionActivityTracker
+
+
+def build_app(Session) -> FastAPI:
+    app = FastAPI()
+
+    def override_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_db
+
+    @app.get("/me")
+    def me(user: User = Depends(get_current_user)):
+        return {"id": str(user.id)}
+
+    return app
+
+
+def seed(Session, sessions: int) -> list:
+    db = Session()
+    tokens = []
+    try:
+        for i in range(sessions):
+            user = User(id=uuid.uuid4(), email=f"load{i}@example.com", is_active=True)
+            db.add(user)
+            db.flush()
+            session = UserSession(
+                id=uuid.uuid4(), user_id=user.id, session_token=uuid.uuid4().hex,
+                expires_at=datetime.utcnow() + timedelta(hours=1),
+            )
+            db.add(session)
+            tokens.append(AuthManager.create_access_token(
+                {"sub": str(user.id), "session_id": str(session.id)}, timedelta(hours=1)
+            ))
+        db.commit()
+    finally:
+        db.close()
+    return tokens
+
+
+def run(app: FastAPI, tokens: list, total_requests: int, threads: int) -> float:
+    per_thread = total_requests // threads
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(offset: int) -> None:
+        with TestClient(app) as client:
+            barrier.wait()
+            for i in range(per_thread):
+                token = tokens[(offset + i) % len(tokens)]
+                response = client.get("/me", headers={"Authorization": f"Bearer {token}"})
+                assert response.status_code == 200, response.text
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        futures = [pool.submit(worker, n * 7919) for n in range(threads)]
+        barrier.wait()
+        started = time.perf_counter()
+        for future in futures:
+            future.result()
+        elapsed = time.perf_counter() - started
+    return (per_thread * threads) / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--sessions", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(
+            f"sqlite:///{Path(tmp) / 'bench_sessions.db'}",
+            connect_args={"check_same_thread": False, "timeout": 30},
+        )
+        Base.metadata.create_all(engine)
+        Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        tokens = seed(Session, args.sessions)
+        app = build_app(Session)
+
+        for label, enabled in (("write-through", False), ("write-behind", True)):
+            tracker = SessionActivityTracker(session_factory=Session, flush_interval=1.0, enabled=enabled)
+            session_activity._tracker = tracker
+            throughput = run(app, tokens, args.requests, args.threads)
+            tracker.stop()
+            print(
+                f"{label:<14} {throughput:>8.0f} req/s  "
+                f"(flushes={tracker.stats['flushes']}, statements={tracker.stats['statements']})"
+            )
+
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Stripe subscription sync benchmark
+
+Runs a local fake Stripe API (with artificial per-request latency) and compares
+the previous loop (one ``subscriptions.retrieve`` per active local row) against
+``StripeSyncEngine`` full and incremental runs.
+
+Usage (from backend/):
+    python -m benchmarks.bench_stripe_sync --subscriptions 2000 --latency-ms 20
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+BACKEND = Path(__file__).resolve().parents[1]
+if str(BACKEND) not in sys.path:
+    sys.path.insert(0, str(BACKEND))
+
+import stripe
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import models.file_metadata  # noqa: F401  (registers FileMetadata for User relationships)
+from models.user import Base, User, Subscription, SubscriptionTier, SubscriptionStatus
+from services.stripe_sync import StripeSyncEngine, map_stripe_status
+
+
+def start_fake_stripe(subscriptions, events, latency: float) -> ThreadingHTTPServer:
+    by_status = {}
+    for sub in subscriptions.values():
+        by_status.setdefault(sub["status"], []).append(sub)
+
+    def page(items, query, url):
+        limit = int(query.get("limit", ["10"])[0])
+        after = query.get("starting_after", [None])[0]
+        start = 0
+        if after:
+            start = next(i for i, item in enumerate(items) if item["id"] == after) + 1
+        return {"object": "list", "url": url, "data": items[start:start + limit],
+                "has_more": start + limit < len(items)}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            time.sleep(latency)
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+            if url.path == "/v1/subscriptions":
+                body = page(by_status.get(query["status"][0], []), query, url.path)
+            elif url.path == "/v1/events":
+                since = int(query["created[gt]"][0])
+                body = page([e for e in events if e["created"] > since], query, url.path)
+            else:
+                body = subscriptions[url.path.rsplit("/", 1)[-1]]
+            payload = json.dumps(body).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def seed(db_path: Path, sub_ids) -> sessionmaker:
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    for sub_id in sub_ids:
+        user = User(id=uuid.uuid4(), email=f"{sub_id}@example.com", subscription_tier=SubscriptionTier.PRO)
+        db.add(user)
+        db.add(Subscription(user=user, stripe_customer_id=f"cus_{sub_id}", stripe_subscription_id=sub_id,
+                            status=SubscriptionStatus.ACTIVE, tier=SubscriptionTier.PRO))
+    db.commit()
+    db.close()
+    return Session
+
+
+def legacy_sync(Session, client) -> int:
+    db = Session()
+    synced = 0
+    for subscription in db.query(Subscription).filter(Subscription.status == SubscriptionStatus.ACTIVE).all():
+        remote = client.subscriptions.retrieve(subscription.stripe_subscription_id)
+        status = map_stripe_status(remote.status)
+        if status != subscription.status:
+            subscription.status = status
+            subscription.current_period_start = datetime.utcfromtimestamp(remote.current_period_start)
+            subscription.current_period_end = datetime.utcfromtimestamp(remote.current_period_end)
+            db.commit()
+            synced += 1
+    db.close()
+    return synced
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--subscriptions", type=int, default=2000)
+    parser.add_argument("--changed", type=int, default=50, help="subscriptions changed before the incremental run")
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    now = int(time.time())
+    statuses = ["active"] * 8 + ["past_due", "canceled"]
+    subscriptions = {
+        f"sub_{i:06d}": {"id": f"sub_{i:06d}", "object": "subscription", "status": statuses[i % len(statuses)],
+                         "current_period_start": now - 86400, "current_period_end": now + 29 * 86400,
+                         "cancel_at_period_end": False, "canceled_at": None}
+        for i in range(args.subscriptions)
+    }
+    events = []
+    server = start_fake_stripe(subscriptions, events, args.latency_ms / 1000)
+    api_base = f"http://127.0.0.1:{server.server_port}"
+    client = stripe.StripeClient("sk_test_bench", base_addresses={"api": api_base})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        def run(label, func):
+            started = time.perf_counter()
+            synced = func()
+            print(f"{label:<28} {synced:>6} synced  {time.perf_counter() - started:>7.2f}s")
+
+        legacy_db = seed(Path(tmp) / "legacy.db", subscriptions)
+        run("legacy per-row retrieve", lambda: legacy_sync(legacy_db, client))
+
+        engine = StripeSyncEngine(seed(Path(tmp) / "engine.db", subscriptions), client=client,
+                                  max_concurrency=args.concurrency, state_path=Path(tmp) / "state.json")
+        full = asyncio.run(engine.sync(full=True))
+        print(f"{'engine full sync':<28} {full.updated:>6} synced  {full.elapsed_seconds:>7.2f}s  "
+              f"({full.api_calls} API calls)")
+
+        watermark = engine.load_watermark()
+        for i, sub_id in enumerate(list(subscriptions)[:args.changed]):
+            subscriptions[sub_id]["cancel_at_period_end"] = True
+            events.insert(0, {"id": f"evt_{i}", "object": "event", "created": watermark + 1 + i,
+                              "type": "customer.subscription.updated",
+                              "data": {"object": dict(subscriptions[sub_id])}})
+        incremental = asyncio.run(engine.sync())
+        print(f"{'engine incremental sync':<28} {incremental.updated:>6} synced  "
+              f"{incremental.elapsed_seconds:>7.2f}s  ({incremental.api_calls} API calls)")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+TemplateCacheService concurrent throughput benchmark
+
+Runs a mixed get/put workload (default 90% get / 10% put) from several threads
+and reports operations per second. The single-shard configuration behaves like
+the previous global-lock cache and is included as the baseline.
+
+Usage (from backend/):
+    python -m benchmarks.bench_template_cache --ops 200000 --threads 1 4 8
+"""
+
+import argparse
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parents[1]
+if str(BACKEND) not in sys.path:
+    sys.path.insert(0, str(BACKEND))
+
+from services.template_cache import TemplateCacheService
+
+
+def run_workload(cache: TemplateCacheService, threads: int, ops: int, keyspace: int, put_ratio: float) -> float:
+    payload = {"html": "<div>" + "x" * 2048 + "</div>", "meta": {"pages": 1}}
+    per_thread = ops // threads
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(seed: int) -> None:
+        rng = random.Random(seed)
+        template_ids = [f"template_{i}" for i in range(8)]
+        barrier.wait()
+        for _ in range(per_thread):
+            key = rng.randrange(keyspace)
+            template_id = template_ids[key % len(template_ids)]
+            if rng.random() < put_ratio:
+                cache.put(template_id, payload, format_type="json", data_hash=str(key))
+            else:
+                cache.get(template_id, format_type="json", data_hash=str(key))
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for t in workers:
+        t.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for t in workers:
+        t.join()
+    return (per_thread * threads) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ops", type=int, default=200_000)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--keyspace", type=int, default=5_000)
+    parser.add_argument("--put-ratio", type=float, default=0.1)
+    parser.add_argument("--shards", type=int, default=16)
+    args = parser.parse_args()
+
+    print(f"{'threads':>7} {'shards':>6} {'ops/s':>12} {'hit_rate':>9}")
+    for threads in args.threads:
+        for shards in (1, args.shards):
+            cache = TemplateCacheService(max_size=args.keyspace // 2, max_memory_mb=256, shard_count=shards)
+            rate = run_workload(cache, threads, args.ops, args.keyspace, args.put_ratio)
+            print(f"{threads:>7} {shards:>6} {rate:>12,.0f} {cache.get_stats()['hit_rate']:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Webhook statistics benchmark
+
+Seeds ``webhook_events`` (default 500k rows over 30 days), builds the hourly
+rollups and times ``get_webhook_statistics`` for 24h/7d/30d windows three ways:
+the previous per-status/per-type COUNT loop with Python-side averaging, the
+grouped raw aggregate, and the rollup range scan.
+
+Usage (from backend/):
+    python -m benchmarks.bench_webhook_stats --events 500000
+"""
+
+import argparse
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parents[1]
+if str(BACKEND) not in sys.path:
+    sys.path.insert(0, str(BACKEND))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import models.file_metadata  # noqa: F401  (registers FileMetadata for User relationships)
+from models.user import Base
+from services.webhook_logger import WebhookEvent, WebhookEventStatus, WebhookLogger
+
+EVENT_TYPES = [
+    "customer.subscription.created", "customer.subscription.updated", "customer.subscription.deleted",
+    "invoice.payment_succeeded", "invoice.payment_failed", "checkout.session.completed",
+]
+
+
+def _ts(value: datetime) -> str:
+    return value.strftime("%Y-%m-%d %H:%M:%S.%f")
+
+
+def seed(db_path: Path, events: int) -> None:
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(engine)
+    engine.dispose()
+
+    rng = random.Random(5)
+    now = datetime.utcnow()
+    statuses = ["PROCESSED"] * 17 + ["FAILED", "IGNORED", "RETRYING"]
+    rows = []
+    for _ in range(events):
+        created = now - timedelta(seconds=rng.uniform(0, 30 * 86400))
+        status = rng.choice(statuses)
+        processed = _ts(created + timedelta(seconds=rng.uniform(0.05, 3))) if status == "PROCESSED" else None
+        rows.append((str(uuid.uuid4()), rng.choice(EVENT_TYPES), status, 1, '{"object": "event"}',
+                     _ts(created), processed))
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        "INSERT INTO webhook_events (id, event_type, status, attempts, payload, created_at, processed_at) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        rows,
+    )
+    conn.commit()
+    conn.close()
+
+
+def legacy_statistics(db, hours_back: int) -> dict:
+    since = datetime.utcnow() - timedelta(hours=hours_back)
+    total = db.query(WebhookEvent).filter(WebhookEvent.created_at >= since).count()
+    status_counts = {
+        status.value: db.query(WebhookEvent).filter(WebhookEvent.created_at >= since,
+                                                    WebhookEvent.status == status).count()
+        for status in WebhookEventStatus
+    }
+    type_counts = {}
+    for (event_type,) in db.query(WebhookEvent.event_type).filter(WebhookEvent.created_at >= since).distinct():
+        type_counts[event_type] = db.query(WebhookEvent).filter(
+            WebhookEvent.created_at >= since, WebhookEvent.event_type == event_type).count()
+    processed = db.query(WebhookEvent).filter(
+        WebhookEvent.created_at >= since, WebhookEvent.status == WebhookEventStatus.PROCESSED,
+        WebhookEvent.processed_at.isnot(None)).all()
+    avg = sum((e.processed_at - e.created_at).total_seconds() for e in processed) / max(1, len(processed))
+    return {"total_events": total, "status_breakdown": status_counts, "event_type_breakdown": type_counts,
+            "average_processing_time_seconds": round(avg, 2)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=500_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "bench.db"
+        started = time.perf_counter()
+        seed(db_path, args.events)
+        engine = create_engine(f"sqlite:///{db_path}")
+        db = sessionmaker(bind=engine)()
+        webhook_logger = WebhookLogger(db)
+        rows = webhook_logger.rebuild_hourly_rollups()
+        print(f"Seeded {args.events:,} events and {rows:,} rollup rows in {time.perf_counter() - started:.1f}s")
+
+        for hours in (24, 24 * 7, 24 * 30):
+            results = {}
+            for label, func in (
+                ("legacy", lambda: legacy_statistics(db, hours)),
+                ("grouped", lambda: webhook_logger.get_webhook_statistics(hours, use_rollups=False)),
+                ("rollup", lambda: webhook_logger.get_webhook_statistics(hours)),
+            ):
+                started = time.perf_counter()
+                stats = func()
+                results[label] = (time.perf_counter() - started, stats["total_events"])
+                db.expunge_all()
+            print(f"{hours:>4}h  " + "  ".join(
+                f"{label} {seconds * 1000:>8.1f} ms ({total:,})" for label, (seconds, total) in results.items()
+            ))
+        db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
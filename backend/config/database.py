@@ -57,6 +57,7 @@ def init_db():
         Subscription, UsageTracking, PaymentHistory
     )
     from models.file_metadata import FileMetadata
+    from models.analytics_event import AnalyticsEvent, AnalyticsDailyRollup
     
     # Create all tables
     Base.metadata.create_all(bind=engine)
@@ -0,0 +1,39 @@
+"""
+Rendering Configuration for Apply.AI Backend
+Selects the PDF rendering backend and sizes its worker pool
+"""
+
+import os
+from typing import Dict, Any
+
+
+class RenderConfig:
+    """Centralized configuration for resume PDF rendering"""
+
+    CHROMIUM = "chromium"
+    REPORTLAB = "reportlab"
+    SUPPORTED_BACKENDS = (CHROMIUM, REPORTLAB)
+
+    # "chromium" renders HTML bundles through Playwright; "reportlab" renders the
+    # structured Resume directly for nodes that cannot ship a browser
+    PDF_BACKEND = os.getenv("PDF_RENDER_BACKEND", CHROMIUM).strip().lower()
+
+    # ReportLab process pool sizing
+    REPORTLAB_POOL_WORKERS = int(os.getenv("REPORTLAB_POOL_WORKERS", str(min(4, os.cpu_count() or 1))))
+    REPORTLAB_TASK_TIMEOUT = int(os.getenv("REPORTLAB_TASK_TIMEOUT", "30"))  # seconds per PDF
+
+    @classmethod
+    def get_pdf_backend(cls) -> str:
+        """Return the configured backend, falling back to Chromium for unknown values"""
+        if cls.PDF_BACKEND in cls.SUPPORTED_BACKENDS:
+            return cls.PDF_BACKEND
+        return cls.CHROMIUM
+
+    @classmethod
+    def get_config_dict(cls) -> Dict[str, Any]:
+        """Get all rendering configuration as a dictionary"""
+        return {
+            "pdf_backend": cls.get_pdf_backend(),
+            "reportlab_pool_workers": cls.REPORTLAB_POOL_WORKERS,
+            "reportlab_task_timeout": cls.REPORTLAB_TASK_TIMEOUT,
+        }
@@ -16,6 +16,7 @@ from config.security import validate_security_environment, SecurityMonitoring, c
 from config.timeout_config import TimeoutConfig
 from utils.rate_limiter import limiter, custom_rate_limit_handler
 from utils.file_security import cleanup_temp_files
+from utils.llm_coalescer import get_llm_coalescer
 from slowapi.errors import RateLimitExceeded
 
 # Import routes
@@ -157,6 +158,16 @@ async def startup_event():
         print(f"⚠️ Failed to start file cleanup scheduler: {e}")
         # Don't fail startup if scheduler fails
     
+    # Precompute template preview PNGs in the background (skips unchanged bundles)
+    if os.getenv("TEMPLATE_PREVIEW_PRECOMPUTE", "false").lower() == "true":
+        try:
+            import asyncio
+            from services.template_preview_service import warm_template_previews
+            app.state.preview_warmup_task = asyncio.create_task(warm_template_previews())
+            print("✅ Template preview precompute scheduled")
+        except Exception as e:
+            print(f"⚠️ Failed to schedule template preview precompute: {e}")
+    
     print("✅ Security configuration validated")
     print("✅ Application ready for requests")
 
@@ -198,7 +209,8 @@ async def detailed_health_check(request: Request):
                 "file_validation": "enabled",
                 "cors_configured": "enabled",
                 "security_headers": "enabled"
-            }
+            },
+            "llm_requests": get_llm_coalescer().get_stats()
         }
     except Exception as e:
         return {
@@ -271,6 +283,37 @@ async def shutdown_event():
     except Exception as e:
         print(f"⚠️ Error stopping lifecycle scheduler: {e}")
     
+    # Flush pending session last-activity timestamps
+    try:
+        from utils.session_activity import flush_session_activity
+        flushed = flush_session_activity()
+        print(f"✅ Session activity flushed ({flushed} sessions)")
+    except Exception as e:
+        print(f"⚠️ Error flushing session activity: {e}")
+    
+    # Write buffered analytics events
+    try:
+        from services.analytics_events import flush_analytics_events
+        written = flush_analytics_events()
+        print(f"✅ Analytics events flushed ({written} events)")
+    except Exception as e:
+        print(f"⚠️ Error flushing analytics events: {e}")
+    
+    # Deliver queued emails and close pooled SMTP connections
+    try:
+        from utils.mail_delivery import shutdown_mail_delivery
+        shutdown_mail_delivery()
+        print("✅ Mail queue flushed")
+    except Exception as e:
+        print(f"⚠️ Error flushing mail queue: {e}")
+    
+    # Stop ReportLab rendering workers
+    try:
+        from services.renderers.reportlab_renderer import shutdown_process_pool
+        shutdown_process_pool()
+    except Exception as e:
+        print(f"⚠️ Error stopping ReportLab render pool: {e}")
+    
     # Cleanup temporary files
     try:
         cleanup_temp_files()
@@ -0,0 +1,77 @@
+"""
+Migration: Add composite indexes for usage and subscription analytics
+Date: 2026-10-18
+Description: Adds the composite indexes used by the admin analytics aggregates and
+per-user usage lookups (usage_tracking by user/type + date, subscriptions by
+status + created_at and canceled_at)
+"""
+
+from sqlalchemy import text
+from config.database import engine, SessionLocal
+import logging
+
+logger = logging.getLogger(__name__)
+
+# (index name, table, columns) - names match the Index() entries on the models
+ANALYTICS_INDEXES = [
+    ("idx_usage_tracking_user_date", "usage_tracking", "user_id, usage_date"),
+    ("idx_usage_tracking_type_date", "usage_tracking", "usage_type, usage_date"),
+    ("idx_subscriptions_status_created", "subscriptions", "status, created_at"),
+    ("idx_subscriptions_canceled_at", "subscriptions", "canceled_at"),
+]
+
+
+def upgrade():
+    """Apply the migration"""
+    db = SessionLocal()
+
+    try:
+        is_sqlite = str(engine.url).startswith('sqlite')
+
+        logger.info("Creating analytics composite indexes...")
+
+        for index_name, table, columns in ANALYTICS_INDEXES:
+            try:
+                db.execute(text(f"CREATE INDEX IF NOT EXISTS {index_name} ON {table}({columns})"))
+                logger.info(f"Created index: {index_name} ON {table}({columns})")
+            except Exception as e:
+                logger.warning(f"Index might already exist: {e}")
+
+        # Refresh planner statistics so the new indexes are picked up immediately
+        db.execute(text("ANALYZE" if is_sqlite else "ANALYZE usage_tracking"))
+        if not is_sqlite:
+            db.execute(text("ANALYZE subscriptions"))
+
+        db.commit()
+        logger.info("✅ Analytics index migration completed successfully!")
+
+    except Exception as e:
+        db.rollback()
+        logger.error(f"❌ Migration failed: {e}")
+        raise e
+    finally:
+        db.close()
+
+def downgrade():
+    """Rollback the migration"""
+    db = SessionLocal()
+
+    try:
+        logger.info("Rolling back analytics index migration...")
+
+        for index_name, _, _ in reversed(ANALYTICS_INDEXES):
+            db.execute(text(f"DROP INDEX IF EXISTS {index_name}"))
+            logger.info(f"Dropped index: {index_name}")
+
+        db.commit()
+        logger.info("✅ Migration rollback completed!")
+
+    except Exception as e:
+        db.rollback()
+        logger.error(f"❌ Migration rollback failed: {e}")
+        raise e
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    upgrade()
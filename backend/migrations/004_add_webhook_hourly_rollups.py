@@ -0,0 +1,61 @@
+"""
+Migration: Add hourly webhook event rollups
+Date: 2026-10-18
+Description: Creates webhook_event_hourly_rollups (event counts and processing time per
+creation hour, event type and status), backfills it from existing webhook_events and
+indexes webhook_events.created_at
+"""
+
+from sqlalchemy import text
+from config.database import engine, SessionLocal
+import logging
+
+import models.file_metadata  # noqa: F401  (registers FileMetadata for User relationships)
+from services.webhook_logger import WebhookEvent, WebhookEventHourlyRollup, WebhookLogger
+
+logger = logging.getLogger(__name__)
+
+
+def upgrade():
+    """Apply the migration"""
+    db = SessionLocal()
+
+    try:
+        logger.info("Creating webhook hourly rollup table...")
+        WebhookEvent.__table__.create(bind=engine, checkfirst=True)
+        WebhookEventHourlyRollup.__table__.create(bind=engine, checkfirst=True)
+        db.execute(text(
+            "CREATE INDEX IF NOT EXISTS idx_webhook_events_created_at ON webhook_events(created_at)"
+        ))
+        db.commit()
+
+        rows = WebhookLogger(db).rebuild_hourly_rollups()
+        logger.info(f"✅ Webhook rollup migration completed successfully! ({rows} rollup rows)")
+
+    except Exception as e:
+        db.rollback()
+        logger.error(f"❌ Migration failed: {e}")
+        raise e
+    finally:
+        db.close()
+
+def downgrade():
+    """Rollback the migration"""
+    db = SessionLocal()
+
+    try:
+        logger.info("Rolling back webhook rollup migration...")
+        db.execute(text("DROP INDEX IF EXISTS idx_webhook_events_created_at"))
+        db.commit()
+        WebhookEventHourlyRollup.__table__.drop(bind=engine, checkfirst=True)
+        logger.info("✅ Migration rollback completed!")
+
+    except Exception as e:
+        db.rollback()
+        logger.error(f"❌ Migration rollback failed: {e}")
+        raise e
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    upgrade()
@@ -0,0 +1,40 @@
+"""
+Migration: Add persistent analytics event store
+Date: 2026-10-18
+Description: Creates analytics_events (append-only tracked events) with a composite
+(user_id, event_type, timestamp) index for dashboard range queries
+"""
+
+from config.database import engine
+import logging
+
+import models.file_metadata  # noqa: F401  (registers FileMetadata for User relationships)
+from models.analytics_event import AnalyticsEvent
+
+logger = logging.getLogger(__name__)
+
+
+def upgrade():
+    """Apply the migration"""
+    try:
+        logger.info("Creating analytics_events table...")
+        AnalyticsEvent.__table__.create(bind=engine, checkfirst=True)
+        logger.info("✅ Analytics event store migration completed successfully!")
+
+    except Exception as e:
+        logger.error(f"❌ Migration failed: {e}")
+        raise e
+
+def downgrade():
+    """Rollback the migration"""
+    try:
+        logger.info("Rolling back analytics event store migration...")
+        AnalyticsEvent.__table__.drop(bind=engine, checkfirst=True)
+        logger.info("✅ Migration rollback completed!")
+
+    except Exception as e:
+        logger.error(f"❌ Migration rollback failed: {e}")
+        raise e
+
+if __name__ == "__main__":
+    upgrade()
@@ -0,0 +1,49 @@
+"""
+Migration: Add daily analytics rollups
+Date: 2026-10-18
+Description: Creates analytics_daily_rollups (per-user daily event counts, template usage
+and keyword score totals) and backfills it from existing analytics_events
+"""
+
+from config.database import engine, SessionLocal
+import logging
+
+import models.file_metadata  # noqa: F401  (registers FileMetadata for User relationships)
+from models.analytics_event import AnalyticsDailyRollup, AnalyticsEvent
+from services.analytics_events import rebuild_daily_rollups
+
+logger = logging.getLogger(__name__)
+
+
+def upgrade():
+    """Apply the migration"""
+    db = SessionLocal()
+
+    try:
+        logger.info("Creating analytics daily rollup table...")
+        AnalyticsEvent.__table__.create(bind=engine, checkfirst=True)
+        AnalyticsDailyRollup.__table__.create(bind=engine, checkfirst=True)
+
+        rows = rebuild_daily_rollups(db)
+        logger.info(f"✅ Analytics rollup migration completed successfully! ({rows} rollup rows)")
+
+    except Exception as e:
+        db.rollback()
+        logger.error(f"❌ Migration failed: {e}")
+        raise e
+    finally:
+        db.close()
+
+def downgrade():
+    """Rollback the migration"""
+    try:
+        logger.info("Rolling back analytics rollup migration...")
+        AnalyticsDailyRollup.__table__.drop(bind=engine, checkfirst=True)
+        logger.info("✅ Migration rollback completed!")
+
+    except Exception as e:
+        logger.error(f"❌ Migration rollback failed: {e}")
+        raise e
+
+if __name__ == "__main__":
+    upgrade()
@@ -116,7 +116,11 @@ class MigrationRunner:
     def run_all_migrations(self):
         """Run all pending migrations"""
         migrations = [
-            "001_add_subscription_system"
+            "001_add_subscription_system",
+            "003_add_analytics_composite_indexes",
+            "004_add_webhook_hourly_rollups",
+            "005_add_analytics_events",
+            "006_add_analytics_daily_rollups"
         ]
         
         logger.info("Starting database migrations...")
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Analytics Event Model
+Append-only store of tracked analytics events, queried by user and time range,
+and the per-day rollups that dashboards read instead of raw events
+"""
+
+from sqlalchemy import BigInteger, Column, Date, DateTime, Float, Index, Integer, String, Text
+from datetime import datetime
+
+from models.user import Base, GUID
+
+
+class AnalyticsEvent(Base):
+    """One tracked analytics event (rows are inserted in batches and never updated)"""
+    
+    __tablename__ = "analytics_events"
+    
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    user_id = Column(GUID(), nullable=False)
+    event_type = Column(String(50), nullable=False)
+    timestamp = Column(DateTime, nullable=False, default=datetime.utcnow)  # UTC
+    
+    event_data = Column(Text, nullable=True)  # JSON string
+    event_metadata = Column(Text, nullable=True)  # JSON string
+    subscription_tier = Column(String(20), nullable=True)
+    
+    __table_args__ = (
+        # Dashboard queries: one user, a set of event types, a time range
+        Index("idx_analytics_events_user_type_ts", "user_id", "event_type", "timestamp"),
+    )
+    
+    def __repr__(self):
+        return f"<AnalyticsEvent(id={self.id}, user_id={self.user_id}, type={self.event_type})>"
+
+
+class AnalyticsDailyRollup(Base):
+    """
+    Per-user daily aggregate of analytics events, kept in step with
+    analytics_events by the event writer (same transaction as the insert)
+    """
+    
+    __tablename__ = "analytics_daily_rollups"
+    
+    user_id = Column(GUID(), primary_key=True)
+    day = Column(Date, primary_key=True)  # UTC day of the event timestamp
+    event_type = Column(String(50), primary_key=True)
+    dimension = Column(String(100), primary_key=True, default="")  # template name for template_usage
+    
+    event_count = Column(Integer, nullable=False, default=0)
+    score_count = Column(Integer, nullable=False, default=0)  # events carrying a match_score
+    score_sum = Column(Float, nullable=False, default=0.0)
+    score_max = Column(Float, nullable=True)
+    
+    def __repr__(self):
+        return f"<AnalyticsDailyRollup(user_id={self.user_id}, day={self.day}, type={self.event_type})>"
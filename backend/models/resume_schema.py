@@ -11,6 +11,8 @@ without being overly aggressive.
 from typing import List, Optional
 from pydantic import BaseModel, Field
 
+from utils.resume_segments import ContactBlock, segment_resume
+
 
 class Link(BaseModel):
     label: str = Field(default="")
@@ -64,73 +66,18 @@ def _split_lines(text: str) -> List[str]:
     return [line.strip() for line in text.splitlines()]
 
 
-def _is_probable_name(line: str) -> bool:
-    if not line:
-        return False
-    low = line.lower().strip()
-    if any(t in low for t in ["@", "http", "linkedin", "github", "phone", "email"]):
-        return False
-    # Avoid bullets or section headers
-    if line.lstrip().startswith(("-", "•", "*", "–")):
-        return False
-    if low.rstrip(":") in {"summary", "professional summary", "experience", "work experience", "professional experience", "education", "skills", "projects"}:
-        return False
-    if len(line) > 80:
-        return False
-    words = [w for w in line.replace("  ", " ").split(" ") if w]
-    return 1 < len(words) <= 5 and not line.isupper() and not line.endswith(":")
-
-
-def _extract_contact(lines: List[str]) -> Contact:
-    import re
-    email_re = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
-    phone_re = re.compile(r"\+?\d[\d\-().\s]{7,}\d")
-    url_re = re.compile(r"https?://[^\s]+", re.I)
-
-    email = None
-    phone = None
-    location = None
-    links: List[Link] = []
-
-    for line in lines[:6]:
-        if not email and (m := email_re.search(line)):
-            email = m.group(0)
-        if not phone and (m := phone_re.search(line)):
-            phone = m.group(0)
-        # A naive location heuristic: commas and letters, no @ or http
-        if not location and ("," in line) and ("@" not in line) and ("http" not in line.lower()):
-            if len(line) <= 80 and any(c.isalpha() for c in line):
-                location = line.strip()
-        for m in url_re.findall(line):
-            label = "Linked" if "linkedin" in m.lower() else ("GitHub" if "github" in m.lower() else "Link")
-            links.append(Link(label=label, url=m))
-
-    return Contact(email=email, phone=phone, location=location, links=links)
-
-
-def _detect_sections(lines: List[str]) -> List[tuple]:
-    """
-    Detect section headers (supports inline content on the same line).
-    Returns list of tuples: (index, section_key:str, inline_content:str)
-    """
-    import re
-    sections_map = {
-        "summary": [r"summary", r"professional\s+summary"],
-        "experience": [r"experience", r"work\s+experience", r"professional\s+experience"],
-        "projects": [r"projects?"],
-        "education": [r"education", r"academic"],
-        "skills": [r"skills", r"technical\s+skills"],
-    }
-    compiled = {k: re.compile(rf"^\s*(?:{'|'.join(v)})\s*:?\s*(.*)$", re.I) for k, v in sections_map.items()}
-    detected: List[tuple] = []
-    for idx, line in enumerate(lines):
-        for key, pattern in compiled.items():
-            m = pattern.match(line.strip())
-            if m:
-                inline = m.group(1).strip()
-                detected.append((idx, key, inline))
-                break
-    return detected
+def _link_label(url: str) -> str:
+    low = url.lower()
+    return "LinkedIn" if "linkedin" in low else ("GitHub" if "github" in low else "Link")
+
+
+def _extract_contact(block: ContactBlock) -> Contact:
+    return Contact(
+        email=block.email,
+        phone=block.phone,
+        location=block.location,
+        links=[Link(label=_link_label(url), url=url) for url in block.links],
+    )
 
 
 def _collect_bullets(lines: List[str]) -> List[str]:
@@ -158,83 +105,39 @@ def parse_resume_text_to_schema(resume_text: str) -> Resume:
     
     lines = [l for l in _split_lines(resume_text) if l]
     print(f"📊 Total lines after filtering: {len(lines)}")
-
-    # Name and headline detection - IMPROVED
-    name = ""
-    headline = None
-    if lines:
-        print("🔍 Extracting name from first few lines...")
-        # Try: explicit probable name - look for name patterns in first line
-        first_line = lines[0].strip()
-        print(f"📝 First line: '{first_line}'")
-        
-        # If first line contains contact info, extract name before separators
-        if '|' in first_line or '@' in first_line:
-            # Split by common separators and take the first part as name
-            name_part = first_line.split('|')[0].split('@')[0].strip()
-            # Remove phone numbers and other contact patterns
-            import re
-            name_part = re.sub(r'\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}', '', name_part).strip()
-            name_part = re.sub(r'\+?1?[-.\s]?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}', '', name_part).strip()
-            if len(name_part.split()) <= 4 and re.match(r"^[A-Za-z][A-Za-z\s\-\.'&]+$", name_part):
-                name = name_part
-                print(f"✅ Extracted name from contact line: '{name}'")
-        
-        # If no name found yet, try probable name detection
-        if not name:
-            for candidate in lines[:5]:
-                if _is_probable_name(candidate):
-                    name = candidate.strip()
-                    print(f"✅ Found probable name: '{name}'")
-                    break
-        
-        # Final fallback: extract name-like tokens from first line
-        if not name:
-            first = lines[0]
-            token_prefix = first.split("•")[0].split("|")[0].strip()
-            tokens = token_prefix.split()
-            if len(tokens) >= 2:
-                base_name = " ".join(tokens[:2])
-                if any(x in token_prefix.lower() for x in ["@", "http"]) or "," in token_prefix or len(tokens) > 3:
-                    name = base_name
-                else:
-                    name = token_prefix
-                print(f"✅ Fallback name extraction: '{name}'")
-        
-        # Headline: first short, non-contact line after name
-        for l in lines[:6]:
-            if l != name and len(l) <= 80 and not any(x in l.lower() for x in ["@", "http", "linkedin", "github"]):
-                # Avoid obvious section headers
-                if l.lower().strip().rstrip(":") not in {"summary", "experience", "projects", "education", "skills"}:
-                    headline = l
-                    print(f"✅ Found headline: '{headline}'")
-                    break
+    segmented = segment_resume(resume_text)
+
+    # Name and headline come from the contact block at the top
+    name = segmented.contact.name
+    headline = segmented.contact.headline
+    if not name and lines:
+        # Fallback: extract name-like tokens from first line
+        first = lines[0]
+        token_prefix = first.split("•")[0].split("|")[0].strip()
+        tokens = token_prefix.split()
+        if len(tokens) >= 2:
+            base_name = " ".join(tokens[:2])
+            if any(x in token_prefix.lower() for x in ["@", "http"]) or "," in token_prefix or len(tokens) > 3:
+                name = base_name
+            else:
+                name = token_prefix
+            print(f"✅ Fallback name extraction: '{name}'")
 
     print(f"📊 Extracted name: '{name}', headline: '{headline}'")
-    contact = _extract_contact(lines)
+    contact = _extract_contact(segmented.contact)
 
-    # Detect sections (supports inline content) - IMPROVED
-    detected = _detect_sections(lines)
-    print(f"🔍 Detected sections: {[(idx, key) for idx, key, _ in detected]}")
-    
+    print(f"🔍 Detected sections: {[(section.header_line, section.key) for section in segmented.sections]}")
     sections: dict = {}
-    if detected:
-        # Append sentinel to ease slicing
-        boundaries = detected + [(len(lines), "_end", "")]
-        for i in range(len(boundaries) - 1):
-            start_idx, key, inline = boundaries[i]
-            end_idx, _, _ = boundaries[i + 1]
-            body = []
-            if inline:
-                body.append(inline)
-            body.extend([l for l in lines[start_idx + 1:end_idx] if l])
-            sections[key] = body
-            print(f"📊 Section '{key}': {len(body)} lines")
-    else:
+    for section in segmented.sections:
+        sections.setdefault(section.key, []).extend(section.lines)
+    body_lines = [l for l in segmented.lines[segmented.contact.end:] if l]
+    if not sections:
         print("⚠️ No sections detected, using fallback parsing")
-        # Fallback if no explicit sections found - IMPROVED HEURISTICS
-        sections["summary"] = lines[:6]
-        sections["experience"] = lines[6:]
+        sections["summary"] = body_lines[:6]
+        sections["experience"] = body_lines[6:]
+    elif "summary" not in sections and segmented.intro:
+        # Unheaded paragraph between the contact block and the first section
+        sections["summary"] = list(segmented.intro)
 
     # Summary
     summary_lines = sections.get("summary", [])
@@ -254,12 +157,7 @@ def parse_resume_text_to_schema(resume_text: str) -> Resume:
 
     # Experience items
     experience_items: List[ExperienceItem] = []
-    exp_body = (
-        sections.get("experience")
-        or sections.get("work experience")
-        or sections.get("professional experience")
-        or []
-    )
+    exp_body = sections.get("experience") or []
     if exp_body:
         bullets = _collect_bullets(exp_body)
         if not bullets:
@@ -290,7 +188,7 @@ def parse_resume_text_to_schema(resume_text: str) -> Resume:
 
     # Skills
     skills: List[Skill] = []
-    skills_body = sections.get("skills") or sections.get("technical skills") or []
+    skills_body = sections.get("skills") or []
     if skills_body:
         tokens: List[str] = []
         for l in skills_body:
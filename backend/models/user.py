@@ -8,7 +8,7 @@ from typing import Optional, Dict, Any, List
 
 # Type: ignore SQLAlchemy type annotation issues
 # mypy: ignore-errors
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Enum, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Enum, Text, ForeignKey, Index
 from sqlalchemy.orm import DeclarativeBase, relationship
 from sqlalchemy.sql import func
 from sqlalchemy.types import TypeDecorator, CHAR
@@ -425,6 +425,10 @@ class EmailVerification(Base):
 # Subscription model
 class Subscription(Base):
     __tablename__ = "subscriptions"
+    __table_args__ = (
+        Index("idx_subscriptions_status_created", "status", "created_at"),
+        Index("idx_subscriptions_canceled_at", "canceled_at"),
+    )
     
     id = Column(GUID(), primary_key=True, default=uuid.uuid4)
     user_id = Column(GUID(), ForeignKey("users.id"), nullable=False)
@@ -493,6 +497,10 @@ class Subscription(Base):
 # Usage tracking model
 class UsageTracking(Base):
     __tablename__ = "usage_tracking"
+    __table_args__ = (
+        Index("idx_usage_tracking_user_date", "user_id", "usage_date"),
+        Index("idx_usage_tracking_type_date", "usage_type", "usage_date"),
+    )
     
     id = Column(GUID(), primary_key=True, default=uuid.uuid4)
     user_id = Column(GUID(), ForeignKey("users.id"), nullable=False)
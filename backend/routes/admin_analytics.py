@@ -17,6 +17,7 @@ from pydantic import BaseModel, Field
 from config.database import get_db
 from services.admin_analytics_service import AdminAnalyticsService, AlertType
 from utils.auth import get_current_user, require_admin_access
+from utils.llm_metrics import get_llm_metrics
 from models.user import User, UsageTracking
 from utils.rate_limiter import limiter
 
@@ -371,6 +372,40 @@ async def get_system_health(
         raise HTTPException(status_code=500, detail="Failed to check system health")
 
 
+@router.get("/llm-metrics")
+@limiter.limit("30/minute")
+async def get_llm_metrics_histograms(
+    request: Request,
+    reset: bool = Query(False, description="Clear the aggregates after reading them"),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get latency, token usage and cost histograms for LLM calls in this process
+    
+    **Admin Only**: Requires admin privileges
+    
+    **Returns (per operation and model):**
+    - Call counts by outcome (ok, error, timeout, coalesced) and retries
+    - Queue wait, time to first token and total latency histograms (ms)
+    - Prompt/completion token and estimated cost histograms
+    """
+    try:
+        require_admin_access(current_user)
+        
+        metrics = get_llm_metrics()
+        snapshot = metrics.snapshot()
+        if reset:
+            metrics.reset()
+        
+        return {**snapshot, "retrieved_at": datetime.utcnow().isoformat()}
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"LLM metrics error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to get LLM metrics")
+
+
 @router.get("/alerts")
 @limiter.limit("30/minute")
 async def get_system_alerts(
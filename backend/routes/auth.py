@@ -12,6 +12,7 @@ import re
 from config.database import get_db, DatabaseManager
 from models.user import User, UserSession, PasswordReset, EmailVerification, UserRole, AuthProvider
 from utils.auth import AuthManager
+from utils.token_cache import get_token_cache
 from utils.rate_limiter import limiter, RateLimits
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
@@ -390,6 +391,9 @@ async def logout(request: Request, credentials: HTTPAuthorizationCredentials = D
         from jose import jwt
         from utils.auth import SECRET_KEY, ALGORITHM
         
+        token_cache = get_token_cache()
+        token_cache.invalidate_token(credentials.credentials)
+        
         payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
         session_id = payload.get("session_id")
         
@@ -399,6 +403,8 @@ async def logout(request: Request, credentials: HTTPAuthorizationCredentials = D
             if session:
                 session.is_active = False
                 db.commit()
+            # After the commit, so a concurrent request cannot re-cache it as active
+            token_cache.invalidate_session(session_id)
         
         return {"success": True, "message": "Logged out successfully"}
         
@@ -473,6 +479,7 @@ async def reset_password(request: Request, reset_data: PasswordResetConfirm, db:
         })
         
         db.commit()
+        get_token_cache().invalidate_user(user.id)
         
         return {"success": True, "message": "Password reset successful"}
         
@@ -607,6 +614,7 @@ async def revoke_session(request: Request, session_id: str, user: User = Depends
     
     session.is_active = False
     db.commit()
+    get_token_cache().invalidate_session(session.id)
     
     return {"success": True, "message": "Session revoked successfully"}
 
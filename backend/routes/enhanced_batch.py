@@ -19,6 +19,9 @@ import re
 from datetime import datetime
 from sqlalchemy.orm import Session
 
+from services.job_generation import JobGenerationPlan
+from utils.stage_tracing import JobTrace, aggregate_stages, otlp_trace_id, to_chrome_trace, to_otlp_json, trace_stage
+
 # Import your existing components with fallback handling
 JOB_SCRAPER_AVAILABLE = True
 LANGCHAIN_AVAILABLE = True
@@ -63,6 +66,11 @@ except ImportError as e:
     LANGCHAIN_AVAILABLE = False
     LangChainResumeProcessor = None
 
+try:
+    from utils.gpt_prompt import GPTProcessor
+except ImportError as e:
+    GPTProcessor = None
+
 # Try to import EnhancedATSScorer first (it's independent of auth/db)
 try:
     from services.enhanced_ats_scorer import EnhancedATSScorer
@@ -298,6 +306,16 @@ class EnhancedBatchStatus:
             "speed_optimization_enabled": True,
             "max_processing_time": 30
         }
+        # Per-stage span traces, one per job index
+        self.job_traces: Dict[int, JobTrace] = {}
+
+    def stage_timings(self):
+        """Per-job stage breakdown plus per-stage p50/p95 across the batch"""
+        traces = dict(self.job_traces)
+        return {
+            "jobs": {index: trace.summary() for index, trace in sorted(traces.items())},
+            "batch": aggregate_stages(traces.values())
+        }
 
     def to_dict(self):
         return {
@@ -311,7 +329,8 @@ class EnhancedBatchStatus:
             "updated_at": self.updated_at.isoformat(),
             "user_email": self.user_email,
             "processing_mode": self.processing_mode,
-            "phase8_metrics": self.phase8_metrics
+            "phase8_metrics": self.phase8_metrics,
+            "stage_timings": self.stage_timings()
         }
 
 class EnhancedJobProcessor:
@@ -337,6 +356,9 @@ class EnhancedJobProcessor:
         else:
             self.langchain_processor = None
             
+        # Created on first cover letter request
+        self.gpt_processor = None
+            
         # Initialize analytics service for Pro users
         self.analytics_service = None
         if ANALYTICS_AVAILABLE and AnalyticsService:
@@ -676,11 +698,32 @@ KEY QUALIFICATIONS:
             # Fix bullet points at minimum
             return resume_text.replace('\\bullet', '•').replace('\bullet', '•')
 
-    def generate_cover_letter(self, resume_text: str, job_data: Dict[str, Any], tone: str = "professional") -> str:
-        """Generate enhanced cover letter"""
+    def generate_cover_letter(self, resume_text: str, job_data: Dict[str, Any], tone: str = "professional",
+                              cover_letter_options: Optional[Dict[str, Any]] = None) -> str:
+        """Generate enhanced cover letter (GPT when available, otherwise the tone template)"""
         job_title = job_data.get('title', 'Position')
-        company = job_data.get('company', 'Company')
         
+        if self.gpt_processor is None and GPTProcessor is not None:
+            try:
+                self.gpt_processor = GPTProcessor()
+            except Exception as e:
+                print(f"⚠️ GPTProcessor unavailable for cover letters: {e}")
+        if self.gpt_processor is not None:
+            options = dict(cover_letter_options or {})
+            options["coverLetterDetails"] = {**options.get("coverLetterDetails", {}), "tone": tone}
+            letter = self.gpt_processor.generate_cover_letter(
+                resume_text, job_data.get('description', ''), job_title, options
+            )
+            if letter:
+                return letter
+            print(f"⚠️ GPT cover letter failed for {job_title}, using template")
+        return self.template_cover_letter(job_data, tone)
+
+    def template_cover_letter(self, job_data: Dict[str, Any], tone: str = "professional") -> str:
+        """Cover letter from the tone template (no LLM call)"""
+        job_title = job_data.get('title', 'Position')
+        company = job_data.get('company', 'Company')
+
         if tone == "conversational":
             opening = f"Hi there! I'm excited to apply for the {job_title} position at {company}."
             closing = "I'd love to chat more about how I can contribute to your team. Looking forward to hearing from you!"
@@ -739,6 +782,21 @@ Best regards,
 # Initialize the enhanced processor
 enhanced_processor = EnhancedJobProcessor()
 
+# Time kept back from the per-job limit for formatting and ATS scoring after generation
+GENERATION_HEADROOM_SECONDS = 3.0
+
+
+def _tailor_resume_text(resume_text: str, job_data: Dict[str, Any], tailoring_mode: str) -> str:
+    """Tailor resume_text with the available processor (runs on the generation pool)"""
+    try:
+        if 'LANGCHAIN_AVAILABLE' in globals() and LANGCHAIN_AVAILABLE and hasattr(enhanced_processor, 'tailor_resume_with_rag'):
+            return enhanced_processor.tailor_resume_with_rag(resume_text, job_data)
+        if hasattr(enhanced_processor, 'tailor_resume'):
+            return enhanced_processor.tailor_resume(resume_text, job_data, tailoring_mode)
+    except Exception as e:
+        print(f"❌ Tailoring failed, falling back to original text: {e}")
+    return resume_text or ""
+
 async def process_single_job_enhanced(
     resume_text: str, 
     job_url: str, 
@@ -767,20 +825,28 @@ async def process_single_job_enhanced(
         if batch_id in batch_jobs:
             max_processing_time = batch_jobs[batch_id].phase8_metrics.get("max_processing_time", 30)
         
+        # Every stage of the job is recorded as a span of this trace
+        trace = JobTrace(f"Job {job_index + 1}", job_index=job_index, job_url=job_url,
+                         batch_id=batch_id, tailoring_mode=tailoring_mode, template=template)
+        if batch_id in batch_jobs:
+            batch_jobs[batch_id].job_traces[job_index] = trace
+        
         try:
             # Use timeout control for Phase 8 speed requirement
-            result = await asyncio.wait_for(
-                _process_job_core_enhanced(
-                    resume_text, job_url, job_index, batch_id, 
-                    tailoring_mode, cover_letter_options, user_id, db, template, output_format
-                ),
-                timeout=max_processing_time
-            )
+            with trace.activate(), trace_stage("job"):
+                result = await asyncio.wait_for(
+                    _process_job_core_enhanced(
+                        resume_text, job_url, job_index, batch_id, 
+                        tailoring_mode, cover_letter_options, user_id, db, template, output_format
+                    ),
+                    timeout=max_processing_time
+                )
             
             processing_time = time.time() - start_time
             result["processing_time"] = processing_time
             result["timed_out"] = False
             result["phase8_optimized"] = True
+            result["stage_timings"] = trace.summary()
             
             # Phase 8: Update performance metrics
             _update_phase8_metrics(batch_id, processing_time, False, job_index)
@@ -805,6 +871,7 @@ async def process_single_job_enhanced(
                 "processing_time": processing_time,
                 "timed_out": True,
                 "phase8_optimized": True,
+                "stage_timings": trace.summary(),
                 "tailored_resume": None,
                 "cover_letter": None,
                 "tailoring_mode": tailoring_mode
@@ -842,18 +909,21 @@ async def _process_job_core_enhanced(
     output_format: str = "pdf"
 ) -> Dict[str, Any]:
     """Core job processing logic with Phase 8 optimizations"""
+    core_started = time.time()
     # Simulate processing time based on mode (Phase 8: Optimized for speed)
     processing_time = 2 if tailoring_mode == "heavy" else 0.8  # Faster than original
-    await asyncio.sleep(processing_time)
+    with trace_stage("throttle"):
+        await asyncio.sleep(processing_time)
     
     print("🧠 Starting tailoring pipeline (RAG -> Standard fallback)")
     # Scrape job data if available; otherwise stub
     try:
-        job_data = enhanced_processor.scrape_job(job_url) if hasattr(enhanced_processor, 'scrape_job') else {
-            'title': f'Job {job_index + 1}',
-            'company': 'Company Name',
-            'description': 'Job description placeholder'
-        }
+        with trace_stage("scrape"):
+            job_data = enhanced_processor.scrape_job(job_url) if hasattr(enhanced_processor, 'scrape_job') else {
+                'title': f'Job {job_index + 1}',
+                'company': 'Company Name',
+                'description': 'Job description placeholder'
+            }
     except:
         job_data = {
             'title': f'Job {job_index + 1}',
@@ -903,172 +973,182 @@ async def _process_job_core_enhanced(
         }
         return failure_result
 
-    # Tailor resume_text -> tailored_resume using available processors
-    try:
-        if 'LANGCHAIN_AVAILABLE' in globals() and LANGCHAIN_AVAILABLE and hasattr(enhanced_processor, 'tailor_resume_with_rag'):
-            tailored_resume = enhanced_processor.tailor_resume_with_rag(resume_text, job_data)
-        elif hasattr(enhanced_processor, 'tailor_resume'):
-            tailored_resume = enhanced_processor.tailor_resume(resume_text, job_data, tailoring_mode)
-        else:
-            tailored_resume = resume_text or ""
-    except Exception as e:
-        print(f"❌ Tailoring failed, falling back to original text: {e}")
-        tailored_resume = resume_text or ""
-
-    # Ensure we always have this defined to avoid UnboundLocalError in later checks
-    formatted_resume_data = None
-
-    if output_format == "rtf":
-        # Handle RTF separately if needed
+    # Tailoring and the cover letter both work from the original resume and JD,
+    # so start them together; the cover letter finishes while the resume is formatted
+    include_cover_letter = bool(cover_letter_options and cover_letter_options.get("includeCoverLetter", False))
+    job_time_limit = batch_jobs[batch_id].phase8_metrics.get("max_processing_time", 30) if batch_id in batch_jobs else 30
+    generation_timeout = max(1.0, job_time_limit - (time.time() - core_started) - GENERATION_HEADROOM_SECONDS)
+    # Leaving the block (including on a formatting error) cancels unfinished steps
+    async with JobGenerationPlan(timeout=generation_timeout) as generation:
+        # Tailoring errors fall back to the original text inside the step; a
+        # tailoring timeout fails the plan, so the job is reported as timed out
+        # instead of completing with an untailored resume
+        generation.add("resume", _tailor_resume_text, resume_text, job_data, tailoring_mode)
+        if include_cover_letter:
+            tone = cover_letter_options.get("coverLetterDetails", {}).get("tone", "professional")
+            generation.add("cover_letter", enhanced_processor.generate_cover_letter,
+                           resume_text, job_data, tone, cover_letter_options, required=False)
+
+        tailored_resume = await generation.result("resume")
+
+        # Ensure we always have this defined to avoid UnboundLocalError in later checks
         formatted_resume_data = None
-    elif output_format in ["pdf", "rtf"] and PROFESSIONAL_OUTPUT_AVAILABLE:
-        print(f"🚀 Starting professional formatting with {template} template...")
-        try:
-            professional_service = ProfessionalOutputService()
-            print(f"✅ ProfessionalOutputService created successfully")
+
+        if output_format == "rtf":
+            # Handle RTF separately if needed
+            formatted_resume_data = None
+        elif output_format in ["pdf", "rtf"] and PROFESSIONAL_OUTPUT_AVAILABLE:
+            print(f"🚀 Starting professional formatting with {template} template...")
+            try:
+                professional_service = ProfessionalOutputService()
+                print(f"✅ ProfessionalOutputService created successfully")
             
-            # Generate professional formatted output
-            if output_format == "pdf":
-                print(f"🔍 DEBUG: Current batch_file_storage has {len(batch_file_storage)} items before PDF generation")
-                result_tuple = professional_service.generate_professional_pdf(
-                    resume_text=tailored_resume,
-                    job_description=job_data.get('description', ''),
-                    template=template,
-                    ats_optimize=True
-                )
-                if isinstance(result_tuple, tuple):
-                    result, ats_score = result_tuple
-                else:
-                    result, ats_score = result_tuple, None
-                if result.get('success'):
-                    print(f"✅ PDF generation successful! Result keys: {list(result.keys())}")
-                    
-                    # Check if we actually got PDF content
-                    pdf_content = result.get('pdf_content')
-                    if pdf_content:
-                        print(f"✅ PDF content exists, type: {type(pdf_content)}, size: {len(pdf_content)} bytes")
+                # Generate professional formatted output
+                if output_format == "pdf":
+                    print(f"🔍 DEBUG: Current batch_file_storage has {len(batch_file_storage)} items before PDF generation")
+                    with trace_stage("format", output_format="pdf"):
+                        result_tuple = professional_service.generate_professional_pdf(
+                            resume_text=tailored_resume,
+                            job_description=job_data.get('description', ''),
+                            template=template,
+                            ats_optimize=True
+                        )
+                    if isinstance(result_tuple, tuple):
+                        result, ats_score = result_tuple
                     else:
-                        print(f"❌ ERROR: PDF content is None or empty!")
-                        formatted_resume_data = None
+                        result, ats_score = result_tuple, None
+                    if result.get('success'):
+                        print(f"✅ PDF generation successful! Result keys: {list(result.keys())}")
+                    
+                        # Check if we actually got PDF content
+                        pdf_content = result.get('pdf_content')
+                        if pdf_content:
+                            print(f"✅ PDF content exists, type: {type(pdf_content)}, size: {len(pdf_content)} bytes")
+                        else:
+                            print(f"❌ ERROR: PDF content is None or empty!")
+                            formatted_resume_data = None
                     
-                    formatted_content = result.get('formatted_text', '')
-                    print(f"📝 Formatted content length: {len(formatted_content) if formatted_content else 0}")
+                        formatted_content = result.get('formatted_text', '')
+                        print(f"📝 Formatted content length: {len(formatted_content) if formatted_content else 0}")
                     
-                    # Store the actual PDF content for download endpoint
-                    pdf_filename = f"{job_data['title'].replace(' ', '_').replace('/', '_')}_resume_{template}_{batch_id}_{job_index}.pdf"
+                        # Store the actual PDF content for download endpoint
+                        pdf_filename = f"{job_data['title'].replace(' ', '_').replace('/', '_')}_resume_{template}_{batch_id}_{job_index}.pdf"
                     
-                    # Store PDF content in global storage for download
-                    file_key = f"{batch_id}/{pdf_filename}"
+                        # Store PDF content in global storage for download
+                        file_key = f"{batch_id}/{pdf_filename}"
                     
-                    if pdf_content:
-                        batch_file_storage[file_key] = pdf_content
-                        print(f"💾 Stored PDF file: {file_key}, size: {len(pdf_content)} bytes")
-                        print(f"✅ Verified storage: key '{file_key}' exists = {file_key in batch_file_storage}")
-                        print(f"📊 Total items in batch_file_storage: {len(batch_file_storage)}")
+                        if pdf_content:
+                            batch_file_storage[file_key] = pdf_content
+                            print(f"💾 Stored PDF file: {file_key}, size: {len(pdf_content)} bytes")
+                            print(f"✅ Verified storage: key '{file_key}' exists = {file_key in batch_file_storage}")
+                            print(f"📊 Total items in batch_file_storage: {len(batch_file_storage)}")
                         
-                        formatted_resume_data = {
-                            'format': 'pdf',
-                            'template_applied': template,
-                            'filename': pdf_filename,
-                            'download_url': f'/api/enhanced-batch/download/{batch_id}/{pdf_filename}',
-                            'has_binary_content': True,
-                            'content': ''
-                        }
+                            formatted_resume_data = {
+                                'format': 'pdf',
+                                'template_applied': template,
+                                'filename': pdf_filename,
+                                'download_url': f'/api/enhanced-batch/download/{batch_id}/{pdf_filename}',
+                                'has_binary_content': True,
+                                'content': ''
+                            }
+                        else:
+                            print(f"❌ ERROR: PDF content is None or empty!")
+                            formatted_resume_data = None
                     else:
-                        print(f"❌ ERROR: PDF content is None or empty!")
+                        print(f"❌ PDF generation failed! Result: {result}")
+                        print(f"🔍 Error details: {result.get('error', 'No error details')}")
                         formatted_resume_data = None
-                else:
-                    print(f"❌ PDF generation failed! Result: {result}")
-                    print(f"🔍 Error details: {result.get('error', 'No error details')}")
-                    formatted_resume_data = None
                     
-            elif output_format == "rtf":
-                result = professional_service.generate_professional_docx(
-                    resume_text=tailored_resume,
-                    template=template
-                )
-                if result.get('success'):
-                    # Store the actual RTF/DOCX content for download endpoint
-                    rtf_filename = f"{job_data['title'].replace(' ', '_').replace('/', '_')}_resume_{template}_{batch_id}_{job_index}.rtf"
+                elif output_format == "rtf":
+                    with trace_stage("format", output_format="rtf"):
+                        result = professional_service.generate_professional_docx(
+                            resume_text=tailored_resume,
+                            template=template
+                        )
+                    if result.get('success'):
+                        # Store the actual RTF/DOCX content for download endpoint
+                        rtf_filename = f"{job_data['title'].replace(' ', '_').replace('/', '_')}_resume_{template}_{batch_id}_{job_index}.rtf"
                     
-                    # Store RTF content in global storage for download
-                    file_key = f"{batch_id}/{rtf_filename}"
-                    rtf_content = result.get('docx_content') or result.get('rtf_content')
-                    batch_file_storage[file_key] = rtf_content
-                    print(f"💾 Stored RTF file: {file_key}, size: {len(rtf_content) if rtf_content else 0} bytes")
+                        # Store RTF content in global storage for download
+                        file_key = f"{batch_id}/{rtf_filename}"
+                        rtf_content = result.get('docx_content') or result.get('rtf_content')
+                        batch_file_storage[file_key] = rtf_content
+                        print(f"💾 Stored RTF file: {file_key}, size: {len(rtf_content) if rtf_content else 0} bytes")
                     
-                    formatted_resume_data = {
-                        'format': 'rtf',
-                        'template_applied': template,
-                        'filename': rtf_filename,
-                        'formatted': True,
-                        'content': result.get('formatted_text', tailored_resume),  # Text content for display
-                        'download_url': f'/api/enhanced-batch/download/{batch_id}/{rtf_filename}',  # Download URL
-                        'has_binary_content': True
-                    }
+                        formatted_resume_data = {
+                            'format': 'rtf',
+                            'template_applied': template,
+                            'filename': rtf_filename,
+                            'formatted': True,
+                            'content': result.get('formatted_text', tailored_resume),  # Text content for display
+                            'download_url': f'/api/enhanced-batch/download/{batch_id}/{rtf_filename}',  # Download URL
+                            'has_binary_content': True
+                        }
                     
-        except Exception as e:
-            print(f"⚠️ Professional formatting failed, using plain text: {e}")
-            import traceback
-            print(f"🚑 Full error traceback: {traceback.format_exc()}")
-            formatted_resume_data = None
-    else:
-        print("📝 Using plain text formatting (no professional templates applied)")
+            except Exception as e:
+                print(f"⚠️ Professional formatting failed, using plain text: {e}")
+                import traceback
+                print(f"🚑 Full error traceback: {traceback.format_exc()}")
+                formatted_resume_data = None
+        else:
+            print("📝 Using plain text formatting (no professional templates applied)")
 
-    # Generate cover letter if requested
-    cover_letter = None
-    if cover_letter_options and cover_letter_options.get("includeCoverLetter", False):
-        tone = cover_letter_options.get("coverLetterDetails", {}).get("tone", "professional")
-        cover_letter = enhanced_processor.generate_cover_letter(resume_text, job_data, tone)
+        # Collect the cover letter started alongside tailoring
+        cover_letter = await generation.result("cover_letter") if include_cover_letter else None
+        if include_cover_letter and cover_letter is None:
+            print(f"⚠️ Cover letter step failed ({generation.summary()['steps']['cover_letter']['error']}), using template")
+            cover_letter = enhanced_processor.template_cover_letter(job_data, tone)
     
     # Track analytics events for Pro users
     if user_id and db:
-        # Track resume generation event
-        await enhanced_processor.track_analytics_event(
-            user_id=user_id,
-            event_type="RESUME_GENERATED",
-            event_data={
-                "job_title": job_data['title'],
-                "company": job_data['company'],
-                "tailoring_mode": tailoring_mode,
-                "processing_time": processing_time,
-                "scraped_successfully": job_data.get('scraped_successfully', False)
-            },
-            db=db
-        )
-        
-        # Track template usage
-        await enhanced_processor.track_analytics_event(
-            user_id=user_id,
-            event_type="TEMPLATE_USAGE",
-            event_data={
-                "template_type": "enhanced_batch",
-                "tailoring_mode": tailoring_mode,
-                "job_title": job_data['title']
-            },
-            db=db
-        )
-        
-        # Track cover letter generation if applicable
-        if cover_letter:
+        with trace_stage("analytics"):
+            # Track resume generation event
             await enhanced_processor.track_analytics_event(
                 user_id=user_id,
-                event_type="COVER_LETTER_GENERATED",
+                event_type="RESUME_GENERATED",
                 event_data={
                     "job_title": job_data['title'],
                     "company": job_data['company'],
-                    "tone": cover_letter_options.get("coverLetterDetails", {}).get("tone", "professional")
+                    "tailoring_mode": tailoring_mode,
+                    "processing_time": processing_time,
+                    "scraped_successfully": job_data.get('scraped_successfully', False)
+                },
+                db=db
+            )
+        
+            # Track template usage
+            await enhanced_processor.track_analytics_event(
+                user_id=user_id,
+                event_type="TEMPLATE_USAGE",
+                event_data={
+                    "template_type": "enhanced_batch",
+                    "tailoring_mode": tailoring_mode,
+                    "job_title": job_data['title']
                 },
                 db=db
             )
+        
+            # Track cover letter generation if applicable
+            if cover_letter:
+                await enhanced_processor.track_analytics_event(
+                    user_id=user_id,
+                    event_type="COVER_LETTER_GENERATED",
+                    event_data={
+                        "job_title": job_data['title'],
+                        "company": job_data['company'],
+                        "tone": cover_letter_options.get("coverLetterDetails", {}).get("tone", "professional")
+                    },
+                    db=db
+                )
     
     # Calculate ATS score for the tailored resume with enhanced intelligence
     ats_scorer = EnhancedATSScorer()
     try:
-        ats_results = ats_scorer.calculate_ats_score(
-            resume_text=tailored_resume or "",
-            job_description=job_data.get('description', '')
-        )
+        with trace_stage("ats_scoring"):
+            ats_results = ats_scorer.calculate_ats_score(
+                resume_text=tailored_resume or "",
+                job_description=job_data.get('description', '')
+            )
     except Exception as ats_err:
         print(f"⚠️ ATS scoring failed: {ats_err}")
         ats_results = { 'overall_score': 'N/A', 'grade': 'N/A', 'keyword_analysis': {}, 'confidence_level': {} }
@@ -1124,6 +1204,7 @@ async def _process_job_core_enhanced(
             "professional_formatting": frd_safe is not None,
             "template_applied": template
         },
+        "generation": generation.summary(),
         "phase8_optimized": True  # Phase 8 marker
     }
     
@@ -1438,6 +1519,23 @@ async def get_enhanced_batch_status(batch_id: str):
         "status": batch_status.to_dict()
     })
 
+@router.get("/trace/{batch_id}")
+async def export_enhanced_batch_trace(batch_id: str, format: str = "chrome"):
+    """Export the batch's per-stage spans.
+
+    format=chrome: Chrome trace-event JSON (chrome://tracing, Perfetto)
+    format=otlp: OTLP/JSON, ready to POST to a collector's /v1/traces
+    """
+    if batch_id not in batch_jobs:
+        raise HTTPException(status_code=404, detail="Batch job not found")
+
+    traces = [trace for _, trace in sorted(batch_jobs[batch_id].job_traces.items())]
+    if format == "chrome":
+        return JSONResponse(to_chrome_trace(traces))
+    if format == "otlp":
+        return JSONResponse(to_otlp_json(traces, otlp_trace_id(batch_id)))
+    raise HTTPException(status_code=400, detail="format must be 'chrome' or 'otlp'")
+
 def sanitize_for_json(obj):
     """Remove any bytes objects from data structure to prevent JSON serialization errors"""
     if isinstance(obj, bytes):
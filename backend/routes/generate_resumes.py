@@ -1,11 +1,12 @@
-from fastapi import APIRouter, HTTPException, Depends
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
+from fastapi.responses import JSONResponse, FileResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 import os
 import uuid
 import asyncio
 import json
+from contextlib import aclosing
 from utils.gpt_prompt import GPTProcessor
 from utils.resume_editor import ResumeEditor
 from utils.langchain_processor import LangChainResumeProcessor
@@ -20,6 +21,7 @@ from services.advanced_formatting_service import (
     FontFamily
 )
 from services.job_specific_templates import JobSpecificTemplateService
+from services.resume_batch_render import RenderTask, failed_result, render_task, render_tasks
 
 router = APIRouter()
 
@@ -46,6 +48,9 @@ class GenerateRequest(BaseModel):
     # Job-specific template options (Pro only)
     use_job_specific_template: Optional[bool] = False
     job_category: Optional[str] = None  # e.g., "software_engineer", "data_scientist"
+    # Render jobs on the process pool; stream_results also streams NDJSON lines as each job finishes
+    parallel_rendering: Optional[bool] = False
+    stream_results: Optional[bool] = False
 
 class ResumeRequest(BaseModel):
     resume_text: str
@@ -130,182 +135,86 @@ async def generate_tailored_resumes(request: GenerateRequest, user: User = Depen
             raise HTTPException(status_code=400, detail="Could not extract text from resume")
         
         generated_resumes = []
-        
+        render_queue = []
+
         for i, job in enumerate(request.jobs):
             if job.get("status") != "success" or not job.get("job_description"):
                 continue
-                
-            try:
-                # Extract job title from URL or use generic title
-                job_title = f"Job_{i+1}"
-                if "linkedin.com" in job.get("url", ""):
-                    job_title = f"LinkedIn_Job_{i+1}"
-                elif "indeed.com" in job.get("url", ""):
-                    job_title = f"Indeed_Job_{i+1}"
-                elif "greenhouse" in job.get("url", ""):
-                    job_title = f"Greenhouse_Job_{i+1}"
-                
-                # Use hardcoded resume service - ignore all parameters
-                from services.hardcoded_resume_service import HardcodedResumeService
-                hardcoded_service = HardcodedResumeService()
-                tailored_resume_text = hardcoded_service.generate_hardcoded_resume()
-                
-                print(f"🚨 Job {i+1}: Using hardcoded resume instead of tailoring")
-                
-                if not tailored_resume_text:
-                    generated_resumes.append({
-                        "job_id": job.get("id", i+1),
-                        "job_url": job.get("url", ""),
-                        "status": "failed",
-                        "error": "Failed to generate tailored resume with GPT"
-                    })
-                    continue
-                
-                # Generate output file
-                output_filename = f"{uuid.uuid4()}_{job_title}.{request.output_format}"
-                output_path = f"outputs/{output_filename}"
-                
-                # Create the tailored resume file
-                if request.output_format == "pdf":
-                    # Check if job-specific template is requested and user is Pro
-                    if request.use_job_specific_template and user.is_pro_active() and request.job_category:
-                        # Validate job-specific template request
-                        is_valid, validation_message = job_specific_template_service.validate_job_specific_request(
-                            request.job_category,
-                            request.formatting_template,
-                            user.is_pro_active()
-                        )
-                        
-                        if is_valid:
-                            # Create formatting options for job-specific template
-                            formatting_options = FormattingOptions(
-                                template=FormattingTemplate(request.formatting_template),
-                                color_scheme=ColorScheme(request.color_scheme),
-                                font_family=FontFamily(request.font_family),
-                                font_size=request.font_size
-                            )
-                            
-                            # Use job-specific template
-                            success = job_specific_template_service.create_job_specific_resume(
-                                tailored_resume_text,
-                                request.job_category,
-                                request.formatting_template,
-                                formatting_options,
-                                output_path,
-                                job_title
-                            )
-                            
-                            # Fallback to advanced formatting if job-specific fails
-                            if not success:
-                                success = advanced_formatting_service.create_advanced_formatted_resume(
-                                    tailored_resume_text, formatting_options, output_path, job_title
-                                )
-                        else:
-                            # Fallback to advanced formatting if validation fails
-                            formatting_options = FormattingOptions(
-                                template=FormattingTemplate(request.formatting_template),
-                                color_scheme=ColorScheme(request.color_scheme),
-                                font_family=FontFamily(request.font_family),
-                                font_size=request.font_size
-                            )
-                            success = advanced_formatting_service.create_advanced_formatted_resume(
-                                tailored_resume_text, formatting_options, output_path, job_title
-                            )
-                    
-                    # Check if advanced formatting is requested and user is Pro
-                    elif request.use_advanced_formatting and user.is_pro_active():
-                        # Validate formatting options
-                        is_valid, validation_message = advanced_formatting_service.validate_formatting_request(
-                            request.formatting_template,
-                            request.color_scheme,
-                            request.font_family,
-                            user.is_pro_active()
-                        )
-                        
-                        if is_valid:
-                            # Create formatting options
-                            formatting_options = FormattingOptions(
-                                template=FormattingTemplate(request.formatting_template),
-                                color_scheme=ColorScheme(request.color_scheme),
-                                font_family=FontFamily(request.font_family),
-                                font_size=request.font_size
-                            )
-                            
-                            # Use advanced formatting
-                            success = advanced_formatting_service.create_advanced_formatted_resume(
-                                tailored_resume_text, formatting_options, output_path, job_title
-                            )
-                            
-                            # Fallback to standard if advanced formatting fails
-                            if not success:
-                                success = advanced_formatting_service.create_standard_formatted_resume(
-                                    tailored_resume_text, output_path, job_title
-                                )
-                        else:
-                            # Fallback to standard formatting if validation fails
-                            success = advanced_formatting_service.create_standard_formatted_resume(
-                                tailored_resume_text, output_path, job_title
-                            )
-                    else:
-                        # Use standard PDF generation for Free users or when advanced formatting not requested
-                        if user.is_pro_active():
-                            # FORCE USE OF UPDATED REFERENCE FORMAT - bypass advanced formatting
-                            # Use our updated ResumeEditor method that matches the reference format
-                            success = resume_editor.create_tailored_resume_pdf(
-                                tailored_resume_text, output_path, job_title
-                            )
-                            
-                            # Only use advanced formatting as fallback if our method fails
-                            if not success and request.use_advanced_formatting:
-                                # Pro user requested advanced formatting but with standard template
-                                success = advanced_formatting_service.create_standard_formatted_resume(
-                                    tailored_resume_text, output_path, job_title
-                                )
-                else:  # docx
-                    success = resume_editor.create_tailored_resume_docx(
-                        tailored_resume_text, output_path, job_title
-                    )
-                
-                if success:
-                    generated_resumes.append({
-                        "job_id": job.get("id", i+1),
-                        "job_title": job_title,
-                        "job_url": job.get("url", ""),
-                        "status": "success",
-                        "filename": output_filename,
-                        "download_url": f"/api/download/{output_filename}",
-                        "preview": tailored_resume_text[:300] + "..." if len(tailored_resume_text) > 300 else tailored_resume_text
-                    })
-                else:
-                    generated_resumes.append({
-                        "job_id": job.get("id", i+1),
-                        "job_url": job.get("url", ""),
-                        "status": "failed",
-                        "error": "Failed to create output file"
-                    })
-                    
-            except Exception as e:
-                generated_resumes.append({
-                    "job_id": job.get("id", i+1),
-                    "job_url": job.get("url", ""),
-                    "status": "failed",
-                    "error": str(e)
-                })
-        
-        successful_resumes = [r for r in generated_resumes if r["status"] == "success"]
-        
-        return JSONResponse({
-            "message": f"Generated {len(successful_resumes)} tailored resumes",
-            "total_jobs": len(request.jobs),
-            "successful_generations": len(successful_resumes),
-            "failed_generations": len(generated_resumes) - len(successful_resumes),
-            "tailoring_mode_requested": request.tailoring_mode.value if request.tailoring_mode else "light",
-            "tailoring_mode_used": effective_tailoring_mode.value,
-            "tailoring_mode_fallback": tailoring_mode_fallback,
-            "tailoring_mode_fallback_reason": tailoring_mode_fallback_reason,
-            "resumes": generated_resumes
-        })
-        
+
+            # Extract job title from URL or use generic title
+            job_title = f"Job_{i+1}"
+            if "linkedin.com" in job.get("url", ""):
+                job_title = f"LinkedIn_Job_{i+1}"
+            elif "indeed.com" in job.get("url", ""):
+                job_title = f"Indeed_Job_{i+1}"
+            elif "greenhouse" in job.get("url", ""):
+                job_title = f"Greenhouse_Job_{i+1}"
+
+            # Use hardcoded resume service - ignore all parameters
+            from services.hardcoded_resume_service import HardcodedResumeService
+            hardcoded_service = HardcodedResumeService()
+            tailored_resume_text = hardcoded_service.generate_hardcoded_resume()
+
+            print(f"🚨 Job {i+1}: Using hardcoded resume instead of tailoring")
+
+            task = RenderTask(
+                index=i,
+                job_id=job.get("id", i+1),
+                job_url=job.get("url", ""),
+                job_title=job_title,
+                resume_text=tailored_resume_text,
+                output_format=request.output_format,
+                output_filename=f"{uuid.uuid4()}_{job_title}.{request.output_format}",
+                is_pro=user.is_pro_active(),
+                formatting_template=request.formatting_template,
+                color_scheme=request.color_scheme,
+                font_family=request.font_family,
+                font_size=request.font_size,
+                use_advanced_formatting=bool(request.use_advanced_formatting),
+                use_job_specific_template=bool(request.use_job_specific_template),
+                job_category=request.job_category,
+            )
+            if not tailored_resume_text:
+                generated_resumes.append(failed_result(task, "Failed to generate tailored resume with GPT"))
+            else:
+                render_queue.append(task)
+
+        def build_summary(results):
+            successful_resumes = [r for r in results if r["status"] == "success"]
+            return {
+                "message": f"Generated {len(successful_resumes)} tailored resumes",
+                "total_jobs": len(request.jobs),
+                "successful_generations": len(successful_resumes),
+                "failed_generations": len(results) - len(successful_resumes),
+                "tailoring_mode_requested": request.tailoring_mode.value if request.tailoring_mode else "light",
+                "tailoring_mode_used": effective_tailoring_mode.value,
+                "tailoring_mode_fallback": tailoring_mode_fallback,
+                "tailoring_mode_fallback_reason": tailoring_mode_fallback_reason,
+            }
+
+        if request.stream_results:
+            # NDJSON: one {"type": "job"} line per job as it finishes, then a {"type": "summary"} line
+            async def stream():
+                results = list(generated_resumes)
+                for result in results:
+                    yield json.dumps({"type": "job", **result}) + "\n"
+                # aclosing: a client disconnect stops the remaining renders right away
+                async with aclosing(render_tasks(render_queue)) as rendered:
+                    async for result in rendered:
+                        results.append(result)
+                        yield json.dumps({"type": "job", **result}) + "\n"
+                yield json.dumps({"type": "summary", **build_summary(results)}) + "\n"
+
+            return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+        if request.parallel_rendering:
+            generated_resumes += [result async for result in render_tasks(render_queue)]
+        else:
+            generated_resumes += [render_task(task) for task in render_queue]
+        generated_resumes.sort(key=lambda result: result["index"])
+
+        return JSONResponse({**build_summary(generated_resumes), "resumes": generated_resumes})
+
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating resumes: {str(e)}")
 
@@ -364,7 +273,7 @@ async def list_generated_resumes():
         raise HTTPException(status_code=500, detail=f"Error listing files: {str(e)}")
 
 @router.post("/tailor")
-async def tailor_resume(request: ResumeRequest, user: User = Depends(AuthManager.verify_token)):
+async def tailor_resume(request: ResumeRequest, background_tasks: BackgroundTasks, user: User = Depends(AuthManager.verify_token)):
     """Enhanced resume tailoring with LangChain RAG, diff analysis, and tailoring mode selection"""
     try:
         # Validate tailoring mode access (Pro users only for Heavy mode)
@@ -408,7 +317,7 @@ async def tailor_resume(request: ResumeRequest, user: User = Depends(AuthManager
                 job_title=request.job_title
             )
 
-        # Store job description in vector store for future RAG
+        # Store job description in vector store for future RAG (after the response is sent)
         if request.job_description and request.job_url:
             job_data = [{
                 "id": result.get("session_id", "unknown"),
@@ -416,7 +325,7 @@ async def tailor_resume(request: ResumeRequest, user: User = Depends(AuthManager
                 "job_title": request.job_title,
                 "url": request.job_url
             }]
-            langchain_processor.initialize_job_vectorstore(job_data)
+            background_tasks.add_task(langchain_processor.initialize_job_vectorstore, job_data)
 
         response_data = {
             "success": True,
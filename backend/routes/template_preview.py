@@ -16,12 +16,14 @@ from pathlib import Path
 from io import BytesIO
 import base64
 
-from fastapi import APIRouter, HTTPException, Query, Response
+from fastapi import APIRouter, HTTPException, Query, Request, Response
 from fastapi.responses import HTMLResponse, JSONResponse
 from pydantic import BaseModel
 
 from services.template_engine import TemplateEngine
 from services.template_registry import TemplateRegistry
+from services.render_cache import get_render_cache
+from services.template_preview_service import get_template_preview_service
 from models.resume_schema import Resume
 
 # Optional dependencies for screenshot generation
@@ -57,123 +59,6 @@ class PreviewRequest(BaseModel):
     format: str = "html"  # html, png, json
 
 
-def generate_sample_resume_data() -> Dict[str, Any]:
-    """
-    Generate comprehensive sample resume data for template previews
-    """
-    return {
-        "name": "Alexandra Johnson",
-        "headline": "Senior Software Engineer & Technical Lead",
-        "contact": {
-            "email": "alexandra.johnson@email.com",
-            "phone": "(555) 123-4567",
-            "location": "San Francisco, CA",
-            "links": [
-                {"url": "https://linkedin.com/in/alexandra-johnson", "label": "LinkedIn"},
-                {"url": "https://github.com/alexandra-johnson", "label": "GitHub"},
-                {"url": "https://alexandra-johnson.dev", "label": "Portfolio"}
-            ]
-        },
-        "summary": "Innovative Senior Software Engineer with 8+ years of experience building scalable web applications and leading high-performing development teams. Expertise in full-stack development, cloud architecture, and agile methodologies. Proven track record of delivering complex projects that drive business growth and improve user experience.",
-        "experience": [
-            {
-                "title": "Senior Software Engineer",
-                "company": "TechCorp Solutions",
-                "location": "San Francisco, CA",
-                "start": "2021-03",
-                "end": None,
-                "bullets": [
-                    "Led development of microservices architecture serving 2M+ daily active users",
-                    "Reduced system latency by 40% through database optimization and caching strategies",
-                    "Mentored 5 junior developers and established code review best practices",
-                    "Implemented CI/CD pipeline reducing deployment time from 2 hours to 15 minutes"
-                ]
-            },
-            {
-                "title": "Full Stack Developer",
-                "company": "StartupXYZ",
-                "location": "San Francisco, CA",
-                "start": "2019-01",
-                "end": "2021-02",
-                "bullets": [
-                    "Built responsive web application using React, Node.js, and PostgreSQL",
-                    "Integrated third-party APIs including Stripe, SendGrid, and AWS services",
-                    "Collaborated with design team to implement pixel-perfect UI components",
-                    "Achieved 99.9% uptime through robust error handling and monitoring"
-                ]
-            },
-            {
-                "title": "Software Developer",
-                "company": "Digital Agency Inc",
-                "location": "San Francisco, CA",
-                "start": "2017-06",
-                "end": "2018-12",
-                "bullets": [
-                    "Developed custom WordPress plugins for enterprise clients",
-                    "Optimized website performance resulting in 60% faster load times",
-                    "Managed multiple client projects simultaneously with strict deadlines",
-                    "Created automated testing suite improving code quality and reliability"
-                ]
-            }
-        ],
-        "education": [
-            {
-                "school": "University of California, Berkeley",
-                "degree": "Bachelor of Science in Computer Science",
-                "end": "2017-05"
-            }
-        ],
-        "skills": [
-            {"name": "JavaScript"},
-            {"name": "TypeScript"},
-            {"name": "Python"},
-            {"name": "Java"},
-            {"name": "Go"},
-            {"name": "SQL"},
-            {"name": "React"},
-            {"name": "Node.js"},
-            {"name": "Express"},
-            {"name": "Django"},
-            {"name": "Spring Boot"},
-            {"name": "GraphQL"},
-            {"name": "AWS"},
-            {"name": "Docker"},
-            {"name": "Kubernetes"},
-            {"name": "Jenkins"},
-            {"name": "Terraform"},
-            {"name": "MongoDB"},
-            {"name": "Git"},
-            {"name": "Jira"},
-            {"name": "Figma"},
-            {"name": "Postman"},
-            {"name": "Redis"},
-            {"name": "Elasticsearch"}
-        ],
-        "projects": [
-            {
-                "name": "E-commerce Platform",
-                "description": "Full-stack e-commerce solution with real-time inventory management",
-                "bullets": [
-                    "Built with React, Node.js, PostgreSQL, Redis, and Stripe",
-                    "Implemented real-time inventory tracking and management",
-                    "Integrated secure payment processing with Stripe API",
-                    "Deployed on AWS with auto-scaling capabilities"
-                ]
-            },
-            {
-                "name": "Task Management API",
-                "description": "RESTful API for team collaboration and project management",
-                "bullets": [
-                    "Developed using Python, FastAPI, MongoDB, and Docker",
-                    "Implemented JWT authentication and role-based access control",
-                    "Created comprehensive API documentation with OpenAPI",
-                    "Achieved 99.9% uptime with automated testing and monitoring"
-                ]
-            }
-        ]
-    }
-
-
 def _get_cache_key(template_id: str, format_type: str = "html", custom_data: bool = False) -> str:
     """Generate cache key for preview"""
     base_key = f"{template_id}:{format_type}"
@@ -385,8 +270,29 @@ def _generate_placeholder_image(template_id: str) -> bytes:
             return b''
 
 
+def _indexed_png_response(request: Request, template_id: str, sample_set: str) -> Optional[Response]:
+    """Serve a precomputed preview PNG with ETag revalidation, or None if not indexed"""
+    service = get_template_preview_service()
+    etag = service.get_indexed_etag(template_id, sample_set)
+    if not etag:
+        return None
+    
+    quoted_etag = f'"{etag}"'
+    headers = {"ETag": quoted_etag, "Cache-Control": "public, max-age=3600"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if quoted_etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    
+    indexed = service.get_indexed_preview(template_id, sample_set)
+    if indexed is None:
+        return None
+    png_bytes, _ = indexed
+    return Response(content=png_bytes, media_type="image/png", headers=headers)
+
+
 @router.get("/preview/{template_id}", response_model=None)
 async def get_template_preview(
+    request: Request,
     template_id: str,
     format: str = Query("html", description="Response format: html, png, json"),
     use_sample: bool = Query(True, description="Use sample data for preview"),
@@ -416,6 +322,12 @@ async def get_template_preview(
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
     
+    # Precomputed previews are served straight from the on-disk index
+    if format == "png" and cache:
+        indexed_response = _indexed_png_response(request, template_id, "sample" if use_sample else "empty")
+        if indexed_response is not None:
+            return indexed_response
+    
     # Check cache if enabled
     cache_key = _get_cache_key(template_id, format, not use_sample)
     if cache and cache_key in _preview_cache and _is_cache_valid(_preview_cache[cache_key]):
@@ -433,26 +345,10 @@ async def get_template_preview(
             return JSONResponse(content=cached_data["content"])
     
     try:
-        # Generate resume data
-        if use_sample:
-            resume_data = generate_sample_resume_data()
-        else:
-            # Use minimal data for empty template preview
-            resume_data = {
-                "name": "Your Name Here",
-                "headline": "Your Professional Title",
-                "contact": {
-                    "email": "your.email@example.com",
-                    "phone": "(555) 000-0000",
-                    "location": "Your City, State",
-                    "links": []
-                },
-                "summary": "Your professional summary will appear here...",
-                "experience": [],
-                "education": [],
-                "skills": [],
-                "projects": []
-            }
+        # Same sample data the precomputed index is rendered from
+        resume_data = get_template_preview_service().get_sample_data(
+            template_id, "sample" if use_sample else "empty"
+        )
         
         # Generate HTML preview
         html_content = TemplateEngine.render_preview(
@@ -552,7 +448,7 @@ async def create_custom_preview(
     
     try:
         # Use provided data or fall back to sample data
-        resume_data = request.resume_data or generate_sample_resume_data()
+        resume_data = request.resume_data or get_template_preview_service().get_sample_data(template_id)
         
         # Generate HTML preview
         html_content = TemplateEngine.render_preview(
@@ -746,10 +642,12 @@ async def clear_preview_cache() -> JSONResponse:
     cache_size = len(_preview_cache)
     _preview_cache.clear()
     _metadata_cache = None
+    rendered_cleared = get_render_cache().clear()
     
     return JSONResponse(content={
         "message": "Preview cache cleared successfully",
         "cleared_entries": cache_size,
+        "cleared_rendered_entries": rendered_cleared,
         "cleared_at": datetime.now().isoformat()
     })
 
@@ -779,5 +677,38 @@ async def get_cache_stats() -> JSONResponse:
         "metadata_cached": _metadata_cache is not None,
         "cache_ttl_hours": _cache_ttl.total_seconds() / 3600,
         "playwright_available": PLAYWRIGHT_AVAILABLE,
+        "rendered_cache": get_render_cache().get_stats(),
         "checked_at": datetime.now().isoformat()
     })
+
+
+@router.delete("/cache/{template_id}")
+async def invalidate_template_cache(template_id: str) -> JSONResponse:
+    """
+    Invalidate cached previews and rendered PDFs for a single template
+    
+    Args:
+        template_id: Template identifier
+        
+    Returns:
+        JSON with the number of invalidated entries
+    """
+    
+    preview_keys = [
+        key
+        for key in (
+            _get_cache_key(template_id, format_type, custom_data)
+            for format_type in ("html", "png", "json")
+            for custom_data in (False, True)
+        )
+        if key in _preview_cache
+    ]
+    for key in preview_keys:
+        del _preview_cache[key]
+    
+    return JSONResponse(content={
+        "template_id": template_id,
+        "invalidated_previews": len(preview_keys),
+        "invalidated_rendered": get_render_cache().invalidate_template(template_id),
+        "invalidated_at": datetime.now().isoformat()
+    })
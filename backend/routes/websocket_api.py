@@ -151,10 +151,7 @@ async def websocket_endpoint(websocket: WebSocket, user_token: str):
         # Authenticate user from token
         try:
             # Decode token to get user info
-            from jose import jwt
-            from utils.auth import SECRET_KEY, ALGORITHM
-            
-            payload = jwt.decode(user_token, SECRET_KEY, algorithms=[ALGORITHM])
+            payload = AuthManager.decode_token(user_token)
             user_id = payload.get("sub")
             
             if not user_id:
@@ -264,10 +261,7 @@ async def analytics_events_stream(user_token: str):
     async def event_generator():
         try:
             # Authenticate user
-            from jose import jwt
-            from utils.auth import SECRET_KEY, ALGORITHM
-            
-            payload = jwt.decode(user_token, SECRET_KEY, algorithms=[ALGORITHM])
+            payload = AuthManager.decode_token(user_token)
             user_id = payload.get("sub")
             
             if not user_id:
@@ -334,10 +328,7 @@ async def processing_events_stream(processing_id: str, user_token: str):
     async def event_generator():
         try:
             # Authenticate user
-            from jose import jwt
-            from utils.auth import SECRET_KEY, ALGORITHM
-            
-            payload = jwt.decode(user_token, SECRET_KEY, algorithms=[ALGORITHM])
+            payload = AuthManager.decode_token(user_token)
             user_id = payload.get("sub")
             
             if not user_id:
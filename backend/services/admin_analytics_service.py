@@ -17,14 +17,26 @@ from typing import Dict, List, Optional, Tuple, Any
 from enum import Enum
 from collections import defaultdict, Counter
 from dataclasses import dataclass
+from bisect import bisect_left
 
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_, desc, text
+from sqlalchemy import func, and_, or_, desc, text, case
 
 from models.user import (
     User, Subscription, UsageTracking, PaymentHistory,
     SubscriptionTier, SubscriptionStatus, UsageType, PaymentStatus
 )
+from services.admin_dashboard import get_admin_dashboard_assembler
+
+
+def _count_where(condition):
+    """COUNT of rows matching ``condition``, for use inside a single aggregate query"""
+    return func.sum(case((condition, 1), else_=0))
+
+
+def _naive(value: datetime) -> datetime:
+    """Drop tzinfo so timezone-aware and naive column values compare consistently"""
+    return value.replace(tzinfo=None) if value is not None and value.tzinfo else value
 
 
 @dataclass
@@ -95,64 +107,69 @@ class AdminAnalyticsService:
             days = {"7d": 7, "30d": 30, "90d": 90, "1y": 365}.get(time_range, 30)
             start_date = end_date - timedelta(days=days)
             
-            # Total users by tier
-            tier_counts = self.db.query(
-                User.subscription_tier,
-                func.count(User.id).label('count')
-            ).group_by(User.subscription_tier).all()
-            
-            # Active subscriptions
-            active_subscriptions = self.db.query(Subscription).filter(
-                Subscription.status == SubscriptionStatus.ACTIVE
-            ).count()
+            previous_period_start = start_date - timedelta(days=days)
             
-            # New subscriptions in time range
-            new_subscriptions = self.db.query(Subscription).filter(
-                Subscription.created_at >= start_date
-            ).count()
+            # Users per tier and active Pro users in a single scan (no GROUP BY sort)
+            user_counts = self.db.query(
+                func.count(User.id).label('total'),
+                *[
+                    _count_where(User.subscription_tier == tier).label(tier.value)
+                    for tier in SubscriptionTier
+                ],
+                _count_where(and_(
+                    User.subscription_tier == SubscriptionTier.PRO,
+                    User.subscription_status == SubscriptionStatus.ACTIVE
+                )).label('active_pro')
+            ).one()
             
-            # Canceled subscriptions in time range
-            canceled_subscriptions = self.db.query(Subscription).filter(
-                and_(
+            tier_distribution = {
+                tier.value: getattr(user_counts, tier.value) or 0
+                for tier in SubscriptionTier
+            }
+            total_free_users = tier_distribution[SubscriptionTier.FREE.value]
+            pro_users = user_counts.active_pro or 0
+            
+            # Active / new / canceled / previous-period subscriptions in a single scan;
+            # the OR filter skips rows that cannot contribute to any of the counts
+            subscription_counts = self.db.query(
+                _count_where(Subscription.status == SubscriptionStatus.ACTIVE).label('active'),
+                _count_where(Subscription.created_at >= start_date).label('new'),
+                _count_where(and_(
                     Subscription.status == SubscriptionStatus.CANCELED,
                     Subscription.canceled_at >= start_date
+                )).label('canceled'),
+                _count_where(and_(
+                    Subscription.created_at >= previous_period_start,
+                    Subscription.created_at < start_date
+                )).label('previous_new')
+            ).filter(
+                or_(
+                    Subscription.status == SubscriptionStatus.ACTIVE,
+                    Subscription.created_at >= previous_period_start,
+                    Subscription.canceled_at >= start_date
                 )
-            ).count()
+            ).one()
             
-            # Conversion rate calculation
-            total_free_users = self.db.query(User).filter(
-                User.subscription_tier == SubscriptionTier.FREE
-            ).count()
+            active_subscriptions = subscription_counts.active or 0
+            new_subscriptions = subscription_counts.new or 0
+            canceled_subscriptions = subscription_counts.canceled or 0
+            previous_new_subs = subscription_counts.previous_new or 0
             
+            # Conversion rate calculation
             conversion_rate = (new_subscriptions / max(1, total_free_users)) * 100
             
             # Churn rate calculation
             churn_rate = (canceled_subscriptions / max(1, active_subscriptions)) * 100
             
             # Monthly Recurring Revenue (MRR) - assuming $9.99/month
-            pro_users = self.db.query(User).filter(
-                and_(
-                    User.subscription_tier == SubscriptionTier.PRO,
-                    User.subscription_status == SubscriptionStatus.ACTIVE
-                )
-            ).count()
-            
             mrr = pro_users * 9.99
             
             # Growth metrics
-            previous_period_start = start_date - timedelta(days=days)
-            previous_new_subs = self.db.query(Subscription).filter(
-                and_(
-                    Subscription.created_at >= previous_period_start,
-                    Subscription.created_at < start_date
-                )
-            ).count()
-            
             growth_rate = ((new_subscriptions - previous_new_subs) / max(1, previous_new_subs)) * 100
             
             return {
                 "overview": {
-                    "total_users": sum(tier.count for tier in tier_counts),
+                    "total_users": user_counts.total or 0,
                     "active_subscriptions": active_subscriptions,
                     "new_subscriptions": new_subscriptions,
                     "canceled_subscriptions": canceled_subscriptions,
@@ -162,8 +179,7 @@ class AdminAnalyticsService:
                     "growth_rate": round(growth_rate, 2)
                 },
                 "tier_distribution": {
-                    tier.subscription_tier.value: tier.count 
-                    for tier in tier_counts
+                    tier: count for tier, count in tier_distribution.items() if count
                 },
                 "time_range": time_range,
                 "generated_at": datetime.utcnow().isoformat()
@@ -176,26 +192,21 @@ class AdminAnalyticsService:
     async def get_conversion_funnel_analysis(self) -> Dict[str, Any]:
         """Analyze conversion funnel from registration to subscription"""
         try:
-            # Total registered users
-            total_users = self.db.query(User).count()
-            
-            # Users who have generated at least one resume
-            active_users = self.db.query(User).filter(
-                User.total_usage_count > 0
-            ).count()
-            
-            # Users who have hit usage limits
-            limit_reached_users = self.db.query(User).filter(
-                and_(
+            # Registered, activated (>= 1 resume), limit-reached and Pro users in one pass
+            funnel = self.db.query(
+                func.count(User.id).label('total'),
+                _count_where(User.total_usage_count > 0).label('active'),
+                _count_where(and_(
                     User.subscription_tier == SubscriptionTier.FREE,
                     User.weekly_usage_count >= 5
-                )
-            ).count()
+                )).label('limit_reached'),
+                _count_where(User.subscription_tier == SubscriptionTier.PRO).label('pro')
+            ).one()
             
-            # Users who upgraded to Pro
-            pro_users = self.db.query(User).filter(
-                User.subscription_tier == SubscriptionTier.PRO
-            ).count()
+            total_users = funnel.total or 0
+            active_users = funnel.active or 0
+            limit_reached_users = funnel.limit_reached or 0
+            pro_users = funnel.pro or 0
             
             # Calculate conversion rates
             activation_rate = (active_users / max(1, total_users)) * 100
@@ -231,11 +242,12 @@ class AdminAnalyticsService:
             days = {"7d": 7, "30d": 30, "90d": 90, "1y": 365}.get(time_range, 30)
             start_date = end_date - timedelta(days=days)
             
-            # Usage patterns by type
+            # Usage patterns by type (unique users feed the feature adoption rates)
             usage_by_type = self.db.query(
                 UsageTracking.usage_type,
                 func.count(UsageTracking.id).label('count'),
-                func.sum(UsageTracking.count).label('total_usage')
+                func.sum(UsageTracking.count).label('total_usage'),
+                func.count(func.distinct(UsageTracking.user_id)).label('unique_users')
             ).filter(
                 UsageTracking.usage_date >= start_date
             ).group_by(UsageTracking.usage_type).all()
@@ -252,7 +264,7 @@ class AdminAnalyticsService:
             retention_data = await self._calculate_user_retention(start_date, end_date)
             
             # Feature adoption rates
-            feature_adoption = await self._calculate_feature_adoption_rates(start_date, end_date)
+            feature_adoption = await self._calculate_feature_adoption_rates(start_date, end_date, usage_by_type)
             
             # User segmentation
             user_segments = await self._analyze_user_segments()
@@ -283,10 +295,24 @@ class AdminAnalyticsService:
         """Calculate user retention metrics"""
         try:
             # Users who registered in the period
-            new_users = self.db.query(User).filter(
+            new_users = self.db.query(User.id, User.created_at).filter(
                 User.created_at >= start_date
             ).all()
             
+            # Activity of those users, fetched once (served by the user_id/usage_date index)
+            # instead of one lookup per user and retention period
+            activity_by_user = defaultdict(list)
+            activity_rows = self.db.query(UsageTracking.user_id, UsageTracking.usage_date).join(
+                User, User.id == UsageTracking.user_id
+            ).filter(
+                and_(
+                    User.created_at >= start_date,
+                    UsageTracking.usage_date >= start_date
+                )
+            ).order_by(UsageTracking.user_id, UsageTracking.usage_date)
+            for row in activity_rows:
+                activity_by_user[row.user_id].append(_naive(row.usage_date))
+            
             # Calculate retention for different periods
             retention_periods = [1, 7, 30]  # 1 day, 1 week, 1 month
             retention_data = {}
@@ -295,17 +321,11 @@ class AdminAnalyticsService:
                 retained_users = 0
                 for user in new_users:
                     # Check if user was active after the retention period
-                    retention_date = user.created_at + timedelta(days=period)
+                    retention_date = _naive(user.created_at) + timedelta(days=period)
                     if retention_date <= end_date:
-                        activity = self.db.query(UsageTracking).filter(
-                            and_(
-                                UsageTracking.user_id == user.id,
-                                UsageTracking.usage_date >= retention_date,
-                                UsageTracking.usage_date <= retention_date + timedelta(days=1)
-                            )
-                        ).first()
-                        
-                        if activity:
+                        usage_dates = activity_by_user.get(user.id, [])
+                        first_after = bisect_left(usage_dates, retention_date)
+                        if first_after < len(usage_dates) and usage_dates[first_after] <= retention_date + timedelta(days=1):
                             retained_users += 1
                 
                 retention_rate = (retained_users / max(1, len(new_users))) * 100
@@ -321,20 +341,29 @@ class AdminAnalyticsService:
             self.logger.error(f"Error calculating user retention: {e}")
             return {}
     
-    async def _calculate_feature_adoption_rates(self, start_date: datetime, end_date: datetime) -> Dict[str, Any]:
-        """Calculate feature adoption rates"""
+    async def _calculate_feature_adoption_rates(self, start_date: datetime, end_date: datetime,
+                                                feature_usage: Optional[List[Any]] = None) -> Dict[str, Any]:
+        """Calculate feature adoption rates
+        
+        Args:
+            feature_usage: Rows with ``usage_type``/``unique_users`` already aggregated
+                for the period; queried here when not supplied
+        """
         try:
-            total_active_users = self.db.query(func.distinct(UsageTracking.user_id)).filter(
+            total_active_users = self.db.query(
+                func.count(func.distinct(UsageTracking.user_id))
+            ).filter(
                 UsageTracking.usage_date >= start_date
-            ).count()
+            ).scalar() or 0
             
             # Feature usage by type
-            feature_usage = self.db.query(
-                UsageTracking.usage_type,
-                func.count(func.distinct(UsageTracking.user_id)).label('unique_users')
-            ).filter(
-                UsageTracking.usage_date >= start_date
-            ).group_by(UsageTracking.usage_type).all()
+            if feature_usage is None:
+                feature_usage = self.db.query(
+                    UsageTracking.usage_type,
+                    func.count(func.distinct(UsageTracking.user_id)).label('unique_users')
+                ).filter(
+                    UsageTracking.usage_date >= start_date
+                ).group_by(UsageTracking.usage_type).all()
             
             adoption_rates = {}
             for usage in feature_usage:
@@ -382,15 +411,15 @@ class AdminAnalyticsService:
             ).group_by(User.subscription_tier).all()
             
             # Segment by usage level
+            usage_levels = self.db.query(
+                _count_where(User.total_usage_count >= 50).label('power_users'),
+                _count_where(and_(User.total_usage_count >= 10, User.total_usage_count < 50)).label('regular_users'),
+                _count_where(and_(User.total_usage_count >= 1, User.total_usage_count < 10)).label('light_users'),
+                _count_where(User.total_usage_count == 0).label('inactive_users')
+            ).one()
             usage_segments = {
-                "power_users": self.db.query(User).filter(User.total_usage_count >= 50).count(),
-                "regular_users": self.db.query(User).filter(
-                    and_(User.total_usage_count >= 10, User.total_usage_count < 50)
-                ).count(),
-                "light_users": self.db.query(User).filter(
-                    and_(User.total_usage_count >= 1, User.total_usage_count < 10)
-                ).count(),
-                "inactive_users": self.db.query(User).filter(User.total_usage_count == 0).count()
+                segment: getattr(usage_levels, segment) or 0
+                for segment in ("power_users", "regular_users", "light_users", "inactive_users")
             }
             
             return {
@@ -427,23 +456,24 @@ class AdminAnalyticsService:
                 PaymentHistory.payment_date >= start_date
             ).group_by(PaymentHistory.status).all()
             
-            # Payment failure analysis
-            failed_payments = self.db.query(PaymentHistory).filter(
+            # Failure reasons analysis
+            failed_by_reason = self.db.query(
+                PaymentHistory.failure_reason,
+                func.count(PaymentHistory.id).label('count')
+            ).filter(
                 and_(
                     PaymentHistory.status == PaymentStatus.FAILED,
                     PaymentHistory.payment_date >= start_date
                 )
-            ).all()
+            ).group_by(PaymentHistory.failure_reason).all()
             
-            # Failure reasons analysis
             failure_reasons = Counter()
-            for payment in failed_payments:
-                reason = payment.failure_reason or "unknown"
-                failure_reasons[reason] += 1
+            for reason in failed_by_reason:
+                failure_reasons[reason.failure_reason or "unknown"] += reason.count
             
             # Calculate failure rate
             total_payments = sum(status.count for status in payment_status_counts)
-            failed_count = sum(1 for status in payment_status_counts if status.status == PaymentStatus.FAILED)
+            failed_count = sum(status.count for status in payment_status_counts if status.status == PaymentStatus.FAILED)
             failure_rate = (failed_count / max(1, total_payments)) * 100
             
             # Revenue analysis
@@ -466,7 +496,7 @@ class AdminAnalyticsService:
             return {
                 "overview": {
                     "total_payments": total_payments,
-                    "successful_payments": sum(1 for status in payment_status_counts if status.status == PaymentStatus.SUCCEEDED),
+                    "successful_payments": sum(status.count for status in successful_payments),
                     "failed_payments": failed_count,
                     "failure_rate": round(failure_rate, 2),
                     "total_revenue": round(total_revenue, 2)
@@ -632,14 +662,21 @@ class AdminAnalyticsService:
             days = {"7d": 7, "30d": 30, "90d": 90, "1y": 365}.get(time_range, 30)
             start_date = end_date - timedelta(days=days)
             
-            # Current MRR calculation
-            active_pro_users = self.db.query(User).filter(
-                and_(
+            # User totals for MRR, ARPU and churn impact in one pass
+            user_counts = self.db.query(
+                func.count(User.id).label('total'),
+                _count_where(and_(
                     User.subscription_tier == SubscriptionTier.PRO,
                     User.subscription_status == SubscriptionStatus.ACTIVE
-                )
-            ).count()
+                )).label('active_pro'),
+                _count_where(and_(
+                    User.subscription_tier == SubscriptionTier.FREE,
+                    User.subscription_status == SubscriptionStatus.CANCELED
+                )).label('churned')
+            ).one()
             
+            # Current MRR calculation
+            active_pro_users = user_counts.active_pro or 0
             current_mrr = active_pro_users * 9.99
             
             # Historical revenue from payments
@@ -672,16 +709,11 @@ class AdminAnalyticsService:
             revenue_growth = ((total_revenue - previous_revenue) / max(1, previous_revenue)) * 100
             
             # Revenue per user metrics
-            total_users = self.db.query(User).count()
+            total_users = user_counts.total or 0
             arpu = total_revenue / max(1, total_users)  # Average Revenue Per User
             
             # Churn impact on revenue
-            churned_users = self.db.query(User).filter(
-                and_(
-                    User.subscription_tier == SubscriptionTier.FREE,
-                    User.subscription_status == SubscriptionStatus.CANCELED
-                )
-            ).count()
+            churned_users = user_counts.churned or 0
             
             churn_revenue_impact = churned_users * 9.99
             
@@ -810,36 +842,16 @@ class AdminAnalyticsService:
     # Comprehensive Admin Dashboard
     
     async def get_admin_dashboard(self, time_range: str = "30d") -> Dict[str, Any]:
-        """Get comprehensive admin dashboard with all key metrics"""
+        """
+        Get comprehensive admin dashboard with all key metrics
+        
+        Sections are computed concurrently on separate sessions and cached
+        individually (see services.admin_dashboard); ``metadata`` reports
+        per-section timing and cache state.
+        """
         try:
-            # Gather all analytics data
-            subscription_metrics = await self.get_subscription_metrics(time_range)
-            user_behavior = await self.get_user_behavior_analytics(time_range)
-            payment_analytics = await self.get_payment_analytics(time_range)
-            revenue_analytics = await self.get_revenue_analytics(time_range)
-            capacity_analytics = await self.get_capacity_analytics()
-            system_alerts = await self.check_system_alerts()
-            conversion_funnel = await self.get_conversion_funnel_analysis()
-            
-            return {
-                "dashboard_overview": {
-                    "total_users": subscription_metrics.get("overview", {}).get("total_users", 0),
-                    "active_subscriptions": subscription_metrics.get("overview", {}).get("active_subscriptions", 0),
-                    "mrr": revenue_analytics.get("overview", {}).get("current_mrr", 0),
-                    "churn_rate": subscription_metrics.get("overview", {}).get("churn_rate", 0),
-                    "conversion_rate": subscription_metrics.get("overview", {}).get("conversion_rate", 0),
-                    "system_health": "healthy" if len(system_alerts) == 0 else "warning"
-                },
-                "subscription_metrics": subscription_metrics,
-                "user_behavior": user_behavior,
-                "payment_analytics": payment_analytics,
-                "revenue_analytics": revenue_analytics,
-                "capacity_analytics": capacity_analytics,
-                "conversion_funnel": conversion_funnel,
-                "alerts": system_alerts,
-                "time_range": time_range,
-                "generated_at": datetime.utcnow().isoformat()
-            }
+            assembler = get_admin_dashboard_assembler(self.db.get_bind())
+            return await assembler.assemble(time_range)
             
         except Exception as e:
             self.logger.error(f"Error generating admin dashboard: {e}")
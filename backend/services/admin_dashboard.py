@@ -0,0 +1,255 @@
+"""
+Admin dashboard assembly
+
+``AdminAnalyticsService.get_admin_dashboard`` is made of independent sections
+(subscription metrics, user behavior, payments, revenue, capacity, alerts,
+conversion funnel). Each one runs many synchronous queries. The assembler
+runs every section that needs computing at the same time on a thread pool.
+Each section gets its own pooled session and its own ``AdminAnalyticsService``.
+
+Section results are cached per ``(section, time_range)`` with their own TTL:
+
+- fresh (younger than the TTL): served from cache
+- stale (past the TTL, younger than ``max_stale_seconds``): served from cache
+  while one background refresh recomputes it
+- missing or too old: computed before responding; concurrent requests for the
+  same section share one computation
+
+Every response carries per-section timing in ``metadata`` so slow sections
+show up without profiling.
+"""
+
+import asyncio
+import atexit
+import concurrent.futures
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from sqlalchemy.orm import sessionmaker
+
+logger = logging.getLogger(__name__)
+
+# section -> (AdminAnalyticsService method, takes time_range, default TTL seconds)
+SECTIONS: Dict[str, Tuple[str, bool, float]] = {
+    "subscription_metrics": ("get_subscription_metrics", True, 60.0),
+    "user_behavior": ("get_user_behavior_analytics", True, 300.0),
+    "payment_analytics": ("get_payment_analytics", True, 60.0),
+    "revenue_analytics": ("get_revenue_analytics", True, 300.0),
+    "capacity_analytics": ("get_capacity_analytics", False, 30.0),
+    "alerts": ("check_system_alerts", False, 30.0),
+    "conversion_funnel": ("get_conversion_funnel_analysis", False, 300.0),
+}
+
+
+class _SectionResult:
+    __slots__ = ("value", "computed_at", "duration", "expires_at", "stale_until")
+
+    def __init__(self, value: Any, duration: float, ttl: float, max_stale: float):
+        now = time.monotonic()
+        self.value = value
+        self.computed_at = datetime.utcnow()
+        self.duration = duration
+        self.expires_at = now + ttl
+        self.stale_until = now + ttl + max_stale
+
+
+class AdminDashboardAssembler:
+    """Concurrent, per-section cached assembly of the admin dashboard"""
+
+    def __init__(
+        self,
+        session_factory: Callable,
+        max_workers: int = 4,
+        ttl_overrides: Optional[Dict[str, float]] = None,
+        max_stale_seconds: float = 600.0,
+        slow_section_ms: float = 500.0,
+    ):
+        """
+        Args:
+            session_factory: Callable returning a new SQLAlchemy session (one per section run)
+            max_workers: Sections computed at the same time
+            ttl_overrides: Per-section TTL seconds replacing the defaults in ``SECTIONS``
+            max_stale_seconds: How long past its TTL a section may still be served while refreshing
+            slow_section_ms: Sections slower than this are listed in ``metadata.slow_sections``
+        """
+        self.session_factory = session_factory
+        self.ttls = {name: ttl for name, (_, _, ttl) in SECTIONS.items()}
+        self.ttls.update(ttl_overrides or {})
+        self.max_stale_seconds = max(0.0, max_stale_seconds)
+        self.slow_section_ms = slow_section_ms
+
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max(1, max_workers), thread_name_prefix="admin-dashboard"
+        )
+        self._results: Dict[Tuple[str, Optional[str]], _SectionResult] = {}
+        self._inflight: Dict[Tuple[str, Optional[str]], concurrent.futures.Future] = {}
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "stale_hits": 0, "misses": 0, "computations": 0, "errors": 0}
+
+    @staticmethod
+    def _key(section: str, time_range: str) -> Tuple[str, Optional[str]]:
+        return section, time_range if SECTIONS[section][1] else None
+
+    def _run_section(self, section: str, time_range: str) -> _SectionResult:
+        """Compute one section on its own session (runs in a worker thread)"""
+        from services.admin_analytics_service import AdminAnalyticsService
+
+        method_name, takes_range, _ = SECTIONS[section]
+        started = time.perf_counter()
+        db = self.session_factory()
+        try:
+            method = getattr(AdminAnalyticsService(db), method_name)
+            value = asyncio.run(method(time_range) if takes_range else method())
+        finally:
+            db.close()
+        duration = time.perf_counter() - started
+
+        result = _SectionResult(value, duration, self.ttls[section], self.max_stale_seconds)
+        # Sections report their own failures as {"error": ...}; don't keep those
+        if not (isinstance(value, dict) and "error" in value):
+            with self._lock:
+                self._results[self._key(section, time_range)] = result
+        else:
+            self.stats["errors"] += 1
+        return result
+
+    def _submit(self, section: str, time_range: str) -> concurrent.futures.Future:
+        """Start (or join) the single in-flight computation of a section"""
+        key = self._key(section, time_range)
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                return future
+            future = self._executor.submit(self._run_section, section, time_range)
+            self._inflight[key] = future
+            self.stats["computations"] += 1
+
+        def _done(_):
+            with self._lock:
+                if self._inflight.get(key) is future:
+                    del self._inflight[key]
+
+        future.add_done_callback(_done)
+        return future
+
+    def _lookup(self, section: str, time_range: str) -> Tuple[Optional[_SectionResult], str]:
+        now = time.monotonic()
+        with self._lock:
+            result = self._results.get(self._key(section, time_range))
+        if result is not None and now < result.expires_at:
+            self.stats["hits"] += 1
+            return result, "cache"
+        if result is not None and now < result.stale_until:
+            self.stats["stale_hits"] += 1
+            self._submit(section, time_range)
+            return result, "stale"
+        self.stats["misses"] += 1
+        return None, "computed"
+
+    async def assemble(self, time_range: str = "30d") -> Dict[str, Any]:
+        """Build the admin dashboard, computing only missing or expired sections"""
+        started = time.perf_counter()
+        results: Dict[str, _SectionResult] = {}
+        sources: Dict[str, str] = {}
+        pending: Dict[str, concurrent.futures.Future] = {}
+
+        for section in SECTIONS:
+            result, source = self._lookup(section, time_range)
+            sources[section] = source
+            if result is not None:
+                results[section] = result
+            else:
+                pending[section] = self._submit(section, time_range)
+
+        if pending:
+            outcomes = await asyncio.gather(
+                *(asyncio.wrap_future(future) for future in pending.values()), return_exceptions=True
+            )
+            for section, outcome in zip(pending, outcomes):
+                if isinstance(outcome, BaseException):
+                    logger.error(f"Admin dashboard section {section} failed: {outcome}")
+                    self.stats["errors"] += 1
+                    outcome = _SectionResult({"error": f"Failed to compute {section}"}, 0.0, 0.0, 0.0)
+                    sources[section] = "error"
+                results[section] = outcome
+
+        values = {section: result.value for section, result in results.items()}
+        subscription_overview = values["subscription_metrics"].get("overview", {})
+        section_timings = {
+            section: {
+                "source": sources[section],
+                "duration_ms": round(result.duration * 1000, 1),
+                "computed_at": result.computed_at.isoformat(),
+                "ttl_seconds": self.ttls[section],
+            }
+            for section, result in results.items()
+        }
+
+        return {
+            "dashboard_overview": {
+                "total_users": subscription_overview.get("total_users", 0),
+                "active_subscriptions": subscription_overview.get("active_subscriptions", 0),
+                "mrr": values["revenue_analytics"].get("overview", {}).get("current_mrr", 0),
+                "churn_rate": subscription_overview.get("churn_rate", 0),
+                "conversion_rate": subscription_overview.get("conversion_rate", 0),
+                "system_health": "healthy" if len(values["alerts"]) == 0 else "warning"
+            },
+            "subscription_metrics": values["subscription_metrics"],
+            "user_behavior": values["user_behavior"],
+            "payment_analytics": values["payment_analytics"],
+            "revenue_analytics": values["revenue_analytics"],
+            "capacity_analytics": values["capacity_analytics"],
+            "conversion_funnel": values["conversion_funnel"],
+            "alerts": values["alerts"],
+            "time_range": time_range,
+            "generated_at": datetime.utcnow().isoformat(),
+            "metadata": {
+                "assembly_ms": round((time.perf_counter() - started) * 1000, 1),
+                "sections": section_timings,
+                "slow_sections": sorted(
+                    (section for section, timing in section_timings.items()
+                     if timing["duration_ms"] >= self.slow_section_ms),
+                    key=lambda section: -section_timings[section]["duration_ms"],
+                ),
+            },
+        }
+
+    def invalidate(self, section: Optional[str] = None) -> None:
+        """Drop cached results (one section, or all)"""
+        with self._lock:
+            if section is None:
+                self._results.clear()
+            else:
+                for key in [key for key in self._results if key[0] == section]:
+                    del self._results[key]
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self.stats, "cached_sections": len(self._results), "inflight": len(self._inflight)}
+
+
+_assemblers: Dict[Any, AdminDashboardAssembler] = {}
+_assemblers_lock = threading.Lock()
+
+
+def get_admin_dashboard_assembler(engine) -> AdminDashboardAssembler:
+    """Get the assembler for ``engine`` (one per engine, so each has its own pool and cache)"""
+    with _assemblers_lock:
+        assembler = _assemblers.get(engine)
+        if assembler is None:
+            assembler = AdminDashboardAssembler(
+                sessionmaker(autocommit=False, autoflush=False, bind=engine),
+                max_workers=int(os.getenv("ADMIN_DASHBOARD_WORKERS", "4")),
+                max_stale_seconds=float(os.getenv("ADMIN_DASHBOARD_MAX_STALE_SECONDS", "600")),
+                slow_section_ms=float(os.getenv("ADMIN_DASHBOARD_SLOW_SECTION_MS", "500")),
+            )
+            _assemblers[engine] = assembler
+            atexit.register(assembler.shutdown)
+        return assembler
@@ -20,7 +20,7 @@ import tempfile
 from io import BytesIO
 
 from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.styles import ParagraphStyle
 from reportlab.lib.colors import HexColor, black, white, blue
 from reportlab.lib.units import inch, cm
 from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_RIGHT, TA_JUSTIFY
@@ -29,6 +29,9 @@ from reportlab.platypus.frames import Frame
 from reportlab.platypus.doctemplate import PageTemplate, BaseDocTemplate
 from reportlab.pdfgen import canvas
 
+from utils.pdf_styles import StyleSet, get_style_registry, sample_styles
+from utils.resume_segments import segment_resume, split_inline_bullets
+
 logger = logging.getLogger(__name__)
 
 
@@ -345,132 +348,28 @@ class AdvancedFormattingService:
     
     def _parse_resume_content(self, resume_text: str) -> Dict[str, Any]:
         """Parse resume text into structured data"""
-        lines = resume_text.split('\n')
+        segmented = segment_resume(resume_text)
         resume_data = {
-            'name': '',
-            'title': '',
-            'contact': [],
+            'name': segmented.contact.name,
+            'title': segmented.contact.headline or '',
+            'contact': list(segmented.contact.lines),
             'sections': []
         }
         
-        current_section = None
-        current_content = []
-        name_detected = False
+        # Unheaded text between the contact block and the first section
+        if segmented.intro:
+            resume_data['sections'].append({'title': 'Summary', 'content': list(segmented.intro)})
         
-        for i, line in enumerate(lines):
-            stripped = line.strip()
-            
-            if not stripped:
-                continue
-            
-            # Handle lines that contain an uppercase header and multiple bullets inline (e.g., "ACHIEVEMENTS • ...")
-            if '•' in stripped:
-                header_candidate = stripped.split('•')[0].strip()
-                if header_candidate.isupper() and 1 <= len(header_candidate.split()) <= 3:
-                    # Save previous section
-                    if current_section:
-                        resume_data['sections'].append({
-                            'title': current_section,
-                            'content': current_content
-                        })
-                    # Start new section with title-cased header
-                    current_section = header_candidate.title()
-                    current_content = []
-                    # Add each bullet after the header
-                    parts = [p.strip() for p in stripped.split('•')[1:] if p.strip()]
-                    for p in parts:
-                        current_content.append(f"• {p}")
-                    continue
-            
-            # Detect name (first substantial line) with fallback when header combines name and contact
-            if not name_detected and i < 5:
-                if (not any(char in stripped.lower() for char in ['@', '.com', 'phone', 'email', '(', ')', 'linkedin', 'http']) and 
-                    len(stripped) < 60 and len(stripped) > 5 and 
-                    not stripped.isupper() and not stripped.startswith('•')):
-                    resume_data['name'] = stripped
-                    name_detected = True
-                    continue
-                # Combined header detection: extract probable name then keep whole line as contact
-                lower = stripped.lower()
-                if any(ind in lower for ind in ['email', '@', 'linkedin', 'phone']):
-                    import re
-                    m = re.match(r'^\s*([A-Za-z][A-Za-z\-]+\s+[A-Za-z][A-Za-z\-]+)', stripped)
-                    if m:
-                        resume_data['name'] = m.group(1).strip()
-                        name_detected = True
-                        resume_data['contact'].append(stripped)
-                        continue
-            
-            # Detect contact info
-            if (any(indicator in stripped.lower() for indicator in ['@', '.com', 'phone', '(', ')', 'email', 'linkedin', 'http']) or 
-                re.search(r'\d{3}[-.]?\d{3}[-.]?\d{4}', stripped)):
-                resume_data['contact'].append(stripped)
-                continue
-            
-            # Detect professional title immediately after name (before contact or first section)
-            if name_detected and not resume_data['title']:
-                if (not self._is_section_header(stripped) and not any(ind in stripped.lower() for ind in ['@', '.com', 'phone', 'email', 'linkedin', 'http']) and len(stripped) < 80):
-                    resume_data['title'] = stripped
-                    continue
-
-            # Detect section headers
-            if self._is_section_header(stripped):
-                # Save previous section
-                if current_section:
-                    resume_data['sections'].append({
-                        'title': current_section,
-                        'content': current_content
-                    })
-                # Start new section
-                current_section = stripped
-                current_content = []
-                continue
-            
-            # Add to current section; if a line has multiple bullets inline, split them
-            if '•' in stripped and not stripped.startswith('•') and stripped.count('•') > 1:
-                parts = [p.strip() for p in stripped.split('•') if p.strip()]
-                for p in parts:
-                    current_content.append(f"• {p}")
-            else:
-                current_content.append(stripped)
-        
-        # Add the last section
-        if current_section:
-            resume_data['sections'].append({
-                'title': current_section,
-                'content': current_content
-            })
+        for section in segmented.sections:
+            content = []
+            for i, line in enumerate(section.lines):
+                # "ACHIEVEMENTS • a • b" and "a • b • c" lines become one bullet per item
+                parts = split_inline_bullets(line, min_separators=1 if section.inline and i == 0 else 2)
+                content.extend(parts if parts == [line] else [f"• {part}" for part in parts])
+            resume_data['sections'].append({'title': section.title, 'content': content})
         
         return resume_data
     
-    def _is_section_header(self, line: str) -> bool:
-        """Determine if a line is a section header"""
-        # Common section headers
-        common_sections = [
-            'experience', 'education', 'skills', 'summary', 'objective',
-            'projects', 'certifications', 'awards', 'publications',
-            'professional experience', 'work experience', 'employment',
-            'technical skills', 'core competencies', 'achievements'
-        ]
-        
-        line_lower = line.lower().strip()
-        
-        # Check if it's all caps (common for headers)
-        if line.isupper() and len(line) > 2:
-            return True
-        
-        # Check if it matches common section names
-        if any(section in line_lower for section in common_sections):
-            return True
-        
-        # Check if it's a short line that could be a header
-        if len(line) < 30 and not line.startswith('•') and ':' not in line:
-            words = line.split()
-            if len(words) <= 3 and all(word.isalpha() or word.isdigit() for word in words):
-                return True
-        
-        return False
-    
     def _create_pdf_with_template(
         self,
         resume_data: Dict[str, Any],
@@ -554,9 +453,25 @@ class AdvancedFormattingService:
         template_config: Dict,
         colors: Dict[str, HexColor],
         fonts: Dict[str, str]
+    ) -> StyleSet:
+        """Custom paragraph styles for the formatting options, built once per configuration"""
+        key = (
+            "advanced", options.template, options.color_scheme, options.font_family,
+            options.font_size, options.line_spacing,
+        )
+        return get_style_registry().get(
+            key, lambda: self._build_custom_styles(options, template_config, colors, fonts)
+        )
+    
+    def _build_custom_styles(
+        self,
+        options: FormattingOptions,
+        template_config: Dict,
+        colors: Dict[str, HexColor],
+        fonts: Dict[str, str]
     ) -> Dict[str, ParagraphStyle]:
         """Create custom paragraph styles based on formatting options"""
-        base_styles = getSampleStyleSheet()
+        base_styles = sample_styles()
         
         # Name style
         name_style = ParagraphStyle(
@@ -12,6 +12,8 @@ from dataclasses import dataclass
 from collections import defaultdict
 import statistics
 
+from services.dashboard_cache import get_dashboard_cache
+
 @dataclass
 class AnalyticsMetric:
     """Analytics metric data structure"""
@@ -38,8 +40,18 @@ class AnalyticsDashboardService:
         self.cache_expiry = timedelta(minutes=15)
         
     async def get_dashboard_overview(self, user_id: str, time_period: str = "30d") -> Dict[str, Any]:
-        """Get comprehensive dashboard overview"""
+        """Get comprehensive dashboard overview (cached per user and period for ``cache_expiry``)"""
+        cache = get_dashboard_cache()
+        cached = cache.get("dashboard_overview", user_id, time_period)
+        if cached is not None:
+            return cached
         
+        overview = await self._build_dashboard_overview(user_id, time_period)
+        cache.put("dashboard_overview", user_id, time_period, overview,
+                  ttl_seconds=min(cache.ttl_seconds, self.cache_expiry.total_seconds()))
+        return overview
+    
+    async def _build_dashboard_overview(self, user_id: str, time_period: str) -> Dict[str, Any]:
         # Calculate time range
         end_date = datetime.now()
         if time_period == "7d":
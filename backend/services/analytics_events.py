@@ -0,0 +1,317 @@
+"""
+Write-behind persistence for analytics events
+
+``AnalyticsService.track_event`` only appends the event to an in-memory buffer.
+A background thread inserts buffered events into ``analytics_events`` with one
+executemany ``INSERT`` per batch, so tracking never waits on the database.
+Events become visible to dashboard queries within ``flush_interval`` seconds,
+and whatever is still buffered is flushed at shutdown.
+
+Each flush also folds the batch into ``analytics_daily_rollups`` (one upsert
+per user/day/event type/template) in the same transaction, and drops the
+cached dashboards of the users it touched.
+"""
+
+import atexit
+import json
+import logging
+import os
+import threading
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, case, delete, insert, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from models.analytics_event import AnalyticsDailyRollup, AnalyticsEvent
+from services.dashboard_cache import get_dashboard_cache
+
+logger = logging.getLogger(__name__)
+
+# (user_id, day, event_type, dimension) -> [event_count, score_count, score_sum, score_max]
+RollupKey = Tuple[Any, date, str, str]
+
+
+def rollup_dimension(event_type: str, event_data: Optional[Dict[str, Any]]) -> Tuple[str, Optional[float]]:
+    """Rollup dimension and match score contributed by one event"""
+    event_data = event_data or {}
+    dimension = str(event_data.get("template", "unknown"))[:100] if event_type == "template_usage" else ""
+    score = event_data.get("match_score")
+    return dimension, float(score) if isinstance(score, (int, float)) else None
+
+
+def _aggregate(entries) -> Dict[RollupKey, List]:
+    """Fold ``(user_id, timestamp, event_type, dimension, score)`` tuples into rollup deltas"""
+    deltas: Dict[RollupKey, List] = defaultdict(lambda: [0, 0, 0.0, None])
+    for user_id, timestamp, event_type, dimension, score in entries:
+        delta = deltas[(str(user_id), timestamp.date(), event_type, dimension)]
+        delta[0] += 1
+        if score is not None:
+            delta[1] += 1
+            delta[2] += score
+            delta[3] = score if delta[3] is None else max(delta[3], score)
+    return deltas
+
+
+def apply_rollup_deltas(db, deltas: Dict[RollupKey, List]) -> int:
+    """Add aggregated deltas to analytics_daily_rollups (upsert), in the caller's transaction"""
+    if not deltas:
+        return 0
+    table = AnalyticsDailyRollup.__table__
+    params = [
+        {"user_id": user_id, "day": day, "event_type": event_type, "dimension": dimension,
+         "event_count": count, "score_count": score_count, "score_sum": score_sum, "score_max": score_max}
+        for (user_id, day, event_type, dimension), (count, score_count, score_sum, score_max) in deltas.items()
+    ]
+    dialect = db.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        statement = (sqlite_insert if dialect == "sqlite" else postgresql_insert)(table)
+        excluded = statement.excluded
+        db.execute(statement.on_conflict_do_update(
+            index_elements=[table.c.user_id, table.c.day, table.c.event_type, table.c.dimension],
+            set_={
+                "event_count": table.c.event_count + excluded.event_count,
+                "score_count": table.c.score_count + excluded.score_count,
+                "score_sum": table.c.score_sum + excluded.score_sum,
+                "score_max": case(
+                    (table.c.score_max.is_(None), excluded.score_max),
+                    (excluded.score_max > table.c.score_max, excluded.score_max),
+                    else_=table.c.score_max,
+                ),
+            },
+        ), params)
+        return len(params)
+
+    for row in params:
+        where = and_(*(table.c[column] == row[column] for column in ("user_id", "day", "event_type", "dimension")))
+        increments = {
+            "event_count": table.c.event_count + row["event_count"],
+            "score_count": table.c.score_count + row["score_count"],
+            "score_sum": table.c.score_sum + row["score_sum"],
+        }
+        if row["score_max"] is not None:
+            increments["score_max"] = case(
+                (table.c.score_max.is_(None), row["score_max"]),
+                (table.c.score_max < row["score_max"], row["score_max"]),
+                else_=table.c.score_max,
+            )
+        if not db.execute(update(table).where(where).values(**increments)).rowcount:
+            db.execute(insert(table).values(**row))
+    return len(params)
+
+
+def rebuild_daily_rollups(db, since: Optional[datetime] = None) -> int:
+    """
+    Recompute analytics_daily_rollups from analytics_events (backfill/repair).
+
+    Args:
+        db: Session; the rebuild is committed
+        since: Only rebuild days on or after this timestamp's day (default: all)
+
+    Returns:
+        Number of rollup rows written
+    """
+    table = AnalyticsDailyRollup.__table__
+    events = db.query(
+        AnalyticsEvent.user_id, AnalyticsEvent.timestamp, AnalyticsEvent.event_type, AnalyticsEvent.event_data
+    )
+    clear = delete(table)
+    if since is not None:
+        day_start = datetime.combine(since.date(), datetime.min.time())
+        events = events.filter(AnalyticsEvent.timestamp >= day_start)
+        clear = clear.where(table.c.day >= since.date())
+
+    def entries():
+        for user_id, timestamp, event_type, event_data in events.yield_per(5000):
+            dimension, score = rollup_dimension(event_type, json.loads(event_data) if event_data else None)
+            yield user_id, timestamp, event_type, dimension, score
+
+    deltas = _aggregate(entries())
+    db.execute(clear)
+    written = apply_rollup_deltas(db, deltas)
+    db.commit()
+    get_dashboard_cache().clear()
+    return written
+
+
+class AnalyticsEventWriter:
+    """Buffers analytics events and inserts them in batches"""
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable] = None,
+        flush_interval: float = 2.0,
+        batch_size: int = 500,
+        max_pending: int = 20000,
+        enabled: bool = True,
+    ):
+        """
+        Args:
+            session_factory: Callable returning a new SQLAlchemy session
+                (defaults to ``config.database.SessionLocal``)
+            flush_interval: Seconds between background flushes
+            batch_size: Rows per executemany ``INSERT``
+            max_pending: Flush inline once this many events are buffered
+            enabled: When False, ``record`` writes through immediately
+        """
+        self._session_factory = session_factory
+        self.flush_interval = max(0.1, flush_interval)
+        self.batch_size = max(1, batch_size)
+        self.max_pending = max(1, max_pending)
+        self.enabled = enabled
+
+        self._pending: List[Tuple[Dict[str, Any], str, Optional[float]]] = []  # (row, dimension, score)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.stats = {"recorded": 0, "flushes": 0, "rows_written": 0, "statements": 0,
+                      "rollup_rows": 0, "errors": 0}
+
+    def _new_session(self):
+        if self._session_factory is None:
+            from config.database import SessionLocal
+            self._session_factory = SessionLocal
+        return self._session_factory()
+
+    def record(
+        self,
+        user_id: Any,
+        event_type: str,
+        event_data: Optional[Dict[str, Any]] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        subscription_tier: Optional[str] = None,
+        timestamp: Optional[datetime] = None,
+    ) -> None:
+        """Buffer one event for the next batched insert"""
+        row = {
+            "user_id": user_id,
+            "event_type": event_type,
+            "timestamp": timestamp or datetime.utcnow(),
+            "event_data": json.dumps(event_data or {}, default=str),
+            "event_metadata": json.dumps(metadata or {}, default=str),
+            "subscription_tier": subscription_tier,
+        }
+        entry = (row, *rollup_dimension(event_type, event_data))
+
+        if not self.enabled:
+            self._write([entry])
+            return
+
+        with self._lock:
+            self._pending.append(entry)
+            self.stats["recorded"] += 1
+            pending_count = len(self._pending)
+
+        self._ensure_started()
+        if pending_count >= self.max_pending:
+            self.flush()
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self) -> int:
+        """
+        Insert all buffered events.
+
+        Returns:
+            Number of events written
+        """
+        with self._lock:
+            if not self._pending:
+                return 0
+            pending, self._pending = self._pending, []
+
+        with self._flush_lock:
+            written = self._write(pending)
+
+        if written < len(pending):
+            # Put the failed batch back in front so the next flush retries it
+            with self._lock:
+                self._pending[:0] = pending
+        return written
+
+    def _write(self, entries: List[Tuple[Dict[str, Any], str, Optional[float]]]) -> int:
+        rows = [row for row, _, _ in entries]
+        deltas = _aggregate(
+            (row["user_id"], row["timestamp"], row["event_type"], dimension, score)
+            for row, dimension, score in entries
+        )
+        db = self._new_session()
+        try:
+            statements = 0
+            for start in range(0, len(rows), self.batch_size):
+                db.execute(insert(AnalyticsEvent), rows[start:start + self.batch_size])
+                statements += 1
+            self.stats["rollup_rows"] += apply_rollup_deltas(db, deltas)
+            db.commit()
+            self.stats["flushes"] += 1
+            self.stats["statements"] += statements
+            self.stats["rows_written"] += len(rows)
+            cache = get_dashboard_cache()
+            for user_id in {key[0] for key in deltas}:
+                cache.invalidate_owner(user_id)
+            return len(rows)
+        except Exception as e:
+            db.rollback()
+            self.stats["errors"] += 1
+            logger.warning(f"Failed to write {len(rows)} analytics events: {e}")
+            return 0
+        finally:
+            db.close()
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name="analytics-event-writer", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.warning(f"Analytics event writer error: {e}")
+
+    def stop(self) -> int:
+        """Stop the background writer and insert whatever is still buffered"""
+        self._stop_event.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive() and thread is not threading.current_thread():
+            thread.join(timeout=self.flush_interval + 1)
+        self._thread = None
+        return self.flush()
+
+
+_writer: Optional[AnalyticsEventWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_analytics_event_writer() -> AnalyticsEventWriter:
+    """Get the process-wide analytics event writer"""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = AnalyticsEventWriter(
+                    flush_interval=float(os.getenv("ANALYTICS_EVENT_FLUSH_INTERVAL", "2")),
+                    batch_size=int(os.getenv("ANALYTICS_EVENT_BATCH_SIZE", "500")),
+                    enabled=os.getenv("ANALYTICS_EVENT_WRITE_BEHIND", "true").lower() == "true",
+                )
+                atexit.register(_writer.stop)
+    return _writer
+
+
+def flush_analytics_events() -> int:
+    """Stop the writer (if it was used) and flush buffered events; used at shutdown"""
+    if _writer is None:
+        return 0
+    return _writer.stop()
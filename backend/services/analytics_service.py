@@ -17,6 +17,9 @@ from sqlalchemy.orm import Session
 from sqlalchemy import func, and_, or_
 
 from models.user import User
+from models.analytics_event import AnalyticsDailyRollup, AnalyticsEvent
+from services.analytics_events import get_analytics_event_writer
+from services.dashboard_cache import get_dashboard_cache
 from services.subscription_service import SubscriptionService
 
 
@@ -41,6 +44,29 @@ class AnalyticsMetric(Enum):
     PERFORMANCE_TREND = "performance_trend"
 
 
+class DailyRollupSummary:
+    """Totals folded from a user's analytics_daily_rollups rows for one time range"""
+    
+    def __init__(self, rows):
+        self.type_counts = Counter()
+        self.daily_counts = defaultdict(int)
+        self.template_counts = Counter()
+        self.score_count = 0
+        self.score_sum = 0.0
+        self.score_max = None
+        
+        for row in rows:
+            self.type_counts[row.event_type] += row.event_count
+            self.daily_counts[row.day.isoformat()] += row.event_count
+            if row.event_type == "template_usage":
+                self.template_counts[row.dimension] += row.event_count
+            if row.score_count:
+                self.score_count += row.score_count
+                self.score_sum += row.score_sum
+                if self.score_max is None or row.score_max > self.score_max:
+                    self.score_max = row.score_max
+
+
 class AnalyticsService:
     """Comprehensive analytics service for Pro users"""
     
@@ -49,8 +75,8 @@ class AnalyticsService:
         self.subscription_service = SubscriptionService(db)
         self.logger = logging.getLogger(__name__)
         
-        # In-memory storage for real-time analytics (would use Redis in production)
-        self.analytics_cache = defaultdict(list)
+        # Events are persisted to analytics_events through the shared write-behind writer
+        self.event_writer = get_analytics_event_writer()
         self.metrics_cache = {}
         
     async def track_event(
@@ -74,29 +100,19 @@ class AnalyticsService:
         """
         try:
             # Verify user exists and has Pro subscription for detailed analytics
-            user = self.db.query(User).filter(User.id == user_id).first()
+            user = self.db.query(User.subscription_tier).filter(User.id == user_id).first()
             if not user:
                 return False
             
-            # Create analytics event record
-            event_record = {
-                "user_id": user_id,
-                "event_type": event_type.value,
-                "event_data": event_data,
-                "metadata": metadata or {},
-                "timestamp": datetime.utcnow().isoformat(),
-                "subscription_tier": user.subscription_tier
-            }
-            
-            # Store in cache for real-time access
-            self.analytics_cache[user_id].append(event_record)
-            
-            # Keep only last 1000 events per user in cache
-            if len(self.analytics_cache[user_id]) > 1000:
-                self.analytics_cache[user_id] = self.analytics_cache[user_id][-1000:]
-            
-            # Log event for persistence (would save to database in production)
-            self.logger.info(f"Analytics event tracked: {json.dumps(event_record)}")
+            # Queue the event for the next batched insert (off the request path)
+            self.event_writer.record(
+                user_id=user_id,
+                event_type=event_type.value,
+                event_data=event_data,
+                metadata=metadata,
+                subscription_tier=user.subscription_tier.value if user.subscription_tier else None
+            )
+            self.logger.debug(f"Analytics event tracked: {event_type.value} for user {user_id}")
             
             # Update real-time metrics
             await self._update_real_time_metrics(user_id, event_type, event_data)
@@ -128,27 +144,34 @@ class AnalyticsService:
             if not can_access:
                 return {"error": "Analytics requires Pro subscription"}
             
-            # Calculate time range
+            cache = get_dashboard_cache()
+            cached = cache.get("user_dashboard", user_id, time_range)
+            if cached is not None:
+                return cached
+            
+            # Calculate time range (whole UTC days, matching the daily rollups)
             end_date = datetime.utcnow()
             days = {"7d": 7, "30d": 30, "90d": 90, "1y": 365}.get(time_range, 30)
             start_date = end_date - timedelta(days=days)
             
-            # Get user events in time range
-            user_events = self._get_user_events_in_range(user_id, start_date, end_date)
+            # Daily rollups are bounded by the range, not by the user's history
+            summary = self._get_rollup_summary(user_id, start_date, end_date)
+            recent_scores = self._get_recent_keyword_scores(user_id, start_date)
             
             # Calculate key metrics
             dashboard_data = {
-                "overview": await self._calculate_overview_metrics(user_events, time_range),
-                "success_rates": await self._calculate_success_rates(user_events),
-                "keyword_optimization": await self._calculate_keyword_optimization(user_events),
-                "template_performance": await self._calculate_template_performance(user_events),
-                "usage_trends": await self._calculate_usage_trends(user_events, start_date, end_date),
-                "feature_adoption": await self._calculate_feature_adoption(user_events),
-                "recommendations": await self._generate_recommendations(user_id, user_events),
+                "overview": await self._calculate_overview_metrics(summary, time_range),
+                "success_rates": await self._calculate_success_rates(summary),
+                "keyword_optimization": await self._calculate_keyword_optimization(summary, recent_scores),
+                "template_performance": await self._calculate_template_performance(summary),
+                "usage_trends": await self._calculate_usage_trends(summary, start_date, end_date),
+                "feature_adoption": await self._calculate_feature_adoption(summary),
+                "recommendations": await self._generate_recommendations(user_id, summary),
                 "time_range": time_range,
                 "generated_at": datetime.utcnow().isoformat()
             }
             
+            cache.put("user_dashboard", user_id, time_range, dashboard_data)
             return dashboard_data
             
         except Exception as e:
@@ -241,7 +264,8 @@ class AnalyticsService:
             if not can_access:
                 return {"error": "Success rate analytics requires Pro subscription"}
             
-            user_events = self.analytics_cache.get(user_id, [])
+            end_date = datetime.utcnow()
+            user_events = self._get_user_events_in_range(user_id, end_date - timedelta(days=365), end_date)
             
             if metric_type == "overall":
                 return await self._calculate_overall_success_rate(user_events)
@@ -262,26 +286,78 @@ class AnalyticsService:
         start_date: datetime,
         end_date: datetime
     ) -> List[Dict]:
-        """Get user events within specified date range"""
-        user_events = self.analytics_cache.get(user_id, [])
-        
-        filtered_events = []
-        for event in user_events:
-            event_time = datetime.fromisoformat(event["timestamp"])
-            if start_date <= event_time <= end_date:
-                filtered_events.append(event)
-        
-        return filtered_events
+        """Get user events within specified date range (oldest first)"""
+        # Listing every event type lets the (user_id, event_type, timestamp)
+        # index serve the range directly instead of filtering all user rows
+        rows = self.db.query(
+            AnalyticsEvent.event_type, AnalyticsEvent.event_data, AnalyticsEvent.timestamp
+        ).filter(
+            AnalyticsEvent.user_id == user_id,
+            AnalyticsEvent.event_type.in_([event_type.value for event_type in AnalyticsEventType]),
+            AnalyticsEvent.timestamp >= start_date,
+            AnalyticsEvent.timestamp <= end_date
+        ).order_by(AnalyticsEvent.timestamp).all()
+        
+        return [
+            {
+                "event_type": row.event_type,
+                "event_data": json.loads(row.event_data) if row.event_data else {},
+                "timestamp": row.timestamp
+            }
+            for row in rows
+        ]
+    
+    def _get_rollup_summary(
+        self,
+        user_id: str,
+        start_date: datetime,
+        end_date: datetime
+    ) -> DailyRollupSummary:
+        """Fold the user's daily rollup rows between two dates (inclusive days)"""
+        rows = self.db.query(
+            AnalyticsDailyRollup.day, AnalyticsDailyRollup.event_type, AnalyticsDailyRollup.dimension,
+            AnalyticsDailyRollup.event_count, AnalyticsDailyRollup.score_count,
+            AnalyticsDailyRollup.score_sum, AnalyticsDailyRollup.score_max
+        ).filter(
+            AnalyticsDailyRollup.user_id == user_id,
+            AnalyticsDailyRollup.day >= start_date.date(),
+            AnalyticsDailyRollup.day <= end_date.date()
+        ).all()
+        return DailyRollupSummary(rows)
+    
+    def _get_recent_keyword_scores(self, user_id: str, start_date: datetime, limit: int = 10) -> List[float]:
+        """
+        Match scores (percent) of the first keyword analysis in range followed by
+        the last ``limit``, oldest first; both are index-ordered LIMIT queries
+        """
+        day_start = datetime.combine(start_date.date(), datetime.min.time())
+        query = self.db.query(AnalyticsEvent.id, AnalyticsEvent.event_data).filter(
+            AnalyticsEvent.user_id == user_id,
+            AnalyticsEvent.event_type == AnalyticsEventType.KEYWORD_OPTIMIZATION.value,
+            AnalyticsEvent.timestamp >= day_start
+        )
+        recent = query.order_by(AnalyticsEvent.timestamp.desc(), AnalyticsEvent.id.desc()).limit(limit).all()
+        first = query.order_by(AnalyticsEvent.timestamp, AnalyticsEvent.id).first()
+        
+        rows = list(reversed(recent))
+        if first is not None and all(row.id != first.id for row in rows):
+            rows.insert(0, first)
+        scores = []
+        for row in rows:
+            score = json.loads(row.event_data or "{}").get("match_score")
+            if isinstance(score, (int, float)):
+                scores.append(score * 100)
+        return scores
     
     async def _calculate_overview_metrics(
         self,
-        events: List[Dict],
+        summary: DailyRollupSummary,
         time_range: str
     ) -> Dict[str, Any]:
         """Calculate overview metrics for dashboard"""
-        total_resumes = len([e for e in events if e["event_type"] == "resume_generated"])
-        total_cover_letters = len([e for e in events if e["event_type"] == "cover_letter_generated"])
-        total_applications = len([e for e in events if e["event_type"] == "job_application"])
+        total_resumes = summary.type_counts["resume_generated"]
+        total_cover_letters = summary.type_counts["cover_letter_generated"]
+        total_applications = summary.type_counts["job_application"]
         
         # Calculate success rate (mock calculation)
         success_rate = 0.75 if total_applications > 0 else 0
@@ -294,7 +370,7 @@ class AnalyticsService:
             "time_range": time_range
         }
     
-    async def _calculate_success_rates(self, events: List[Dict]) -> Dict[str, Any]:
+    async def _calculate_success_rates(self, summary: DailyRollupSummary) -> Dict[str, Any]:
         """Calculate various success rate metrics"""
         # Mock success rate calculations (would use real data in production)
         return {
@@ -309,40 +385,30 @@ class AnalyticsService:
             "trend": "increasing"
         }
     
-    async def _calculate_keyword_optimization(self, events: List[Dict]) -> Dict[str, Any]:
+    async def _calculate_keyword_optimization(
+        self,
+        summary: DailyRollupSummary,
+        recent_scores: List[float]
+    ) -> Dict[str, Any]:
         """Calculate keyword optimization metrics"""
-        keyword_events = [e for e in events if e["event_type"] == "keyword_optimization"]
-        
-        if not keyword_events:
+        if not summary.score_count:
             return {"average_score": 0, "trend": "no_data"}
         
-        scores = [e["event_data"]["match_score"] * 100 for e in keyword_events]
-        average_score = sum(scores) / len(scores)
+        average_score = summary.score_sum / summary.score_count * 100
         
         return {
             "average_optimization_score": round(average_score, 1),
-            "best_score": round(max(scores), 1),
-            "recent_scores": scores[-10:],  # Last 10 scores
-            "trend": "improving" if len(scores) > 1 and scores[-1] > scores[0] else "stable"
+            "best_score": round(summary.score_max * 100, 1),
+            "recent_scores": recent_scores[-10:],  # Last 10 scores
+            "trend": "improving" if len(recent_scores) > 1 and recent_scores[-1] > recent_scores[0] else "stable"
         }
     
-    async def _calculate_template_performance(self, events: List[Dict]) -> Dict[str, Any]:
+    async def _calculate_template_performance(self, summary: DailyRollupSummary) -> Dict[str, Any]:
         """Calculate template performance metrics"""
-        template_usage = Counter()
-        template_success = defaultdict(list)
-        
-        for event in events:
-            if event["event_type"] == "template_usage":
-                template = event["event_data"].get("template", "unknown")
-                template_usage[template] += 1
-                
-                # Mock success rate for each template
-                success_rate = 0.8 + (hash(template) % 20) / 100  # Mock calculation
-                template_success[template].append(success_rate)
-        
         performance_data = {}
-        for template, usage_count in template_usage.items():
-            avg_success = sum(template_success[template]) / len(template_success[template])
+        for template, usage_count in summary.template_counts.items():
+            # Mock success rate for each template
+            avg_success = 0.8 + (hash(template) % 20) / 100  # Mock calculation
             performance_data[template] = {
                 "usage_count": usage_count,
                 "success_rate": round(avg_success * 100, 1),
@@ -353,17 +419,12 @@ class AnalyticsService:
     
     async def _calculate_usage_trends(
         self,
-        events: List[Dict],
+        summary: DailyRollupSummary,
         start_date: datetime,
         end_date: datetime
     ) -> Dict[str, Any]:
         """Calculate usage trends over time"""
-        # Group events by day
-        daily_usage = defaultdict(int)
-        
-        for event in events:
-            event_date = datetime.fromisoformat(event["timestamp"]).date()
-            daily_usage[event_date.isoformat()] += 1
+        daily_usage = dict(summary.daily_counts)
         
         # Fill in missing dates with 0
         current_date = start_date.date()
@@ -381,14 +442,9 @@ class AnalyticsService:
             "average_daily_usage": sum(daily_usage.values()) / len(daily_usage) if daily_usage else 0
         }
     
-    async def _calculate_feature_adoption(self, events: List[Dict]) -> Dict[str, Any]:
+    async def _calculate_feature_adoption(self, summary: DailyRollupSummary) -> Dict[str, Any]:
         """Calculate feature adoption metrics"""
-        feature_usage = Counter()
-        
-        for event in events:
-            event_type = event["event_type"]
-            feature_usage[event_type] += 1
-        
+        feature_usage = summary.type_counts
         total_events = sum(feature_usage.values())
         
         adoption_rates = {}
@@ -403,16 +459,13 @@ class AnalyticsService:
     async def _generate_recommendations(
         self,
         user_id: str,
-        events: List[Dict]
+        summary: DailyRollupSummary
     ) -> List[Dict[str, str]]:
         """Generate personalized recommendations based on analytics"""
         recommendations = []
         
-        # Analyze usage patterns
-        event_types = [e["event_type"] for e in events]
-        
         # Recommendation logic
-        if "cover_letter_generated" not in event_types:
+        if not summary.type_counts["cover_letter_generated"]:
             recommendations.append({
                 "type": "feature_suggestion",
                 "title": "Try Cover Letters",
@@ -420,7 +473,7 @@ class AnalyticsService:
                 "action": "Generate your first cover letter"
             })
         
-        if "advanced_formatting" not in event_types:
+        if not summary.type_counts["advanced_formatting"]:
             recommendations.append({
                 "type": "feature_suggestion",
                 "title": "Advanced Formatting",
@@ -429,9 +482,8 @@ class AnalyticsService:
             })
         
         # Keyword optimization recommendation
-        keyword_events = [e for e in events if e["event_type"] == "keyword_optimization"]
-        if keyword_events:
-            avg_score = sum(e["event_data"]["match_score"] for e in keyword_events) / len(keyword_events)
+        if summary.score_count:
+            avg_score = summary.score_sum / summary.score_count
             if avg_score < 0.7:
                 recommendations.append({
                     "type": "improvement",
@@ -0,0 +1,115 @@
+"""
+Set-based bulk updates for scheduled subscription tasks
+
+Walks the rows matching a filter in primary-key order (keyset pagination) and
+applies one ``UPDATE ... WHERE id IN (...)`` per chunk, committing after each
+chunk so no single transaction holds the write lock for the whole table.
+"""
+
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+
+class BulkUpdateStats:
+    """Progress and throughput metrics for a chunked bulk update"""
+    def __init__(self, name: str, chunk_size: int):
+        self.name = name
+        self.chunk_size = chunk_size
+        self.chunks = 0
+        self.rows_selected = 0
+        self.rows_updated = 0
+        self.max_chunk_ms = 0.0
+        self._started = time.perf_counter()
+        self.elapsed_seconds = 0.0
+
+    def record_chunk(self, selected: int, updated: int, chunk_seconds: float) -> None:
+        self.chunks += 1
+        self.rows_selected += selected
+        self.rows_updated += updated
+        self.max_chunk_ms = max(self.max_chunk_ms, chunk_seconds * 1000)
+        self.elapsed_seconds = time.perf_counter() - self._started
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "operation": self.name,
+            "chunk_size": self.chunk_size,
+            "chunks": self.chunks,
+            "rows_selected": self.rows_selected,
+            "rows_updated": self.rows_updated,
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+            "rows_per_second": round(self.rows_updated / self.elapsed_seconds, 1) if self.elapsed_seconds else 0.0,
+            "max_chunk_ms": round(self.max_chunk_ms, 2),
+        }
+
+
+def iter_chunked_update(
+    db: Session,
+    model: Any,
+    criteria: Sequence[Any],
+    values: Dict[Any, Any],
+    stats: BulkUpdateStats,
+    columns: Sequence[Any] = (),
+    related_updates: Optional[Callable[[List[Any]], Sequence[Any]]] = None,
+) -> Iterator[List[Any]]:
+    """
+    Update every ``model`` row matching ``criteria`` in keyset-paginated chunks.
+
+    The criteria are re-applied inside each ``UPDATE`` so rows changed by another
+    writer between the SELECT and the UPDATE are left alone.
+
+    Args:
+        db: Database session (committed after every chunk)
+        model: Mapped class with an ``id`` primary key
+        criteria: Filter expressions selecting the rows to update
+        values: Column values for the ``UPDATE``
+        stats: Metrics accumulator, updated after each chunk
+        columns: Extra columns to return with each chunk (e.g. for notifications)
+        related_updates: Builds additional statements for the chunk's ids,
+            executed in the same transaction
+
+    Yields:
+        The selected rows (``id`` plus ``columns``) of each committed chunk
+    """
+    last_id = None
+    while True:
+        chunk_started = time.perf_counter()
+        query = db.query(model.id, *columns).filter(*criteria)
+        if last_id is not None:
+            query = query.filter(model.id > last_id)
+        rows = query.order_by(model.id).limit(stats.chunk_size).all()
+        if not rows:
+            break
+
+        ids = [row.id for row in rows]
+        try:
+            result = db.execute(
+                update(model)
+                .where(model.id.in_(ids), *criteria)
+                .values(values)
+                .execution_options(synchronize_session=False)
+            )
+            if related_updates is not None:
+                for statement in related_updates(ids):
+                    db.execute(statement.execution_options(synchronize_session=False))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        stats.record_chunk(len(ids), result.rowcount or 0, time.perf_counter() - chunk_started)
+        last_id = ids[-1]
+        yield rows
+
+        if len(rows) < stats.chunk_size:
+            break
+
+
+def chunked_update(db: Session, model: Any, criteria: Sequence[Any], values: Dict[Any, Any],
+                   stats: BulkUpdateStats, **kwargs) -> BulkUpdateStats:
+    """Run ``iter_chunked_update`` to completion and return its stats"""
+    for _ in iter_chunked_update(db, model, criteria, values, stats, **kwargs):
+        pass
+    return stats
@@ -0,0 +1,111 @@
+"""
+Short-lived cache of computed dashboards
+
+Dashboards are keyed by ``(namespace, owner, variant)``, for example
+``("user_dashboard", user_id, "30d")``. Entries expire after ``ttl_seconds``.
+The analytics event writer calls ``invalidate_owner`` for every user whose
+events it has just written, so a user's new activity shows up on the next
+request instead of at the end of the TTL.
+
+Cached values are shared between requests and must be treated as read-only.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Set, Tuple
+
+CacheKey = Tuple[str, Hashable, Hashable]
+
+
+class DashboardCache:
+    """Thread-safe LRU + TTL cache of computed dashboard payloads"""
+
+    def __init__(self, ttl_seconds: float = 30.0, max_entries: int = 5000, enabled: bool = True):
+        self.ttl_seconds = max(0.0, ttl_seconds)
+        self.max_entries = max(1, max_entries)
+        self.enabled = enabled and self.ttl_seconds > 0
+
+        self._entries: "OrderedDict[CacheKey, Tuple[float, Any]]" = OrderedDict()
+        self._by_owner: Dict[Hashable, Set[CacheKey]] = {}
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0, "evictions": 0}
+
+    @staticmethod
+    def _owner(owner: Hashable) -> Hashable:
+        # UUID and str user ids must hit the same entries
+        return str(owner) if owner is not None else None
+
+    def get(self, namespace: str, owner: Hashable, variant: Hashable = None) -> Optional[Any]:
+        if not self.enabled:
+            return None
+        key = (namespace, self._owner(owner), variant)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return entry[1]
+
+    def put(self, namespace: str, owner: Hashable, variant: Hashable, value: Any,
+            ttl_seconds: Optional[float] = None) -> None:
+        if not self.enabled:
+            return
+        key = (namespace, self._owner(owner), variant)
+        expires_at = time.monotonic() + (self.ttl_seconds if ttl_seconds is None else ttl_seconds)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            self._by_owner.setdefault(key[1], set()).add(key)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.stats["evictions"] += 1
+
+    def invalidate_owner(self, owner: Hashable) -> int:
+        """Drop every cached dashboard belonging to ``owner``"""
+        with self._lock:
+            keys = self._by_owner.pop(self._owner(owner), set())
+            for key in keys:
+                self._entries.pop(key, None)
+            self.stats["invalidations"] += len(keys)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_owner.clear()
+
+    def _remove(self, key: CacheKey) -> None:
+        self._entries.pop(key, None)
+        keys = self._by_owner.get(key[1])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_owner[key[1]]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self.stats, "entries": len(self._entries), "ttl_seconds": self.ttl_seconds}
+
+
+_dashboard_cache: Optional[DashboardCache] = None
+_dashboard_cache_lock = threading.Lock()
+
+
+def get_dashboard_cache() -> DashboardCache:
+    """Get the process-wide dashboard cache"""
+    global _dashboard_cache
+    if _dashboard_cache is None:
+        with _dashboard_cache_lock:
+            if _dashboard_cache is None:
+                _dashboard_cache = DashboardCache(
+                    ttl_seconds=float(os.getenv("DASHBOARD_CACHE_TTL_SECONDS", "30")),
+                    max_entries=int(os.getenv("DASHBOARD_CACHE_MAX_ENTRIES", "5000")),
+                )
+    return _dashboard_cache
@@ -7,11 +7,12 @@ Automatically deletes user files after 24 hours for privacy protection
 import os
 import asyncio
 import logging
+import time
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Any, Callable, Dict, Iterator, Optional, Set
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import case, delete, func
 
 from config.database import SessionLocal
 from models.user import User
@@ -24,155 +25,177 @@ logger = logging.getLogger(__name__)
 class FileCleanupService:
     """Service for automatically cleaning up old user files"""
     
-    def __init__(self, upload_directory: str = "uploads"):
+    def __init__(self, upload_directory: str = "uploads", session_factory: Optional[Callable[[], Session]] = None,
+                 batch_size: Optional[int] = None):
         self.upload_directory = Path(upload_directory)
         self.cleanup_age_hours = 24
-        self.batch_size = 100  # Process files in batches to avoid memory issues
+        # Records deleted per DELETE statement / commit; runs loop until none are left
+        self.batch_size = batch_size or int(os.getenv("FILE_CLEANUP_BATCH_SIZE", "1000"))
+        self._session_factory = session_factory or SessionLocal
+        self.last_run: Optional[Dict[str, Any]] = None
         
-    async def cleanup_expired_files(self) -> Dict[str, int]:
+    async def cleanup_expired_files(self) -> Dict[str, Any]:
         """
         Clean up files older than 24 hours
         Returns statistics about the cleanup operation
         """
         logger.info("🧹 Starting file cleanup process...")
-        
+        stats = await asyncio.to_thread(self._run_cleanup)
+        self.last_run = stats
+        logger.info(f"✅ File cleanup completed: {stats}")
+        return stats
+
+    def _run_cleanup(self) -> Dict[str, Any]:
+        """Expired-record pass followed by the orphan pass (blocking; runs in a worker thread)"""
         stats = {
             "files_checked": 0,
             "files_deleted": 0,
+            "records_deleted": 0,
+            "orphans_deleted": 0,
+            "entries_scanned": 0,
+            "batches": 0,
             "errors": 0,
-            "space_freed_mb": 0
+            "space_freed_mb": 0.0,
         }
-        
-        db = SessionLocal()
+        started = time.perf_counter()
+        cutoff_time = datetime.utcnow() - timedelta(hours=self.cleanup_age_hours)
+        logger.info(f"🕒 Cleaning up files older than: {cutoff_time}")
+
+        db = self._session_factory()
         try:
-            # Calculate cutoff time (24 hours ago)
-            cutoff_time = datetime.utcnow() - timedelta(hours=self.cleanup_age_hours)
-            logger.info(f"🕒 Cleaning up files older than: {cutoff_time}")
-            
-            # Get expired file metadata from database
-            expired_files = db.query(FileMetadata).filter(
-                FileMetadata.created_at < cutoff_time
-            ).limit(self.batch_size).all()
-            
-            logger.info(f"📁 Found {len(expired_files)} expired files to clean up")
-            
-            for file_record in expired_files:
-                stats["files_checked"] += 1
-                
-                try:
-                    # Delete physical file
-                    file_path = Path(file_record.file_path)
-                    if file_path.exists():
-                        file_size_mb = file_path.stat().st_size / (1024 * 1024)
-                        file_path.unlink()
-                        stats["space_freed_mb"] += file_size_mb
-                        logger.info(f"🗑️  Deleted file: {file_path} ({file_size_mb:.2f} MB)")
-                    
-                    # Remove database record
-                    db.delete(file_record)
-                    stats["files_deleted"] += 1
-                    
-                except Exception as e:
-                    logger.error(f"❌ Error deleting file {file_record.file_path}: {str(e)}")
-                    stats["errors"] += 1
-            
-            # Commit database changes
-            db.commit()
-            
-            # Also clean up orphaned files (files without database records)
-            await self._cleanup_orphaned_files(stats)
-            
-            logger.info(f"✅ File cleanup completed: {stats}")
-            return stats
-            
+            self._delete_expired_records(db, cutoff_time, stats)
+            expired_seconds = time.perf_counter() - started
+            # Load tracked paths after the expired records are gone
+            self._delete_orphaned_files(self._tracked_paths(db), stats)
         except Exception as e:
             logger.error(f"❌ File cleanup failed: {str(e)}")
             db.rollback()
             stats["errors"] += 1
-            return stats
+            expired_seconds = time.perf_counter() - started
         finally:
             db.close()
-    
-    async def _cleanup_orphaned_files(self, stats: Dict[str, int]) -> None:
-        """Clean up physical files that don't have database records"""
+
+        elapsed = time.perf_counter() - started
+        stats["space_freed_mb"] = round(stats["space_freed_mb"], 3)
+        stats["elapsed_seconds"] = round(elapsed, 3)
+        stats["records_per_second"] = round(stats["records_deleted"] / expired_seconds, 1) if expired_seconds else 0.0
+        stats["entries_per_second"] = round(stats["entries_scanned"] / elapsed, 1) if elapsed else 0.0
+        stats["completed_at"] = datetime.utcnow().isoformat()
+        return stats
+
+    def _delete_expired_records(self, db: Session, cutoff_time: datetime, stats: Dict[str, Any]) -> None:
+        """Unlink expired files and bulk-DELETE their records, one keyset batch at a time"""
+        last_id = None
+        while True:
+            query = db.query(FileMetadata.id, FileMetadata.file_path).filter(FileMetadata.created_at < cutoff_time)
+            if last_id is not None:
+                query = query.filter(FileMetadata.id > last_id)
+            rows = query.order_by(FileMetadata.id).limit(self.batch_size).all()
+            if not rows:
+                break
+
+            removable = []
+            for row in rows:
+                stats["files_checked"] += 1
+                try:
+                    freed = self._unlink(row.file_path)
+                    if freed is not None:
+                        stats["files_deleted"] += 1
+                        stats["space_freed_mb"] += freed / (1024 * 1024)
+                    removable.append(row.id)
+                except OSError as e:
+                    # Keep the record so the file is retried on the next run
+                    logger.error(f"❌ Error deleting file {row.file_path}: {str(e)}")
+                    stats["errors"] += 1
+
+            if removable:
+                db.execute(delete(FileMetadata).where(FileMetadata.id.in_(removable))
+                           .execution_options(synchronize_session=False))
+                db.commit()
+            stats["records_deleted"] += len(removable)
+            stats["batches"] += 1
+            last_id = rows[-1].id
+            if len(rows) < self.batch_size:
+                break
+
+    @staticmethod
+    def _unlink(file_path: str) -> Optional[int]:
+        """Delete a file, returning its size, or None if it was already gone"""
         try:
-            if not self.upload_directory.exists():
-                return
-            
-            cutoff_time = datetime.utcnow() - timedelta(hours=self.cleanup_age_hours)
-            
-            # Check all files in upload directory
-            for file_path in self.upload_directory.rglob("*"):
-                if file_path.is_file():
-                    try:
-                        # Check file age
-                        file_mtime = datetime.fromtimestamp(file_path.stat().st_mtime)
-                        
-                        if file_mtime < cutoff_time:
-                            # Check if file has database record
-                            db = SessionLocal()
-                            try:
-                                file_record = db.query(FileMetadata).filter(
-                                    FileMetadata.file_path == str(file_path)
-                                ).first()
-                                
-                                if not file_record:
-                                    # Orphaned file - delete it
-                                    file_size_mb = file_path.stat().st_size / (1024 * 1024)
-                                    file_path.unlink()
-                                    stats["files_deleted"] += 1
-                                    stats["space_freed_mb"] += file_size_mb
-                                    logger.info(f"🗑️  Deleted orphaned file: {file_path} ({file_size_mb:.2f} MB)")
-                                    
-                            finally:
-                                db.close()
-                                
-                    except Exception as e:
-                        logger.error(f"❌ Error processing file {file_path}: {str(e)}")
-                        stats["errors"] += 1
-                        
-        except Exception as e:
-            logger.error(f"❌ Error during orphaned file cleanup: {str(e)}")
-            stats["errors"] += 1
+            size = os.stat(file_path).st_size
+            os.unlink(file_path)
+            return size
+        except FileNotFoundError:
+            return None
+
+    def _tracked_paths(self, db: Session) -> Set[str]:
+        """Absolute paths of every file that still has a metadata record"""
+        tracked = set()
+        for (file_path,) in db.query(FileMetadata.file_path).yield_per(5000):
+            tracked.add(os.path.abspath(file_path))
+        return tracked
+
+    def _iter_files(self, root: str) -> Iterator[os.DirEntry]:
+        """Depth-first ``os.scandir`` walk yielding regular files"""
+        stack = [root]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            yield entry
+            except OSError as e:
+                logger.error(f"❌ Error scanning directory: {str(e)}")
+
+    def _delete_orphaned_files(self, tracked: Set[str], stats: Dict[str, Any]) -> None:
+        """Clean up physical files that don't have database records"""
+        if not self.upload_directory.exists():
+            return
+
+        cutoff_ts = time.time() - self.cleanup_age_hours * 3600
+        for entry in self._iter_files(os.path.abspath(self.upload_directory)):
+            stats["entries_scanned"] += 1
+            try:
+                info = entry.stat(follow_symlinks=False)
+                if info.st_mtime >= cutoff_ts or entry.path in tracked:
+                    continue
+                os.unlink(entry.path)
+                stats["files_deleted"] += 1
+                stats["orphans_deleted"] += 1
+                stats["space_freed_mb"] += info.st_size / (1024 * 1024)
+                logger.debug(f"Deleted orphaned file: {entry.path}")
+            except FileNotFoundError:
+                continue
+            except OSError as e:
+                logger.error(f"❌ Error processing file {entry.path}: {str(e)}")
+                stats["errors"] += 1
     
-    async def get_cleanup_stats(self) -> Dict[str, any]:
-        """Get statistics about files eligible for cleanup"""
-        db = SessionLocal()
+    async def get_cleanup_stats(self) -> Dict[str, Any]:
+        """Get statistics about files eligible for cleanup, plus the last run's throughput"""
+        db = self._session_factory()
         try:
             cutoff_time = datetime.utcnow() - timedelta(hours=self.cleanup_age_hours)
+            is_expired = FileMetadata.created_at < cutoff_time
             
-            # Count expired files
-            expired_count = db.query(FileMetadata).filter(
-                FileMetadata.created_at < cutoff_time
-            ).count()
-            
-            # Count total files
-            total_count = db.query(FileMetadata).count()
-            
-            # Calculate total storage used
-            total_size = 0
-            expired_size = 0
-            
-            all_files = db.query(FileMetadata).all()
-            for file_record in all_files:
-                try:
-                    file_path = Path(file_record.file_path)
-                    if file_path.exists():
-                        size = file_path.stat().st_size
-                        total_size += size
-                        
-                        if file_record.created_at < cutoff_time:
-                            expired_size += size
-                except:
-                    pass
+            # One aggregate pass instead of loading and stat()-ing every record
+            total_count, expired_count, total_size, expired_size = db.query(
+                func.count(FileMetadata.id),
+                func.sum(case((is_expired, 1), else_=0)),
+                func.sum(FileMetadata.file_size_bytes),
+                func.sum(case((is_expired, FileMetadata.file_size_bytes), else_=0)),
+            ).one()
             
             return {
-                "total_files": total_count,
-                "expired_files": expired_count,
-                "total_size_mb": total_size / (1024 * 1024),
-                "expired_size_mb": expired_size / (1024 * 1024),
+                "total_files": total_count or 0,
+                "expired_files": expired_count or 0,
+                "total_size_mb": (total_size or 0) / (1024 * 1024),
+                "expired_size_mb": (expired_size or 0) / (1024 * 1024),
                 "cleanup_age_hours": self.cleanup_age_hours,
-                "next_cleanup_eligible": cutoff_time.isoformat()
+                "next_cleanup_eligible": cutoff_time.isoformat(),
+                "batch_size": self.batch_size,
+                "last_run": self.last_run
             }
             
         finally:
@@ -0,0 +1,179 @@
+"""
+Per-job generation plan
+
+A batch job with a cover letter makes two LLM calls: tailor the resume, and
+write the cover letter. Both depend only on the original resume and the job
+description, so they don't have to run one after the other.
+
+``JobGenerationPlan`` starts each step on a shared thread pool as soon as it is
+added, and the caller awaits results in whatever order it needs them:
+
+    async with JobGenerationPlan(timeout=30) as plan:
+        plan.add("resume", tailor, resume_text, job_data)
+        plan.add("cover_letter", write_letter, resume_text, job_data, required=False)
+        tailored = await plan.result("resume")
+        ...format the resume while the cover letter finishes...
+        letter = await plan.result("cover_letter")
+
+All steps share one deadline and one cancellation:
+
+- a required step that fails or times out cancels the rest and raises
+- an optional step that fails or times out yields ``None`` and records the error
+- leaving the block early (an exception, or the caller being cancelled, e.g.
+  by the batch's per-job ``asyncio.wait_for``) cancels every pending step
+
+Steps already running in a worker thread can't be interrupted. Steps still
+queued are skipped, and any outcome that arrives after cancellation is
+discarded.
+"""
+
+import asyncio
+import atexit
+import concurrent.futures
+import contextvars
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from utils.stage_tracing import trace_stage
+
+logger = logging.getLogger(__name__)
+
+
+class GenerationCancelled(Exception):
+    """The step was cancelled (by the plan or a failing required step) before it finished"""
+
+
+class _Step:
+    __slots__ = ("name", "future", "required", "timeout", "started_at", "duration", "error")
+
+    def __init__(self, name: str, future: asyncio.Future, required: bool, timeout: Optional[float]):
+        self.name = name
+        self.future = future
+        self.required = required
+        self.timeout = timeout
+        self.started_at = time.monotonic()
+        self.duration: Optional[float] = None
+        self.error: Optional[str] = None
+
+
+class JobGenerationPlan:
+    """Concurrent, jointly cancelled generation steps for one job"""
+
+    def __init__(self, timeout: Optional[float] = None, executor: Optional[concurrent.futures.Executor] = None):
+        """
+        Args:
+            timeout: Seconds from plan creation by which every step must finish
+            executor: Pool the steps run on (defaults to ``get_generation_executor()``)
+        """
+        self.executor = executor or get_generation_executor()
+        self.started_at = time.monotonic()
+        self.deadline = self.started_at + timeout if timeout is not None else None
+        self.cancel_event = threading.Event()
+        self._steps: Dict[str, _Step] = {}
+
+    def add(self, name: str, func: Callable[..., Any], *args, required: bool = True,
+            timeout: Optional[float] = None, **kwargs) -> None:
+        """Start ``func(*args, **kwargs)`` on the pool as step ``name``"""
+        if name in self._steps:
+            raise ValueError(f"Step {name!r} already added")
+        cancel_event = self.cancel_event
+        # Run in the caller's context so the step joins its job trace
+        context = contextvars.copy_context()
+
+        def run():
+            if cancel_event.is_set():
+                raise GenerationCancelled(name)
+            with trace_stage(f"generate.{name}"):
+                return func(*args, **kwargs)
+
+        future = asyncio.get_running_loop().run_in_executor(self.executor, context.run, run)
+        step = self._steps[name] = _Step(name, future, required, timeout)
+
+        def _finished(_):
+            step.duration = time.monotonic() - step.started_at
+
+        future.add_done_callback(_finished)
+
+    def _remaining(self, step: _Step) -> Optional[float]:
+        now = time.monotonic()
+        limits = [limit for limit in (
+            self.deadline - now if self.deadline is not None else None,
+            step.started_at + step.timeout - now if step.timeout is not None else None,
+        ) if limit is not None]
+        return max(0.0, min(limits)) if limits else None
+
+    async def result(self, name: str) -> Any:
+        """Wait for step ``name`` within its timeout and the plan deadline"""
+        step = self._steps[name]
+        try:
+            done, _ = await asyncio.wait({step.future}, timeout=self._remaining(step))
+        except asyncio.CancelledError:
+            self.cancel()
+            raise
+
+        if not done:
+            step.future.cancel()
+            step.error, error = "timed out", asyncio.TimeoutError(f"Generation step {name} timed out")
+        elif step.future.cancelled():
+            step.error, error = step.error or "cancelled", GenerationCancelled(name)
+        elif step.future.exception() is not None:
+            error = step.future.exception()
+            step.error = str(error) or type(error).__name__
+        else:
+            return step.future.result()
+
+        if step.required:
+            logger.warning(f"Required generation step {name} failed ({step.error}); cancelling the plan")
+            self.cancel()
+            raise error
+        logger.warning(f"Optional generation step {name} failed ({step.error})")
+        return None
+
+    def cancel(self) -> None:
+        """Skip queued steps and drop the outcome of running ones"""
+        self.cancel_event.set()
+        for step in self._steps.values():
+            if not step.future.done():
+                step.future.cancel()
+                step.error = step.error or "cancelled"
+
+    def summary(self) -> Dict[str, Any]:
+        """Per-step timings and errors, plus total wall time, in milliseconds"""
+        return {
+            "wall_ms": round((time.monotonic() - self.started_at) * 1000, 1),
+            "steps": {
+                name: {
+                    "duration_ms": round(step.duration * 1000, 1) if step.duration is not None else None,
+                    "error": step.error,
+                }
+                for name, step in self._steps.items()
+            },
+        }
+
+    async def __aenter__(self) -> "JobGenerationPlan":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        # Anything not awaited by now (or left behind by an error) is no longer wanted
+        self.cancel()
+
+
+_executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_generation_executor() -> concurrent.futures.ThreadPoolExecutor:
+    """Process-wide pool for generation steps, sized by ``JOB_GENERATION_WORKERS``"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=int(os.getenv("JOB_GENERATION_WORKERS", "8")),
+                    thread_name_prefix="job-generation",
+                )
+                atexit.register(_executor.shutdown, wait=False, cancel_futures=True)
+    return _executor
@@ -18,6 +18,7 @@ from openai import AsyncOpenAI
 from models.user import User
 from services.subscription_service import SubscriptionService
 from utils.gpt_prompt import GPTProcessor
+from utils.llm_metrics import track_llm_call
 
 
 class CoverLetterTemplate(Enum):
@@ -289,16 +290,18 @@ Generate a premium cover letter that showcases why this candidate is the perfect
 
         try:
             # Use OpenAI API for advanced generation
-            client = AsyncOpenAI()
-            response = await self.gpt_processor.process_prompt(
-                model="gpt-4",  # Use GPT-4 for premium quality
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=0.7,
-                max_tokens=1000
-            )
+            client = AsyncOpenAI(max_retries=0)  # retried (and counted) by track_llm_call
+            async with track_llm_call("premium_cover_letter", "gpt-4") as call:
+                response = await call.run_async(lambda: client.chat.completions.create(
+                    model="gpt-4",  # Use GPT-4 for premium quality
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt}
+                    ],
+                    temperature=0.7,
+                    max_tokens=1000
+                ))
+                call.set_output(response.choices[0].message.content)
             
             return response.choices[0].message.content.strip()
             
@@ -317,11 +320,12 @@ Generate a premium cover letter that showcases why this candidate is the perfect
         job_title: str
     ) -> str:
         """Fallback to basic cover letter generation for non-Pro users"""
-        return await self.gpt_prompt.generate_cover_letter(
-            resume_text=resume_text,
-            job_description=job_description,
-            company_name=company_name,
-            job_title=job_title
+        return await asyncio.to_thread(
+            self.gpt_processor.generate_cover_letter,
+            resume_text,
+            job_description,
+            job_title,
+            {"coverLetterDetails": {"additionalInfo": f"The company is {company_name}."}} if company_name else None
         )
     
     async def _track_cover_letter_generation(
@@ -10,6 +10,9 @@ from io import BytesIO
 from datetime import datetime
 import asyncio
 
+from utils.resume_segments import segment_resume
+from utils.stage_tracing import trace_stage
+
 
 def _prefer_backend(module_path: str, fallback_path: str, attr: str | None = None):
     try:
@@ -21,6 +24,7 @@ def _prefer_backend(module_path: str, fallback_path: str, attr: str | None = Non
 # Import existing components
 try:
     from utils.resume_editor import ResumeEditor
+    from utils.pdf_styles import StyleSet, get_style_registry
     from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
     from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
     from reportlab.lib.pagesizes import letter
@@ -215,12 +219,12 @@ class ProfessionalTemplateEngine:
             'classic': self._classic_template
         }
     
-    def get_template_styles(self, template_name: str) -> Dict[str, ParagraphStyle]:
-        """Get styles for specific template"""
+    def get_template_styles(self, template_name: str) -> StyleSet:
+        """Get styles for specific template (built once per process)"""
         if template_name not in self.templates:
             template_name = 'modern'
         
-        return self.templates[template_name]()
+        return get_style_registry().get(("professional", template_name), self.templates[template_name])
     
     def _executive_template(self) -> Dict[str, ParagraphStyle]:
         """Executive template - Conservative, professional"""
@@ -411,44 +415,46 @@ class ProfessionalOutputService:
             logger.info(f"🚀 Starting professional PDF generation with template: {template}")
             
             # Calculate ATS score (kept for compatibility)
-            ats_results = self.ats_scorer.calculate_ats_score(resume_text, job_description)
+            with trace_stage("ats_scoring"):
+                ats_results = self.ats_scorer.calculate_ats_score(resume_text, job_description)
             logger.info(f"📊 ATS Score calculated: {ats_results.get('total_score', 0)}")
 
             # Optional text optimizations
             optimized_text = self._apply_ats_optimizations(resume_text, ats_results) if ats_optimize else resume_text
 
             # Parse resume with comprehensive parser if available
-            if RESUME_PARSER_AVAILABLE:
-                logger.info("📝 Using comprehensive resume parser")
-                parser = ResumeParser()
-                # Sanitize input of JD-derived junk before parsing
-                try:
-                    sanitize_input_text = _prefer_backend('services.content_filters', 'backend.services.content_filters', attr='sanitize_input_text')
-                except Exception:
-                    sanitize_input_text = lambda x: x
-                parsed_data = parser.parse(sanitize_input_text(optimized_text))
+            with trace_stage("parse", parser='comprehensive' if RESUME_PARSER_AVAILABLE else 'fallback'):
+                if RESUME_PARSER_AVAILABLE:
+                    logger.info("📝 Using comprehensive resume parser")
+                    parser = ResumeParser()
+                    # Sanitize input of JD-derived junk before parsing
+                    try:
+                        sanitize_input_text = _prefer_backend('services.content_filters', 'backend.services.content_filters', attr='sanitize_input_text')
+                    except Exception:
+                        sanitize_input_text = lambda x: x
+                    parsed_data = parser.parse(sanitize_input_text(optimized_text))
                 
-                # Validate parsed data
-                validation_errors = parser.validate_parsed_data(parsed_data)
-                if validation_errors:
-                    logger.warning(f"⚠️ Validation issues: {validation_errors}")
+                    # Validate parsed data
+                    validation_errors = parser.validate_parsed_data(parsed_data)
+                    if validation_errors:
+                        logger.warning(f"⚠️ Validation issues: {validation_errors}")
                 
-                # Convert to Resume schema
-                resume_obj = self._convert_parsed_to_resume_schema(parsed_data)
-                if not resume_obj or not resume_obj.name:
-                    logger.warning("⚠️ Parsed resume missing critical fields; falling back to raw text output")
+                    # Convert to Resume schema
+                    resume_obj = self._convert_parsed_to_resume_schema(parsed_data)
+                    if not resume_obj or not resume_obj.name:
+                        logger.warning("⚠️ Parsed resume missing critical fields; falling back to raw text output")
+                    else:
+                        logger.info(f"✅ Successfully parsed resume: {resume_obj.name}")
                 else:
-                    logger.info(f"✅ Successfully parsed resume: {resume_obj.name}")
-            else:
-                logger.info("📝 Using fallback resume parser")
-                # Fallback to original parser
-                try:
-                    sanitize_input_text = _prefer_backend('services.content_filters', 'backend.services.content_filters', attr='sanitize_input_text')
-                except Exception:
-                    sanitize_input_text = lambda x: x
-                resume_obj = parse_resume_text_to_schema(sanitize_input_text(optimized_text))
+                    logger.info("📝 Using fallback resume parser")
+                    # Fallback to original parser
+                    try:
+                        sanitize_input_text = _prefer_backend('services.content_filters', 'backend.services.content_filters', attr='sanitize_input_text')
+                    except Exception:
+                        sanitize_input_text = lambda x: x
+                    resume_obj = parse_resume_text_to_schema(sanitize_input_text(optimized_text))
             
-            resume_json = clean_and_compact(resume_obj.dict())
+                resume_json = clean_and_compact(resume_obj.dict())
 
             # Generate formatted display text using parsed data when available
             formatted_display_text = make_short_preview_string(resume_json)
@@ -491,12 +497,13 @@ class ProfessionalOutputService:
             bundle_name = template or "executive_compact"
             pdf_bytes = b""
             try:
-                pdf_bytes = TemplateEngine.render_pdf_sync(
-                    template_id=bundle_name,
-                    resume_json=resume_json,
-                    resume_text=optimized_text,
-                    bundle=bundle_name,
-                )
+                with trace_stage("render_pdf", template=bundle_name):
+                    pdf_bytes = TemplateEngine.render_pdf_sync(
+                        template_id=bundle_name,
+                        resume_json=resume_json,
+                        resume_text=optimized_text,
+                        bundle=bundle_name,
+                    )
             except Exception as render_err:
                 logger.error(f"❌ TemplateEngine rendering failed, falling back to direct ReportLab: {render_err}", exc_info=True)
                 try:
@@ -580,152 +587,51 @@ class ProfessionalOutputService:
         """
         Parse resume text into structured sections:
         - Extracts name, contact info, and main sections (experience, education, skills, summary, other)
-        - Handles common section header variations and preserves formatting
+        - Unheaded text below the contact block counts as the summary
         """
-        import re
-
-        print(f"🔍 _parse_resume_sections called with text length: {len(resume_text)}")
-        print(f"🔍 Resume text preview: {resume_text[:150]}...")
-
-        # Section header patterns (case-insensitive)
-        SECTION_HEADERS = {
-            "experience": re.compile(r"^(work\s+)?experience|professional\s+experience|employment\s+history$", re.I),
-            "education": re.compile(r"^education|academic\s+background$", re.I),
-            "skills": re.compile(r"^skills|technical\s+skills|core\s+competencies$", re.I),
-            "summary": re.compile(r"^summary|professional\s+summary|profile|about\s+me$", re.I),
-        }
-        # For "other" section, anything not matching above
-
-        # Contact info patterns
-        EMAIL_PATTERN = re.compile(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b")
-        PHONE_PATTERN = re.compile(r"\b(\+?\d{1,3}[-.\s]?)?(\(?\d{3}\)?[-.\s]?){1,2}\d{3,4}\b")
-        LOCATION_KEYWORDS = [
-            "street", "st.", "ave", "avenue", "road", "rd.", "blvd", "suite", "floor",
-            "city", "state", "zip", "country", "usa", "united states", "canada",
-            "atlanta", "new york", "san francisco", "los angeles", "chicago", "boston", "ga", "ny", "ca", "il", "ma"
-        ]
-
-        try:
-            lines = [line.strip() for line in resume_text.strip().split('\n') if line.strip()]
-            print(f"🔍 Parsed {len(lines)} lines from resume")
+        segmented = segment_resume(resume_text.strip())
+        content_lines = [line for line in segmented.lines[segmented.contact.end:] if line]
 
-            if not lines:
-                print("⚠️ Empty resume text for parsing")
-                return {
-                    'header': 'Professional Resume',
-                    'experience': '',
-                    'education': '',
-                    'skills': '',
-                    'summary': '',
-                    'contact': '',
-                    'other': ''
-                }
-
-            # 1. Identify contact info and name
-            contact_info = []
-            name = None
-            name_line_idx = None
-            max_contact_scan = min(8, len(lines))  # Only scan first 8 lines for contact info and name
-
-            for idx in range(max_contact_scan):
-                line = lines[idx]
-                # Check for contact info
-                is_email = EMAIL_PATTERN.search(line)
-                is_phone = PHONE_PATTERN.search(line)
-                is_location = any(loc in line.lower() for loc in LOCATION_KEYWORDS)
-                if is_email or is_phone or is_location:
-                    contact_info.append(line)
-                elif not name and len(line.split()) <= 6 and not any(x in line for x in ['@', '|', 'www.', '.com']):
-                    # Heuristic: first non-contact, non-weird line with <= 6 words is likely the name
-                    name = line
-                    name_line_idx = idx
-
-            # If name not found, fallback to first line
-            if not name:
-                name = lines[0]
-                name_line_idx = 0
-
-            # Remove name and contact lines from the main content
-            skip_idxs = set()
-            if name_line_idx is not None:
-                skip_idxs.add(name_line_idx)
-            for idx, line in enumerate(lines[:max_contact_scan]):
-                if line in contact_info:
-                    skip_idxs.add(idx)
-            content_lines = [line for idx, line in enumerate(lines) if idx not in skip_idxs]
-
-            # 2. Parse sections
-            sections = {
-                'header': name,
-                'contact': "\n".join(contact_info),
-                'summary': '',
+        if not any(segmented.lines):
+            print("⚠️ Empty resume text for parsing")
+            return {
+                'header': 'Professional Resume',
                 'experience': '',
                 'education': '',
                 'skills': '',
+                'summary': '',
+                'contact': '',
                 'other': ''
             }
-            current_section = None
-            section_buffers = {
-                'summary': [],
-                'experience': [],
-                'education': [],
-                'skills': [],
-                'other': []
-            }
-
-            def match_section(line):
-                for sec, pat in SECTION_HEADERS.items():
-                    if pat.match(line):
-                        return sec
-                return None
-
-            # Track which sections have been seen
-            seen_sections = set()
-            for line in content_lines:
-                sec = match_section(line)
-                if sec:
-                    current_section = sec
-                    seen_sections.add(sec)
-                    continue
-                # If line is a section header not recognized, treat as "other"
-                if re.match(r"^[A-Z][A-Za-z\s]+$", line) and len(line.split()) <= 4 and not sec:
-                    current_section = "other"
-                    continue
-                # Assign line to current section, or to "other" if none
-                if current_section:
-                    section_buffers[current_section].append(line)
-                else:
-                    section_buffers["other"].append(line)
-
-            # 3. Populate sections with joined text
-            for sec in ['summary', 'experience', 'education', 'skills', 'other']:
-                sections[sec] = "\n".join(section_buffers[sec]).strip()
 
-            # If all main sections are empty, put everything in experience as fallback
-            if not any(sections[sec] for sec in ['experience', 'education', 'skills', 'summary']):
-                sections['experience'] = "\n".join(content_lines).strip()
-                sections['other'] = ''
+        section_buffers = {
+            'summary': list(segmented.intro),
+            'experience': [],
+            'education': [],
+            'skills': [],
+            'other': []
+        }
+        for section in segmented.sections:
+            bucket = section.key if section.key in section_buffers else 'other'
+            section_buffers[bucket].extend(section.lines)
+
+        sections = {
+            'header': segmented.contact.name or next(line for line in segmented.lines if line),
+            'headline': segmented.contact.headline or '',
+            'contact': "\n".join(segmented.contact.lines),
+        }
+        for sec, lines in section_buffers.items():
+            sections[sec] = "\n".join(lines).strip()
 
-            print(f"📝 Parsed resume: name='{sections['header']}', contact_lines={len(contact_info)}")
-            for sec in ['summary', 'experience', 'education', 'skills', 'other']:
-                print(f"📝 Section '{sec}': {len(sections[sec])} chars")
+        # If all main sections are empty, put everything in experience as fallback
+        if not any(sections[sec] for sec in ['experience', 'education', 'skills', 'summary']):
+            sections['experience'] = "\n".join(content_lines).strip()
+            sections['other'] = ''
 
-            return sections
+        print(f"📝 Parsed resume: name='{sections['header']}', contact_lines={len(segmented.contact.lines)}, "
+              f"sections={[section.key for section in segmented.sections]}")
+        return sections
 
-        except Exception as e:
-            print(f"❌ Resume parsing error: {e}")
-            import traceback
-            print(f"🔍 Full parsing error: {traceback.format_exc()}")
-            # Safe fallback - return expected structure with all content in experience section
-            return {
-                'header': 'Professional Resume',
-                'contact': '',
-                'summary': '',
-                'experience': resume_text,
-                'education': '',
-                'skills': '',
-                'other': ''
-            }
     def _format_modern_template(self, sections: Dict[str, Any]) -> str:
         """Format resume with Modern template styling and proper section formatting"""
         formatted = []
@@ -962,7 +868,7 @@ class ProfessionalOutputService:
             sanitize_input_text = _prefer_backend('backend.services.content_filters', 'services.content_filters', attr='sanitize_input_text')
         except Exception:
             sanitize_input_text = lambda x: x
-        sections = self._parse_resume_sections(sanitize_input_text(resume_text))
+        sections = self._parse_docx_sections(sanitize_input_text(resume_text))
         
         # Apply template-specific formatting
         for section_name, content in sections.items():
@@ -971,29 +877,16 @@ class ProfessionalOutputService:
             else:
                 self._add_docx_section(doc, section_name, content, template)
     
-    def _parse_resume_sections(self, text: str) -> Dict[str, List[str]]:
-        """Parse resume into sections"""
-        sections = {'header': [], 'experience': [], 'education': [], 'skills': [], 'other': []}
-        current_section = 'header'
-        
-        for line in text.split('\n'):
-            line = line.strip()
-            if not line:
-                continue
-            
-            # Detect section headers
-            if any(keyword in line.lower() for keyword in ['experience', 'education', 'skills', 'summary']):
-                if 'experience' in line.lower():
-                    current_section = 'experience'
-                elif 'education' in line.lower():
-                    current_section = 'education'
-                elif 'skills' in line.lower():
-                    current_section = 'skills'
-                else:
-                    current_section = 'other'
-                continue
-            
-            sections[current_section].append(line)
+    def _parse_docx_sections(self, text: str) -> Dict[str, List[str]]:
+        """Parse resume into the header and DOCX sections"""
+        segmented = segment_resume(text)
+        first_header = segmented.sections[0].header_line if segmented.sections else len(segmented.lines)
+        sections = {
+            'header': [line for line in segmented.lines[:first_header] if line],
+            'experience': [], 'education': [], 'skills': [], 'other': []
+        }
+        for section in segmented.sections:
+            sections[section.key if section.key in sections else 'other'].extend(section.lines)
         
         return sections
     
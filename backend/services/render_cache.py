@@ -0,0 +1,410 @@
+"""
+Rendered Artifact Cache
+
+Two-tier cache (size-bounded in-memory LRU plus on-disk store) for rendered
+resume HTML and PDF bytes. Keys are derived from the cleaned resume JSON, the
+template bundle id, the bundle file mtimes and the page size, so editing a
+bundle on disk naturally produces new keys. Explicit invalidation follows the
+same per-template semantics as ``TemplateCacheService.invalidate_template``.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from threading import RLock
+from typing import Any, Dict, Optional, Tuple, Union
+
+try:
+    from backend.services.template_registry import TemplateRegistry
+except ImportError:
+    from services.template_registry import TemplateRegistry
+
+logger = logging.getLogger(__name__)
+
+
+ARTIFACT_EXTENSIONS = {"html": "html", "pdf": "pdf"}
+
+
+@dataclass
+class RenderedArtifact:
+    """In-memory rendered artifact with bookkeeping metadata"""
+    template_id: str
+    kind: str
+    data: Union[str, bytes]
+    size_bytes: int
+    created_at: datetime
+
+
+def _encode(data: Union[str, bytes]) -> bytes:
+    return data.encode("utf-8") if isinstance(data, str) else data
+
+
+class RenderCache:
+    """
+    Rendered HTML/PDF cache placed in front of ``TemplateEngine.render_pdf``.
+
+    The memory tier is an LRU bounded by total bytes; the disk tier lives under
+    ``cache_dir/<template_id>/<key>.<ext>`` and is bounded separately.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[Path] = None,
+        max_memory_mb: int = 64,
+        max_disk_mb: int = 512,
+        disk_enabled: bool = True,
+    ):
+        """
+        Initialize the render cache
+
+        Args:
+            cache_dir: Directory for the disk tier (defaults to ./cache/rendered)
+            max_memory_mb: Maximum bytes held in memory, in MB
+            max_disk_mb: Maximum bytes held on disk, in MB
+            disk_enabled: Whether to persist artifacts to disk
+        """
+        self.cache_dir = Path(cache_dir or "cache/rendered")
+        self.max_memory_bytes = max_memory_mb * 1024 * 1024
+        self.max_disk_bytes = max_disk_mb * 1024 * 1024
+        self.disk_enabled = disk_enabled
+
+        self._memory: "OrderedDict[Tuple[str, str], RenderedArtifact]" = OrderedDict()
+        self._template_keys: Dict[str, set] = {}
+        self._memory_bytes = 0
+        self._disk_bytes: Optional[int] = None
+        self._lock = RLock()
+
+        self._stats = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'invalidations': 0,
+            'created_at': datetime.now()
+        }
+
+        if self.disk_enabled:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    # ------------------------------------------------------------------
+    # Key generation
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def bundle_fingerprint(template_id: str) -> str:
+        """Fingerprint a template bundle by its resolved id and file mtimes"""
+        bundle_dir = TemplateRegistry.get_dir(template_id)
+        parts = [bundle_dir.name]
+        for name in TemplateRegistry.REQUIRED_FILES:
+            try:
+                stat = (bundle_dir / name).stat()
+                parts.append(f"{name}:{stat.st_mtime_ns}:{stat.st_size}")
+            except OSError:
+                parts.append(f"{name}:missing")
+        return "|".join(parts)
+
+    def build_key(
+        self,
+        resume_data: Dict[str, Any],
+        template_id: str,
+        page_size: str = "Letter",
+        raw_text: Optional[str] = None,
+        renderer: str = "chromium",
+    ) -> str:
+        """
+        Build a stable cache key for a rendered artifact
+
+        Args:
+            resume_data: Cleaned resume dict (output of ``clean_and_compact``)
+            template_id: Template bundle id
+            page_size: PDF page size
+            raw_text: Scrubbed raw resume text used for template fallbacks
+            renderer: PDF backend that produced the artifact
+
+        Returns:
+            Hex digest identifying the artifact
+        """
+        hasher = hashlib.sha256()
+        hasher.update(
+            json.dumps(resume_data, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8")
+        )
+        hasher.update(b"\x00")
+        hasher.update(self.bundle_fingerprint(template_id).encode("utf-8"))
+        hasher.update(b"\x00")
+        hasher.update(f"{page_size}:{renderer}".encode("utf-8"))
+        hasher.update(b"\x00")
+        hasher.update((raw_text or "").encode("utf-8"))
+        return hasher.hexdigest()
+
+    # ------------------------------------------------------------------
+    # Memory tier
+    # ------------------------------------------------------------------
+
+    def _memory_put(self, key: str, artifact: RenderedArtifact) -> None:
+        with self._lock:
+            slot = (key, artifact.kind)
+            previous = self._memory.pop(slot, None)
+            if previous:
+                self._memory_bytes -= previous.size_bytes
+
+            if artifact.size_bytes > self.max_memory_bytes:
+                return
+
+            self._memory[slot] = artifact
+            self._memory_bytes += artifact.size_bytes
+            self._template_keys.setdefault(artifact.template_id, set()).add(slot)
+
+            while self._memory_bytes > self.max_memory_bytes and self._memory:
+                evicted_slot, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= evicted.size_bytes
+                self._discard_template_slot(evicted.template_id, evicted_slot)
+                self._stats['evictions'] += 1
+
+    def _discard_template_slot(self, template_id: str, slot: Tuple[str, str]) -> None:
+        slots = self._template_keys.get(template_id)
+        if slots is not None:
+            slots.discard(slot)
+            if not slots:
+                del self._template_keys[template_id]
+
+    # ------------------------------------------------------------------
+    # Disk tier
+    # ------------------------------------------------------------------
+
+    def _disk_path(self, template_id: str, key: str, kind: str) -> Path:
+        return self.cache_dir / template_id / f"{key}.{ARTIFACT_EXTENSIONS[kind]}"
+
+    def _disk_usage(self) -> int:
+        if self._disk_bytes is None:
+            total = 0
+            for path in self.cache_dir.glob("*/*"):
+                try:
+                    total += path.stat().st_size
+                except OSError:
+                    continue
+            self._disk_bytes = total
+        return self._disk_bytes
+
+    def _disk_put(self, template_id: str, key: str, kind: str, payload: bytes) -> None:
+        if not self.disk_enabled:
+            return
+        path = self._disk_path(template_id, key, kind)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            previous_size = path.stat().st_size if path.exists() else 0
+            with self._lock:
+                usage = self._disk_usage()
+            tmp_path = path.with_suffix(path.suffix + ".tmp")
+            tmp_path.write_bytes(payload)
+            os.replace(tmp_path, path)
+            with self._lock:
+                self._disk_bytes = usage + len(payload) - previous_size
+            self._enforce_disk_limit()
+        except OSError as e:
+            logger.warning(f"Failed to write render cache file {path}: {e}")
+
+    def _enforce_disk_limit(self) -> None:
+        """Drop the oldest disk artifacts until usage fits under the limit"""
+        if self._disk_usage() <= self.max_disk_bytes:
+            return
+        files = []
+        for path in self.cache_dir.glob("*/*"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_atime, stat.st_size, path))
+        files.sort()
+        with self._lock:
+            for _, size, path in files:
+                if self._disk_bytes <= self.max_disk_bytes:
+                    break
+                try:
+                    path.unlink()
+                    self._disk_bytes -= size
+                    self._stats['evictions'] += 1
+                except OSError:
+                    continue
+
+    def _disk_get(self, template_id: str, key: str, kind: str) -> Optional[bytes]:
+        if not self.disk_enabled:
+            return None
+        path = self._disk_path(template_id, key, kind)
+        try:
+            return path.read_bytes()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"Failed to read render cache file {path}: {e}")
+            return None
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def get(self, key: str, template_id: str, kind: str = "pdf") -> Optional[Union[str, bytes]]:
+        """
+        Retrieve a rendered artifact
+
+        Args:
+            key: Key from ``build_key``
+            template_id: Template bundle id used to build the key
+            kind: Artifact kind (html or pdf)
+
+        Returns:
+            HTML string or PDF bytes, or None on a miss
+        """
+        template_id = TemplateRegistry.resolve_id(template_id)
+        slot = (key, kind)
+
+        with self._lock:
+            artifact = self._memory.get(slot)
+            if artifact is not None:
+                self._memory.move_to_end(slot)
+                self._stats['memory_hits'] += 1
+                return artifact.data
+
+        payload = self._disk_get(template_id, key, kind)
+        if payload is None:
+            with self._lock:
+                self._stats['misses'] += 1
+            return None
+
+        data: Union[str, bytes] = payload.decode("utf-8") if kind == "html" else payload
+        self._memory_put(key, RenderedArtifact(
+            template_id=template_id,
+            kind=kind,
+            data=data,
+            size_bytes=len(payload),
+            created_at=datetime.now()
+        ))
+        with self._lock:
+            self._stats['disk_hits'] += 1
+        return data
+
+    def put(self, key: str, template_id: str, data: Union[str, bytes], kind: str = "pdf") -> None:
+        """
+        Store a rendered artifact in both tiers
+
+        Args:
+            key: Key from ``build_key``
+            template_id: Template bundle id used to build the key
+            data: HTML string or PDF bytes
+            kind: Artifact kind (html or pdf)
+        """
+        if kind not in ARTIFACT_EXTENSIONS:
+            raise ValueError(f"Unsupported artifact kind: {kind}")
+
+        template_id = TemplateRegistry.resolve_id(template_id)
+        payload = _encode(data)
+        self._memory_put(key, RenderedArtifact(
+            template_id=template_id,
+            kind=kind,
+            data=data,
+            size_bytes=len(payload),
+            created_at=datetime.now()
+        ))
+        self._disk_put(template_id, key, kind, payload)
+
+    def invalidate_template(self, template_id: str) -> int:
+        """
+        Invalidate all rendered artifacts for a specific template
+
+        Args:
+            template_id: Template identifier to invalidate
+
+        Returns:
+            Number of entries invalidated
+        """
+        template_id = TemplateRegistry.resolve_id(template_id)
+        removed = 0
+
+        with self._lock:
+            for slot in list(self._template_keys.pop(template_id, set())):
+                artifact = self._memory.pop(slot, None)
+                if artifact:
+                    self._memory_bytes -= artifact.size_bytes
+                    removed += 1
+
+            if self.disk_enabled:
+                template_dir = self.cache_dir / template_id
+                if template_dir.exists():
+                    disk_files = [p for p in template_dir.iterdir() if p.is_file()]
+                    removed = max(removed, len(disk_files))
+                    shutil.rmtree(template_dir, ignore_errors=True)
+                    self._disk_bytes = None
+
+            if removed:
+                self._stats['invalidations'] += removed
+                logger.info(f"Invalidated {removed} rendered artifacts for template {template_id}")
+
+        return removed
+
+    def clear(self) -> int:
+        """
+        Clear both tiers
+
+        Returns:
+            Number of in-memory entries cleared
+        """
+        with self._lock:
+            count = len(self._memory)
+            self._memory.clear()
+            self._template_keys.clear()
+            self._memory_bytes = 0
+            if self.disk_enabled and self.cache_dir.exists():
+                for child in self.cache_dir.iterdir():
+                    if child.is_dir():
+                        shutil.rmtree(child, ignore_errors=True)
+                self._disk_bytes = 0
+            self._stats['invalidations'] += count
+
+        logger.info(f"Cleared render cache: {count} in-memory entries")
+        return count
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        with self._lock:
+            hits = self._stats['memory_hits'] + self._stats['disk_hits']
+            lookups = hits + self._stats['misses']
+            return {
+                'memory_entries': len(self._memory),
+                'memory_usage_bytes': self._memory_bytes,
+                'max_memory_mb': self.max_memory_bytes // (1024 * 1024),
+                'disk_enabled': self.disk_enabled,
+                'disk_usage_bytes': self._disk_usage() if self.disk_enabled else 0,
+                'max_disk_mb': self.max_disk_bytes // (1024 * 1024),
+                'hit_rate': round(hits / lookups, 3) if lookups else 0.0,
+                'memory_hits': self._stats['memory_hits'],
+                'disk_hits': self._stats['disk_hits'],
+                'misses': self._stats['misses'],
+                'evictions': self._stats['evictions'],
+                'invalidations': self._stats['invalidations'],
+                'template_count': len(self._template_keys),
+                'uptime_seconds': (datetime.now() - self._stats['created_at']).total_seconds()
+            }
+
+
+# Global cache instance
+_global_render_cache: Optional[RenderCache] = None
+
+
+def get_render_cache() -> RenderCache:
+    """Get or create global render cache instance"""
+    global _global_render_cache
+
+    if _global_render_cache is None:
+        _global_render_cache = RenderCache(
+            cache_dir=Path(os.getenv("RENDER_CACHE_DIR", "cache/rendered")),
+            max_memory_mb=int(os.getenv("RENDER_CACHE_MEMORY_MB", "64")),
+            max_disk_mb=int(os.getenv("RENDER_CACHE_DISK_MB", "512")),
+            disk_enabled=os.getenv("RENDER_CACHE_DISK_ENABLED", "true").lower() == "true",
+        )
+
+    return _global_render_cache
@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import asyncio
+import atexit
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from io import BytesIO
+from typing import Any, Dict, List, Optional
+from xml.sax.saxutils import escape
+
+
+def _prefer_backend(module_path: str, fallback_path: str, attr: str | None = None):
+    try:
+        mod = __import__(module_path, fromlist=['*'])
+    except ImportError:
+        mod = __import__(fallback_path, fromlist=['*'])
+    return getattr(mod, attr) if attr else mod
+
+from reportlab.lib.colors import HexColor
+from reportlab.lib.pagesizes import A4, letter
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.pdfbase import pdfmetrics
+from reportlab.platypus import HRFlowable, Paragraph, SimpleDocTemplate, Spacer
+
+Resume = _prefer_backend('backend.models.resume_schema', 'models.resume_schema', attr='Resume')
+get_template_config = _prefer_backend('backend.services.reportlab_direct', 'services.reportlab_direct', attr='get_template_config')
+RenderConfig = _prefer_backend('backend.config.render_config', 'config.render_config', attr='RenderConfig')
+
+
+PAGE_SIZES = {"letter": letter, "a4": A4}
+PAGE_MARGIN = 0.5 * inch
+
+
+@lru_cache(maxsize=32)
+def _get_styles(template_id: str) -> Dict[str, ParagraphStyle]:
+    """
+    Build the paragraph styles for a template once per process.
+
+    Styles are treated as read-only after construction so they can be shared by
+    every PDF built in this worker.
+    """
+    config = get_template_config(template_id)
+    accent = HexColor(config["accent_color"])
+    body_size = config["body_size"]
+
+    # Touch the fonts so their metrics are loaded before the first build
+    for font_name in {config["name_font"], config["header_font"], config["body_font"],
+                      config.get("job_title_font", config["header_font"])}:
+        pdfmetrics.getFont(font_name)
+
+    return {
+        "name": ParagraphStyle(
+            name="Name", fontName=config["name_font"], fontSize=config["name_size"],
+            leading=config["name_size"] * 1.2, textColor=accent, alignment=1, spaceAfter=4,
+        ),
+        "contact": ParagraphStyle(
+            name="Contact", fontName=config["body_font"], fontSize=config["contact_size"],
+            leading=config["contact_size"] * 1.3, alignment=1, spaceAfter=6,
+        ),
+        "section": ParagraphStyle(
+            name="SectionHeader", fontName=config["header_font"], fontSize=config["header_size"],
+            leading=config["header_size"] * 1.2, textColor=accent, spaceBefore=8, spaceAfter=3,
+        ),
+        "role": ParagraphStyle(
+            name="JobTitle", fontName=config.get("job_title_font", config["header_font"]),
+            fontSize=config["job_title_size"], leading=config["job_title_size"] * 1.25, spaceAfter=1,
+        ),
+        "meta": ParagraphStyle(
+            name="Dates", fontName=config["body_font"], fontSize=body_size - 0.5,
+            leading=(body_size - 0.5) * 1.25, textColor=HexColor("#666666"), spaceAfter=2,
+        ),
+        "body": ParagraphStyle(
+            name="Body", fontName=config["body_font"], fontSize=body_size,
+            leading=body_size * 1.3, spaceAfter=2,
+        ),
+        "bullet": ParagraphStyle(
+            name="CustomBullet", fontName=config["body_font"], fontSize=body_size,
+            leading=body_size * 1.3, leftIndent=10, bulletIndent=0, spaceAfter=1,
+        ),
+    }
+
+
+def _text(value: Any) -> str:
+    return escape(str(value).strip()) if value else ""
+
+
+def _skill_names(skills: List[Any]) -> List[str]:
+    names: List[str] = []
+    for skill in skills or []:
+        name = skill.get("name") if isinstance(skill, dict) else skill
+        if isinstance(name, str) and name.strip():
+            names.append(name.strip())
+    return names
+
+
+def _date_range(start: Optional[str], end: Optional[str]) -> str:
+    if not start and not end:
+        return ""
+    return f"{start or ''} – {end or 'Present'}".strip(" –")
+
+
+def _section(story: list, title: str, styles: Dict[str, ParagraphStyle], accent: str) -> None:
+    story.append(Paragraph(escape(title.upper()), styles["section"]))
+    story.append(HRFlowable(width="100%", thickness=0.6, color=HexColor(accent), spaceBefore=0, spaceAfter=3))
+
+
+def render_resume_pdf(resume_data: Dict[str, Any], template_id: str = "executive_compact", page_size: str = "Letter") -> bytes:
+    """
+    Render a cleaned resume dict (``clean_and_compact`` output) to PDF with ReportLab.
+
+    This is a pure function of its arguments so it can run inside a worker process.
+    """
+    styles = _get_styles(template_id)
+    accent = get_template_config(template_id)["accent_color"]
+    contact = resume_data.get("contact") or {}
+
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=PAGE_SIZES.get(page_size.lower(), letter),
+        leftMargin=PAGE_MARGIN,
+        rightMargin=PAGE_MARGIN,
+        topMargin=PAGE_MARGIN,
+        bottomMargin=PAGE_MARGIN,
+        title=resume_data.get("name") or "Resume",
+    )
+    story: list = []
+
+    if resume_data.get("name"):
+        story.append(Paragraph(_text(resume_data["name"]), styles["name"]))
+    contact_parts = [contact.get("location"), contact.get("email"), contact.get("phone")]
+    contact_parts += [link.get("url") for link in contact.get("links") or [] if isinstance(link, dict)]
+    contact_line = " • ".join(_text(part) for part in contact_parts if part)
+    if contact_line:
+        story.append(Paragraph(contact_line, styles["contact"]))
+
+    if resume_data.get("summary"):
+        _section(story, "Summary", styles, accent)
+        story.append(Paragraph(_text(resume_data["summary"]), styles["body"]))
+
+    skills = _skill_names(resume_data.get("skills") or [])
+    if skills:
+        _section(story, "Skills", styles, accent)
+        story.append(Paragraph(" • ".join(escape(s) for s in skills), styles["body"]))
+
+    experience = [role for role in resume_data.get("experience") or [] if isinstance(role, dict)]
+    if experience:
+        _section(story, "Experience", styles, accent)
+        for role in experience:
+            header = " | ".join(_text(part) for part in (role.get("title"), role.get("company")) if part)
+            if header:
+                story.append(Paragraph(header, styles["role"]))
+            meta = " • ".join(
+                part for part in (_text(role.get("location")), _text(_date_range(role.get("start"), role.get("end")))) if part
+            )
+            if meta:
+                story.append(Paragraph(meta, styles["meta"]))
+            for bullet in role.get("bullets") or []:
+                story.append(Paragraph(_text(bullet), styles["bullet"], bulletText="•"))
+            story.append(Spacer(1, 4))
+
+    projects = [project for project in resume_data.get("projects") or [] if isinstance(project, dict)]
+    if projects:
+        _section(story, "Projects", styles, accent)
+        for project in projects:
+            if project.get("name"):
+                story.append(Paragraph(_text(project["name"]), styles["role"]))
+            if project.get("description"):
+                story.append(Paragraph(_text(project["description"]), styles["body"]))
+            for bullet in project.get("bullets") or []:
+                story.append(Paragraph(_text(bullet), styles["bullet"], bulletText="•"))
+            story.append(Spacer(1, 4))
+
+    education = [item for item in resume_data.get("education") or [] if isinstance(item, dict)]
+    if education:
+        _section(story, "Education", styles, accent)
+        for item in education:
+            line = " | ".join(_text(part) for part in (item.get("degree"), item.get("school"), item.get("end")) if part)
+            if line:
+                story.append(Paragraph(line, styles["body"]))
+
+    if not story:
+        story.append(Paragraph("Resume", styles["name"]))
+
+    doc.build(story)
+    return buffer.getvalue()
+
+
+def render_pdf_from_resume_sync(resume: Resume | Dict[str, Any], template_id: str = "executive_compact", page_size: str = "Letter") -> bytes:
+    """In-process ReportLab rendering of a structured ``Resume``."""
+    resume_data = resume.model_dump() if isinstance(resume, Resume) else dict(resume or {})
+    return render_resume_pdf(resume_data, template_id, page_size)
+
+
+# ----------------------------------------------------------------------
+# Process pool
+# ----------------------------------------------------------------------
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _warm_worker(template_ids: tuple) -> None:
+    """Worker initializer: pre-build styles (and font metrics) for known templates."""
+    for template_id in template_ids:
+        _get_styles(template_id)
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Get or create the shared ReportLab process pool."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=max(1, RenderConfig.REPORTLAB_POOL_WORKERS),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_warm_worker,
+                initargs=(("executive_compact", "modern", "classic"),),
+            )
+        return _pool
+
+
+def shutdown_process_pool(wait: bool = True) -> None:
+    """Shut down the shared ReportLab process pool if it was started."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=wait, cancel_futures=True)
+            _pool = None
+
+
+atexit.register(shutdown_process_pool, False)
+
+
+async def render_pdf_from_resume(resume: Resume | Dict[str, Any], template_id: str = "executive_compact", page_size: str = "Letter") -> bytes:
+    """
+    Async ReportLab rendering of a structured ``Resume`` in the shared process pool.
+    """
+    resume_data = resume.model_dump() if isinstance(resume, Resume) else dict(resume or {})
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(get_process_pool(), render_resume_pdf, resume_data, template_id, page_size)
+    return await asyncio.wait_for(future, timeout=RenderConfig.REPORTLAB_TASK_TIMEOUT)
@@ -0,0 +1,233 @@
+"""
+Multi-job resume rendering
+
+``/generate-resumes`` renders one file per job through ReportLab or
+python-docx. Both are CPU-bound and synchronous, so rendering 25 jobs inline
+holds the event loop (and the worker) for the whole request.
+
+Each job is described by a picklable ``RenderTask`` and rendered by
+``render_task``, which is a plain module-level function that builds its own
+services. The same function runs:
+
+- in-process, one job after another (the serial mode)
+- on the shared ReportLab process pool, where ``render_tasks`` yields each
+  result as soon as its job finishes (the parallel mode)
+
+A job that fails, raises or exceeds ``RenderConfig.REPORTLAB_TASK_TIMEOUT``
+yields a ``failed`` result and does not affect the other jobs. Only as many
+jobs as the pool has workers are submitted at a time, and a job holds its
+slot until its worker is free again (even after timing out), so the timeout
+covers rendering rather than time spent queued behind the request's other
+jobs. Files from jobs that finish after timing out, or after the caller
+stopped consuming results, are deleted.
+"""
+
+import asyncio
+import logging
+import os
+from concurrent.futures import BrokenExecutor, Executor, Future
+from dataclasses import dataclass
+from functools import lru_cache, partial
+from typing import Any, AsyncIterator, Dict, Iterable, Optional
+
+from config.render_config import RenderConfig
+
+logger = logging.getLogger(__name__)
+
+PREVIEW_CHARS = 300
+
+
+@dataclass(frozen=True)
+class RenderTask:
+    """Everything needed to render one job's resume file"""
+
+    index: int
+    job_id: Any
+    job_url: str
+    job_title: str
+    resume_text: str
+    output_format: str
+    output_filename: str
+    is_pro: bool
+    formatting_template: str
+    color_scheme: str
+    font_family: str
+    font_size: int
+    use_advanced_formatting: bool = False
+    use_job_specific_template: bool = False
+    job_category: Optional[str] = None
+
+    @property
+    def output_path(self) -> str:
+        return f"outputs/{self.output_filename}"
+
+
+@lru_cache(maxsize=1)
+def _services():
+    """Renderers for this process, built on first use (pool workers build their own)"""
+    from services.advanced_formatting_service import AdvancedFormattingService
+    from services.job_specific_templates import JobSpecificTemplateService
+    from utils.resume_editor import ResumeEditor
+
+    return ResumeEditor(), AdvancedFormattingService(), JobSpecificTemplateService()
+
+
+def _formatting_options(task: RenderTask):
+    from services.advanced_formatting_service import ColorScheme, FontFamily, FormattingOptions, FormattingTemplate
+
+    return FormattingOptions(
+        template=FormattingTemplate(task.formatting_template),
+        color_scheme=ColorScheme(task.color_scheme),
+        font_family=FontFamily(task.font_family),
+        font_size=task.font_size,
+    )
+
+
+def _render_pdf(task: RenderTask) -> bool:
+    resume_editor, advanced_formatting, job_templates = _services()
+    text, path, title = task.resume_text, task.output_path, task.job_title
+
+    if task.use_job_specific_template and task.is_pro and task.job_category:
+        is_valid, _ = job_templates.validate_job_specific_request(
+            task.job_category, task.formatting_template, task.is_pro
+        )
+        options = _formatting_options(task)
+        if is_valid and job_templates.create_job_specific_resume(
+            text, task.job_category, task.formatting_template, options, path, title
+        ):
+            return True
+        # Fall back to advanced formatting if validation or the job-specific template fails
+        return advanced_formatting.create_advanced_formatted_resume(text, options, path, title)
+
+    if task.use_advanced_formatting and task.is_pro:
+        is_valid, _ = advanced_formatting.validate_formatting_request(
+            task.formatting_template, task.color_scheme, task.font_family, task.is_pro
+        )
+        if is_valid and advanced_formatting.create_advanced_formatted_resume(
+            text, _formatting_options(task), path, title
+        ):
+            return True
+        return advanced_formatting.create_standard_formatted_resume(text, path, title)
+
+    # Standard PDF in the reference format; Pro users who asked for advanced
+    # formatting get the standard template as a fallback
+    success = resume_editor.create_tailored_resume_pdf(text, path, title)
+    if not success and task.use_advanced_formatting and task.is_pro:
+        success = advanced_formatting.create_standard_formatted_resume(text, path, title)
+    return success
+
+
+def failed_result(task: RenderTask, error: str) -> Dict[str, Any]:
+    return {
+        "index": task.index,
+        "job_id": task.job_id,
+        "job_url": task.job_url,
+        "status": "failed",
+        "error": error,
+    }
+
+
+def render_task(task: RenderTask) -> Dict[str, Any]:
+    """Render one job's file and return its ``/generate-resumes`` result entry"""
+    try:
+        if task.output_format == "pdf":
+            success = _render_pdf(task)
+        else:
+            resume_editor, _, _ = _services()
+            success = resume_editor.create_tailored_resume_docx(task.resume_text, task.output_path, task.job_title)
+    except Exception as e:
+        return failed_result(task, str(e))
+
+    if not success:
+        return failed_result(task, "Failed to create output file")
+    text = task.resume_text
+    return {
+        "index": task.index,
+        "job_id": task.job_id,
+        "job_title": task.job_title,
+        "job_url": task.job_url,
+        "status": "success",
+        "filename": task.output_filename,
+        "download_url": f"/api/download/{task.output_filename}",
+        "preview": text[:PREVIEW_CHARS] + "..." if len(text) > PREVIEW_CHARS else text,
+    }
+
+
+def _discard_late_output(task: RenderTask, future: Future) -> None:
+    """Delete the file of a job that finished after it timed out or its request was abandoned"""
+    if future.cancelled():
+        return
+    try:
+        os.remove(task.output_path)
+        logger.info(f"Removed output of timed-out rendering job {task.index + 1}: {task.output_path}")
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning(f"Could not remove output of timed-out rendering job {task.index + 1}: {e}")
+
+
+async def render_tasks(tasks: Iterable[RenderTask], executor: Optional[Executor] = None,
+                       timeout: Optional[float] = None,
+                       max_in_flight: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Render every task on ``executor`` and yield results in completion order.
+
+    Args:
+        tasks: Jobs to render
+        executor: Pool to render on (defaults to the shared ReportLab process pool)
+        timeout: Seconds each job may take once submitted (defaults to ``RenderConfig.REPORTLAB_TASK_TIMEOUT``)
+        max_in_flight: Jobs submitted at a time (defaults to the pool's worker count)
+    """
+    from services.renderers import reportlab_renderer
+
+    shared_pool = executor is None
+    executor = reportlab_renderer.get_process_pool() if shared_pool else executor
+    timeout = RenderConfig.REPORTLAB_TASK_TIMEOUT if timeout is None else timeout
+    slots = asyncio.Semaphore(max(1, max_in_flight or getattr(executor, "_max_workers", None) or 1))
+    loop = asyncio.get_running_loop()
+
+    def release_slot(_future: Future) -> None:
+        # A timed-out job keeps its worker busy, so its slot is only freed
+        # once the worker is done with it
+        try:
+            loop.call_soon_threadsafe(slots.release)
+        except RuntimeError:  # the request finished and its loop is closed
+            pass
+
+    async def run(task: RenderTask) -> Dict[str, Any]:
+        await slots.acquire()
+        future: Optional[Future] = None
+        try:
+            future = executor.submit(render_task, task)
+            future.add_done_callback(release_slot)
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=timeout)
+        except asyncio.TimeoutError:
+            # The worker can't be interrupted; drop its file once it finishes
+            future.add_done_callback(partial(_discard_late_output, task))
+            return failed_result(task, f"Rendering timed out after {timeout}s")
+        except asyncio.CancelledError:
+            # The client went away: a job that was still queued is cancelled,
+            # one already rendering has its file dropped when it finishes
+            if future is not None:
+                future.add_done_callback(partial(_discard_late_output, task))
+            raise
+        except BrokenExecutor as e:
+            if shared_pool and reportlab_renderer._pool is executor:
+                # A worker died; start a fresh pool for the next request
+                reportlab_renderer.shutdown_process_pool(wait=False)
+            return failed_result(task, f"Rendering worker failed: {e}")
+        except Exception as e:  # e.g. an unpicklable task
+            logger.warning(f"Rendering job {task.index + 1} failed in the pool: {e}")
+            return failed_result(task, str(e))
+        finally:
+            if future is None:  # never reached the pool
+                slots.release()
+
+    pending = [asyncio.ensure_future(run(task)) for task in tasks]
+    try:
+        for next_done in asyncio.as_completed(pending):
+            yield await next_done
+    finally:
+        # The client went away or the caller stopped early
+        for future in pending:
+            future.cancel()
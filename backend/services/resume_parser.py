@@ -8,6 +8,8 @@ from typing import Dict, List, Optional, Any
 from datetime import datetime
 import logging
 
+from utils.resume_segments import segment_resume
+
 logger = logging.getLogger(__name__)
 
 
@@ -16,6 +18,9 @@ class ResumeParser:
     A comprehensive resume parser that extracts structured information from raw resume text.
     """
     
+    # Shared segmentation keys that this parser files under another section
+    SHARED_SECTION_KEYS = {'certifications': 'skills'}
+    
     def __init__(self):
         """Initialize the resume parser with regex patterns."""
         self._initialize_patterns()
@@ -150,7 +155,7 @@ class ResumeParser:
             
             # Parse individual components
             parsed_data = {
-                'name': self._extract_name(resume_text),
+                'name': segment_resume(resume_text).contact.name or self._extract_name(resume_text),
                 'email': self._extract_email(resume_text),
                 'phone': self._extract_phone(resume_text),
                 'location': self._extract_location(resume_text),
@@ -186,26 +191,14 @@ class ResumeParser:
     def _extract_sections(self, text: str) -> Dict[str, str]:
         """Extract different sections from the resume."""
         sections = {}
-        lines = text.split('\n')
-        
-        # Find all section headers and their positions
-        header_positions = []
-        for section_name, pattern in self.section_headers.items():
-            for i, line in enumerate(lines):
-                if pattern.search(line):
-                    header_positions.append((i, section_name, line))
-        
-        # Sort by position
-        header_positions.sort(key=lambda x: x[0])
-        
-        # Extract content for each section
-        for i, (pos, section_name, header_line) in enumerate(header_positions):
-            start = pos + 1
-            end = header_positions[i + 1][0] if i + 1 < len(header_positions) else len(lines)
-            
-            # Get section content
-            section_content = '\n'.join(lines[start:end])
-            sections[section_name] = section_content.strip()
+        for section in segment_resume(text).sections:
+            section_name = self.SHARED_SECTION_KEYS.get(section.key, section.key)
+            if section_name not in self.section_headers:
+                continue
+            if sections.get(section_name) and section.text:
+                sections[section_name] += '\n\n' + section.text
+            else:
+                sections[section_name] = sections.get(section_name) or section.text
         
         # If no sections were found, treat the entire text as content
         if not sections:
@@ -0,0 +1,352 @@
+"""
+Bounded-concurrency Stripe subscription sync
+
+Replaces the one-``Subscription.retrieve``-per-row loop with list endpoints:
+
+- Incremental runs page through ``/v1/events`` for ``customer.subscription.*``
+  events created after the last sync watermark, so only subscriptions that
+  changed since then are touched.
+- Full runs (no watermark, or one older than Stripe's event retention) page
+  through ``/v1/subscriptions`` once per non-terminal status, concurrently.
+  Local subscriptions that did not show up in any listing (typically canceled
+  ones) are retrieved individually.
+
+All Stripe calls go through one semaphore (``max_concurrency``) and run in
+worker threads. Differences against the local rows are applied with bulk
+``UPDATE`` executemany batches on ``subscriptions`` and ``users``.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import stripe
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from models.user import Subscription, SubscriptionStatus, User
+
+logger = logging.getLogger(__name__)
+
+SUBSCRIPTION_EVENT_TYPES = [
+    "customer.subscription.created",
+    "customer.subscription.updated",
+    "customer.subscription.deleted",
+    "customer.subscription.paused",
+    "customer.subscription.resumed",
+]
+
+# Terminal statuses are not listed on full syncs; local rows still pointing at
+# such a subscription are retrieved individually instead.
+LISTED_STATUSES = ["active", "trialing", "past_due", "unpaid", "incomplete", "paused"]
+
+STRIPE_STATUS_MAP = {
+    "active": SubscriptionStatus.ACTIVE,
+    "canceled": SubscriptionStatus.CANCELED,
+    "past_due": SubscriptionStatus.PAST_DUE,
+    "unpaid": SubscriptionStatus.UNPAID,
+    "incomplete": SubscriptionStatus.INCOMPLETE,
+    "incomplete_expired": SubscriptionStatus.INCOMPLETE_EXPIRED,
+    "trialing": SubscriptionStatus.TRIALING,
+}
+
+
+def map_stripe_status(stripe_status: Optional[str]) -> SubscriptionStatus:
+    """Map a Stripe subscription status to the local enum (unknown -> CANCELED)"""
+    return STRIPE_STATUS_MAP.get(stripe_status, SubscriptionStatus.CANCELED)
+
+
+def _from_timestamp(value: Optional[int]) -> Optional[datetime]:
+    return datetime.utcfromtimestamp(value) if value else None
+
+
+class StripeSyncStats:
+    """Counters for one sync run"""
+    def __init__(self, mode: str, watermark: Optional[int]):
+        self.mode = mode
+        self.watermark_before = watermark
+        self.watermark_after = watermark
+        self.api_calls = 0
+        self.pages = 0
+        self.events_seen = 0
+        self.remote_subscriptions = 0
+        self.retrieved = 0
+        self.checked = 0
+        self.updated = 0
+        self.write_batches = 0
+        self.errors: List[str] = []
+        self._started = time.perf_counter()
+        self.elapsed_seconds = 0.0
+
+    def finish(self) -> "StripeSyncStats":
+        self.elapsed_seconds = time.perf_counter() - self._started
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "watermark_before": self.watermark_before,
+            "watermark_after": self.watermark_after,
+            "api_calls": self.api_calls,
+            "pages": self.pages,
+            "events_seen": self.events_seen,
+            "remote_subscriptions": self.remote_subscriptions,
+            "retrieved": self.retrieved,
+            "total_checked": self.checked,
+            "synced": self.updated,
+            "write_batches": self.write_batches,
+            "errors": len(self.errors),
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+        }
+
+
+class StripeSyncEngine:
+    """Syncs local ``Subscription`` rows from Stripe with bounded concurrency"""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        api_key: Optional[str] = None,
+        api_base: Optional[str] = None,
+        client: Optional[stripe.StripeClient] = None,
+        max_concurrency: int = 8,
+        page_size: int = 100,
+        write_batch_size: int = 500,
+        state_path: Optional[Path] = None,
+        max_watermark_age_days: int = 25,
+        watermark_skew_seconds: int = 300,
+    ):
+        """
+        Args:
+            session_factory: Callable returning a new DB session
+            api_key: Stripe secret key (ignored when ``client`` is given)
+            api_base: Override for the Stripe API host, e.g. a local fake server
+            client: Preconfigured ``stripe.StripeClient``
+            max_concurrency: Maximum in-flight Stripe requests
+            page_size: ``limit`` for list calls (Stripe maximum is 100)
+            write_batch_size: Rows per bulk UPDATE / commit
+            state_path: JSON file holding the sync watermark
+            max_watermark_age_days: Fall back to a full sync past this age
+                (Stripe keeps events for 30 days)
+            watermark_skew_seconds: Overlap kept when advancing the watermark
+        """
+        if client is None:
+            if not api_key:
+                raise ValueError("api_key or client is required")
+            base_addresses = {"api": api_base} if api_base else {}
+            client = stripe.StripeClient(api_key, base_addresses=base_addresses, max_network_retries=2)
+        self.client = client
+        self.session_factory = session_factory
+        self.max_concurrency = max(1, max_concurrency)
+        self.page_size = min(100, max(1, page_size))
+        self.write_batch_size = max(1, write_batch_size)
+        self.state_path = Path(state_path or "cache/stripe_sync_state.json")
+        self.max_watermark_age = max_watermark_age_days * 86400
+        self.watermark_skew = watermark_skew_seconds
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    # Watermark state
+
+    def load_watermark(self) -> Optional[int]:
+        try:
+            return int(json.loads(self.state_path.read_text())["watermark"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def save_watermark(self, watermark: int, stats: Optional[Dict[str, Any]] = None) -> None:
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"watermark": watermark, "last_run": stats or {}}))
+        os.replace(tmp, self.state_path)
+
+    # Stripe access
+
+    async def _call(self, stats: StripeSyncStats, func: Callable, *args, **kwargs) -> Any:
+        async with self._semaphore:
+            stats.api_calls += 1
+            return await asyncio.to_thread(func, *args, **kwargs)
+
+    async def _iter_pages(self, stats: StripeSyncStats, list_func: Callable, params: Dict[str, Any]):
+        """Yield the ``data`` of each page of a Stripe list endpoint"""
+        params = dict(params, limit=self.page_size)
+        while True:
+            page = await self._call(stats, list_func, params=params)
+            stats.pages += 1
+            data = list(page.data)
+            if data:
+                yield data
+            if not page.has_more or not data:
+                break
+            params["starting_after"] = data[-1].id
+
+    async def _changed_since(self, watermark: int, stats: StripeSyncStats) -> Dict[str, Any]:
+        """Latest subscription object per id from events created after ``watermark``"""
+        latest: Dict[str, Any] = {}
+        newest_event = watermark
+        params = {"types": SUBSCRIPTION_EVENT_TYPES, "created": {"gt": watermark}}
+        async for events in self._iter_pages(stats, self.client.events.list, params):
+            for event in events:
+                stats.events_seen += 1
+                newest_event = max(newest_event, event.created)
+                subscription = event.data["object"]
+                # Events are returned newest first; keep the first object seen
+                latest.setdefault(subscription.id, subscription)
+        # Events can become visible slightly out of order; keep an overlap
+        # window; re-applying an already-synced object is a no-op.
+        stats.watermark_after = max(watermark, newest_event - self.watermark_skew)
+        return latest
+
+    async def _list_status(self, status: str, stats: StripeSyncStats) -> List[Any]:
+        found = []
+        async for page in self._iter_pages(stats, self.client.subscriptions.list, {"status": status}):
+            found.extend(page)
+        return found
+
+    async def _list_all(self, stats: StripeSyncStats) -> Dict[str, Any]:
+        pages = await asyncio.gather(*(self._list_status(status, stats) for status in LISTED_STATUSES))
+        return {subscription.id: subscription for page in pages for subscription in page}
+
+    async def _retrieve_many(self, subscription_ids: Iterable[str], stats: StripeSyncStats) -> Dict[str, Any]:
+        async def retrieve(subscription_id: str):
+            try:
+                return await self._call(stats, self.client.subscriptions.retrieve, subscription_id)
+            except stripe.InvalidRequestError as e:
+                stats.errors.append(f"{subscription_id}: {e.user_message or e}")
+            except stripe.StripeError as e:
+                stats.errors.append(f"{subscription_id}: {e}")
+            return None
+
+        results = await asyncio.gather(*(retrieve(sid) for sid in subscription_ids))
+        stats.retrieved += sum(1 for result in results if result is not None)
+        return {result.id: result for result in results if result is not None}
+
+    # Local state
+
+    def _local_ids(self, db: Session) -> List[str]:
+        """Stripe ids of local subscriptions that are not already terminal"""
+        rows = db.query(Subscription.stripe_subscription_id).filter(
+            Subscription.stripe_subscription_id.isnot(None),
+            Subscription.status.notin_([SubscriptionStatus.CANCELED, SubscriptionStatus.INCOMPLETE_EXPIRED]),
+        ).all()
+        return [row.stripe_subscription_id for row in rows]
+
+    def _apply(self, db: Session, remote: Dict[str, Any], stats: StripeSyncStats) -> None:
+        """Diff remote objects against local rows and bulk-update the differences"""
+        remote_ids = list(remote)
+        for offset in range(0, len(remote_ids), self.write_batch_size):
+            chunk = remote_ids[offset:offset + self.write_batch_size]
+            rows = db.query(
+                Subscription.id, Subscription.user_id, Subscription.stripe_subscription_id,
+                Subscription.status, Subscription.current_period_start,
+                Subscription.current_period_end, Subscription.cancel_at_period_end,
+            ).filter(Subscription.stripe_subscription_id.in_(chunk)).all()
+
+            subscription_rows, user_rows = [], []
+            for row in rows:
+                stats.checked += 1
+                obj = remote[row.stripe_subscription_id]
+                status = map_stripe_status(obj.status)
+                period_start = _from_timestamp(obj.get("current_period_start")) or row.current_period_start
+                period_end = _from_timestamp(obj.get("current_period_end")) or row.current_period_end
+                cancel_at_period_end = bool(obj.get("cancel_at_period_end"))
+                if (status, period_start, period_end, cancel_at_period_end) == (
+                    row.status, row.current_period_start, row.current_period_end, row.cancel_at_period_end
+                ):
+                    continue
+
+                canceled_at = _from_timestamp(obj.get("canceled_at"))
+                subscription_row = {
+                    "id": row.id,
+                    "status": status,
+                    "current_period_start": period_start,
+                    "current_period_end": period_end,
+                    "cancel_at_period_end": cancel_at_period_end,
+                    "updated_at": datetime.utcnow(),
+                }
+                if canceled_at:
+                    subscription_row["canceled_at"] = canceled_at
+                subscription_rows.append(subscription_row)
+                user_rows.append({
+                    "id": row.user_id,
+                    "subscription_status": status,
+                    "current_period_start": period_start,
+                    "current_period_end": period_end,
+                    "cancel_at_period_end": cancel_at_period_end,
+                })
+                logger.info(f"Synced subscription {row.id}: {row.status.value} -> {status.value}")
+
+            if not subscription_rows:
+                continue
+            # Rows may carry different keys (canceled_at); group so each
+            # executemany batch has a uniform parameter set.
+            try:
+                for key_set in {tuple(sorted(r)) for r in subscription_rows}:
+                    db.execute(update(Subscription),
+                               [r for r in subscription_rows if tuple(sorted(r)) == key_set])
+                db.execute(update(User), user_rows)
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+            stats.write_batches += 1
+            stats.updated += len(subscription_rows)
+
+    # Entry point
+
+    async def sync(self, full: bool = False) -> StripeSyncStats:
+        """
+        Run one sync pass.
+
+        Args:
+            full: Ignore the watermark and list every non-terminal subscription
+
+        Returns:
+            Stats for the run; the watermark is only advanced when no Stripe
+            call failed
+        """
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        watermark = None if full else self.load_watermark()
+        run_started = int(time.time())
+        if watermark is not None and run_started - watermark > self.max_watermark_age:
+            logger.info("Stripe sync watermark older than event retention; running a full sync")
+            watermark = None
+        stats = StripeSyncStats("incremental" if watermark is not None else "full", watermark)
+
+        db = self.session_factory()
+        try:
+            if watermark is not None:
+                remote = await self._changed_since(watermark, stats)
+            else:
+                remote = await self._list_all(stats)
+                missing = set(self._local_ids(db)) - set(remote)
+                if missing:
+                    remote.update(await self._retrieve_many(sorted(missing), stats))
+                stats.watermark_after = run_started - self.watermark_skew
+            stats.remote_subscriptions = len(remote)
+            self._apply(db, remote, stats)
+        finally:
+            db.close()
+
+        stats.finish()
+        if not stats.errors and stats.watermark_after is not None:
+            self.save_watermark(stats.watermark_after, stats.to_dict())
+        return stats
+
+
+def create_stripe_sync_engine(session_factory: Callable[[], Session]) -> StripeSyncEngine:
+    """Build a sync engine from the Stripe config and ``STRIPE_SYNC_*`` env vars"""
+    from config.stripe_config import get_stripe_config
+
+    return StripeSyncEngine(
+        session_factory,
+        api_key=get_stripe_config().secret_key,
+        api_base=os.getenv("STRIPE_API_BASE") or None,
+        max_concurrency=int(os.getenv("STRIPE_SYNC_CONCURRENCY", "8")),
+        write_batch_size=int(os.getenv("STRIPE_SYNC_WRITE_BATCH", "500")),
+        state_path=Path(os.getenv("STRIPE_SYNC_STATE_PATH", "cache/stripe_sync_state.json")),
+    )
@@ -22,8 +22,12 @@ from models.user import (
     User, Subscription, UsageTracking, PaymentHistory, UserSession,
     SubscriptionTier, SubscriptionStatus, UsageType, PaymentStatus
 )
-from services.subscription_service import SubscriptionService
+from services.subscription_service import (
+    SubscriptionService, BULK_UPDATE_CHUNK_SIZE, cancel_subscriptions_statement
+)
+from services.bulk_updates import BulkUpdateStats, iter_chunked_update
 from services.payment_service import PaymentService
+from services.stripe_sync import StripeSyncEngine, create_stripe_sync_engine, map_stripe_status
 from utils.email_service import EmailService
 from config.database import SessionLocal
 
@@ -70,6 +74,7 @@ class SubscriptionLifecycleService:
         self.subscription_service = None
         self.payment_service = None
         self.email_service = None
+        self.stripe_sync_engine: Optional[StripeSyncEngine] = None
         self._running_tasks = set()
     
     def _get_services(self, db_session: Session):
@@ -83,72 +88,33 @@ class SubscriptionLifecycleService:
     
     # Subscription Status Synchronization
     
-    async def sync_subscription_status(self) -> LifecycleTaskResult:
+    async def sync_subscription_status(self, full: bool = False) -> LifecycleTaskResult:
         """
         Synchronize subscription status with Stripe
-        Checks for discrepancies between local and Stripe subscription status
+
+        Only subscriptions changed since the last sync watermark are fetched
+        (via the Events API); without a usable watermark every non-terminal
+        subscription is listed. See ``services.stripe_sync``.
+
+        Args:
+            full: Force a full listing instead of an incremental sync
         """
-        db = SessionLocal()
         try:
-            self._get_services(db)
-            
-            # Get all active subscriptions with Stripe IDs
-            active_subscriptions = db.query(Subscription).filter(
-                and_(
-                    Subscription.status == SubscriptionStatus.ACTIVE,
-                    Subscription.stripe_subscription_id.isnot(None)
-                )
-            ).all()
-            
-            synced_count = 0
-            sync_errors = []
-            
-            for subscription in active_subscriptions:
-                try:
-                    # Get subscription status from Stripe
-                    stripe_subscription = await self.payment_service.get_subscription(
-                        subscription.stripe_subscription_id
-                    )
-                    
-                    if stripe_subscription:
-                        # Check if status needs updating
-                        stripe_status = self._map_stripe_status(stripe_subscription.status)
-                        
-                        if stripe_status != subscription.status:
-                            # Update local subscription status
-                            await self.subscription_service.update_subscription(
-                                str(subscription.id),
-                                status=stripe_status,
-                                current_period_start=datetime.fromtimestamp(
-                                    stripe_subscription.current_period_start
-                                ),
-                                current_period_end=datetime.fromtimestamp(
-                                    stripe_subscription.current_period_end
-                                ),
-                                cancel_at_period_end=stripe_subscription.cancel_at_period_end
-                            )
-                            
-                            logger.info(f"Synced subscription {subscription.id}: "
-                                      f"{subscription.status.value} -> {stripe_status.value}")
-                            synced_count += 1
-                    
-                except Exception as e:
-                    error_msg = f"Error syncing subscription {subscription.id}: {str(e)}"
-                    logger.error(error_msg)
-                    sync_errors.append(error_msg)
-            
+            if self.stripe_sync_engine is None:
+                self.stripe_sync_engine = create_stripe_sync_engine(SessionLocal)
+            stats = await self.stripe_sync_engine.sync(full=full)
+
+            for error in stats.errors:
+                logger.error(f"Error syncing subscription {error}")
+
             return LifecycleTaskResult(
                 LifecycleTaskType.SUBSCRIPTION_SYNC,
-                success=len(sync_errors) == 0,
-                processed_count=synced_count,
-                error_message="; ".join(sync_errors) if sync_errors else "",
-                details={
-                    "total_checked": len(active_subscriptions),
-                    "synced": synced_count,
-                    "errors": len(sync_errors)
-                }
+                success=not stats.errors,
+                processed_count=stats.updated,
+                error_message="; ".join(stats.errors),
+                details=stats.to_dict()
             )
-            
+
         except Exception as e:
             logger.error(f"Error in subscription sync task: {e}")
             return LifecycleTaskResult(
@@ -156,21 +122,10 @@ class SubscriptionLifecycleService:
                 success=False,
                 error_message=str(e)
             )
-        finally:
-            db.close()
-    
+
     def _map_stripe_status(self, stripe_status: str) -> SubscriptionStatus:
         """Map Stripe subscription status to local status"""
-        status_mapping = {
-            "active": SubscriptionStatus.ACTIVE,
-            "canceled": SubscriptionStatus.CANCELED,
-            "past_due": SubscriptionStatus.PAST_DUE,
-            "unpaid": SubscriptionStatus.UNPAID,
-            "incomplete": SubscriptionStatus.INCOMPLETE,
-            "incomplete_expired": SubscriptionStatus.INCOMPLETE_EXPIRED,
-            "trialing": SubscriptionStatus.TRIALING
-        }
-        return status_mapping.get(stripe_status, SubscriptionStatus.CANCELED)
+        return map_stripe_status(stripe_status)
     
     # Weekly Usage Reset
     
@@ -183,41 +138,19 @@ class SubscriptionLifecycleService:
         try:
             self._get_services(db)
             
-            # Find users whose weekly usage should be reset
-            users_to_reset = db.query(User).filter(
-                or_(
-                    User.weekly_usage_reset.is_(None),
-                    User.weekly_usage_reset <= datetime.utcnow() - timedelta(days=7)
-                )
-            ).all()
-            
-            reset_count = 0
-            reset_errors = []
-            
-            for user in users_to_reset:
-                try:
-                    # Reset weekly usage
-                    user.reset_weekly_usage()
-                    reset_count += 1
-                    
-                    logger.info(f"Reset weekly usage for user {user.id}")
-                    
-                except Exception as e:
-                    error_msg = f"Error resetting usage for user {user.id}: {str(e)}"
-                    logger.error(error_msg)
-                    reset_errors.append(error_msg)
-            
-            db.commit()
+            # Set-based reset: one UPDATE per keyset-paginated chunk, committed per chunk
+            stats = SubscriptionService(db).bulk_reset_weekly_usage()
+            logger.info(f"Reset weekly usage for {stats.rows_updated} users in {stats.chunks} chunks")
             
             return LifecycleTaskResult(
                 LifecycleTaskType.USAGE_RESET,
-                success=len(reset_errors) == 0,
-                processed_count=reset_count,
-                error_message="; ".join(reset_errors) if reset_errors else "",
+                success=True,
+                processed_count=stats.rows_updated,
                 details={
-                    "total_users_checked": len(users_to_reset),
-                    "reset_count": reset_count,
-                    "errors": len(reset_errors)
+                    "total_users_checked": stats.rows_selected,
+                    "reset_count": stats.rows_updated,
+                    "errors": 0,
+                    "bulk_update": stats.to_dict()
                 }
             )
             
@@ -242,54 +175,65 @@ class SubscriptionLifecycleService:
         db = SessionLocal()
         try:
             self._get_services(db)
+            now = datetime.utcnow()
+            past_due = [
+                User.subscription_status == SubscriptionStatus.PAST_DUE,
+                User.current_period_end.isnot(None)
+            ]
+            contact_columns = (User.email, User.full_name, User.username, User.current_period_end)
             
-            # Find users in past due status
-            past_due_users = db.query(User).filter(
-                and_(
-                    User.subscription_status == SubscriptionStatus.PAST_DUE,
-                    User.current_period_end.isnot(None)
-                )
-            ).all()
-            
-            processed_count = 0
+            total_past_due = db.query(func.count(User.id)).filter(*past_due).scalar() or 0
             grace_actions = []
             
-            for user in past_due_users:
-                try:
-                    days_past_due = (datetime.utcnow() - user.current_period_end).days
-                    
-                    if days_past_due <= grace_days:
-                        # Still in grace period - send reminder if needed
-                        if days_past_due == 1:  # Send reminder on day 1
-                            await self._send_payment_failure_reminder(user)
-                            grace_actions.append(f"Sent reminder to user {user.id}")
-                        elif days_past_due == grace_days:  # Final warning
-                            await self._send_final_grace_warning(user)
-                            grace_actions.append(f"Sent final warning to user {user.id}")
-                    else:
-                        # Grace period expired - downgrade to Free
-                        await self._downgrade_expired_grace_period(user)
-                        grace_actions.append(f"Downgraded user {user.id} after grace period")
-                    
-                    processed_count += 1
-                    
-                except Exception as e:
-                    error_msg = f"Error handling grace period for user {user.id}: {str(e)}"
-                    logger.error(error_msg)
-                    grace_actions.append(error_msg)
+            # Still in grace period: reminder on day 1, final warning on the last day.
+            # A user is N days past due when now - current_period_end is in [N, N + 1) days.
+            notices = [(1, self._send_payment_failure_reminder, "Sent reminder to")]
+            if grace_days != 1:
+                notices.append((grace_days, self._send_final_grace_warning, "Sent final warning to"))
+            for days_past_due, send, label in notices:
+                recipients = db.query(User.id, *contact_columns).filter(
+                    *past_due,
+                    User.current_period_end <= now - timedelta(days=days_past_due),
+                    User.current_period_end > now - timedelta(days=days_past_due + 1)
+                ).all()
+                # Sent concurrently; the mail queue bounds in-flight SMTP sends
+                await asyncio.gather(*(send(user) for user in recipients))
+                grace_actions.extend(f"{label} user {user.id}" for user in recipients)
+            
+            # Grace period expired: downgrade to Free in set-based chunks, then notify
+            downgrade_stats = BulkUpdateStats("grace_period_downgrade", BULK_UPDATE_CHUNK_SIZE)
+            for chunk in iter_chunked_update(
+                db,
+                User,
+                criteria=[*past_due, User.current_period_end <= now - timedelta(days=grace_days + 1)],
+                values={
+                    User.subscription_tier: SubscriptionTier.FREE,
+                    User.subscription_status: SubscriptionStatus.CANCELED
+                },
+                stats=downgrade_stats,
+                columns=contact_columns,
+                related_updates=lambda user_ids: [
+                    cancel_subscriptions_statement(user_ids, [SubscriptionStatus.PAST_DUE], now)
+                ],
+            ):
+                await asyncio.gather(*(self._send_downgrade_notification(user) for user in chunk))
+                grace_actions.extend(f"Downgraded user {user.id} after grace period" for user in chunk)
             
             return LifecycleTaskResult(
                 LifecycleTaskType.GRACE_PERIOD_CHECK,
                 success=True,
-                processed_count=processed_count,
+                processed_count=total_past_due,
                 details={
-                    "total_past_due": len(past_due_users),
+                    "total_past_due": total_past_due,
                     "actions_taken": grace_actions,
-                    "grace_days": grace_days
+                    "grace_days": grace_days,
+                    "downgraded": downgrade_stats.rows_updated,
+                    "bulk_update": downgrade_stats.to_dict()
                 }
             )
             
         except Exception as e:
+            db.rollback()
             logger.error(f"Error in grace period handling task: {e}")
             return LifecycleTaskResult(
                 LifecycleTaskType.GRACE_PERIOD_CHECK,
@@ -323,42 +267,16 @@ class SubscriptionLifecycleService:
         except Exception as e:
             logger.error(f"Error sending final warning to user {user.id}: {e}")
     
-    async def _downgrade_expired_grace_period(self, user: User):
-        """Downgrade user after grace period expires"""
-        db = SessionLocal()
+    async def _send_downgrade_notification(self, user: User):
+        """Send grace period downgrade notification email"""
         try:
-            # Update user to Free tier
-            user.subscription_tier = SubscriptionTier.FREE
-            user.subscription_status = SubscriptionStatus.CANCELED
-            
-            # Update subscription record
-            subscription = db.query(Subscription).filter(
-                and_(
-                    Subscription.user_id == user.id,
-                    Subscription.status == SubscriptionStatus.PAST_DUE
-                )
-            ).first()
-            
-            if subscription:
-                subscription.status = SubscriptionStatus.CANCELED
-                subscription.canceled_at = datetime.utcnow()
-            
-            db.commit()
-            
-            # Send downgrade notification
             await self.email_service.send_downgrade_notification(
                 user.email,
                 user.full_name or user.username
             )
-            
             logger.info(f"Downgraded user {user.id} after grace period expiry")
-            
         except Exception as e:
-            db.rollback()
-            logger.error(f"Error downgrading user {user.id} after grace period: {e}")
-            raise
-        finally:
-            db.close()
+            logger.error(f"Error sending downgrade notification to user {user.id}: {e}")
     
     # Expired Subscription Downgrade
     
@@ -370,71 +288,65 @@ class SubscriptionLifecycleService:
         db = SessionLocal()
         try:
             self._get_services(db)
+            now = datetime.utcnow()
             
-            # Find users with expired Pro subscriptions
-            expired_users = db.query(User).filter(
-                and_(
+            # Expired Pro users that are canceled or set to cancel at period end,
+            # downgraded to Free in set-based chunks
+            stats = BulkUpdateStats("expired_downgrade", BULK_UPDATE_CHUNK_SIZE)
+            notify_errors = []
+            for chunk in iter_chunked_update(
+                db,
+                User,
+                criteria=[
                     User.subscription_tier == SubscriptionTier.PRO,
-                    User.current_period_end < datetime.utcnow(),
+                    User.current_period_end < now,
                     User.subscription_status.in_([
                         SubscriptionStatus.ACTIVE,
                         SubscriptionStatus.CANCELED
-                    ])
-                )
-            ).all()
-            
-            downgraded_count = 0
-            downgrade_errors = []
-            
-            for user in expired_users:
-                try:
-                    # Check if user should be downgraded
-                    if user.cancel_at_period_end or user.subscription_status == SubscriptionStatus.CANCELED:
-                        # Downgrade to Free tier
-                        user.subscription_tier = SubscriptionTier.FREE
-                        user.subscription_status = SubscriptionStatus.CANCELED
-                        
-                        # Update subscription record
-                        subscription = db.query(Subscription).filter(
-                            and_(
-                                Subscription.user_id == user.id,
-                                Subscription.status.in_([
-                                    SubscriptionStatus.ACTIVE,
-                                    SubscriptionStatus.CANCELED
-                                ])
-                            )
-                        ).first()
-                        
-                        if subscription:
-                            subscription.status = SubscriptionStatus.CANCELED
-                            if not subscription.canceled_at:
-                                subscription.canceled_at = datetime.utcnow()
-                        
-                        # Send downgrade notification
-                        await self.email_service.send_subscription_expired_notification(
-                            user.email,
-                            user.full_name or user.username
-                        )
-                        
-                        downgraded_count += 1
-                        logger.info(f"Downgraded expired subscription for user {user.id}")
-                
-                except Exception as e:
-                    error_msg = f"Error downgrading user {user.id}: {str(e)}"
-                    logger.error(error_msg)
-                    downgrade_errors.append(error_msg)
+                    ]),
+                    or_(
+                        User.cancel_at_period_end == True,
+                        User.subscription_status == SubscriptionStatus.CANCELED
+                    )
+                ],
+                values={
+                    User.subscription_tier: SubscriptionTier.FREE,
+                    User.subscription_status: SubscriptionStatus.CANCELED
+                },
+                stats=stats,
+                columns=(User.email, User.full_name, User.username),
+                related_updates=lambda user_ids: [
+                    cancel_subscriptions_statement(
+                        user_ids, [SubscriptionStatus.ACTIVE, SubscriptionStatus.CANCELED], now
+                    )
+                ],
+            ):
+                # Send downgrade notifications once the chunk is committed
+                results = await asyncio.gather(*(
+                    self.email_service.send_subscription_expired_notification(
+                        user.email,
+                        user.full_name or user.username
+                    )
+                    for user in chunk
+                ), return_exceptions=True)
+                for user, outcome in zip(chunk, results):
+                    if isinstance(outcome, Exception):
+                        error_msg = f"Error notifying user {user.id}: {str(outcome)}"
+                        logger.error(error_msg)
+                        notify_errors.append(error_msg)
             
-            db.commit()
+            logger.info(f"Downgraded {stats.rows_updated} expired subscriptions in {stats.chunks} chunks")
             
             return LifecycleTaskResult(
                 LifecycleTaskType.EXPIRED_DOWNGRADE,
-                success=len(downgrade_errors) == 0,
-                processed_count=downgraded_count,
-                error_message="; ".join(downgrade_errors) if downgrade_errors else "",
+                success=len(notify_errors) == 0,
+                processed_count=stats.rows_updated,
+                error_message="; ".join(notify_errors) if notify_errors else "",
                 details={
-                    "total_expired": len(expired_users),
-                    "downgraded": downgraded_count,
-                    "errors": len(downgrade_errors)
+                    "total_expired": stats.rows_selected,
+                    "downgraded": stats.rows_updated,
+                    "errors": len(notify_errors),
+                    "bulk_update": stats.to_dict()
                 }
             )
             
@@ -484,16 +396,17 @@ class SubscriptionLifecycleService:
                     )
                 ).all()
                 
-                for user in users_to_remind:
-                    try:
-                        await self._send_renewal_reminder(user, days_before, reminder_type)
-                        sent_count += 1
-                        reminder_details.append(f"Sent {reminder_type} reminder to user {user.id}")
-                        
-                    except Exception as e:
-                        error_msg = f"Error sending {reminder_type} reminder to user {user.id}: {str(e)}"
+                results = await asyncio.gather(*(
+                    self._send_renewal_reminder(user, days_before, reminder_type) for user in users_to_remind
+                ), return_exceptions=True)
+                for user, outcome in zip(users_to_remind, results):
+                    if isinstance(outcome, Exception):
+                        error_msg = f"Error sending {reminder_type} reminder to user {user.id}: {str(outcome)}"
                         logger.error(error_msg)
                         reminder_details.append(error_msg)
+                    else:
+                        sent_count += 1
+                        reminder_details.append(f"Sent {reminder_type} reminder to user {user.id}")
             
             return LifecycleTaskResult(
                 LifecycleTaskType.RENEWAL_REMINDERS,
@@ -13,14 +13,19 @@ This service handles all subscription-related operations including:
 from datetime import datetime, timedelta
 from typing import Optional, Dict, List, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
+from sqlalchemy import and_, or_, func, update
 import logging
+import os
 from enum import Enum
 
 from models.user import (
     User, Subscription, UsageTracking, PaymentHistory,
     SubscriptionTier, SubscriptionStatus, UsageType, TailoringMode
 )
+from services.bulk_updates import BulkUpdateStats, chunked_update
+
+# Rows per UPDATE statement / transaction for the scheduled bulk tasks
+BULK_UPDATE_CHUNK_SIZE = int(os.getenv("BULK_UPDATE_CHUNK_SIZE", "5000"))
 
 logger = logging.getLogger(__name__)
 
@@ -42,6 +47,17 @@ class UsageLimitResult:
         }
 
 
+def cancel_subscriptions_statement(user_ids: List, statuses: List[SubscriptionStatus], canceled_at: datetime):
+    """UPDATE marking the given users' subscriptions in ``statuses`` as canceled"""
+    return update(Subscription).where(
+        Subscription.user_id.in_(user_ids),
+        Subscription.status.in_(statuses)
+    ).values(
+        status=SubscriptionStatus.CANCELED,
+        canceled_at=func.coalesce(Subscription.canceled_at, canceled_at)
+    )
+
+
 class SubscriptionService:
     """Core subscription service for managing user subscriptions and usage"""
     
@@ -366,29 +382,36 @@ class SubscriptionService:
     async def reset_all_weekly_usage(self) -> int:
         """Reset weekly usage for all users (scheduled task)"""
         try:
-            # Find users whose weekly usage should be reset
-            users_to_reset = self.db.query(User).filter(
-                or_(
-                    User.weekly_usage_reset.is_(None),
-                    User.weekly_usage_reset <= datetime.utcnow() - timedelta(days=7)
-                )
-            ).all()
-            
-            reset_count = 0
-            for user in users_to_reset:
-                user.reset_weekly_usage()
-                reset_count += 1
-            
-            self.db.commit()
-            
-            logger.info(f"Reset weekly usage for {reset_count} users")
-            return reset_count
+            stats = self.bulk_reset_weekly_usage()
+            logger.info(f"Reset weekly usage for {stats.rows_updated} users")
+            return stats.rows_updated
             
         except Exception as e:
             self.db.rollback()
             logger.error(f"Error resetting weekly usage for all users: {e}")
             return 0
     
+    def bulk_reset_weekly_usage(self, chunk_size: int = BULK_UPDATE_CHUNK_SIZE) -> BulkUpdateStats:
+        """
+        Set-based weekly usage reset: one UPDATE per keyset-paginated chunk.
+        
+        Equivalent to calling ``User.reset_weekly_usage()`` on every due user, without
+        loading the rows into the ORM or holding one long transaction.
+        """
+        now = datetime.utcnow()
+        return chunked_update(
+            self.db,
+            User,
+            criteria=[
+                or_(
+                    User.weekly_usage_reset.is_(None),
+                    User.weekly_usage_reset <= now - timedelta(days=7)
+                )
+            ],
+            values={User.weekly_usage_count: 0, User.weekly_usage_reset: now},
+            stats=BulkUpdateStats("weekly_usage_reset", chunk_size),
+        )
+    
     async def get_usage_statistics(self, user_id: str) -> Dict:
         """Get usage statistics for a user"""
         try:
@@ -513,24 +536,30 @@ class SubscriptionService:
     async def process_expired_subscriptions(self) -> int:
         """Process all expired subscriptions (scheduled task)"""
         try:
-            # Find users with expired Pro subscriptions
-            expired_users = self.db.query(User).filter(
-                and_(
+            now = datetime.utcnow()
+            stats = chunked_update(
+                self.db,
+                User,
+                criteria=[
                     User.subscription_tier == SubscriptionTier.PRO,
-                    User.current_period_end < datetime.utcnow(),
+                    User.current_period_end < now,
                     User.subscription_status == SubscriptionStatus.ACTIVE
-                )
-            ).all()
-            
-            downgraded_count = 0
-            for user in expired_users:
-                if await self._downgrade_expired_subscription(str(user.id)):
-                    downgraded_count += 1
+                ],
+                values={
+                    User.subscription_tier: SubscriptionTier.FREE,
+                    User.subscription_status: SubscriptionStatus.CANCELED
+                },
+                stats=BulkUpdateStats("expired_downgrade", BULK_UPDATE_CHUNK_SIZE),
+                related_updates=lambda user_ids: [
+                    cancel_subscriptions_statement(user_ids, [SubscriptionStatus.ACTIVE], now)
+                ],
+            )
             
-            logger.info(f"Processed {downgraded_count} expired subscriptions")
-            return downgraded_count
+            logger.info(f"Processed {stats.rows_updated} expired subscriptions")
+            return stats.rows_updated
             
         except Exception as e:
+            self.db.rollback()
             logger.error(f"Error processing expired subscriptions: {e}")
             return 0
     
@@ -7,61 +7,158 @@ TTL expiration, and template-specific invalidation capabilities.
 
 import asyncio
 import hashlib
+import heapq
+import itertools
+import json
 import logging
 import time
 from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional, Union, List, Tuple
-from dataclasses import dataclass
-from threading import RLock
+from dataclasses import dataclass, field
+from threading import Lock
 import weakref
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+def _payload_size(data: Any) -> int:
+    """Size of a payload in bytes, measured once from its serialized form"""
+    if isinstance(data, bytes):
+        return len(data)
+    if isinstance(data, str):
+        return len(data.encode('utf-8'))
+    try:
+        return len(json.dumps(data, separators=(",", ":"), default=str).encode('utf-8'))
+    except (TypeError, ValueError):
+        return 1024  # Default estimate for non-serializable payloads
+
+
+@dataclass(slots=True)
 class CacheEntry:
-    """Cache entry with metadata"""
+    """Cache entry with metadata (timestamps are epoch seconds)"""
     key: str
     data: Union[str, bytes, Dict[str, Any]]
-    created_at: datetime
-    expires_at: datetime
+    created_at: float
+    expires_at: float
     template_id: str
     format_type: str
     access_count: int = 0
-    last_accessed: Optional[datetime] = None
-    size_bytes: int = 0
+    last_accessed: float = 0.0
+    size_bytes: int = -1
 
     def __post_init__(self):
         """Calculate size after initialization"""
-        if self.last_accessed is None:
+        if not self.last_accessed:
             self.last_accessed = self.created_at
-        
-        # Estimate size in bytes
-        if isinstance(self.data, str):
-            self.size_bytes = len(self.data.encode('utf-8'))
-        elif isinstance(self.data, bytes):
-            self.size_bytes = len(self.data)
-        elif isinstance(self.data, dict):
-            # Rough estimate for dict size
-            self.size_bytes = len(str(self.data).encode('utf-8'))
-        else:
-            self.size_bytes = 1024  # Default estimate
+        if self.size_bytes < 0:
+            self.size_bytes = _payload_size(self.data)
 
-    def is_expired(self) -> bool:
+    def is_expired(self, now: Optional[float] = None) -> bool:
         """Check if cache entry has expired"""
-        return datetime.now() > self.expires_at
+        return (now if now is not None else time.time()) > self.expires_at
 
-    def access(self) -> None:
+    def access(self, now: Optional[float] = None) -> None:
         """Mark entry as accessed"""
         self.access_count += 1
-        self.last_accessed = datetime.now()
+        self.last_accessed = now if now is not None else time.time()
+
+
+@dataclass(slots=True)
+class _CacheUsage:
+    """Entry count and bytes across all shards, so the limits hold for the whole cache"""
+    max_size: int
+    max_memory_bytes: int
+    lock: Lock = field(default_factory=Lock)
+    entries: int = 0
+    size_bytes: int = 0
+
+    def add(self, entries: int, size_bytes: int) -> None:
+        with self.lock:
+            self.entries += entries
+            self.size_bytes += size_bytes
+
+    def over_limit(self) -> bool:
+        with self.lock:
+            return self.entries > self.max_size or self.size_bytes > self.max_memory_bytes
+
+
+@dataclass(slots=True)
+class _CacheShard:
+    """One lock-protected partition of the cache with its own LRU and expiry heap"""
+    usage: _CacheUsage
+    lock: Lock = field(default_factory=Lock)
+    entries: "OrderedDict[str, CacheEntry]" = field(default_factory=OrderedDict)
+    template_keys: Dict[str, set] = field(default_factory=dict)
+    format_keys: Dict[str, set] = field(default_factory=dict)
+    expiry_heap: List[Tuple[float, int, str]] = field(default_factory=list)
+    size_bytes: int = 0
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+
+    def index(self, entry: CacheEntry) -> None:
+        self.template_keys.setdefault(entry.template_id, set()).add(entry.key)
+        self.format_keys.setdefault(entry.format_type, set()).add(entry.key)
+
+    def unindex(self, entry: CacheEntry) -> None:
+        for mapping, name in ((self.template_keys, entry.template_id), (self.format_keys, entry.format_type)):
+            keys = mapping.get(name)
+            if keys is not None:
+                keys.discard(entry.key)
+                if not keys:
+                    del mapping[name]
+
+    def insert(self, entry: CacheEntry, sequence: int) -> None:
+        """Store an entry as most recently used; caller must hold the lock"""
+        self.entries[entry.key] = entry
+        self.index(entry)
+        self.size_bytes += entry.size_bytes
+        self.usage.add(1, entry.size_bytes)
+        heapq.heappush(self.expiry_heap, (entry.expires_at, sequence, entry.key))
+
+    def remove(self, key: str) -> Optional[CacheEntry]:
+        """Remove an entry; caller must hold the lock"""
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.unindex(entry)
+            self.size_bytes -= entry.size_bytes
+            self.usage.add(-1, -entry.size_bytes)
+        return entry
+
+    def lru_head(self) -> Optional[CacheEntry]:
+        """Least recently used entry; caller must hold the lock"""
+        return next(iter(self.entries.values()), None)
+
+    def pop_expired(self, now: float) -> int:
+        """Drop entries whose expiry has passed, touching only the heap head"""
+        removed = 0
+        heap = self.expiry_heap
+        while heap and heap[0][0] <= now:
+            expires_at, _, key = heapq.heappop(heap)
+            entry = self.entries.get(key)
+            # Heap items are lazily invalidated: skip replaced or already-removed entries
+            if entry is not None and entry.expires_at == expires_at:
+                self.remove(key)
+                self.expirations += 1
+                removed += 1
+        # Rebuild when stale heap items dominate so memory stays proportional to live entries
+        if len(heap) > 2 * len(self.entries) + 64:
+            self.expiry_heap = [(e.expires_at, i, k) for i, (k, e) in enumerate(self.entries.items())]
+            heapq.heapify(self.expiry_heap)
+        return removed
 
 
 class TemplateCacheService:
     """
     Advanced caching service for template previews with LRU eviction,
     TTL expiration, and template-specific cache invalidation.
+
+    Entries are spread across independently locked shards so concurrent
+    get/put calls rarely contend; each shard keeps its own O(1) LRU order
+    and an expiry min-heap so cleanup never scans the whole cache.
     """
 
     def __init__(
@@ -69,7 +166,8 @@ class TemplateCacheService:
         max_size: int = 1000,
         default_ttl_hours: int = 1,
         max_memory_mb: int = 100,
-        cleanup_interval_seconds: int = 300  # 5 minutes
+        cleanup_interval_seconds: int = 300,  # 5 minutes
+        shard_count: int = 16
     ):
         """
         Initialize the template cache service
@@ -79,29 +177,19 @@ class TemplateCacheService:
             default_ttl_hours: Default TTL for cache entries in hours
             max_memory_mb: Maximum memory usage in MB
             cleanup_interval_seconds: How often to run cleanup tasks
+            shard_count: Number of independently locked cache partitions
         """
         self.max_size = max_size
         self.default_ttl = timedelta(hours=default_ttl_hours)
         self.max_memory_bytes = max_memory_mb * 1024 * 1024
         self.cleanup_interval = cleanup_interval_seconds
         
-        # Thread-safe cache storage using OrderedDict for LRU
-        self._cache: OrderedDict[str, CacheEntry] = OrderedDict()
-        self._lock = RLock()
-        
-        # Template ID to cache keys mapping for invalidation
-        self._template_keys: Dict[str, set] = {}
-        
-        # Statistics
-        self._stats = {
-            'hits': 0,
-            'misses': 0,
-            'evictions': 0,
-            'expirations': 0,
-            'invalidations': 0,
-            'total_size_bytes': 0,
-            'created_at': datetime.now()
-        }
+        # Limits apply to the whole cache; eviction takes the least recently used shard head
+        self.shard_count = max(1, min(shard_count, max_size))
+        self._usage = _CacheUsage(max_size=max_size, max_memory_bytes=self.max_memory_bytes)
+        self._shards: List[_CacheShard] = [_CacheShard(usage=self._usage) for _ in range(self.shard_count)]
+        self._sequence = itertools.count()
+        self._created_at = datetime.now()
         
         # Background cleanup task
         self._cleanup_task: Optional[asyncio.Task] = None
@@ -111,7 +199,7 @@ class TemplateCacheService:
         self._instances = weakref.WeakSet()
         self._instances.add(self)
         
-        logger.info(f"TemplateCacheService initialized: max_size={max_size}, ttl={default_ttl_hours}h, max_memory={max_memory_mb}MB")
+        logger.info(f"TemplateCacheService initialized: max_size={max_size}, ttl={default_ttl_hours}h, max_memory={max_memory_mb}MB, shards={self.shard_count}")
 
     async def __aenter__(self):
         """Async context manager entry"""
@@ -122,6 +210,9 @@ class TemplateCacheService:
         """Async context manager exit"""
         await self.shutdown()
 
+    def _shard_for(self, cache_key: str) -> _CacheShard:
+        return self._shards[hash(cache_key) % self.shard_count]
+
     def _generate_cache_key(
         self,
         template_id: str,
@@ -148,88 +239,69 @@ class TemplateCacheService:
         
         # Add any additional parameters
         for k, v in sorted(kwargs.items()):
-            key_parts.append(f"{k}:{v}")
+            key_parts.append(f"{k}={v}")
         
-        key_string = ":".join(key_parts)
-        return hashlib.md5(key_string.encode()).hexdigest()
+        # The joined parts are already unique; hashing them again buys nothing
+        return "\x1f".join(key_parts)
 
     def _calculate_data_hash(self, data: Any) -> str:
         """Calculate hash for data to use in cache key"""
         if data is None:
             return "none"
         
-        if isinstance(data, dict):
+        if isinstance(data, (str, bytes)):
+            data_bytes = data.encode() if isinstance(data, str) else data
+        elif isinstance(data, dict):
             # Sort dict for consistent hashing
-            import json
-            data_str = json.dumps(data, sort_keys=True)
+            data_bytes = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str).encode()
         else:
-            data_str = str(data)
-        
-        return hashlib.md5(data_str.encode()).hexdigest()[:8]
-
-    def _evict_lru(self) -> None:
-        """Evict least recently used entries"""
-        with self._lock:
-            while len(self._cache) >= self.max_size:
-                # Remove oldest entry (LRU)
-                key, entry = self._cache.popitem(last=False)
-                self._remove_from_template_mapping(entry.template_id, key)
-                self._stats['total_size_bytes'] -= entry.size_bytes
-                self._stats['evictions'] += 1
-                logger.debug(f"Evicted LRU cache entry: {key}")
-
-    def _evict_by_memory(self) -> None:
-        """Evict entries to stay under memory limit"""
-        with self._lock:
-            while self._stats['total_size_bytes'] > self.max_memory_bytes and self._cache:
-                # Remove oldest entry
-                key, entry = self._cache.popitem(last=False)
-                self._remove_from_template_mapping(entry.template_id, key)
-                self._stats['total_size_bytes'] -= entry.size_bytes
-                self._stats['evictions'] += 1
-                logger.debug(f"Evicted cache entry for memory: {key} ({entry.size_bytes} bytes)")
-
-    def _cleanup_expired(self) -> int:
-        """Remove expired entries and return count of removed entries"""
-        expired_keys = []
+            data_bytes = str(data).encode()
         
-        with self._lock:
-            for key, entry in self._cache.items():
-                if entry.is_expired():
-                    expired_keys.append(key)
-        
-        # Remove expired entries
-        for key in expired_keys:
-            self._remove_entry(key)
-            self._stats['expirations'] += 1
-        
-        if expired_keys:
-            logger.debug(f"Cleaned up {len(expired_keys)} expired cache entries")
-        
-        return len(expired_keys)
+        return hashlib.blake2b(data_bytes, digest_size=8).hexdigest()
 
-    def _add_to_template_mapping(self, template_id: str, cache_key: str) -> None:
-        """Add cache key to template mapping"""
-        if template_id not in self._template_keys:
-            self._template_keys[template_id] = set()
-        self._template_keys[template_id].add(cache_key)
+    def _resolve_key(self, template_id: str, format_type: str, custom_data: Any, data_hash: Optional[str], kwargs: Dict[str, Any]) -> str:
+        if data_hash is None and custom_data:
+            data_hash = self._calculate_data_hash(custom_data)
+        return self._generate_cache_key(template_id, format_type, data_hash, **kwargs)
 
-    def _remove_from_template_mapping(self, template_id: str, cache_key: str) -> None:
-        """Remove cache key from template mapping"""
-        if template_id in self._template_keys:
-            self._template_keys[template_id].discard(cache_key)
-            if not self._template_keys[template_id]:
-                del self._template_keys[template_id]
+    def _cleanup_expired(self) -> int:
+        """Remove expired entries and return count of removed entries"""
+        now = time.time()
+        removed = 0
+        for shard in self._shards:
+            with shard.lock:
+                removed += shard.pop_expired(now)
+        
+        if removed:
+            logger.debug(f"Cleaned up {removed} expired cache entries")
+        
+        return removed
+
+    def _evict_to_limits(self) -> None:
+        """Evict least recently used entries across shards until the global limits hold"""
+        while self._usage.over_limit():
+            oldest: Optional[Tuple[float, _CacheShard, str]] = None
+            for shard in self._shards:
+                with shard.lock:
+                    head = shard.lru_head()
+                    if head is not None and (oldest is None or head.last_accessed < oldest[0]):
+                        oldest = (head.last_accessed, shard, head.key)
+            if oldest is None:
+                return
+            _, shard, key = oldest
+            with shard.lock:
+                # Another caller may have touched or removed it since the scan
+                head = shard.lru_head()
+                if head is not None and head.key == key:
+                    shard.remove(key)
+                    shard.evictions += 1
+                    logger.debug(f"Evicted LRU cache entry: {key} ({head.size_bytes} bytes)")
 
     def _remove_entry(self, key: str) -> bool:
         """Remove a cache entry by key"""
-        with self._lock:
-            entry = self._cache.pop(key, None)
-            if entry:
-                self._remove_from_template_mapping(entry.template_id, key)
-                self._stats['total_size_bytes'] -= entry.size_bytes
-                return True
-            return False
+        shard = self._shard_for(key)
+        with shard.lock:
+            return shard.remove(key) is not None
 
     def put(
         self,
@@ -238,6 +310,7 @@ class TemplateCacheService:
         format_type: str = "html",
         custom_data: Any = None,
         ttl_hours: Optional[int] = None,
+        data_hash: Optional[str] = None,
         **kwargs
     ) -> str:
         """
@@ -249,46 +322,41 @@ class TemplateCacheService:
             format_type: Type of data (html, png, json)
             custom_data: Custom data used for key generation
             ttl_hours: Custom TTL in hours (uses default if None)
+            data_hash: Precomputed hash of custom_data (skips re-hashing)
             **kwargs: Additional parameters for cache key
             
         Returns:
             Cache key for the stored data
         """
-        # Generate cache key
-        data_hash = self._calculate_data_hash(custom_data) if custom_data else None
-        cache_key = self._generate_cache_key(template_id, format_type, data_hash, **kwargs)
+        cache_key = self._resolve_key(template_id, format_type, custom_data, data_hash, kwargs)
         
         # Calculate expiration time
         ttl = timedelta(hours=ttl_hours) if ttl_hours else self.default_ttl
-        expires_at = datetime.now() + ttl
+        now = time.time()
         
-        # Create cache entry
+        # Size is measured here, outside the shard lock
         entry = CacheEntry(
             key=cache_key,
             data=data,
-            created_at=datetime.now(),
-            expires_at=expires_at,
+            created_at=now,
+            expires_at=now + ttl.total_seconds(),
             template_id=template_id,
             format_type=format_type
         )
         
-        with self._lock:
+        shard = self._shard_for(cache_key)
+        with shard.lock:
             # Remove existing entry if present
-            if cache_key in self._cache:
-                old_entry = self._cache[cache_key]
-                self._stats['total_size_bytes'] -= old_entry.size_bytes
-            
-            # Check if we need to evict entries
-            self._evict_lru()
-            self._evict_by_memory()
-            
-            # Store new entry
-            self._cache[cache_key] = entry
-            self._cache.move_to_end(cache_key)  # Mark as most recently used
+            shard.remove(cache_key)
+            if entry.size_bytes > self.max_memory_bytes:
+                shard.evictions += 1
+                logger.warning(f"Not caching {format_type} for template {template_id}: "
+                               f"{entry.size_bytes} bytes exceeds the cache memory limit")
+                return cache_key
             
-            # Update mappings and stats
-            self._add_to_template_mapping(template_id, cache_key)
-            self._stats['total_size_bytes'] += entry.size_bytes
+            # Store new entry as most recently used
+            shard.insert(entry, next(self._sequence))
+        self._evict_to_limits()
         
         logger.debug(f"Cached {format_type} for template {template_id}: {cache_key}")
         return cache_key
@@ -298,6 +366,7 @@ class TemplateCacheService:
         template_id: str,
         format_type: str = "html",
         custom_data: Any = None,
+        data_hash: Optional[str] = None,
         **kwargs
     ) -> Optional[Union[str, bytes, Dict[str, Any]]]:
         """
@@ -307,37 +376,49 @@ class TemplateCacheService:
             template_id: Template identifier
             format_type: Type of data to retrieve
             custom_data: Custom data used for key generation
+            data_hash: Precomputed hash of custom_data (skips re-hashing)
             **kwargs: Additional parameters for cache key
             
         Returns:
             Cached data or None if not found/expired
         """
-        # Generate cache key
-        data_hash = self._calculate_data_hash(custom_data) if custom_data else None
-        cache_key = self._generate_cache_key(template_id, format_type, data_hash, **kwargs)
+        cache_key = self._resolve_key(template_id, format_type, custom_data, data_hash, kwargs)
+        now = time.time()
         
-        with self._lock:
-            entry = self._cache.get(cache_key)
+        shard = self._shard_for(cache_key)
+        with shard.lock:
+            entry = shard.entries.get(cache_key)
             
             if entry is None:
-                self._stats['misses'] += 1
+                shard.misses += 1
                 return None
             
             # Check if expired
-            if entry.is_expired():
-                self._remove_entry(cache_key)
-                self._stats['misses'] += 1
-                self._stats['expirations'] += 1
+            if entry.is_expired(now):
+                shard.remove(cache_key)
+                shard.misses += 1
+                shard.expirations += 1
                 return None
             
             # Update access info and move to end (most recently used)
-            entry.access()
-            self._cache.move_to_end(cache_key)
-            self._stats['hits'] += 1
+            entry.access(now)
+            shard.entries.move_to_end(cache_key)
+            shard.hits += 1
             
-            logger.debug(f"Cache hit for template {template_id}: {cache_key}")
             return entry.data
 
+    def _invalidate_by(self, attribute: str, value: str) -> int:
+        removed = 0
+        for shard in self._shards:
+            with shard.lock:
+                mapping = shard.template_keys if attribute == "template" else shard.format_keys
+                keys = list(mapping.get(value, ()))
+                for key in keys:
+                    shard.remove(key)
+                shard.invalidations += len(keys)
+                removed += len(keys)
+        return removed
+
     def invalidate_template(self, template_id: str) -> int:
         """
         Invalidate all cache entries for a specific template
@@ -348,17 +429,10 @@ class TemplateCacheService:
         Returns:
             Number of entries invalidated
         """
-        with self._lock:
-            keys_to_remove = list(self._template_keys.get(template_id, set()))
-            
-            for key in keys_to_remove:
-                self._remove_entry(key)
-            
-            if keys_to_remove:
-                self._stats['invalidations'] += len(keys_to_remove)
-                logger.info(f"Invalidated {len(keys_to_remove)} cache entries for template {template_id}")
-            
-            return len(keys_to_remove)
+        removed = self._invalidate_by("template", template_id)
+        if removed:
+            logger.info(f"Invalidated {removed} cache entries for template {template_id}")
+        return removed
 
     def invalidate_format(self, format_type: str) -> int:
         """
@@ -370,21 +444,10 @@ class TemplateCacheService:
         Returns:
             Number of entries invalidated
         """
-        keys_to_remove = []
-        
-        with self._lock:
-            for key, entry in self._cache.items():
-                if entry.format_type == format_type:
-                    keys_to_remove.append(key)
-            
-            for key in keys_to_remove:
-                self._remove_entry(key)
-            
-            if keys_to_remove:
-                self._stats['invalidations'] += len(keys_to_remove)
-                logger.info(f"Invalidated {len(keys_to_remove)} cache entries for format {format_type}")
-            
-            return len(keys_to_remove)
+        removed = self._invalidate_by("format", format_type)
+        if removed:
+            logger.info(f"Invalidated {removed} cache entries for format {format_type}")
+        return removed
 
     def clear(self) -> int:
         """
@@ -393,76 +456,89 @@ class TemplateCacheService:
         Returns:
             Number of entries cleared
         """
-        with self._lock:
-            count = len(self._cache)
-            self._cache.clear()
-            self._template_keys.clear()
-            self._stats['total_size_bytes'] = 0
-            self._stats['invalidations'] += count
+        count = 0
+        for shard in self._shards:
+            with shard.lock:
+                count += len(shard.entries)
+                shard.invalidations += len(shard.entries)
+                shard.usage.add(-len(shard.entries), -shard.size_bytes)
+                shard.entries.clear()
+                shard.template_keys.clear()
+                shard.format_keys.clear()
+                shard.expiry_heap.clear()
+                shard.size_bytes = 0
         
         logger.info(f"Cleared all cache entries: {count}")
         return count
 
     def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics"""
-        with self._lock:
-            hit_rate = (
-                self._stats['hits'] / (self._stats['hits'] + self._stats['misses'])
-                if (self._stats['hits'] + self._stats['misses']) > 0
-                else 0.0
-            )
-            
-            return {
-                'cache_size': len(self._cache),
-                'max_size': self.max_size,
-                'memory_usage_bytes': self._stats['total_size_bytes'],
-                'memory_usage_mb': round(self._stats['total_size_bytes'] / (1024 * 1024), 2),
-                'max_memory_mb': self.max_memory_bytes // (1024 * 1024),
-                'hit_rate': round(hit_rate, 3),
-                'hits': self._stats['hits'],
-                'misses': self._stats['misses'],
-                'evictions': self._stats['evictions'],
-                'expirations': self._stats['expirations'],
-                'invalidations': self._stats['invalidations'],
-                'template_count': len(self._template_keys),
-                'default_ttl_hours': self.default_ttl.total_seconds() / 3600,
-                'uptime_seconds': (datetime.now() - self._stats['created_at']).total_seconds()
-            }
+        totals = dict.fromkeys(
+            ('size', 'bytes', 'hits', 'misses', 'evictions', 'expirations', 'invalidations'), 0
+        )
+        templates: set = set()
+        for shard in self._shards:
+            with shard.lock:
+                totals['size'] += len(shard.entries)
+                totals['bytes'] += shard.size_bytes
+                totals['hits'] += shard.hits
+                totals['misses'] += shard.misses
+                totals['evictions'] += shard.evictions
+                totals['expirations'] += shard.expirations
+                totals['invalidations'] += shard.invalidations
+                templates.update(shard.template_keys)
+        
+        lookups = totals['hits'] + totals['misses']
+        hit_rate = totals['hits'] / lookups if lookups > 0 else 0.0
+        
+        return {
+            'cache_size': totals['size'],
+            'max_size': self.max_size,
+            'memory_usage_bytes': totals['bytes'],
+            'memory_usage_mb': round(totals['bytes'] / (1024 * 1024), 2),
+            'max_memory_mb': self.max_memory_bytes // (1024 * 1024),
+            'hit_rate': round(hit_rate, 3),
+            'hits': totals['hits'],
+            'misses': totals['misses'],
+            'evictions': totals['evictions'],
+            'expirations': totals['expirations'],
+            'invalidations': totals['invalidations'],
+            'template_count': len(templates),
+            'shard_count': self.shard_count,
+            'default_ttl_hours': self.default_ttl.total_seconds() / 3600,
+            'uptime_seconds': (datetime.now() - self._created_at).total_seconds()
+        }
 
     def get_template_stats(self, template_id: str) -> Dict[str, Any]:
         """Get statistics for a specific template"""
-        with self._lock:
-            template_keys = self._template_keys.get(template_id, set())
-            template_entries = [
-                self._cache[key] for key in template_keys 
-                if key in self._cache
-            ]
-            
-            total_size = sum(entry.size_bytes for entry in template_entries)
-            total_accesses = sum(entry.access_count for entry in template_entries)
-            
-            format_breakdown = {}
-            for entry in template_entries:
-                if entry.format_type not in format_breakdown:
-                    format_breakdown[entry.format_type] = 0
-                format_breakdown[entry.format_type] += 1
-            
-            return {
-                'template_id': template_id,
-                'cache_entries': len(template_entries),
-                'total_size_bytes': total_size,
-                'total_size_mb': round(total_size / (1024 * 1024), 2),
-                'total_accesses': total_accesses,
-                'format_breakdown': format_breakdown,
-                'oldest_entry': min(
-                    (entry.created_at for entry in template_entries),
-                    default=None
-                ),
-                'newest_entry': max(
-                    (entry.created_at for entry in template_entries),
-                    default=None
+        template_entries: List[CacheEntry] = []
+        for shard in self._shards:
+            with shard.lock:
+                template_entries.extend(
+                    shard.entries[key] for key in shard.template_keys.get(template_id, ())
+                    if key in shard.entries
                 )
-            }
+        
+        total_size = sum(entry.size_bytes for entry in template_entries)
+        total_accesses = sum(entry.access_count for entry in template_entries)
+        
+        format_breakdown = {}
+        for entry in template_entries:
+            if entry.format_type not in format_breakdown:
+                format_breakdown[entry.format_type] = 0
+            format_breakdown[entry.format_type] += 1
+        
+        created = [entry.created_at for entry in template_entries]
+        return {
+            'template_id': template_id,
+            'cache_entries': len(template_entries),
+            'total_size_bytes': total_size,
+            'total_size_mb': round(total_size / (1024 * 1024), 2),
+            'total_accesses': total_accesses,
+            'format_breakdown': format_breakdown,
+            'oldest_entry': datetime.fromtimestamp(min(created)) if created else None,
+            'newest_entry': datetime.fromtimestamp(max(created)) if created else None
+        }
 
     async def start_background_cleanup(self) -> None:
         """Start background cleanup task"""
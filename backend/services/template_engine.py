@@ -2,8 +2,11 @@ from __future__ import annotations
 
 from typing import Any, Dict
 import asyncio
+import contextvars
 import threading
 
+from utils.stage_tracing import trace_stage
+
 
 def _prefer_backend(module_path: str, fallback_path: str, attr: str | None = None):
     try:
@@ -19,6 +22,9 @@ clean_and_compact = _prefer_backend('backend.services.cleaners', 'services.clean
 render_html = _prefer_backend('backend.services.renderers.html_renderer', 'services.renderers.html_renderer', attr='render_html')
 render_pdf_from_html = _prefer_backend('backend.services.renderers.pdf_renderer', 'services.renderers.pdf_renderer', attr='render_pdf_from_html')
 render_pdf_from_html_sync = _prefer_backend('backend.services.renderers.pdf_renderer', 'services.renderers.pdf_renderer', attr='render_pdf_from_html_sync')
+get_render_cache = _prefer_backend('backend.services.render_cache', 'services.render_cache', attr='get_render_cache')
+render_pdf_from_resume = _prefer_backend('backend.services.renderers.reportlab_renderer', 'services.renderers.reportlab_renderer', attr='render_pdf_from_resume')
+RenderConfig = _prefer_backend('backend.config.render_config', 'config.render_config', attr='RenderConfig')
 
 
 DEFAULT_TEMPLATE = "executive_compact"
@@ -202,19 +208,49 @@ class TemplateEngine:
         template_id: str,
         resume_json: Dict[str, Any] | None = None,
         resume_text: str | None = None,
-        bundle: str | None = None
+        bundle: str | None = None,
+        page_size: str = "Letter",
+        use_cache: bool = True,
     ) -> bytes:
         resume = TemplateEngine._ensure_resume(resume_json, resume_text)
         cleaned = clean_and_compact(resume.model_dump())
         raw = sanitize_input_text(resume_text) if resume_text else None
         raw = scrub_noise(raw) if raw else None
-        html = render_html(
-            bundle or DEFAULT_TEMPLATE,
-            Resume.model_validate(cleaned),
-            raw_text=raw,
-            request_params={"template": DEFAULT_TEMPLATE, "bypass_sanitization": True},
+        bundle_id = bundle or DEFAULT_TEMPLATE
+        renderer = RenderConfig.get_pdf_backend()
+
+        # Identical (cleaned resume, bundle, page size) requests reuse earlier renders
+        cache = get_render_cache() if use_cache else None
+        cache_key = (
+            cache.build_key(cleaned, bundle_id, page_size=page_size, raw_text=raw, renderer=renderer)
+            if cache else None
         )
-        pdf_bytes = await render_pdf_from_html(html, page_size="Letter")
+        if cache:
+            cached_pdf = cache.get(cache_key, bundle_id, kind="pdf")
+            if cached_pdf is not None:
+                return cached_pdf
+
+        if renderer == RenderConfig.REPORTLAB:
+            # Chromium-free backend: lay out the structured resume directly in a worker process
+            with trace_stage("reportlab_pdf", template=bundle_id):
+                pdf_bytes = await render_pdf_from_resume(cleaned, bundle_id, page_size=page_size)
+        else:
+            html = cache.get(cache_key, bundle_id, kind="html") if cache else None
+            if html is None:
+                with trace_stage("html_render", template=bundle_id):
+                    html = render_html(
+                        bundle_id,
+                        Resume.model_validate(cleaned),
+                        raw_text=raw,
+                        request_params={"template": DEFAULT_TEMPLATE, "bypass_sanitization": True},
+                    )
+                if cache:
+                    cache.put(cache_key, bundle_id, html, kind="html")
+            with trace_stage("chromium_pdf", template=bundle_id):
+                pdf_bytes = await render_pdf_from_html(html, page_size=page_size)
+
+        if cache and pdf_bytes:
+            cache.put(cache_key, bundle_id, pdf_bytes, kind="pdf")
         return pdf_bytes
 
     @staticmethod
@@ -223,6 +259,8 @@ class TemplateEngine:
         resume_json: Dict[str, Any] | None = None,
         resume_text: str | None = None,
         bundle: str | None = None,
+        page_size: str = "Letter",
+        use_cache: bool = True,
     ) -> bytes:
         result: bytes | None = None
         error: Exception | None = None
@@ -236,12 +274,15 @@ class TemplateEngine:
                         resume_json=resume_json,
                         resume_text=resume_text,
                         bundle=bundle,
+                        page_size=page_size,
+                        use_cache=use_cache,
                     )
                 )
             except Exception as exc:  # pragma: no cover
                 error = exc
 
-        thread = threading.Thread(target=_worker, daemon=True)
+        # The worker's event loop inherits this context, so its stages join the caller's trace
+        thread = threading.Thread(target=contextvars.copy_context().run, args=(_worker,), daemon=True)
         thread.start()
         thread.join()
 
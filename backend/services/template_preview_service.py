@@ -11,6 +11,9 @@ import asyncio
 import hashlib
 import json
 import logging
+import os
+from collections import OrderedDict
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional, Any, Union, Tuple
@@ -21,6 +24,7 @@ from pydantic import BaseModel
 
 from services.template_engine import TemplateEngine
 from services.template_registry import TemplateRegistry
+from services.render_cache import RenderCache
 from models.resume_schema import Resume
 
 # Optional dependencies
@@ -38,6 +42,35 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Sample data sets rendered by precompute mode ("sample" = showcase data, "empty" = placeholder layout)
+PREVIEW_SAMPLE_SETS = ("sample", "empty")
+
+EMPTY_PREVIEW_DATA: Dict[str, Any] = {
+    "name": "Your Name Here",
+    "headline": "Your Professional Title",
+    "contact": {
+        "email": "your.email@example.com",
+        "phone": "(555) 000-0000",
+        "location": "Your City, State",
+        "links": []
+    },
+    "summary": "Your professional summary will appear here...",
+    "experience": [],
+    "education": [],
+    "skills": [],
+    "projects": []
+}
+
+# Resolves once the document has loaded and every web font is ready to paint
+_READINESS_SCRIPT = """
+() => new Promise((resolve) => {
+    const fontsReady = () => (document.fonts ? document.fonts.ready : Promise.resolve());
+    const done = () => fontsReady().then(() => requestAnimationFrame(() => resolve(true)));
+    if (document.readyState === "complete") { done(); }
+    else { window.addEventListener("load", done, { once: true }); }
+})
+"""
+
 
 class TemplateMetadata(BaseModel):
     """Enhanced template metadata model"""
@@ -86,7 +119,8 @@ class TemplatePreviewService:
         disk_cache_ttl_hours: int = 24,
         screenshot_timeout: int = 30000,
         viewport_width: int = 1200,
-        viewport_height: int = 1600
+        viewport_height: int = 1600,
+        max_pages: int = 3
     ):
         """
         Initialize the template preview service
@@ -98,6 +132,7 @@ class TemplatePreviewService:
             screenshot_timeout: Playwright timeout in milliseconds
             viewport_width: Screenshot viewport width
             viewport_height: Screenshot viewport height
+            max_pages: Maximum number of concurrently open browser pages
         """
         self.cache_dir = cache_dir or Path("cache/previews")
         self.cache_dir.mkdir(parents=True, exist_ok=True)
@@ -111,13 +146,21 @@ class TemplatePreviewService:
         self.viewport_width = viewport_width
         self.viewport_height = viewport_height
         
-        # In-memory caches
-        self._memory_cache: Dict[str, Dict[str, Any]] = {}
+        # In-memory caches (insertion/access ordered for O(1) LRU eviction)
+        self._memory_cache: OrderedDict[str, Dict[str, Any]] = OrderedDict()
         self._metadata_cache: Dict[str, TemplateMetadata] = {}
         
-        # Browser instance for reuse
+        # Precomputed, content-addressed PNG index
+        self.index_dir = self.cache_dir / "index"
+        self.index_path = self.index_dir / "index.json"
+        self._preview_index: Optional[Dict[str, Dict[str, Any]]] = None
+        
+        # Browser instance and bounded page pool for reuse
+        self._playwright = None
         self._browser: Optional[Browser] = None
         self._browser_lock = asyncio.Lock()
+        self._page_semaphore = asyncio.Semaphore(max(1, max_pages))
+        self._idle_pages: List[Page] = []
         
         logger.info(f"TemplatePreviewService initialized with cache_dir: {self.cache_dir}")
         logger.info(f"Playwright available: {PLAYWRIGHT_AVAILABLE}")
@@ -140,8 +183,8 @@ class TemplatePreviewService:
         async with self._browser_lock:
             if self._browser is None:
                 try:
-                    playwright = await async_playwright().start()
-                    self._browser = await playwright.chromium.launch(
+                    self._playwright = await async_playwright().start()
+                    self._browser = await self._playwright.chromium.launch(
                         headless=True,
                         args=[
                             '--no-sandbox',
@@ -155,12 +198,21 @@ class TemplatePreviewService:
                 except Exception as e:
                     logger.error(f"Failed to launch browser: {e}")
                     self._browser = None
+                    if self._playwright:
+                        await self._playwright.stop()
+                        self._playwright = None
             
             return self._browser
     
     async def _close_browser(self):
         """Close browser instance"""
         async with self._browser_lock:
+            idle_pages, self._idle_pages = self._idle_pages, []
+            for page in idle_pages:
+                try:
+                    await page.close()
+                except Exception:
+                    pass
             if self._browser:
                 try:
                     await self._browser.close()
@@ -169,6 +221,37 @@ class TemplatePreviewService:
                     logger.error(f"Error closing browser: {e}")
                 finally:
                     self._browser = None
+            if self._playwright:
+                try:
+                    await self._playwright.stop()
+                finally:
+                    self._playwright = None
+    
+    @asynccontextmanager
+    async def _pooled_page(self):
+        """Borrow a page from the bounded pool, creating one if none are idle"""
+        async with self._page_semaphore:
+            page = self._idle_pages.pop() if self._idle_pages else None
+            if page is None:
+                browser = await self._ensure_browser()
+                if not browser:
+                    raise RuntimeError("Browser unavailable for screenshot generation")
+                page = await browser.new_page()
+                await page.set_viewport_size({
+                    "width": self.viewport_width,
+                    "height": self.viewport_height
+                })
+            try:
+                yield page
+            except Exception:
+                # Do not return a page in an unknown state to the pool
+                try:
+                    await page.close()
+                except Exception:
+                    pass
+                raise
+            else:
+                self._idle_pages.append(page)
     
     def _get_cache_key(self, template_id: str, format_type: str, sample_data_hash: str = "") -> str:
         """Generate cache key for preview"""
@@ -190,17 +273,18 @@ class TemplatePreviewService:
     
     def _cleanup_memory_cache(self):
         """Clean up memory cache if it exceeds size limit"""
-        if len(self._memory_cache) > self.memory_cache_size:
-            # Remove oldest entries
-            sorted_items = sorted(
-                self._memory_cache.items(),
-                key=lambda x: x[1].get('timestamp', datetime.min.isoformat())
-            )
-            items_to_remove = len(sorted_items) - self.memory_cache_size + 10  # Remove extra to avoid frequent cleanup
-            
-            for i in range(items_to_remove):
-                key, _ = sorted_items[i]
-                del self._memory_cache[key]
+        # Entries are kept in LRU order, so eviction pops from the front
+        while len(self._memory_cache) > self.memory_cache_size:
+            self._memory_cache.popitem(last=False)
+    
+    def _remember(self, cache_key: str, data: Any) -> None:
+        """Store an entry in the memory cache as most recently used"""
+        self._memory_cache[cache_key] = {
+            "data": data,
+            "timestamp": datetime.now().isoformat()
+        }
+        self._memory_cache.move_to_end(cache_key)
+        self._cleanup_memory_cache()
     
     def generate_template_specific_sample_data(self, template_id: str) -> Dict[str, Any]:
         """
@@ -394,50 +478,36 @@ class TemplatePreviewService:
         
         for attempt in range(retries + 1):
             try:
-                page = await browser.new_page()
-                
-                # Set viewport for consistent screenshots
-                await page.set_viewport_size({
-                    "width": self.viewport_width,
-                    "height": self.viewport_height
-                })
-                
-                # Load HTML content with timeout
-                await page.set_content(
-                    html_content,
-                    wait_until="networkidle",
-                    timeout=self.screenshot_timeout
-                )
-                
-                # Wait a bit more for any CSS animations or fonts to load
-                await asyncio.sleep(1)
-                
-                # Take screenshot with specific settings
-                screenshot_bytes = await page.screenshot(
-                    type="png",
-                    full_page=True,
-                    clip={
-                        "x": 0,
-                        "y": 0,
-                        "width": self.viewport_width,
-                        "height": min(self.viewport_height, 2000)  # Limit height for performance
-                    },
-                    timeout=self.screenshot_timeout
-                )
+                async with self._pooled_page() as page:
+                    # Inline HTML has no network dependencies; wait for load + font readiness
+                    await page.set_content(
+                        html_content,
+                        wait_until="load",
+                        timeout=self.screenshot_timeout
+                    )
+                    await page.evaluate(_READINESS_SCRIPT)
+                    
+                    # Take screenshot with specific settings
+                    screenshot_bytes = await page.screenshot(
+                        type="png",
+                        full_page=True,
+                        clip={
+                            "x": 0,
+                            "y": 0,
+                            "width": self.viewport_width,
+                            "height": min(self.viewport_height, 2000)  # Limit height for performance
+                        },
+                        timeout=self.screenshot_timeout
+                    )
                 
-                await page.close()
                 logger.info(f"Screenshot generated successfully for template '{template_id}' (attempt {attempt + 1})")
                 return screenshot_bytes
                 
             except Exception as e:
                 logger.error(f"Screenshot attempt {attempt + 1} failed for template '{template_id}': {e}")
-                try:
-                    await page.close()
-                except:
-                    pass
                 
                 if attempt < retries:
-                    await asyncio.sleep(1)  # Brief delay before retry
+                    await asyncio.sleep(0.25 * (attempt + 1))  # Brief backoff before retry
                 else:
                     logger.error(f"All screenshot attempts failed for template '{template_id}'")
                     return None
@@ -707,6 +777,7 @@ class TemplatePreviewService:
             # Check memory cache
             if use_cache and cache_key in self._memory_cache:
                 cached_data = self._memory_cache[cache_key]
+                self._memory_cache.move_to_end(cache_key)
                 generation_time = (datetime.now() - start_time).total_seconds() * 1000
                 
                 return PreviewResult(
@@ -729,11 +800,7 @@ class TemplatePreviewService:
                             data = disk_cache_path.read_text(encoding="utf-8")
                         
                         # Cache in memory
-                        self._memory_cache[cache_key] = {
-                            "data": data,
-                            "timestamp": datetime.now().isoformat()
-                        }
-                        self._cleanup_memory_cache()
+                        self._remember(cache_key, data)
                         
                         generation_time = (datetime.now() - start_time).total_seconds() * 1000
                         
@@ -759,11 +826,7 @@ class TemplatePreviewService:
                 # Cache results
                 if use_cache:
                     # Memory cache
-                    self._memory_cache[cache_key] = {
-                        "data": html_content,
-                        "timestamp": datetime.now().isoformat()
-                    }
-                    self._cleanup_memory_cache()
+                    self._remember(cache_key, html_content)
                     
                     # Disk cache
                     try:
@@ -811,11 +874,7 @@ class TemplatePreviewService:
                 # Cache results
                 if use_cache and screenshot_bytes:
                     # Memory cache
-                    self._memory_cache[cache_key] = {
-                        "data": screenshot_bytes,
-                        "timestamp": datetime.now().isoformat()
-                    }
-                    self._cleanup_memory_cache()
+                    self._remember(cache_key, screenshot_bytes)
                     
                     # Disk cache
                     try:
@@ -941,6 +1000,175 @@ class TemplatePreviewService:
         
         return preview_results
     
+    # ------------------------------------------------------------------
+    # Precompute mode: content-hashed on-disk PNG index
+    # ------------------------------------------------------------------
+    
+    def get_sample_data(self, template_id: str, sample_set: str = "sample") -> Dict[str, Any]:
+        """Resolve the resume data used for a named preview sample set"""
+        if sample_set == "empty":
+            return json.loads(json.dumps(EMPTY_PREVIEW_DATA))
+        return self.generate_template_specific_sample_data(template_id)
+    
+    @staticmethod
+    def _index_key(template_id: str, sample_set: str) -> str:
+        return f"{template_id}:{sample_set}"
+    
+    def _source_hash(self, template_id: str, sample_set: str, resume_data: Optional[Dict[str, Any]] = None) -> str:
+        """Hash of what a preview is rendered from: the bundle files and the sample data"""
+        if resume_data is None:
+            resume_data = self.get_sample_data(template_id, sample_set)
+        return hashlib.sha256(
+            (RenderCache.bundle_fingerprint(template_id) + json.dumps(resume_data, sort_keys=True)).encode("utf-8")
+        ).hexdigest()
+    
+    def _current_index_entry(self, template_id: str, sample_set: str) -> Optional[Dict[str, Any]]:
+        """The index entry, unless the template or sample data changed since it was rendered"""
+        entry = self._load_preview_index().get(self._index_key(template_id, sample_set))
+        if not entry:
+            return None
+        try:
+            if entry.get("source_hash") != self._source_hash(template_id, sample_set):
+                return None
+        except Exception as e:
+            logger.warning(f"Could not fingerprint template {template_id}; not serving its indexed preview: {e}")
+            return None
+        return entry
+    
+    def _load_preview_index(self) -> Dict[str, Dict[str, Any]]:
+        """Load the precomputed preview index once per process"""
+        if self._preview_index is None:
+            try:
+                self._preview_index = json.loads(self.index_path.read_text(encoding="utf-8"))
+            except FileNotFoundError:
+                self._preview_index = {}
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable preview index {self.index_path}: {e}")
+                self._preview_index = {}
+        return self._preview_index
+    
+    def _write_preview_index(self, index: Dict[str, Dict[str, Any]]) -> None:
+        """Atomically persist the preview index"""
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_suffix(".json.tmp")
+        tmp_path.write_text(json.dumps(index, indent=2, sort_keys=True), encoding="utf-8")
+        os.replace(tmp_path, self.index_path)
+        self._preview_index = index
+    
+    def get_indexed_preview(self, template_id: str, sample_set: str = "sample") -> Optional[Tuple[bytes, str]]:
+        """
+        Serve a precomputed PNG preview without any render work
+        
+        Args:
+            template_id: Template identifier
+            sample_set: Sample data set name
+            
+        Returns:
+            Tuple of (PNG bytes, ETag) or None if not precomputed or out of date
+        """
+        entry = self._current_index_entry(template_id, sample_set)
+        if not entry:
+            return None
+        
+        cache_key = f"index:{entry['sha256']}"
+        cached = self._memory_cache.get(cache_key)
+        if cached is not None:
+            self._memory_cache.move_to_end(cache_key)
+            return cached["data"], entry["sha256"]
+        
+        try:
+            data = (self.index_dir / entry["file"]).read_bytes()
+        except OSError:
+            return None
+        self._remember(cache_key, data)
+        return data, entry["sha256"]
+    
+    def get_indexed_etag(self, template_id: str, sample_set: str = "sample") -> Optional[str]:
+        """Return the ETag of a current precomputed preview without reading the image"""
+        entry = self._current_index_entry(template_id, sample_set)
+        return entry["sha256"] if entry else None
+    
+    async def precompute_previews(
+        self,
+        template_ids: Optional[List[str]] = None,
+        sample_sets: Tuple[str, ...] = PREVIEW_SAMPLE_SETS,
+        force: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Render every template x sample-set PNG once and record it in the on-disk index
+        
+        Entries are skipped when the template bundle fingerprint (file mtimes) and the
+        sample data are unchanged since the last run, so this is cheap to call at every
+        deploy or startup. Renders share the bounded page pool.
+        
+        Args:
+            template_ids: Templates to precompute (defaults to the registry list)
+            sample_sets: Sample data set names to render
+            force: Re-render even when the index entry is current
+            
+        Returns:
+            Summary with rendered/skipped/failed counts
+        """
+        template_ids = template_ids or TemplateRegistry.list_ids()
+        index = dict(self._load_preview_index())
+        summary = {"rendered": 0, "skipped": 0, "failed": 0, "entries": len(template_ids) * len(sample_sets)}
+        
+        async def precompute_one(template_id: str, sample_set: str) -> None:
+            resume_data = self.get_sample_data(template_id, sample_set)
+            source_hash = self._source_hash(template_id, sample_set, resume_data)
+            key = self._index_key(template_id, sample_set)
+            current = index.get(key)
+            if (not force and current and current.get("source_hash") == source_hash
+                    and (self.index_dir / current["file"]).exists()):
+                summary["skipped"] += 1
+                return
+            
+            html_content = TemplateEngine.render_preview(template_id=template_id, resume_json=resume_data)
+            screenshot_bytes = await self.generate_screenshot(html_content, template_id)
+            if not screenshot_bytes:
+                summary["failed"] += 1
+                return
+            
+            digest = hashlib.sha256(screenshot_bytes).hexdigest()
+            file_name = f"{digest}.png"
+            file_path = self.index_dir / file_name
+            if not file_path.exists():
+                tmp_path = file_path.with_suffix(".png.tmp")
+                tmp_path.write_bytes(screenshot_bytes)
+                os.replace(tmp_path, file_path)
+            
+            index[key] = {
+                "sha256": digest,
+                "file": file_name,
+                "source_hash": source_hash,
+                "size_bytes": len(screenshot_bytes),
+                "generated_at": datetime.now().isoformat()
+            }
+            summary["rendered"] += 1
+        
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        results = await asyncio.gather(
+            *(precompute_one(tid, sample_set) for tid in template_ids for sample_set in sample_sets),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                summary["failed"] += 1
+                logger.error(f"Preview precompute task failed: {result}")
+        
+        # Drop image files no longer referenced by any entry
+        referenced = {entry["file"] for entry in index.values()}
+        for png_path in self.index_dir.glob("*.png"):
+            if png_path.name not in referenced:
+                try:
+                    png_path.unlink()
+                except OSError:
+                    pass
+        
+        self._write_preview_index(index)
+        logger.info(f"Preview precompute finished: {summary}")
+        return summary
+    
     async def get_all_metadata(self, refresh: bool = False) -> Dict[str, TemplateMetadata]:
         """
         Get metadata for all available templates
@@ -981,6 +1209,7 @@ class TemplatePreviewService:
             self._metadata_cache.clear()
         
         if disk:
+            self._preview_index = None
             try:
                 for cache_file in self.cache_dir.glob("*"):
                     if cache_file.is_file():
@@ -1010,7 +1239,51 @@ class TemplatePreviewService:
             "disk_cache_files": disk_files,
             "disk_cache_size_bytes": disk_size,
             "cache_dir": str(self.cache_dir),
+            "precomputed_previews": len(self._load_preview_index()),
+            "idle_pages": len(self._idle_pages),
             "playwright_available": PLAYWRIGHT_AVAILABLE,
             "pil_available": PIL_AVAILABLE,
             "browser_initialized": self._browser is not None
         }
+
+
+# Global preview service instance
+_preview_service: Optional[TemplatePreviewService] = None
+
+
+def _create_preview_service() -> TemplatePreviewService:
+    return TemplatePreviewService(
+        cache_dir=Path(os.getenv("TEMPLATE_PREVIEW_CACHE_DIR", "cache/previews")),
+        max_pages=int(os.getenv("TEMPLATE_PREVIEW_MAX_PAGES", "3"))
+    )
+
+
+def get_template_preview_service() -> TemplatePreviewService:
+    """Get or create the global template preview service"""
+    global _preview_service
+    
+    if _preview_service is None:
+        _preview_service = _create_preview_service()
+    
+    return _preview_service
+
+
+async def warm_template_previews(force: bool = False) -> Dict[str, Any]:
+    """Precompute the preview index on a dedicated service, then close only its browser"""
+    # The shared service's browser may be serving preview requests meanwhile
+    warmer = _create_preview_service()
+    try:
+        summary = await warmer.precompute_previews(force=force)
+    finally:
+        await warmer._close_browser()
+    if _preview_service is not None:
+        _preview_service._preview_index = None  # reload the new index on next use
+    return summary
+
+
+if __name__ == "__main__":
+    # Deploy-time entry point: python -m services.template_preview_service [--force]
+    import sys
+    
+    logging.basicConfig(level=logging.INFO)
+    print(json.dumps(asyncio.run(warm_template_previews(force="--force" in sys.argv)), indent=2))
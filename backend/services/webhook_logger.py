@@ -9,10 +9,14 @@ This service handles:
 """
 
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Dict, Any, Optional, List
 from sqlalchemy.orm import Session
-from sqlalchemy import Column, String, DateTime, Integer, Text, Boolean, Enum
+from sqlalchemy import (
+    Column, String, DateTime, Integer, Float, Text, Boolean, Enum, Index, and_, case, insert, update
+)
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.sql import func
 import json
 import enum
@@ -32,6 +36,16 @@ class WebhookEventStatus(enum.Enum):
     IGNORED = "ignored"
 
 
+def _utc_naive(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _hour_bucket(value: datetime) -> datetime:
+    return _utc_naive(value).replace(minute=0, second=0, microsecond=0)
+
+
 class WebhookEvent(Base):
     """Model for tracking webhook events"""
     __tablename__ = "webhook_events"
@@ -60,6 +74,11 @@ class WebhookEvent(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
+    __table_args__ = (
+        # Partial-hour head of the statistics window is read from raw rows
+        Index("idx_webhook_events_created_at", "created_at"),
+    )
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for API responses"""
         return {
@@ -76,12 +95,71 @@ class WebhookEvent(Base):
         }
 
 
+class WebhookEventHourlyRollup(Base):
+    """Webhook event counts per creation hour, event type and current status"""
+    __tablename__ = "webhook_event_hourly_rollups"
+
+    hour_start = Column(DateTime, primary_key=True)  # UTC, truncated to the hour
+    event_type = Column(String(100), primary_key=True)
+    status = Column(Enum(WebhookEventStatus), primary_key=True)
+    event_count = Column(Integer, nullable=False, default=0)
+    processing_seconds = Column(Float, nullable=False, default=0.0)  # PROCESSED rows only
+
+
 class WebhookLogger:
     """Service for logging and monitoring webhook events"""
     
     def __init__(self, db_session: Session):
         self.db = db_session
     
+    @staticmethod
+    def _processing_seconds(webhook_event: WebhookEvent) -> float:
+        if webhook_event.status != WebhookEventStatus.PROCESSED or not webhook_event.processed_at:
+            return 0.0
+        return (_utc_naive(webhook_event.processed_at) - _utc_naive(webhook_event.created_at)).total_seconds()
+    
+    def _bump_rollup(self, webhook_event: WebhookEvent, status: WebhookEventStatus,
+                     count: int, seconds: float) -> None:
+        """Add to one hourly rollup row (upsert), in the caller's transaction"""
+        table = WebhookEventHourlyRollup.__table__
+        key = {
+            "hour_start": _hour_bucket(webhook_event.created_at),
+            "event_type": webhook_event.event_type,
+            "status": status,
+        }
+        increments = {
+            "event_count": table.c.event_count + count,
+            "processing_seconds": table.c.processing_seconds + seconds,
+        }
+        dialect = self.db.get_bind().dialect.name
+        if dialect in ("sqlite", "postgresql"):
+            upsert = sqlite_insert if dialect == "sqlite" else postgresql_insert
+            statement = upsert(table).values(**key, event_count=count, processing_seconds=seconds)
+            self.db.execute(statement.on_conflict_do_update(
+                index_elements=[table.c.hour_start, table.c.event_type, table.c.status], set_=increments
+            ))
+            return
+        
+        where = and_(*(table.c[column] == value for column, value in key.items()))
+        if not self.db.execute(update(table).where(where).values(**increments)).rowcount:
+            self.db.execute(insert(table).values(**key, event_count=count, processing_seconds=seconds))
+    
+    def _set_status(self, webhook_event: WebhookEvent, status: WebhookEventStatus, **fields) -> None:
+        """Apply a status change and move the event between hourly rollup rows"""
+        old_status = webhook_event.status
+        old_seconds = self._processing_seconds(webhook_event)
+        webhook_event.status = status
+        for name, value in fields.items():
+            setattr(webhook_event, name, value)
+        
+        new_seconds = self._processing_seconds(webhook_event)
+        if old_status == status:
+            if new_seconds != old_seconds:
+                self._bump_rollup(webhook_event, status, 0, new_seconds - old_seconds)
+            return
+        self._bump_rollup(webhook_event, old_status, -1, -old_seconds)
+        self._bump_rollup(webhook_event, status, 1, new_seconds)
+    
     def log_webhook_received(
         self,
         event_type: str,
@@ -101,6 +179,8 @@ class WebhookLogger:
             )
             
             self.db.add(webhook_event)
+            self.db.flush()  # assigns the server-side created_at used for the rollup bucket
+            self._bump_rollup(webhook_event, WebhookEventStatus.RECEIVED, 1, 0.0)
             self.db.commit()
             self.db.refresh(webhook_event)
             
@@ -120,7 +200,7 @@ class WebhookLogger:
             ).first()
             
             if webhook_event:
-                webhook_event.status = WebhookEventStatus.PROCESSING
+                self._set_status(webhook_event, WebhookEventStatus.PROCESSING)
                 webhook_event.attempts += 1
                 webhook_event.last_attempt_at = datetime.utcnow()
                 self.db.commit()
@@ -147,8 +227,7 @@ class WebhookLogger:
             ).first()
             
             if webhook_event:
-                webhook_event.status = WebhookEventStatus.PROCESSED
-                webhook_event.processed_at = datetime.utcnow()
+                self._set_status(webhook_event, WebhookEventStatus.PROCESSED, processed_at=datetime.utcnow())
                 webhook_event.result = json.dumps(result)
                 webhook_event.error_message = None
                 self.db.commit()
@@ -176,7 +255,9 @@ class WebhookLogger:
             ).first()
             
             if webhook_event:
-                webhook_event.status = WebhookEventStatus.RETRYING if will_retry else WebhookEventStatus.FAILED
+                self._set_status(
+                    webhook_event, WebhookEventStatus.RETRYING if will_retry else WebhookEventStatus.FAILED
+                )
                 webhook_event.error_message = error_message
                 self.db.commit()
                 
@@ -203,8 +284,7 @@ class WebhookLogger:
             ).first()
             
             if webhook_event:
-                webhook_event.status = WebhookEventStatus.IGNORED
-                webhook_event.processed_at = datetime.utcnow()
+                self._set_status(webhook_event, WebhookEventStatus.IGNORED, processed_at=datetime.utcnow())
                 webhook_event.result = json.dumps({"status": "ignored", "reason": reason})
                 self.db.commit()
                 
@@ -251,66 +331,79 @@ class WebhookLogger:
             logger.error(f"Error getting webhook events: {e}")
             return []
     
-    def get_webhook_statistics(self, hours_back: int = 24) -> Dict[str, Any]:
-        """Get webhook processing statistics"""
+    def _duration_seconds(self):
+        """Database-side ``processed_at - created_at`` in seconds"""
+        if self.db.get_bind().dialect.name == "sqlite":
+            return (func.julianday(WebhookEvent.processed_at) - func.julianday(WebhookEvent.created_at)) * 86400.0
+        return func.extract("epoch", WebhookEvent.processed_at - WebhookEvent.created_at)
+    
+    def _raw_breakdown(self, since: datetime, until: Optional[datetime] = None) -> List[tuple]:
+        """(event_type, status, count, processing_seconds) grouped over raw events"""
+        is_timed = and_(WebhookEvent.status == WebhookEventStatus.PROCESSED, WebhookEvent.processed_at.isnot(None))
+        query = self.db.query(
+            WebhookEvent.event_type,
+            WebhookEvent.status,
+            func.count(WebhookEvent.id),
+            func.sum(case((is_timed, self._duration_seconds()), else_=0.0)),
+        ).filter(WebhookEvent.created_at >= since)
+        if until is not None:
+            query = query.filter(WebhookEvent.created_at < until)
+        return query.group_by(WebhookEvent.event_type, WebhookEvent.status).all()
+    
+    def _rollup_breakdown(self, since_hour: datetime) -> List[tuple]:
+        """(event_type, status, count, processing_seconds) summed over hourly rollups"""
+        rollup = WebhookEventHourlyRollup
+        return self.db.query(
+            rollup.event_type,
+            rollup.status,
+            func.sum(rollup.event_count),
+            func.sum(rollup.processing_seconds),
+        ).filter(rollup.hour_start >= since_hour).group_by(rollup.event_type, rollup.status).all()
+    
+    def get_webhook_statistics(self, hours_back: int = 24, use_rollups: bool = True) -> Dict[str, Any]:
+        """
+        Get webhook processing statistics
+        
+        Whole hours come from the hourly rollup table; only the partial hour at
+        the start of the window is aggregated from raw events.
+        
+        Args:
+            hours_back: Window size in hours
+            use_rollups: Set False to aggregate everything from raw events
+        """
         try:
             since = datetime.utcnow() - timedelta(hours=hours_back)
             
-            # Total events
-            total_events = self.db.query(WebhookEvent).filter(
-                WebhookEvent.created_at >= since
-            ).count()
-            
-            # Events by status
-            status_counts = {}
-            for status in WebhookEventStatus:
-                count = self.db.query(WebhookEvent).filter(
-                    WebhookEvent.created_at >= since,
-                    WebhookEvent.status == status
-                ).count()
-                status_counts[status.value] = count
-            
-            # Events by type
-            type_counts = {}
-            event_types = self.db.query(WebhookEvent.event_type).filter(
-                WebhookEvent.created_at >= since
-            ).distinct().all()
-            
-            for (event_type,) in event_types:
-                count = self.db.query(WebhookEvent).filter(
-                    WebhookEvent.created_at >= since,
-                    WebhookEvent.event_type == event_type
-                ).count()
-                type_counts[event_type] = count
-            
-            # Failed events that need attention
-            failed_events = self.db.query(WebhookEvent).filter(
-                WebhookEvent.created_at >= since,
-                WebhookEvent.status == WebhookEventStatus.FAILED
-            ).count()
-            
-            # Average processing time (for processed events)
-            processed_events = self.db.query(WebhookEvent).filter(
-                WebhookEvent.created_at >= since,
-                WebhookEvent.status == WebhookEventStatus.PROCESSED,
-                WebhookEvent.processed_at.isnot(None)
-            ).all()
-            
-            avg_processing_time = 0
-            if processed_events:
-                total_time = sum([
-                    (event.processed_at - event.created_at).total_seconds()
-                    for event in processed_events
-                ])
-                avg_processing_time = total_time / len(processed_events)
+            if use_rollups:
+                boundary = _hour_bucket(since)
+                if boundary < since:
+                    boundary += timedelta(hours=1)
+                rows = self._raw_breakdown(since, until=boundary) + self._rollup_breakdown(boundary)
+            else:
+                rows = self._raw_breakdown(since)
+            
+            status_counts = {status.value: 0 for status in WebhookEventStatus}
+            type_counts: Dict[str, int] = {}
+            processing_seconds = 0.0
+            for event_type, status, count, seconds in rows:
+                count = int(count or 0)
+                if not count:
+                    continue
+                status_counts[status.value] += count
+                type_counts[event_type] = type_counts.get(event_type, 0) + count
+                processing_seconds += float(seconds or 0.0)
+            
+            total_events = sum(status_counts.values())
+            processed = status_counts[WebhookEventStatus.PROCESSED.value]
+            avg_processing_time = processing_seconds / processed if processed else 0
             
             return {
                 "period_hours": hours_back,
                 "total_events": total_events,
                 "status_breakdown": status_counts,
                 "event_type_breakdown": type_counts,
-                "failed_events": failed_events,
-                "success_rate": (status_counts.get("processed", 0) / max(1, total_events)) * 100,
+                "failed_events": status_counts[WebhookEventStatus.FAILED.value],
+                "success_rate": (processed / max(1, total_events)) * 100,
                 "average_processing_time_seconds": round(avg_processing_time, 2),
                 "generated_at": datetime.utcnow().isoformat()
             }
@@ -319,6 +412,51 @@ class WebhookLogger:
             logger.error(f"Error getting webhook statistics: {e}")
             return {}
     
+    def rebuild_hourly_rollups(self, since: Optional[datetime] = None) -> int:
+        """
+        Recompute hourly rollups from raw events (backfill / repair)
+        
+        Args:
+            since: Only rebuild hours from this time on (default: everything)
+        
+        Returns:
+            Number of rollup rows written
+        """
+        try:
+            rollup = WebhookEventHourlyRollup
+            events = self.db.query(
+                WebhookEvent.created_at, WebhookEvent.event_type, WebhookEvent.status, WebhookEvent.processed_at
+            )
+            delete_query = self.db.query(rollup)
+            if since is not None:
+                since = _hour_bucket(since)
+                events = events.filter(WebhookEvent.created_at >= since)
+                delete_query = delete_query.filter(rollup.hour_start >= since)
+            
+            buckets: Dict[tuple, List[float]] = {}
+            for created_at, event_type, status, processed_at in events.yield_per(5000):
+                totals = buckets.setdefault((_hour_bucket(created_at), event_type, status), [0, 0.0])
+                totals[0] += 1
+                if status == WebhookEventStatus.PROCESSED and processed_at:
+                    totals[1] += (_utc_naive(processed_at) - _utc_naive(created_at)).total_seconds()
+            
+            delete_query.delete(synchronize_session=False)
+            if buckets:
+                self.db.execute(insert(rollup.__table__), [
+                    {"hour_start": hour, "event_type": event_type, "status": status,
+                     "event_count": count, "processing_seconds": seconds}
+                    for (hour, event_type, status), (count, seconds) in buckets.items()
+                ])
+            self.db.commit()
+            
+            logger.info(f"Rebuilt {len(buckets)} webhook hourly rollup rows")
+            return len(buckets)
+            
+        except Exception as e:
+            logger.error(f"Error rebuilding webhook rollups: {e}")
+            self.db.rollback()
+            raise
+    
     def cleanup_old_events(self, days_to_keep: int = 30) -> int:
         """Clean up old webhook events"""
         try:
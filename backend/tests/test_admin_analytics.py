@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta
+from pathlib import Path
+import sys
+import uuid
+
+ROOT = Path(__file__).resolve().parents[2]
+BACKEND = ROOT / "backend"
+if str(BACKEND) not in sys.path:
+    sys.path.insert(0, str(BACKEND))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import models.file_metadata  # noqa: F401
+from models.user import (
+    Base, User, Subscription, UsageTracking, SubscriptionTier, SubscriptionStatus, UsageType
+)
+from services.admin_analytics_service import AdminAnalyticsService
+
+
+def _session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)()
+
+
+def _user(db, tier, status, total_usage=0, weekly_usage=0, created_at=None):
+    user = User(
+        id=uuid.uuid4(), email=f"{uuid.uuid4().hex}@example.com", subscription_tier=tier,
+        subscription_status=status, total_usage_count=total_usage, weekly_usage_count=weekly_usage,
+    )
+    if created_at is not None:
+        user.created_at = created_at
+    db.add(user)
+    return user
+
+
+def test_grouped_metrics_match_per_metric_counts():
+    db = _session()
+    now = datetime.utcnow()
+    _user(db, SubscriptionTier.FREE, SubscriptionStatus.ACTIVE, total_usage=0)
+    _user(db, SubscriptionTier.FREE, SubscriptionStatus.ACTIVE, total_usage=3, weekly_usage=5)
+    _user(db, SubscriptionTier.FREE, SubscriptionStatus.CANCELED, total_usage=60)
+    pro = _user(db, SubscriptionTier.PRO, SubscriptionStatus.ACTIVE, total_usage=12)
+    db.flush()
+    db.add_all([
+        Subscription(user_id=pro.id, stripe_customer_id="cus_1", status=SubscriptionStatus.ACTIVE,
+                     tier=SubscriptionTier.PRO, created_at=now - timedelta(days=2)),
+        Subscription(user_id=pro.id, stripe_customer_id="cus_2", status=SubscriptionStatus.CANCELED,
+                     tier=SubscriptionTier.PRO, created_at=now - timedelta(days=40),
+                     canceled_at=now - timedelta(days=1)),
+    ])
+    db.commit()
+
+    service = AdminAnalyticsService(db)
+    metrics = asyncio.run(service.get_subscription_metrics("30d"))
+    assert metrics["overview"]["total_users"] == 4
+    assert metrics["overview"]["active_subscriptions"] == 1
+    assert metrics["overview"]["new_subscriptions"] == 1
+    assert metrics["overview"]["canceled_subscriptions"] == 1
+    assert metrics["overview"]["mrr"] == 9.99
+    assert metrics["tier_distribution"] == {"free": 3, "pro": 1}
+
+    funnel = asyncio.run(service.get_conversion_funnel_analysis())
+    assert funnel["funnel_stages"] == {"registered": 4, "activated": 3, "limit_reached": 1, "converted": 1}
+
+    revenue = asyncio.run(service.get_revenue_analytics("30d"))
+    assert revenue["overview"]["churn_revenue_impact"] == 9.99
+
+
+def test_retention_uses_single_activity_lookup():
+    db = _session()
+    now = datetime.utcnow()
+    retained = _user(db, SubscriptionTier.FREE, SubscriptionStatus.ACTIVE, created_at=now - timedelta(days=10))
+    _user(db, SubscriptionTier.FREE, SubscriptionStatus.ACTIVE, created_at=now - timedelta(days=10))
+    db.flush()
+    db.add(UsageTracking(user_id=retained.id, usage_type=UsageType.RESUME_PROCESSING,
+                         usage_date=retained.created_at + timedelta(days=1, hours=2)))
+    db.commit()
+
+    retention = asyncio.run(AdminAnalyticsService(db)._calculate_user_retention(now - timedelta(days=30), now))
+    assert retention["day_1"]["retained_users"] == 1
+    assert retention["day_1"]["total_new_users"] == 2
+    assert retention["day_7"]["retained_users"] == 0
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+import sys
+import time
+import uuid
+
+ROOT = Path(__file__).resolve().parents[2]
+BACKEND = ROOT / "backend"
+if str(BACKEND) not in sys.path:
+    sys.path.insert(0, str(BACKEND))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import models.file_metadata  # noqa: F401
+from models.user import Base, User, SubscriptionTier, SubscriptionStatus
+from services.admin_analytics_service import AdminAnalyticsService
+from services.admin_dashboard import SECTIONS, AdminDashboardAssembler
+
+
+def _factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'admin.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    db = factory()
+    for tier in (SubscriptionTier.FREE, SubscriptionTier.FREE, SubscriptionTier.PRO):
+        db.add(User(id=uuid.uuid4(), email=f"{uuid.uuid4().hex}@example.com", subscription_tier=tier,
+                    subscription_status=SubscriptionStatus.ACTIVE))
+    db.commit()
+    return factory, db
+
+
+def test_admin_dashboard_sections_are_cached_with_timing_metadata(tmp_path):
+    _, db = _factory(tmp_path)
+    service = AdminAnalyticsService(db)
+
+    first = asyncio.run(service.get_admin_dashboard("30d"))
+    assert first["dashboard_overview"]["total_users"] == 3
+    sections = first["metadata"]["sections"]
+    assert set(sections) == set(SECTIONS)
+    assert {timing["source"] for timing in sections.values()} == {"computed"}
+    assert all(timing["duration_ms"] >= 0 for timing in sections.values())
+
+    second = asyncio.run(service.get_admin_dashboard("30d"))
+    assert {timing["source"] for timing in second["metadata"]["sections"].values()} == {"cache"}
+    assert second["subscription_metrics"] == first["subscription_metrics"]
+
+    # Range-independent sections are shared across time ranges
+    week = asyncio.run(service.get_admin_dashboard("7d"))
+    assert week["metadata"]["sections"]["conversion_funnel"]["source"] == "cache"
+    assert week["metadata"]["sections"]["subscription_metrics"]["source"] == "computed"
+
+
+def test_expired_sections_are_served_stale_while_revalidating(tmp_path):
+    factory, db = _factory(tmp_path)
+    assembler = AdminDashboardAssembler(factory, ttl_overrides={name: 0.0 for name in SECTIONS},
+                                        max_stale_seconds=60, slow_section_ms=0)
+    try:
+        first = asyncio.run(assembler.assemble("30d"))
+        assert first["metadata"]["slow_sections"]
+        computed_at = first["metadata"]["sections"]["subscription_metrics"]["computed_at"]
+
+        db.add(User(id=uuid.uuid4(), email="late@example.com", subscription_tier=SubscriptionTier.FREE,
+                    subscription_status=SubscriptionStatus.ACTIVE))
+        db.commit()
+
+        stale = asyncio.run(assembler.assemble("30d"))
+        assert {timing["source"] for timing in stale["metadata"]["sections"].values()} == {"stale"}
+        assert stale["dashboard_overview"]["total_users"] == 3
+
+        deadline = time.time() + 10
+        while assembler.get_stats()["inflight"] and time.time() < deadline:
+            time.sleep(0.01)
+        refreshed = asyncio.run(assembler.assemble("30d"))
+        assert refreshed["dashboard_overview"]["total_users"] == 4
+        assert refreshed["metadata"]["sections"]["subscription_metrics"]["computed_at"] != computed_at
+        assert assembler.get_stats()["computations"] == 3 * len(SECTIONS)
+    finally:
+        assembler.shutdown()
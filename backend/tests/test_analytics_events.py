@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta
+from pathlib import Path
+import sys
+import uuid
+
+ROOT = Path(__file__).resolve().parents[2]
+BACKEND = ROOT / "backend"
+if str(BACKEND) not in sys.path:
+    sys.path.insert(0, str(BACKEND))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import models.file_metadata  # noqa: F401
+from models.analytics_event import AnalyticsDailyRollup, AnalyticsEvent
+from models.user import Base, User, SubscriptionTier, SubscriptionStatus
+from services.analytics_events import AnalyticsEventWriter, rebuild_daily_rollups
+from services.analytics_service import AnalyticsEventType, AnalyticsService
+from services.dashboard_cache import get_dashboard_cache
+
+
+def _session_factory():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)
+
+
+def test_writer_batches_inserts_and_flushes_on_stop():
+    factory = _session_factory()
+    writer = AnalyticsEventWriter(session_factory=factory, flush_interval=60, batch_size=100)
+    user_id = uuid.uuid4()
+    for i in range(250):
+        writer.record(user_id, "resume_generated", {"n": i}, subscription_tier="pro")
+
+    db = factory()
+    assert db.query(AnalyticsEvent).count() == 0
+    assert writer.pending_count() == 250
+
+    assert writer.stop() == 250
+    assert db.query(AnalyticsEvent).count() == 250
+    assert writer.stats["statements"] == 3 and writer.stats["flushes"] == 1
+    assert writer.pending_count() == 0
+
+
+def test_dashboard_reads_persisted_events_in_range():
+    factory = _session_factory()
+    db = factory()
+    user = User(id=uuid.uuid4(), email="pro@example.com", subscription_tier=SubscriptionTier.PRO,
+                subscription_status=SubscriptionStatus.ACTIVE)
+    other = User(id=uuid.uuid4(), email="other@example.com", subscription_tier=SubscriptionTier.PRO,
+                 subscription_status=SubscriptionStatus.ACTIVE)
+    db.add_all([user, other])
+    db.commit()
+
+    service = AnalyticsService(db)
+    service.event_writer = AnalyticsEventWriter(session_factory=factory, flush_interval=60)
+
+    async def track():
+        for score in (0.5, 0.7, 0.9):
+            await service.track_event(str(user.id), AnalyticsEventType.KEYWORD_OPTIMIZATION, {"match_score": score})
+        await service.track_event(str(user.id), AnalyticsEventType.TEMPLATE_USAGE, {"template": "modern"})
+        await service.track_event(str(other.id), AnalyticsEventType.RESUME_GENERATED, {})
+
+    asyncio.run(track())
+    # Outside the 7-day window
+    service.event_writer.record(user.id, "resume_generated", timestamp=datetime.utcnow() - timedelta(days=20))
+    service.event_writer.flush()
+
+    assert len(service._get_user_events_in_range(str(user.id), datetime.utcnow() - timedelta(days=30),
+                                                 datetime.utcnow())) == 5
+    dashboard = asyncio.run(service.get_user_analytics_dashboard(str(user.id), "7d"))
+    assert "error" not in dashboard
+    assert dashboard["keyword_optimization"]["average_optimization_score"] == 70.0
+    assert dashboard["keyword_optimization"]["recent_scores"] == [50.0, 70.0, 90.0]
+    assert dashboard["template_performance"]["modern"]["usage_count"] == 1
+    assert sum(dashboard["usage_trends"]["daily_usage"].values()) == 4
+
+
+def _rollup_rows(db):
+    return sorted(
+        (str(r.user_id), r.day, r.event_type, r.dimension, r.event_count, r.score_count,
+         round(r.score_sum, 6), r.score_max)
+        for r in db.query(AnalyticsDailyRollup).all()
+    )
+
+
+def test_incremental_rollups_match_rebuild_and_invalidate_cached_dashboards():
+    factory = _session_factory()
+    db = factory()
+    user = User(id=uuid.uuid4(), email="rollup@example.com", subscription_tier=SubscriptionTier.PRO,
+                subscription_status=SubscriptionStatus.ACTIVE)
+    db.add(user)
+    db.commit()
+
+    service = AnalyticsService(db)
+    writer = service.event_writer = AnalyticsEventWriter(session_factory=factory, flush_interval=60, batch_size=7)
+    now = datetime.utcnow()
+    for i in range(40):
+        writer.record(user.id, "keyword_optimization", {"match_score": (i % 10) / 10},
+                      timestamp=now - timedelta(days=i % 4, minutes=i))
+        writer.record(user.id, "template_usage", {"template": "modern" if i % 3 else "classic"},
+                      timestamp=now - timedelta(days=i % 5))
+    # Split across two flushes so rows are upserted, not only inserted
+    writer.flush()
+    writer.record(user.id, "keyword_optimization", {"match_score": 0.95}, timestamp=now)
+    writer.flush()
+
+    incremental = _rollup_rows(db)
+    assert rebuild_daily_rollups(db) == len(incremental)
+    assert _rollup_rows(db) == incremental
+
+    first = asyncio.run(service.get_user_analytics_dashboard(str(user.id), "7d"))
+    assert first["keyword_optimization"]["best_score"] == 95.0
+    assert first["keyword_optimization"]["recent_scores"][-1] == 95.0
+    assert first["template_performance"]["classic"]["usage_count"] == 14
+    assert first["feature_adoption"]["template_usage"]["usage_count"] == 40
+    assert asyncio.run(service.get_user_analytics_dashboard(str(user.id), "7d")) is first
+
+    writer.record(user.id, "cover_letter_generated", {})
+    writer.flush()
+    refreshed = asyncio.run(service.get_user_analytics_dashboard(str(user.id), "7d"))
+    assert refreshed is not first
+    assert refreshed["overview"]["total_cover_letters_generated"] == 1
+    assert get_dashboard_cache().get_stats()["invalidations"] >= 1
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta
+from pathlib import Path
+import sys
+import uuid
+
+ROOT = Path(__file__).resolve().parents[2]
+BACKEND = ROOT / "backend"
+if str(BACKEND) not in sys.path:
+    sys.path.insert(0, str(BACKEND))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import models.file_metadata  # noqa: F401
+from models.user import Base, User, Subscription, SubscriptionTier, SubscriptionStatus
+from services import subscription_lifecycle_service as lifecycle_module
+from services.subscription_lifecycle_service import SubscriptionLifecycleService
+from services.subscription_service import SubscriptionService
+
+
+def _session_factory():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)
+
+
+def _add_user(db, **fields):
+    user = User(id=uuid.uuid4(), email=f"{uuid.uuid4().hex}@example.com", **fields)
+    db.add(user)
+    return user
+
+
+def test_bulk_weekly_reset_pages_through_due_users():
+    db = _session_factory()()
+    old = datetime.utcnow() - timedelta(days=8)
+    due = [_add_user(db, weekly_usage_count=4, weekly_usage_reset=old) for _ in range(5)]
+    fresh = _add_user(db, weekly_usage_count=3, weekly_usage_reset=datetime.utcnow())
+    db.commit()
+
+    stats = SubscriptionService(db).bulk_reset_weekly_usage(chunk_size=2)
+    assert stats.rows_updated == 5
+    assert stats.chunks == 3
+
+    db.expire_all()
+    assert all(user.weekly_usage_count == 0 for user in due)
+    assert fresh.weekly_usage_count == 3
+
+
+class _FakeEmailService:
+    def __init__(self):
+        self.expired = []
+
+    async def send_subscription_expired_notification(self, email, name):
+        self.expired.append(email)
+
+
+def test_expired_subscriptions_downgraded_with_metrics(monkeypatch):
+    Session = _session_factory()
+    db = Session()
+    past = datetime.utcnow() - timedelta(days=2)
+    expired = _add_user(db, subscription_tier=SubscriptionTier.PRO, subscription_status=SubscriptionStatus.CANCELED,
+                        current_period_end=past)
+    renewing = _add_user(db, subscription_tier=SubscriptionTier.PRO, subscription_status=SubscriptionStatus.ACTIVE,
+                         current_period_end=past, cancel_at_period_end=False)
+    db.flush()
+    db.add(Subscription(user_id=expired.id, stripe_customer_id="cus_1", status=SubscriptionStatus.ACTIVE,
+                        tier=SubscriptionTier.PRO))
+    db.commit()
+
+    monkeypatch.setattr(lifecycle_module, "SessionLocal", Session)
+    service = SubscriptionLifecycleService()
+    service.email_service = _FakeEmailService()
+    service.subscription_service = service.payment_service = object()  # no Stripe needed
+    result = asyncio.run(service.process_expired_subscriptions())
+
+    assert result.success and result.processed_count == 1
+    assert result.details["bulk_update"]["rows_updated"] == 1
+    assert service.email_service.expired == [expired.email]
+
+    db.expire_all()
+    assert expired.subscription_tier == SubscriptionTier.FREE
+    assert renewing.subscription_tier == SubscriptionTier.PRO
+    subscription = db.query(Subscription).one()
+    assert subscription.status == SubscriptionStatus.CANCELED and subscription.canceled_at is not None
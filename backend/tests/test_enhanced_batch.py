@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from pathlib import Path
+import sys
+
+ROOT = Path(__file__).resolve().parents[2]
+BACKEND = ROOT / "backend"
+if str(BACKEND) not in sys.path:
+    sys.path.insert(0, str(BACKEND))
+
+import pytest
+
+from routes import enhanced_batch
+
+JOB = {
+    "title": "Data Engineer",
+    "company": "Acme",
+    "description": "Build Spark pipelines and own the warehouse.",
+    "scraped_successfully": True,
+}
+
+
+@pytest.fixture
+def short_plan(monkeypatch):
+    """Give each job's generation plan the 1s minimum deadline"""
+    processor = enhanced_batch.enhanced_processor
+    monkeypatch.setattr(enhanced_batch, "GENERATION_HEADROOM_SECONDS", 29.5)
+    monkeypatch.setattr(processor, "scrape_job", lambda url: dict(JOB))
+    return processor
+
+
+def run_job(cover_letter: bool):
+    options = {"includeCoverLetter": True, "coverLetterDetails": {"tone": "professional"}} if cover_letter else None
+    return asyncio.run(enhanced_batch.process_single_job_enhanced(
+        "Jane Doe\nEXPERIENCE\n- Built pipelines", "https://example.com/jobs/1", 0, "missing-batch",
+        cover_letter_options=options, output_format="text",
+    ))
+
+
+def test_tailoring_timeout_reports_the_job_as_timed_out(short_plan, monkeypatch):
+    def slow_tailoring(resume_text, job_data, tailoring_mode):
+        time.sleep(1.5)
+        return "TAILORED"
+
+    monkeypatch.setattr(enhanced_batch, "_tailor_resume_text", slow_tailoring)
+
+    result = run_job(cover_letter=False)
+
+    assert result["status"] == "timeout" and result["tailored_resume"] is None
+
+
+def test_cover_letter_timeout_falls_back_to_the_template(short_plan, monkeypatch):
+    def slow_letter(*args, **kwargs):
+        time.sleep(1.5)
+        return "GPT LETTER"
+
+    monkeypatch.setattr(enhanced_batch, "_tailor_resume_text", lambda resume_text, job_data, mode: "TAILORED")
+    monkeypatch.setattr(short_plan, "generate_cover_letter", slow_letter)
+
+    result = run_job(cover_letter=True)
+
+    assert result["status"] == "completed" and result["tailored_resume"] == "TAILORED"
+    assert result["cover_letter"] == short_plan.template_cover_letter(JOB, "professional")
+    assert result["generation"]["steps"]["cover_letter"]["error"] == "timed out"
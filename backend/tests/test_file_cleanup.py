@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta
+import os
+from pathlib import Path
+import sys
+import time
+
+ROOT = Path(__file__).resolve().parents[2]
+BACKEND = ROOT / "backend"
+if str(BACKEND) not in sys.path:
+    sys.path.insert(0, str(BACKEND))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from models.file_metadata import FileMetadata
+from models.user import Base
+from services.file_cleanup_service import FileCleanupService
+
+
+def _file(path: Path, age_hours: float, size: int = 1024) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * size)
+    stamp = time.time() - age_hours * 3600
+    os.utime(path, (stamp, stamp))
+    return path
+
+
+def test_cleanup_loops_batches_and_removes_orphans(tmp_path):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+
+    uploads = tmp_path / "uploads"
+    old = datetime.utcnow() - timedelta(hours=30)
+    expired = [_file(uploads / "a" / f"expired{i}.pdf", 30) for i in range(4)]
+    for path in expired + [uploads / "gone.pdf"]:
+        db.add(FileMetadata(file_path=str(path), original_filename=path.name, created_at=old,
+                            expires_at=old + timedelta(hours=24)))
+    tracked = _file(uploads / "b" / "fresh.pdf", 30)
+    db.add(FileMetadata(file_path=str(tracked), original_filename="fresh.pdf", file_size_bytes=1024))
+    old_orphan = _file(uploads / "b" / "c" / "orphan.pdf", 48, size=2048)
+    new_orphan = _file(uploads / "new.pdf", 1)
+    db.commit()
+
+    service = FileCleanupService(str(uploads), session_factory=Session, batch_size=2)
+    stats = asyncio.run(service.cleanup_expired_files())
+
+    assert stats["records_deleted"] == 5 and stats["batches"] == 3
+    assert stats["orphans_deleted"] == 1
+    assert stats["files_deleted"] == 5 and stats["errors"] == 0
+    assert stats["entries_scanned"] == 3
+    assert not any(path.exists() for path in expired) and not old_orphan.exists()
+    assert tracked.exists() and new_orphan.exists()
+    assert db.query(FileMetadata).count() == 1
+
+    summary = asyncio.run(service.get_cleanup_stats())
+    assert summary["total_files"] == 1 and summary["expired_files"] == 0
+    assert summary["last_run"]["records_deleted"] == 5
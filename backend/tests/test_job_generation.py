@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import threading
+import time
+from pathlib import Path
+import sys
+
+ROOT = Path(__file__).resolve().parents[2]
+BACKEND = ROOT / "backend"
+if str(BACKEND) not in sys.path:
+    sys.path.insert(0, str(BACKEND))
+
+import pytest
+
+from services.job_generation import GenerationCancelled, JobGenerationPlan
+
+
+def slow(value, seconds=0.3, calls=None):
+    time.sleep(seconds)
+    if calls is not None:
+        calls.append(value)
+    return value
+
+
+def test_resume_and_cover_letter_run_concurrently():
+    async def scenario():
+        async with JobGenerationPlan(timeout=5) as plan:
+            plan.add("resume", slow, "tailored")
+            plan.add("cover_letter", slow, "letter", required=False)
+            return await plan.result("resume"), await plan.result("cover_letter"), plan.summary()
+
+    started = time.perf_counter()
+    resume, letter, summary = asyncio.run(scenario())
+    elapsed = time.perf_counter() - started
+
+    assert (resume, letter) == ("tailored", "letter")
+    # Sequential would be ~0.6s
+    assert elapsed < 0.5
+    assert summary["steps"]["cover_letter"]["error"] is None
+    assert summary["steps"]["resume"]["duration_ms"] >= 250
+
+
+def test_optional_step_timeout_yields_none_without_failing_the_job():
+    async def scenario():
+        async with JobGenerationPlan(timeout=5) as plan:
+            plan.add("resume", slow, "tailored", 0.05)
+            plan.add("cover_letter", slow, "letter", 1.0, required=False, timeout=0.2)
+            return await plan.result("resume"), await plan.result("cover_letter"), plan.summary()
+
+    resume, letter, summary = asyncio.run(scenario())
+
+    assert resume == "tailored"
+    assert letter is None
+    assert summary["steps"]["cover_letter"]["error"] == "timed out"
+
+
+def test_required_failure_cancels_the_other_steps():
+    def boom():
+        time.sleep(0.1)
+        raise RuntimeError("model unavailable")
+
+    async def scenario():
+        async with JobGenerationPlan(timeout=5) as plan:
+            plan.add("resume", boom)
+            plan.add("cover_letter", slow, "letter", 0.3, required=False)
+            with pytest.raises(RuntimeError, match="model unavailable"):
+                await plan.result("resume")
+            return plan, await plan.result("cover_letter")
+
+    plan, letter = asyncio.run(scenario())
+
+    # The letter's thread may still finish, but its outcome is dropped
+    assert letter is None
+    assert plan.cancel_event.is_set()
+    assert plan.summary()["steps"]["cover_letter"]["error"] == "cancelled"
+
+
+def test_outer_cancellation_cancels_every_step():
+    calls = []
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+    plans = []
+
+    async def job():
+        plan = JobGenerationPlan(executor=executor)
+        plans.append(plan)
+        plan.add("resume", slow, "tailored", 0.3, calls)
+        plan.add("cover_letter", slow, "letter", 0.3, calls, required=False)
+        await plan.result("resume")
+        return await plan.result("cover_letter")
+
+    async def scenario():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(job(), timeout=0.1)
+
+    asyncio.run(scenario())
+    executor.shutdown(wait=True)
+
+    assert plans[0].cancel_event.is_set()
+    # The running step finishes in its thread, but the queued one never starts
+    assert calls == ["tailored"]
+
+
+def test_cancelled_step_raises_for_required_results():
+    gate = threading.Event()
+
+    async def scenario():
+        plan = JobGenerationPlan(timeout=5)
+        plan.add("resume", gate.wait, 1)
+        plan.cancel()
+        with pytest.raises(GenerationCancelled):
+            await plan.result("resume")
+
+    asyncio.run(scenario())
+    gate.set()
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import os
+import threading
+from pathlib import Path
+import sys
+
+ROOT = Path(__file__).resolve().parents[2]
+BACKEND = ROOT / "backend"
+if str(BACKEND) not in sys.path:
+    sys.path.insert(0, str(BACKEND))
+
+import pytest
+
+pytest.importorskip("faiss")
+from utils.job_vector_store import CachedEmbeddings, EmbeddingCache, JobVectorStore, LocalHashEmbedder
+
+JOBS = [
+    {"id": "1", "job_title": "Data Engineer", "url": "https://jobs.test/1",
+     "job_description": "Build Spark and Airflow pipelines on AWS. Python, SQL and data modeling."},
+    {"id": "2", "job_title": "Product Designer", "url": "https://jobs.test/2",
+     "job_description": "Own Figma prototypes, user research and design systems for mobile apps."},
+    {"id": "3", "job_title": "Backend Engineer", "url": "https://jobs.test/3",
+     "job_description": "Design REST APIs in Go and Python, Postgres, Kubernetes deployments."},
+]
+
+
+class CountingEmbedder(LocalHashEmbedder):
+    def __init__(self):
+        super().__init__(dimensions=128)
+        self.embedded = 0
+
+    def embed_documents(self, texts):
+        self.embedded += len(texts)
+        return super().embed_documents(texts)
+
+
+def _store(tmp_path, embedder):
+    embeddings = CachedEmbeddings(embedder, EmbeddingCache(str(tmp_path / "cache.sqlite3")))
+    return JobVectorStore(str(tmp_path / "jobs"), embeddings, chunk_size=60, chunk_overlap=0)
+
+
+def test_store_appends_dedupes_and_persists(tmp_path):
+    embedder = CountingEmbedder()
+    store = _store(tmp_path, embedder)
+    assert not store.is_available()
+
+    added = store.add_jobs(JOBS[:2])
+    assert added == store.ntotal > 2  # several chunks per job
+    assert store.add_jobs(JOBS[:2]) == 0
+    assert store.add_jobs([dict(JOBS[0], id="dup", job_description=JOBS[0]["job_description"].upper())]) == 0
+    third = store.add_jobs(JOBS)
+    assert third > 0 and store.ntotal == added + third
+    assert embedder.embedded == store.ntotal
+
+    top = store.similarity_search("REST APIs in Go and Python", k=1)[0]
+    assert top.metadata["job_title"] == "Backend Engineer"
+
+    # Only the newest versions are kept, behind the CURRENT pointer
+    versions = [name for name in os.listdir(tmp_path / "jobs") if name.startswith("v-")]
+    assert len(versions) == 2
+    assert (tmp_path / "jobs" / "CURRENT").read_text() in versions
+
+    # A fresh process loads the saved index and knows which chunks it holds
+    reloaded = _store(tmp_path, CountingEmbedder())
+    assert reloaded.ntotal == store.ntotal
+    assert reloaded.add_jobs(JOBS) == 0
+
+
+def test_searches_do_not_wait_for_indexing_to_embed(tmp_path):
+    embedder = CountingEmbedder()
+    store = _store(tmp_path, embedder)
+    store.add_jobs(JOBS[:1])
+
+    embedding, release = threading.Event(), threading.Event()
+    embed_documents = embedder.embed_documents
+
+    def slow_embed_documents(texts):
+        embedding.set()
+        assert release.wait(5)
+        return embed_documents(texts)
+
+    embedder.embed_documents = slow_embed_documents
+    indexer = threading.Thread(target=store.add_jobs, args=(JOBS[1:],))
+    indexer.start()
+    try:
+        assert embedding.wait(5)
+        # The indexer is blocked inside the embedding call; the search still runs
+        searcher = threading.Thread(target=store.similarity_search, args=("Spark pipelines",))
+        searcher.start()
+        searcher.join(2)
+        assert not searcher.is_alive()
+    finally:
+        release.set()
+        indexer.join(5)
+
+    assert store.similarity_search("REST APIs in Go and Python", k=1)[0].metadata["job_title"] == "Backend Engineer"
+    assert _store(tmp_path, CountingEmbedder()).ntotal == store.ntotal
+
+
+def test_embedding_cache_is_reused_across_stores(tmp_path):
+    first = CountingEmbedder()
+    _store(tmp_path, first).add_jobs(JOBS)
+
+    # Rebuilding into a new directory with the same cache embeds nothing
+    second = CountingEmbedder()
+    cache = EmbeddingCache(str(tmp_path / "cache.sqlite3"))
+    rebuilt = JobVectorStore(str(tmp_path / "rebuilt"), CachedEmbeddings(second, cache), chunk_size=60, chunk_overlap=0)
+    assert rebuilt.add_jobs(JOBS) == first.embedded
+    assert second.embedded == 0
+    assert rebuilt.embeddings.stats["cache_hits"] == first.embedded
+
+
+def test_processor_uses_shared_local_store(tmp_path, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setenv("JOB_VECTOR_EMBEDDER", "local")
+    monkeypatch.setenv("JOB_VECTOR_STORE_PATH", str(tmp_path / "shared"))
+    monkeypatch.setenv("JOB_VECTOR_EMBEDDING_CACHE", str(tmp_path / "shared-cache.sqlite3"))
+    from utils.langchain_processor import LangChainResumeProcessor
+
+    first, second = LangChainResumeProcessor(), LangChainResumeProcessor()
+    assert first.load_job_vectorstore() is False
+    assert first.initialize_job_vectorstore(JOBS)
+    assert second.load_job_vectorstore() is True
+    assert second.job_vectorstore is first.job_vectorstore
+    assert second.retrieve_similar_jobs("Figma design systems", k=1)[0].metadata["job_id"] == "2"
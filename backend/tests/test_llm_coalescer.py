@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import sys
+from types import SimpleNamespace
+
+ROOT = Path(__file__).resolve().parents[2]
+BACKEND = ROOT / "backend"
+if str(BACKEND) not in sys.path:
+    sys.path.insert(0, str(BACKEND))
+
+import pytest
+
+from utils import gpt_prompt
+from utils.llm_coalescer import LLMRequestCoalescer, prompt_fingerprint
+
+
+def test_identical_concurrent_calls_share_one_request():
+    coalescer = LLMRequestCoalescer(default_limit=4)
+    calls = []
+    release = threading.Event()
+
+    def call():
+        calls.append(1)
+        release.wait(5)
+        return {"text": "tailored"}
+
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        futures = [pool.submit(coalescer.run, "gpt-4o-mini", ["system", "resume\n\n  and JD"], call)
+                   for _ in range(5)]
+        # Whitespace differences normalize to the same fingerprint
+        futures.append(pool.submit(coalescer.run, "gpt-4o-mini", ["system", "resume and JD"], call))
+        deadline = time.time() + 5
+        while coalescer.get_stats()["deduplicated"] < 5 and time.time() < deadline:
+            time.sleep(0.01)
+        release.set()
+        results = [future.result(timeout=5) for future in futures]
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    stats = coalescer.get_stats()
+    assert stats["calls"] == 6 and stats["executed"] == 1 and stats["deduplicated"] == 5
+    assert stats["in_flight_requests"] == 0
+
+    # Completed calls are not cached; different models/params never coalesce
+    coalescer.run("gpt-4o-mini", ["system", "resume and JD"], call)
+    assert len(calls) == 2
+    assert prompt_fingerprint("gpt-4o", ["a"]) != prompt_fingerprint("gpt-4o-mini", ["a"])
+
+
+def test_leader_errors_propagate_to_followers_and_limits_apply():
+    coalescer = LLMRequestCoalescer(default_limit=1, model_limits={"big-model": 2})
+    started = threading.Event()
+
+    def failing():
+        started.set()
+        time.sleep(0.1)
+        raise RuntimeError("rate limited")
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        leader = pool.submit(coalescer.run, "m", ["same"], failing)
+        started.wait(5)
+        follower = pool.submit(coalescer.run, "m", ["same"], failing)
+        for future in (leader, follower):
+            with pytest.raises(RuntimeError):
+                future.result(timeout=5)
+    assert coalescer.get_stats()["errors"] == 1
+
+    active = []
+    peak = []
+
+    def tracked():
+        active.append(1)
+        peak.append(len(active))
+        time.sleep(0.05)
+        active.pop()
+        return True
+
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        assert all(pool.map(lambda i: coalescer.run("big-model", [str(i)], tracked), range(6)))
+    assert max(peak) <= 2
+    assert coalescer.get_stats()["models"]["big-model"]["limit"] == 2
+
+
+def test_gpt_processor_coalesces_duplicate_cover_letters(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    coalescer = LLMRequestCoalescer()
+    monkeypatch.setattr(gpt_prompt, "get_llm_coalescer", lambda: coalescer)
+    release = threading.Event()
+    requests = []
+
+    def create(**kwargs):
+        requests.append(kwargs)
+        release.wait(5)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="Dear team"))])
+
+    processor = gpt_prompt.GPTProcessor()
+    processor._initialized = True
+    processor.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        futures = [pool.submit(processor.generate_cover_letter, "Resume", "Job description", "Engineer")
+                   for _ in range(3)]
+        deadline = time.time() + 5
+        while coalescer.get_stats()["deduplicated"] < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        release.set()
+        assert [future.result(timeout=5) for future in futures] == ["Dear team"] * 3
+    assert len(requests) == 1
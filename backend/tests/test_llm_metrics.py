@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import sys
+from types import SimpleNamespace
+
+ROOT = Path(__file__).resolve().parents[2]
+BACKEND = ROOT / "backend"
+if str(BACKEND) not in sys.path:
+    sys.path.insert(0, str(BACKEND))
+
+import httpx
+import openai
+import pytest
+
+from utils import gpt_prompt, llm_metrics
+from utils.llm_coalescer import LLMRequestCoalescer
+from utils.llm_metrics import Histogram, LLMMetrics, estimate_cost, track_llm_call
+
+
+@pytest.fixture
+def metrics(monkeypatch):
+    metrics = LLMMetrics()
+    monkeypatch.setattr(llm_metrics, "get_llm_metrics", lambda: metrics)
+    backoff = llm_metrics.LLMCallTracker._backoff
+    # Retry immediately
+    monkeypatch.setattr(llm_metrics.LLMCallTracker, "_backoff",
+                        lambda self, attempt, error: None if backoff(self, attempt, error) is None else 0.0)
+    return metrics
+
+
+def completion(text: str, prompt_tokens: int = 1200, completion_tokens: int = 800):
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=text))],
+        usage=SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens),
+    )
+
+
+def test_records_queue_wait_usage_retries_and_coalesced_calls(metrics):
+    coalescer = LLMRequestCoalescer(default_limit=1)
+    release = threading.Event()
+    attempts = []
+
+    def create(text):
+        attempts.append(text)
+        if text == "flaky" and attempts.count("flaky") == 1:
+            raise openai.APIConnectionError(request=httpx.Request("POST", "https://api.openai.com"))
+        release.wait(5)
+        return completion(text)
+
+    def tailor(text):
+        with track_llm_call("resume_tailoring", "gpt-4o-mini") as call:
+            response = coalescer.run("gpt-4o-mini", [text], call.wrap(lambda: create(text)))
+            call.set_output(response.choices[0].message.content)
+            return call
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        leader = pool.submit(tailor, "same")
+        while coalescer.get_stats()["executed"] < 1:
+            time.sleep(0.01)
+        follower = pool.submit(tailor, "same")
+        queued = pool.submit(tailor, "flaky")  # waits for the model's single slot
+        time.sleep(0.2)
+        release.set()
+        leader, follower, queued = (future.result(timeout=5) for future in (leader, follower, queued))
+
+    snapshot = metrics.snapshot()
+    entry = snapshot["calls"][0]
+    assert (entry["operation"], entry["model"], entry["calls"]) == ("resume_tailoring", "gpt-4o-mini", 3)
+    assert entry["statuses"] == {"ok": 2, "coalesced": 1}
+    assert entry["retries"] == 1 and queued.retries == 1
+    # Tokens and cost are counted once per provider request, not per caller
+    assert entry["histograms"]["prompt_tokens"]["count"] == 2
+    assert snapshot["total_cost_usd"] == pytest.approx(2 * estimate_cost("gpt-4o-mini", 1200, 800))
+    assert queued.record("ok").queue_wait_ms >= 150
+    assert follower.record("ok").status == "coalesced"
+
+
+def test_errors_and_timeouts_are_recorded(metrics):
+    def fails():
+        raise openai.BadRequestError("bad prompt", response=httpx.Response(400, request=httpx.Request("POST", "https://x")), body=None)
+
+    with pytest.raises(openai.BadRequestError):
+        with track_llm_call("cover_letter", "gpt-4o-mini") as call:
+            call.wrap(fails)()
+    assert call.retries == 0  # not retryable
+
+    async def slow():
+        async with track_llm_call("premium_cover_letter", "gpt-4") as call:
+            await asyncio.wait_for(call.run_async(lambda: asyncio.sleep(1)), timeout=0.01)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(slow())
+
+    statuses = {entry["operation"]: entry["statuses"] for entry in metrics.snapshot()["calls"]}
+    assert statuses == {"cover_letter": {"error": 1}, "premium_cover_letter": {"timeout": 1}}
+
+
+def test_histogram_percentiles_and_cumulative_buckets():
+    histogram = Histogram((100, 1000, 10000))
+    for value in [50] * 50 + [500] * 45 + [5000] * 5:
+        histogram.observe(value)
+
+    snapshot = histogram.snapshot()
+    assert snapshot["count"] == 100 and snapshot["max"] == 5000
+    assert [bucket["count"] for bucket in snapshot["buckets"]] == [50, 95, 100, 100]
+    assert 50 <= snapshot["p50"] <= 100
+    assert 100 < snapshot["p95"] <= 1000
+    assert estimate_cost("gpt-4o-mini-2024-07-18", 1_000_000, 0) == pytest.approx(0.15)
+    assert estimate_cost("unknown-model", 10, 10) is None
+
+
+def test_gpt_processor_tailoring_is_instrumented(monkeypatch, metrics):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setattr(gpt_prompt, "get_llm_coalescer", lambda: LLMRequestCoalescer())
+    processor = gpt_prompt.GPTProcessor()
+    processor._initialized = True
+    processor.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(
+        create=lambda **kwargs: completion("JANE DOE\nTailored resume", 3000, 1500))))
+
+    assert processor.tailor_resume("JANE DOE\nResume", "Job description", "Engineer") == "JANE DOE\nTailored resume"
+
+    entry = metrics.snapshot()["calls"][0]
+    assert entry["operation"] == "resume_tailoring" and entry["statuses"] == {"ok": 1}
+    assert entry["histograms"]["completion_tokens"]["sum"] == 1500
@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import asyncio
+from email.message import EmailMessage
+from pathlib import Path
+import socket
+import sys
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+BACKEND = ROOT / "backend"
+if str(BACKEND) not in sys.path:
+    sys.path.insert(0, str(BACKEND))
+
+pytest.importorskip("aiosmtpd")
+from aiosmtpd.controller import Controller
+
+from utils import email_service as email_module
+from utils.email_service import EmailService
+from utils.mail_delivery import MailDelivery, SMTPConnectionPool
+
+
+class _Inbox:
+    def __init__(self):
+        self.messages = []
+        self.sessions = set()
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope)
+        self.sessions.add(id(session))
+        return "250 OK"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server():
+    inbox = _Inbox()
+    controller = Controller(inbox, hostname="127.0.0.1", port=_free_port())
+    controller.start()
+    yield controller, inbox
+    controller.stop()
+
+
+def _delivery(port: int, **pool_kwargs) -> MailDelivery:
+    pool = SMTPConnectionPool("127.0.0.1", port, start_tls=False, **pool_kwargs)
+    return MailDelivery(pool, concurrency=pool.max_connections)
+
+
+def _message(i: int) -> EmailMessage:
+    message = EmailMessage()
+    message["From"] = "noreply@applyai.test"
+    message["To"] = f"user{i}@example.com"
+    message["Subject"] = f"Message {i}"
+    message.set_content("hello")
+    return message
+
+
+def test_queue_reuses_pooled_connections(smtp_server):
+    controller, inbox = smtp_server
+    delivery = _delivery(controller.port, max_connections=3)
+    try:
+        futures = [delivery.submit(_message(i)) for i in range(30)]
+        assert all(future.result(timeout=10) for future in futures)
+    finally:
+        delivery.stop()
+
+    assert len(inbox.messages) == 30
+    stats = delivery.get_stats()
+    assert stats["sent"] == 30 and stats["failed"] == 0
+    assert stats["pool"]["connections_opened"] <= 3
+    assert len(inbox.sessions) <= 3
+
+
+def test_pool_reconnects_after_server_restart():
+    inbox = _Inbox()
+    port = _free_port()
+    controller = Controller(inbox, hostname="127.0.0.1", port=port)
+    controller.start()
+    delivery = _delivery(port, max_connections=1, idle_check_seconds=3600)
+    try:
+        assert delivery.submit(_message(0)).result(timeout=10)
+        controller.stop()  # pooled connection is now dead
+        controller = Controller(inbox, hostname="127.0.0.1", port=port)
+        controller.start()
+        assert delivery.submit(_message(1)).result(timeout=10)
+    finally:
+        delivery.stop()
+        controller.stop()
+
+    assert [m.rcpt_tos for m in inbox.messages] == [["user0@example.com"], ["user1@example.com"]]
+    assert delivery.get_stats()["pool"]["reconnects"] == 1
+
+
+def test_email_service_renders_cached_templates_through_queue(smtp_server, monkeypatch):
+    controller, inbox = smtp_server
+    delivery = _delivery(controller.port, max_connections=2)
+    monkeypatch.setattr(email_module, "get_mail_delivery", lambda: delivery)
+
+    service = EmailService()
+    service.settings = service.settings.model_copy(update={
+        "environment": "production", "smtp_username": "mailer", "smtp_password": "secret",
+    })
+    assert service._get_template("renewal_reminder") is service._get_template("renewal_reminder")
+
+    async def send_batch():
+        return await asyncio.gather(*(
+            service.send_downgrade_notification(f"user{i}@example.com", f"User {i}") for i in range(10)
+        ))
+
+    try:
+        assert asyncio.run(send_batch()) == [True] * 10
+        assert service.send_email_sync("solo@example.com", "Hi", "custom", {"content": "Body"})
+    finally:
+        delivery.stop()
+
+    assert len(inbox.messages) == 11
+    assert b"Downgraded to Free" in inbox.messages[0].content
+
+
+class _StalledInbox(_Inbox):
+    def __init__(self, delay: float = 5):
+        super().__init__()
+        self.delay = delay
+
+    async def handle_DATA(self, server, session, envelope):
+        await asyncio.sleep(self.delay)
+        return await super().handle_DATA(server, session, envelope)
+
+
+def test_stop_resolves_messages_it_could_not_send():
+    controller = Controller(_StalledInbox(), hostname="127.0.0.1", port=_free_port())
+    controller.start()
+    delivery = _delivery(controller.port, max_connections=1, timeout=1)
+    try:
+        futures = [delivery.submit(_message(i)) for i in range(3)]
+        delivery.stop(timeout=0.2)
+        assert [future.result(timeout=5) for future in futures] == [False] * 3
+        assert delivery.get_stats()["failed"] == 3
+    finally:
+        controller.stop()
+
+
+def test_send_email_timeout_withdraws_queued_mail_and_awaits_mail_in_flight(monkeypatch):
+    inbox = _StalledInbox(delay=1)
+    controller = Controller(inbox, hostname="127.0.0.1", port=_free_port())
+    controller.start()
+    delivery = _delivery(controller.port, max_connections=1)
+    monkeypatch.setattr(email_module, "get_mail_delivery", lambda: delivery)
+
+    service = EmailService()
+    service.settings = service.settings.model_copy(update={
+        "environment": "production", "smtp_username": "mailer", "smtp_password": "secret",
+    })
+    service.send_timeout = 0.3
+
+    async def send_batch():
+        return await asyncio.gather(*(
+            service.send_email(f"user{i}@example.com", "Hi", "custom", {"content": "Body"}) for i in range(3)
+        ))
+
+    try:
+        # The first message is already on the wire when the timeout fires; the
+        # other two are still queued, so they are withdrawn and never sent
+        assert asyncio.run(send_batch()) == [True, False, False]
+        delivery.flush(timeout=5)
+    finally:
+        delivery.stop(timeout=1)
+        controller.stop()
+
+    assert [m.rcpt_tos for m in inbox.messages] == [["user0@example.com"]]
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+
+ROOT = Path(__file__).resolve().parents[2]
+BACKEND = ROOT / "backend"
+if str(BACKEND) not in sys.path:
+    sys.path.insert(0, str(BACKEND))
+
+import pytest
+from reportlab.pdfbase import pdfmetrics
+
+from services.advanced_formatting_service import AdvancedFormattingService, FontFamily, FormattingOptions
+from services.professional_output_service import ProfessionalTemplateEngine
+from utils.pdf_styles import STANDARD_FONTS, StyleRegistry, get_style_registry
+from utils.resume_editor import ResumeEditor
+
+
+def custom_styles(service: AdvancedFormattingService, options: FormattingOptions):
+    return service._create_custom_styles(
+        options,
+        service.template_configs[options.template],
+        service.color_schemes[options.color_scheme],
+        service.font_mappings[options.font_family],
+    )
+
+
+def test_registry_builds_each_configuration_once():
+    registry = StyleRegistry(max_entries=2)
+    builds = []
+
+    def build():
+        builds.append(1)
+        return {"body": object()}
+
+    first = registry.get(("a", 10), build)
+    assert registry.get(("a", 10), build) is first
+    registry.get(("b", 10), build)
+    registry.get(("c", 10), build)  # evicts ("a", 10)
+    registry.get(("a", 10), build)
+
+    assert len(builds) == 4
+    assert registry.stats == {"hits": 1, "misses": 4}
+    with pytest.raises(TypeError):
+        first["body"] = None
+    assert all(font in pdfmetrics.getRegisteredFontNames() for font in STANDARD_FONTS)
+
+
+def test_renderers_share_style_sets_per_configuration():
+    get_style_registry().clear()
+    service = AdvancedFormattingService()
+
+    standard = custom_styles(service, FormattingOptions())
+    assert custom_styles(AdvancedFormattingService(), FormattingOptions()) is standard
+    times = custom_styles(service, FormattingOptions(font_family=FontFamily.TIMES))
+    assert times is not standard and times["body"].fontName == "Times-Roman"
+    assert custom_styles(service, FormattingOptions(font_size=11)) is not standard
+
+    assert ResumeEditor().styles is ResumeEditor().styles
+    assert ResumeEditor().styles["ResumeBody"].parent is ResumeEditor().styles["Normal"]
+    engine = ProfessionalTemplateEngine()
+    assert engine.get_template_styles("classic") is ProfessionalTemplateEngine().get_template_styles("classic")
+    assert engine.get_template_styles("unknown") is engine.get_template_styles("modern")
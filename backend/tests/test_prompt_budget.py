@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+
+ROOT = Path(__file__).resolve().parents[2]
+BACKEND = ROOT / "backend"
+if str(BACKEND) not in sys.path:
+    sys.path.insert(0, str(BACKEND))
+
+from models.user import TailoringMode
+from utils import gpt_prompt
+from utils.prompt_budget import (
+    PromptBudget,
+    PromptSection,
+    assemble_prompt,
+    count_tokens,
+    strip_jd_boilerplate,
+)
+
+JOB_DESCRIPTION = """About the role
+We are hiring a product manager for our payments platform.
+
+Responsibilities:
+- Own the checkout roadmap
+- Partner with engineering and design
+
+Benefits:
+- Medical, dental and vision insurance
+- Flexible hours
+- Home office stipend
+
+Requirements:
+- 5+ years of product management experience
+- Experience with SQL and experimentation
+
+Acme is an equal opportunity employer. All applicants are considered without regard to race, religion or age.
+"""
+
+
+def test_strip_jd_boilerplate_drops_benefits_and_eeo_only():
+    stripped = strip_jd_boilerplate(JOB_DESCRIPTION)
+
+    assert "Own the checkout roadmap" in stripped
+    assert "5+ years of product management experience" in stripped
+    assert "Requirements:" in stripped
+    assert "Benefits" not in stripped
+    assert "Home office stipend" not in stripped
+    assert "equal opportunity" not in stripped
+    assert count_tokens(stripped) < count_tokens(JOB_DESCRIPTION)
+
+
+def test_strip_jd_boilerplate_keeps_benefit_words_that_are_the_job():
+    benefits_analyst = """Benefits Analyst
+Benefits Analyst role on our People team, administering health insurance, dental and 401(k) plans.
+- Run open enrollment for medical, dental and vision insurance
+- Reconcile 401(k) contributions and paid time off balances
+Requirements:
+- 3+ years in benefits administration
+
+WHAT WE OFFER
+- Unlimited paid time off
+Acme participates in E-Verify.
+"""
+    healthcare = """## Senior Data Engineer
+Build claims pipelines for a health insurance company. We are proud to be an equal opportunity employer.
+- Model dental and vision claims in dbt
+
+**Perks & Benefits**
+- Gym stipend
+"""
+
+    stripped = strip_jd_boilerplate(benefits_analyst)
+    assert stripped.startswith("Benefits Analyst\nBenefits Analyst role on our People team")
+    assert "Run open enrollment for medical, dental and vision insurance" in stripped
+    assert "Reconcile 401(k) contributions" in stripped
+    assert "3+ years in benefits administration" in stripped
+    assert "Unlimited paid time off" not in stripped
+    assert "E-Verify" not in stripped
+
+    stripped = strip_jd_boilerplate(healthcare)
+    assert "Build claims pipelines for a health insurance company." in stripped
+    assert "Model dental and vision claims in dbt" in stripped
+    assert "equal opportunity" not in stripped
+    assert "Gym stipend" not in stripped
+
+
+def test_rag_context_is_trimmed_before_the_job_and_never_the_resume():
+    budget = PromptBudget(max_input_tokens=600, rag_context_tokens=400, min_output_tokens=100)
+    resume = "Built data pipelines for analytics teams. " * 20
+    job = "Looking for a data engineer with Spark experience. " * 20
+    similar = "Similar posting mentioning Airflow and dbt. " * 60
+
+    prompt = assemble_prompt(
+        "STATIC INSTRUCTIONS\n",
+        [
+            PromptSection("job", job, trim_priority=1, min_tokens=150),
+            PromptSection("similar_jobs", similar, trim_priority=0, max_tokens=budget.rag_context_tokens),
+            PromptSection("resume", resume),
+        ],
+        output_basis=resume,
+        budget=budget,
+    )
+
+    assert prompt.text.startswith("STATIC INSTRUCTIONS\n")
+    assert resume.strip() in prompt.text
+    assert prompt.trimmed_tokens["similar_jobs"] > 0
+    assert prompt.input_tokens <= budget.max_input_tokens + 10
+    assert count_tokens(similar) - prompt.trimmed_tokens["similar_jobs"] < budget.rag_context_tokens
+
+
+def test_output_budget_scales_with_resume_and_is_clamped():
+    budget = PromptBudget(min_output_tokens=500, max_output_tokens=4000, output_overhead_tokens=100)
+
+    assert budget.output_tokens_for(50, 1000, ratio=2.0) == 500
+    assert budget.output_tokens_for(1000, 1000, ratio=2.0) == 2100
+    assert budget.output_tokens_for(5000, 1000, ratio=2.0) == 4000
+    assert budget.output_tokens_for(1000, budget.context_window - 300, ratio=2.0) == 300
+
+
+def test_tailoring_prompts_share_a_byte_identical_prefix(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    processor = gpt_prompt.GPTProcessor()
+
+    first = processor._assemble_tailoring_prompt(
+        "JANE DOE\nPROFESSIONAL SUMMARY\nProduct manager.", JOB_DESCRIPTION, "Product Manager",
+        {"includeSkills": True}, TailoringMode.HEAVY,
+    )
+    second = processor._assemble_tailoring_prompt(
+        "JOHN ROE\nEXPERIENCE\n- Built APIs\n" * 120, "Backend engineer, Go and Postgres.", "Engineer",
+        {}, TailoringMode.HEAVY,
+    )
+    light = processor._assemble_tailoring_prompt(
+        "JOHN ROE\nEXPERIENCE\n- Built APIs\n" * 120, "Backend engineer, Go and Postgres.", "Engineer",
+        {}, TailoringMode.LIGHT,
+    )
+
+    assert first.static_prefix == second.static_prefix
+    assert first.text.startswith(first.static_prefix.rstrip("\n"))
+    assert second.text.startswith(first.static_prefix.rstrip("\n"))
+    assert "Product Manager" not in first.static_prefix
+    assert "dental" not in first.text
+    assert second.max_tokens > first.max_tokens
+    assert light.max_tokens < second.max_tokens
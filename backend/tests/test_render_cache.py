@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+import sys
+
+ROOT = Path(__file__).resolve().parents[2]
+BACKEND = ROOT / "backend"
+if str(BACKEND) not in sys.path:
+    sys.path.insert(0, str(BACKEND))
+
+from services import template_engine
+from services.render_cache import RenderCache
+from services.template_engine import TemplateEngine
+
+
+SAMPLE_RESUME = {
+    "name": "Jane Doe",
+    "contact": {"email": "jane@example.com", "phone": "(555) 555-1212", "location": "Austin, TX"},
+    "summary": "Backend engineer focused on reliable data systems.",
+    "experience": [
+        {"title": "Senior Engineer", "company": "Acme", "bullets": ["Led migration to Postgres"]},
+    ],
+}
+
+
+def test_key_is_stable_and_sensitive_to_inputs(tmp_path):
+    cache = RenderCache(cache_dir=tmp_path)
+    key = cache.build_key(SAMPLE_RESUME, "executive_compact")
+    reordered = dict(reversed(list(SAMPLE_RESUME.items())))
+    assert cache.build_key(reordered, "executive_compact") == key
+    assert cache.build_key(SAMPLE_RESUME, "executive_compact", page_size="A4") != key
+    assert cache.build_key({**SAMPLE_RESUME, "name": "John"}, "executive_compact") != key
+
+
+def test_disk_tier_survives_new_instance_and_invalidation(tmp_path):
+    cache = RenderCache(cache_dir=tmp_path)
+    key = cache.build_key(SAMPLE_RESUME, "executive_compact")
+    cache.put(key, "executive_compact", b"%PDF-1.4 test", kind="pdf")
+
+    reopened = RenderCache(cache_dir=tmp_path)
+    assert reopened.get(key, "executive_compact", kind="pdf") == b"%PDF-1.4 test"
+    assert reopened.get_stats()["disk_hits"] == 1
+
+    assert reopened.invalidate_template("executive_compact") >= 1
+    assert reopened.get(key, "executive_compact", kind="pdf") is None
+    assert RenderCache(cache_dir=tmp_path).get(key, "executive_compact", kind="pdf") is None
+
+
+def test_memory_tier_is_size_bounded(tmp_path):
+    cache = RenderCache(cache_dir=tmp_path, max_memory_mb=1, disk_enabled=False)
+    payload = b"x" * (400 * 1024)
+    for i in range(4):
+        cache.put(f"key-{i}", "executive_compact", payload, kind="pdf")
+    stats = cache.get_stats()
+    assert stats["memory_usage_bytes"] <= 1024 * 1024
+    assert stats["evictions"] >= 1
+    assert cache.get("key-0", "executive_compact", kind="pdf") is None
+    assert cache.get("key-3", "executive_compact", kind="pdf") == payload
+
+
+def test_render_pdf_reuses_cached_artifact(tmp_path, monkeypatch):
+    cache = RenderCache(cache_dir=tmp_path)
+    calls = []
+
+    async def fake_render(html: str, page_size: str = "Letter") -> bytes:
+        calls.append(page_size)
+        return b"%PDF-fake"
+
+    monkeypatch.setattr(template_engine, "get_render_cache", lambda: cache)
+    monkeypatch.setattr(template_engine, "render_pdf_from_html", fake_render)
+
+    first = asyncio.run(TemplateEngine.render_pdf("executive_compact", resume_json=SAMPLE_RESUME))
+    second = asyncio.run(TemplateEngine.render_pdf("executive_compact", resume_json=SAMPLE_RESUME))
+    assert first == second == b"%PDF-fake"
+    assert calls == ["Letter"]
+
+    asyncio.run(TemplateEngine.render_pdf("executive_compact", resume_json=SAMPLE_RESUME, use_cache=False))
+    assert len(calls) == 2
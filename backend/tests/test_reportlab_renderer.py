@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import asyncio
+import io
+from pathlib import Path
+import sys
+
+ROOT = Path(__file__).resolve().parents[2]
+BACKEND = ROOT / "backend"
+if str(BACKEND) not in sys.path:
+    sys.path.insert(0, str(BACKEND))
+
+from PyPDF2 import PdfReader
+
+from config.render_config import RenderConfig
+from services import template_engine
+from services.render_cache import RenderCache
+from services.renderers import reportlab_renderer
+from services.template_engine import TemplateEngine
+
+
+SAMPLE_RESUME = {
+    "name": "Jane <Doe>",
+    "contact": {"email": "jane@example.com", "location": "Austin, TX"},
+    "summary": "Backend engineer & data systems lead.",
+    "skills": ["Python", "SQL"],
+    "experience": [
+        {"title": "Senior Engineer", "company": "Acme", "start": "2020", "bullets": ["Cut p95 latency by 30%"]},
+    ],
+    "education": [{"school": "State University", "degree": "BS CS"}],
+}
+
+
+def test_render_resume_pdf_produces_pdf_and_escapes_markup():
+    resume = SAMPLE_RESUME | {
+        "summary": "Backend engineer & data systems lead <b>not bold</b>.",
+        "skills": ["C&C++", "<script>"],
+    }
+    pdf = reportlab_renderer.render_resume_pdf(resume, "executive_compact")
+    assert pdf.startswith(b"%PDF")
+
+    text = PdfReader(io.BytesIO(pdf)).pages[0].extract_text()
+    assert "Jane <Doe>" in text
+    assert "Backend engineer & data systems lead <b>not bold</b>." in text
+    assert "C&C++" in text and "<script>" in text
+
+
+def test_styles_are_built_once_per_template():
+    reportlab_renderer._get_styles.cache_clear()
+    reportlab_renderer.render_resume_pdf(SAMPLE_RESUME, "modern")
+    reportlab_renderer.render_resume_pdf(SAMPLE_RESUME, "modern")
+    info = reportlab_renderer._get_styles.cache_info()
+    assert info.misses == 1 and info.hits >= 1
+
+
+def test_engine_uses_reportlab_backend_when_configured(tmp_path, monkeypatch):
+    async def fake_pool_render(resume, template_id="executive_compact", page_size="Letter"):
+        return reportlab_renderer.render_resume_pdf(resume, template_id, page_size)
+
+    async def chromium_must_not_run(*args, **kwargs):
+        raise AssertionError("Chromium backend should not be used")
+
+    monkeypatch.setattr(RenderConfig, "PDF_BACKEND", RenderConfig.REPORTLAB)
+    monkeypatch.setattr(template_engine, "get_render_cache", lambda: RenderCache(cache_dir=tmp_path))
+    monkeypatch.setattr(template_engine, "render_pdf_from_resume", fake_pool_render)
+    monkeypatch.setattr(template_engine, "render_pdf_from_html", chromium_must_not_run)
+
+    pdf = asyncio.run(TemplateEngine.render_pdf("executive_compact", resume_json=SAMPLE_RESUME | {"skills": []}))
+    assert pdf.startswith(b"%PDF")
+
+
+def test_render_pdf_from_resume_runs_in_the_spawn_process_pool(monkeypatch):
+    monkeypatch.setattr(RenderConfig, "REPORTLAB_POOL_WORKERS", 1)
+    reportlab_renderer.shutdown_process_pool()
+    try:
+        pdf = asyncio.run(reportlab_renderer.render_pdf_from_resume(SAMPLE_RESUME, "executive_compact"))
+        assert reportlab_renderer.get_process_pool()._max_workers == 1
+    finally:
+        reportlab_renderer.shutdown_process_pool()
+    assert pdf.startswith(b"%PDF")
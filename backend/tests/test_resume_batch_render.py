@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import dataclasses
+import time
+from pathlib import Path
+import sys
+
+ROOT = Path(__file__).resolve().parents[2]
+BACKEND = ROOT / "backend"
+if str(BACKEND) not in sys.path:
+    sys.path.insert(0, str(BACKEND))
+
+from services import resume_batch_render
+from services.hardcoded_resume_service import HardcodedResumeService
+from services.resume_batch_render import RenderTask, render_task, render_tasks
+
+
+def make_task(index: int, output_format: str = "pdf") -> RenderTask:
+    return RenderTask(
+        index=index,
+        job_id=index + 1,
+        job_url=f"https://example.com/jobs/{index}",
+        job_title=f"Job_{index + 1}",
+        resume_text=HardcodedResumeService.generate_hardcoded_resume(),
+        output_format=output_format,
+        output_filename=f"test_{index}.{output_format}",
+        is_pro=False,
+        formatting_template="standard",
+        color_scheme="classic_blue",
+        font_family="helvetica",
+        font_size=10,
+    )
+
+
+def test_render_task_writes_file_and_reports_result(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "outputs").mkdir()
+
+    pdf = render_task(make_task(0))
+    docx = render_task(make_task(1, "docx"))
+
+    assert pdf["status"] == "success" and pdf["download_url"] == "/api/download/test_0.pdf"
+    assert (tmp_path / "outputs" / "test_0.pdf").read_bytes().startswith(b"%PDF")
+    assert docx["status"] == "success" and (tmp_path / "outputs" / "test_1.docx").exists()
+    assert pdf["preview"].endswith("...")
+
+    missing_dir = render_task(dataclasses.replace(make_task(2), output_filename="missing/dir.pdf"))
+    assert missing_dir["status"] == "failed" and missing_dir["index"] == 2
+
+
+def test_render_tasks_yields_in_completion_order_and_isolates_timeouts(monkeypatch):
+    delays = {0: 0.3, 1: 0.05, 2: 1.0}
+
+    def fake_render(task):
+        time.sleep(delays[task.index])
+        return {"index": task.index, "status": "success"}
+
+    monkeypatch.setattr(resume_batch_render, "render_task", fake_render)
+
+    async def scenario():
+        with concurrent.futures.ThreadPoolExecutor(max_workers=3) as pool:
+            results = [result async for result in render_tasks([make_task(i) for i in range(3)], pool, timeout=0.6)]
+            pool.shutdown(wait=False, cancel_futures=True)
+            return results
+
+    results = asyncio.run(scenario())
+
+    assert [result["index"] for result in results] == [1, 0, 2]
+    assert results[2]["status"] == "failed" and "timed out" in results[2]["error"]
+
+
+def test_timeout_covers_rendering_not_queueing_and_late_files_are_removed(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "outputs").mkdir()
+
+    def fake_render(task):
+        time.sleep(0.8 if task.index == 5 else 0.2)
+        Path(task.output_path).write_bytes(b"%PDF-")
+        return {"index": task.index, "status": "success"}
+
+    monkeypatch.setattr(resume_batch_render, "render_task", fake_render)
+
+    async def scenario():
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as pool:
+            # Six 0.2s jobs on two workers take ~0.6s in total, longer than the timeout
+            return [result async for result in render_tasks([make_task(i) for i in range(6)], pool, timeout=0.4)]
+
+    results = {result["index"]: result for result in asyncio.run(scenario())}
+
+    assert all(results[i]["status"] == "success" for i in range(5))
+    assert results[5]["status"] == "failed" and "timed out" in results[5]["error"]
+    assert not (tmp_path / "outputs" / "test_5.pdf").exists()
+    assert (tmp_path / "outputs" / "test_4.pdf").exists()
+
+
+def test_timed_out_jobs_hold_their_slot_until_the_worker_is_free(monkeypatch):
+    def fake_render(task):
+        time.sleep(0.6 if task.index == 0 else 0.1)
+        return {"index": task.index, "status": "success"}
+
+    monkeypatch.setattr(resume_batch_render, "render_task", fake_render)
+
+    async def scenario():
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as pool:
+            return [result async for result in render_tasks([make_task(i) for i in range(3)], pool, timeout=0.3)]
+
+    results = {result["index"]: result for result in asyncio.run(scenario())}
+
+    # Job 0 times out at 0.3s but keeps the only worker until 0.6s; the
+    # next job's timeout starts when it gets the worker, not while it waits
+    assert results[0]["status"] == "failed"
+    assert results[1]["status"] == "success" and results[2]["status"] == "success"
+
+
+def test_abandoned_requests_remove_files_rendered_after_the_client_left(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "outputs").mkdir()
+
+    def fake_render(task):
+        time.sleep(0.05 if task.index == 0 else 0.3)
+        Path(task.output_path).write_bytes(b"%PDF-")
+        return {"index": task.index, "status": "success"}
+
+    monkeypatch.setattr(resume_batch_render, "render_task", fake_render)
+
+    async def scenario():
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as pool:
+            rendered = render_tasks([make_task(i) for i in range(4)], pool, timeout=5)
+            first = await rendered.__anext__()
+            await rendered.aclose()  # client disconnected
+            return first
+
+    assert asyncio.run(scenario())["index"] == 0
+    assert (tmp_path / "outputs" / "test_0.pdf").exists()
+    assert sorted(path.name for path in (tmp_path / "outputs").iterdir()) == ["test_0.pdf"]
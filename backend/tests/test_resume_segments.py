@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import dataclasses
+from pathlib import Path
+import sys
+
+ROOT = Path(__file__).resolve().parents[2]
+BACKEND = ROOT / "backend"
+if str(BACKEND) not in sys.path:
+    sys.path.insert(0, str(BACKEND))
+
+import pytest
+
+from models.resume_schema import parse_resume_text_to_schema
+from services.resume_parser import ResumeParser
+from utils.resume_diff import ResumeDiffAnalyzer
+from utils.resume_segments import detect_existing_sections, get_segment_cache, segment_resume
+
+RESUME = """JANE DOE
+Senior Product Manager
+jane.doe@example.com | (555) 123-4567 | San Francisco, CA | linkedin.com/in/janedoe
+
+Experience with payments, growth and marketplaces.
+
+PROFESSIONAL EXPERIENCE
+Acme Corp | San Francisco, CA
+• Led checkout redesign that lifted conversion by 12%
+- Managed a team of 6 engineers
+
+Beta Inc | Remote
+• Launched onboarding flow used by 2M users
+
+ACHIEVEMENTS • Product of the Year • Speaker at ProductCon
+
+Education
+MBA, Stanford University | 2017
+
+TECHNICAL SKILLS: SQL, Python, Tableau
+VOLUNTEER
+Mentor at Code for Good
+"""
+
+
+def test_segments_sections_contact_and_bullets_in_one_pass():
+    segmented = segment_resume(RESUME)
+
+    assert [section.key for section in segmented.sections] == [
+        "experience", "awards", "education", "skills", "volunteer",
+    ]
+    assert segmented.contact.name == "JANE DOE"
+    assert segmented.contact.headline == "Senior Product Manager"
+    assert segmented.contact.email == "jane.doe@example.com"
+    assert segmented.contact.location == "San Francisco, CA"
+    assert segmented.contact.links == ("linkedin.com/in/janedoe",)
+    # Not a header: "Experience" is followed by prose, not a separator
+    assert segmented.intro == ("Experience with payments, growth and marketplaces.",)
+
+    skills = segmented.section("skills")
+    assert skills.title == "TECHNICAL SKILLS"
+    assert skills.lines == ("SQL, Python, Tableau",)
+    experience = segmented.section("experience")
+    assert segmented.lines[experience.header_line] == "PROFESSIONAL EXPERIENCE"
+    assert "\n\nBeta Inc" in experience.text
+
+    bullets = [(bullet.section, bullet.text) for bullet in segmented.bullets]
+    assert ("experience", "Managed a team of 6 engineers") in bullets
+    assert ("awards", "Product of the Year") in bullets
+    assert ("awards", "Speaker at ProductCon") in bullets
+
+
+def test_labelled_lines_stay_in_their_section():
+    resume = """JANE DOE
+jane.doe@example.com
+
+EXPERIENCE
+Acme Corp | Senior Engineer
+• Built the event pipeline
+Tools: Python, Kafka, Kubernetes
+
+Beta Inc | Engineer
+• Cut deploy time in half
+
+SKILLS
+Languages: Python, Go, SQL
+Databases: Postgres, Redis
+"""
+    segmented = segment_resume(resume)
+
+    assert [section.key for section in segmented.sections] == ["experience", "skills"]
+    experience = segmented.section("experience")
+    assert "Tools: Python, Kafka, Kubernetes" in experience.lines
+    assert "Beta Inc | Engineer" in experience.lines
+    assert ("experience", "Cut deploy time in half") in [(bullet.section, bullet.text) for bullet in segmented.bullets]
+    assert segmented.section("skills").lines == ("Languages: Python, Go, SQL", "Databases: Postgres, Redis")
+
+    skills = [skill.name for skill in parse_resume_text_to_schema(resume).skills]
+    assert "Go" in skills and "Redis" in skills
+    assert not any("Beta Inc" in name or "deploy" in name for name in skills)
+
+    # Styled as headers, the same labels still open sections
+    assert segment_resume("EXPERIENCE\nAcme Corp\nLANGUAGES: English, Spanish").keys == {"experience", "languages"}
+    assert segment_resume("Jane Doe\nSkills: Python, SQL").section("skills").inline == "Python, SQL"
+
+
+def test_segmentation_is_memoized_and_immutable():
+    cache = get_segment_cache()
+    cache.clear()
+
+    first = segment_resume(RESUME)
+    second = segment_resume(RESUME)
+
+    assert first is second
+    assert cache.stats == {"hits": 1, "misses": 1}
+    assert segment_resume(RESUME + "\n") is not first
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        first.contact = None
+
+
+def test_consumers_agree_on_the_shared_segmentation():
+    parser = ResumeParser()
+    parser_sections = parser._extract_sections(RESUME.strip())
+    diff_sections = ResumeDiffAnalyzer()._parse_resume_sections(RESUME)
+    schema = parse_resume_text_to_schema(RESUME)
+
+    assert set(parser_sections) == {"experience", "awards", "education", "skills"}
+    assert {"experience", "awards", "education", "skills", "volunteer", "header"} == set(diff_sections)
+    assert "JANE DOE" not in diff_sections and "jane_doe" not in diff_sections
+    assert schema.name == "JANE DOE"
+    assert schema.headline == "Senior Product Manager"
+    assert [skill.name for skill in schema.skills] == ["SQL", "Python", "Tableau"]
+    assert detect_existing_sections(RESUME) == {"education", "skills"}
+
+
+def test_detect_existing_sections_counts_degrees_without_a_header():
+    assert detect_existing_sections("Jane Doe\nSUMMARY\nPM.\nBS Computer Science, 2012") == {"summary", "education"}
+    assert detect_existing_sections("Jane Doe\nBuilt a profile page with strong skills.") == set()
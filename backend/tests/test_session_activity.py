@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from pathlib import Path
+import sys
+import uuid
+
+ROOT = Path(__file__).resolve().parents[2]
+BACKEND = ROOT / "backend"
+if str(BACKEND) not in sys.path:
+    sys.path.insert(0, str(BACKEND))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import models.file_metadata  # noqa: F401
+from models.user import Base, User, UserSession
+from utils.session_activity import SessionActivityTracker
+
+
+def _setup(count: int):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    user = User(id=uuid.uuid4(), email="activity@example.com")
+    db.add(user)
+    db.flush()
+    old = datetime(2020, 1, 1)
+    session_ids = []
+    for _ in range(count):
+        session = UserSession(user_id=user.id, session_token=uuid.uuid4().hex, last_activity=old,
+                              expires_at=datetime.utcnow() + timedelta(hours=1))
+        db.add(session)
+        db.flush()
+        session_ids.append(session.id)
+    db.commit()
+    db.close()
+    return Session, session_ids
+
+
+def test_touches_are_coalesced_into_batched_updates():
+    Session, session_ids = _setup(5)
+    tracker = SessionActivityTracker(session_factory=Session, flush_interval=60, batch_size=2)
+    seen_at = datetime(2030, 1, 1, 12, 0, 30)
+    for _ in range(3):
+        for session_id in session_ids:
+            tracker.touch(session_id, seen_at)
+
+    assert tracker.pending_count() == 5
+    assert tracker.stop() == 5
+    # One timestamp bucket, split into ceil(5 / 2) IN-lists, in a single transaction
+    assert tracker.stats["statements"] == 3
+    assert tracker.stats["flushes"] == 1
+
+    db = Session()
+    values = {row.last_activity for row in db.query(UserSession).all()}
+    assert values == {datetime(2030, 1, 1, 12, 0, 0)}
+
+
+def test_flush_never_moves_activity_backwards():
+    Session, session_ids = _setup(1)
+    tracker = SessionActivityTracker(session_factory=Session, flush_interval=1)
+    tracker.touch(session_ids[0], datetime(2030, 1, 1, 12, 0, 5))
+    tracker.flush()
+    tracker.touch(session_ids[0], datetime(2029, 1, 1))
+    tracker.stop()
+
+    db = Session()
+    assert db.query(UserSession).one().last_activity == datetime(2030, 1, 1, 12, 0, 5)
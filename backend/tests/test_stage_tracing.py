@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from pathlib import Path
+import sys
+from types import SimpleNamespace
+
+ROOT = Path(__file__).resolve().parents[2]
+BACKEND = ROOT / "backend"
+if str(BACKEND) not in sys.path:
+    sys.path.insert(0, str(BACKEND))
+
+import pytest
+
+from services.job_generation import JobGenerationPlan
+from utils import llm_metrics
+from utils.llm_metrics import LLMMetrics, track_llm_call
+from utils.stage_tracing import (
+    JobTrace,
+    Span,
+    aggregate_stages,
+    otlp_trace_id,
+    to_chrome_trace,
+    to_otlp_json,
+    trace_stage,
+)
+
+
+def tailor(text):
+    with trace_stage("rag_retrieval"):
+        time.sleep(0.01)
+    with track_llm_call("resume_tailoring", "gpt-4o-mini") as call:
+        call.wrap(lambda: SimpleNamespace(usage=SimpleNamespace(prompt_tokens=100, completion_tokens=50)))()
+        time.sleep(0.02)
+    return text
+
+
+def test_stages_nest_across_generation_threads_and_llm_calls(monkeypatch):
+    monkeypatch.setattr(llm_metrics, "get_llm_metrics", lambda: LLMMetrics())
+    trace = JobTrace("Job 1", job_index=0)
+
+    async def job():
+        with trace_stage("scrape"):
+            await asyncio.sleep(0.01)
+        async with JobGenerationPlan(timeout=5) as plan:
+            plan.add("resume", tailor, "tailored")
+            return await plan.result("resume")
+
+    async def scenario():
+        with trace.activate(), trace_stage("job"):
+            return await asyncio.wait_for(job(), timeout=5)
+
+    assert asyncio.run(scenario()) == "tailored"
+    with trace_stage("outside") as span:
+        assert span is None  # no active trace
+
+    spans = {span.name: span for span in trace.spans}
+    assert set(spans) == {"job", "scrape", "generate.resume", "rag_retrieval", "llm"}
+    assert spans["job"].parent_id is None
+    assert spans["generate.resume"].parent_id == spans["job"].span_id
+    assert spans["llm"].parent_id == spans["generate.resume"].span_id
+    assert spans["llm"].attributes["completion_tokens"] == 50
+    assert spans["llm"].thread_id != spans["scrape"].thread_id
+
+    summary = trace.summary()
+    assert summary["stages"]["llm"] >= 15
+    assert summary["stages"]["job"] <= summary["total_ms"]
+    assert summary["errors"] == {}
+
+
+def test_timed_out_stages_are_recorded_as_errors():
+    trace = JobTrace("Job 1")
+
+    async def scenario():
+        with trace.activate(), trace_stage("job"):
+            async def job():
+                with trace_stage("format"):
+                    await asyncio.sleep(1)
+            await asyncio.wait_for(job(), timeout=0.05)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(scenario())
+
+    assert trace.summary()["errors"] == {"format": "CancelledError", "job": "TimeoutError"}
+
+
+def add_span(trace: JobTrace, name: str, ms: float, parent: Span | None = None) -> Span:
+    span = Span(name, parent.span_id if parent else None, {})
+    span.duration_ns = int(ms * 1e6)
+    trace.add(span)
+    return span
+
+
+def test_batch_percentiles_and_trace_exports():
+    traces = []
+    for index, llm_ms in enumerate([100, 200, 300, 400, 1000]):
+        trace = JobTrace(f"Job {index + 1}", job_index=index)
+        root = add_span(trace, "job", llm_ms + 50)
+        add_span(trace, "llm", llm_ms, root)
+        if index < 2:
+            add_span(trace, "chromium_pdf", 40, root)
+        traces.append(trace)
+
+    batch = aggregate_stages(traces + [JobTrace("not started")])
+    assert batch["jobs"] == 5
+    assert batch["stages"]["llm"]["p50_ms"] == 300
+    assert batch["stages"]["llm"]["p95_ms"] == pytest.approx(880)
+    assert batch["stages"]["chromium_pdf"]["count"] == 2
+
+    events = to_chrome_trace(traces)["traceEvents"]
+    assert events[0] == {"name": "process_name", "ph": "M", "pid": 1, "tid": 0, "args": {"name": "Job 1"}}
+    llm = next(event for event in events if event["name"] == "llm" and event["pid"] == 5)
+    assert (llm["ph"], llm["dur"]) == ("X", 1_000_000)
+
+    batch_id = "0f8fad5b-d9cb-469f-a165-70867728950e"
+    exported = to_otlp_json(traces, otlp_trace_id(batch_id))["resourceSpans"][0]
+    spans = exported["scopeSpans"][0]["spans"]
+    assert {span["traceId"] for span in spans} == {"0f8fad5bd9cb469fa16570867728950e"}
+    root = spans[0]
+    assert root["name"] == "job" and root["parentSpanId"] == ""
+    assert {"key": "job_index", "value": {"intValue": "0"}} in root["attributes"]
+    assert int(root["endTimeUnixNano"]) - int(root["startTimeUnixNano"]) == 150_000_000
+    assert len(otlp_trace_id("not-a-uuid")) == 32
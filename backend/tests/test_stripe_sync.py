@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+from pathlib import Path
+import sys
+import threading
+import time
+from urllib.parse import parse_qs, urlparse
+import uuid
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+BACKEND = ROOT / "backend"
+if str(BACKEND) not in sys.path:
+    sys.path.insert(0, str(BACKEND))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import models.file_metadata  # noqa: F401
+from models.user import Base, User, Subscription, SubscriptionTier, SubscriptionStatus
+from services.stripe_sync import StripeSyncEngine
+
+
+class FakeStripe:
+    """Minimal /v1/subscriptions + /v1/events implementation with cursor pagination"""
+
+    def __init__(self):
+        self.subscriptions = {}
+        self.events = []
+        self.requests = []
+
+    def subscription(self, sub_id, status, cancel_at_period_end=False):
+        now = int(time.time())
+        self.subscriptions[sub_id] = {
+            "id": sub_id, "object": "subscription", "status": status,
+            "current_period_start": now - 86400, "current_period_end": now + 29 * 86400,
+            "cancel_at_period_end": cancel_at_period_end, "canceled_at": now if status == "canceled" else None,
+        }
+        return self.subscriptions[sub_id]
+
+    def event(self, sub_id, created):
+        self.events.insert(0, {"id": f"evt_{len(self.events)}", "object": "event", "created": created,
+                               "type": "customer.subscription.updated",
+                               "data": {"object": dict(self.subscriptions[sub_id])}})
+
+    @staticmethod
+    def page(items, query, url):
+        limit = int(query.get("limit", ["10"])[0])
+        after = query.get("starting_after", [None])[0]
+        if after:
+            items = items[[item["id"] for item in items].index(after) + 1:]
+        return {"object": "list", "url": url, "data": items[:limit], "has_more": len(items) > limit}
+
+    def handle(self, path, query):
+        self.requests.append(path)
+        if path == "/v1/subscriptions":
+            status = query["status"][0]
+            items = [s for s in self.subscriptions.values() if s["status"] == status]
+            return 200, self.page(items, query, path)
+        if path == "/v1/events":
+            since = int(query["created[gt]"][0])
+            return 200, self.page([e for e in self.events if e["created"] > since], query, path)
+        if path.startswith("/v1/subscriptions/"):
+            sub = self.subscriptions.get(path.rsplit("/", 1)[-1])
+            if sub:
+                return 200, sub
+            return 404, {"error": {"type": "invalid_request_error", "message": "No such subscription"}}
+        return 404, {"error": {"type": "invalid_request_error", "message": "Unknown path"}}
+
+
+@pytest.fixture
+def fake_stripe():
+    fake = FakeStripe()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            code, body = fake.handle(url.path, parse_qs(url.query))
+            payload = json.dumps(body).encode()
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    fake.url = f"http://127.0.0.1:{server.server_port}"
+    yield fake
+    server.shutdown()
+
+
+def _seed(sub_ids):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    for sub_id in sub_ids:
+        user = User(id=uuid.uuid4(), email=f"{sub_id}@example.com", subscription_tier=SubscriptionTier.PRO,
+                    subscription_status=SubscriptionStatus.ACTIVE)
+        db.add(user)
+        db.flush()
+        db.add(Subscription(user_id=user.id, stripe_customer_id=f"cus_{sub_id}", stripe_subscription_id=sub_id,
+                            status=SubscriptionStatus.ACTIVE, tier=SubscriptionTier.PRO,
+                            current_period_end=datetime.utcnow() + timedelta(days=3)))
+    db.commit()
+    return Session, db
+
+
+def _engine(fake, Session, tmp_path):
+    return StripeSyncEngine(Session, api_key="sk_test_fake", api_base=fake.url, max_concurrency=4,
+                            page_size=2, write_batch_size=3, state_path=tmp_path / "state.json")
+
+
+def test_full_sync_pages_lists_and_bulk_updates(fake_stripe, tmp_path):
+    ids = [f"sub_{i}" for i in range(7)]
+    for sub_id in ids[:4]:
+        fake_stripe.subscription(sub_id, "active")
+    fake_stripe.subscription("sub_4", "past_due")
+    fake_stripe.subscription("sub_5", "active", cancel_at_period_end=True)
+    fake_stripe.subscription("sub_6", "canceled")
+    Session, db = _seed(ids)
+
+    stats = asyncio.run(_engine(fake_stripe, Session, tmp_path).sync())
+
+    assert stats.mode == "full" and not stats.errors
+    assert stats.retrieved == 1  # only the canceled one needed an individual fetch
+    assert fake_stripe.requests.count("/v1/subscriptions/sub_6") == 1
+    assert stats.updated == 7  # period dates refreshed everywhere
+    rows = {s.stripe_subscription_id: s for s in db.query(Subscription)}
+    assert rows["sub_4"].status == SubscriptionStatus.PAST_DUE
+    assert rows["sub_5"].cancel_at_period_end is True
+    assert rows["sub_6"].status == SubscriptionStatus.CANCELED and rows["sub_6"].canceled_at is not None
+    assert rows["sub_4"].user.subscription_status == SubscriptionStatus.PAST_DUE
+    assert json.loads((tmp_path / "state.json").read_text())["watermark"] <= time.time()
+
+
+def test_incremental_sync_only_fetches_changed_events(fake_stripe, tmp_path):
+    for i in range(3):
+        fake_stripe.subscription(f"sub_{i}", "active")
+    Session, db = _seed(["sub_0", "sub_1", "sub_2"])
+    engine = _engine(fake_stripe, Session, tmp_path)
+    asyncio.run(engine.sync())
+    fake_stripe.requests.clear()
+
+    watermark = engine.load_watermark()
+    fake_stripe.subscription("sub_1", "unpaid")
+    fake_stripe.event("sub_1", watermark + 10)
+    stats = asyncio.run(engine.sync())
+
+    assert stats.mode == "incremental"
+    assert set(fake_stripe.requests) == {"/v1/events"}
+    assert stats.remote_subscriptions == 1 and stats.updated == 1
+    statuses = {s.stripe_subscription_id: s.status for s in db.query(Subscription)}
+    assert statuses == {"sub_0": SubscriptionStatus.ACTIVE, "sub_1": SubscriptionStatus.UNPAID,
+                        "sub_2": SubscriptionStatus.ACTIVE}
+
+    # Re-running over the overlap window is a no-op
+    assert asyncio.run(engine.sync()).updated == 0
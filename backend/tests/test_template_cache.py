@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import threading
+import time
+from pathlib import Path
+import sys
+
+ROOT = Path(__file__).resolve().parents[2]
+BACKEND = ROOT / "backend"
+if str(BACKEND) not in sys.path:
+    sys.path.insert(0, str(BACKEND))
+
+from services.template_cache import TemplateCacheService
+
+
+def test_capacity_is_global_across_shards():
+    cache = TemplateCacheService(max_size=32, shard_count=16)
+    for i in range(32):
+        cache.put(f"template_{i}", f"<html>{i}</html>")
+    assert all(cache.get(f"template_{i}") is not None for i in range(32))
+
+    cache.put("template_32", "<html>32</html>")
+    stats = cache.get_stats()
+    assert stats["cache_size"] == 32 and stats["evictions"] == 1
+    assert cache.get("template_32") == "<html>32</html>"
+
+
+def test_memory_limit_evicts_least_recently_used_and_rejects_oversized_entries():
+    cache = TemplateCacheService(max_memory_mb=10, shard_count=16)
+    megabytes = lambda n: b"x" * (n * 1024 * 1024)
+
+    # Larger than 10 MB / 16 shards, but well within the cache's budget
+    cache.put("large", megabytes(7), format_type="png")
+    assert cache.get("large", format_type="png") is not None
+    assert cache.get_stats()["evictions"] == 0
+
+    cache.put("other", megabytes(2), format_type="png")
+    time.sleep(0.01)
+    cache.get("large", format_type="png")  # "other" is now least recently used
+    cache.put("third", megabytes(2), format_type="png")
+    assert cache.get("other", format_type="png") is None
+    assert cache.get("large", format_type="png") is not None
+    assert cache.get_stats()["memory_usage_bytes"] <= 10 * 1024 * 1024
+
+    cache.put("huge", megabytes(11), format_type="png")
+    assert cache.get("huge", format_type="png") is None
+    assert cache.get("large", format_type="png") is not None
+
+
+def test_entries_expire_after_their_ttl():
+    cache = TemplateCacheService()
+    cache.put("short", "<html/>", ttl_hours=0.05 / 3600)
+    cache.put("long", "<html/>")
+    assert cache.get("short") == "<html/>"
+
+    time.sleep(0.1)
+    assert cache._cleanup_expired() == 1
+    assert cache.get("short") is None
+    assert cache.get("long") == "<html/>"
+    assert cache.get_stats()["cache_size"] == 1
+
+
+def test_concurrent_puts_and_gets_keep_limits_and_accounting():
+    cache = TemplateCacheService(max_size=50, shard_count=8)
+    errors = []
+
+    def worker(offset):
+        try:
+            for i in range(500):
+                key = f"template_{(offset * 37 + i) % 120}"
+                cache.put(key, key, format_type="json")
+                value = cache.get(key, format_type="json")
+                assert value in (None, key)
+        except Exception as error:  # surfaced in the main thread
+            errors.append(error)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    stats = cache.get_stats()
+    assert stats["cache_size"] <= 50
+    assert cache._usage.entries == stats["cache_size"]
+    assert cache._usage.size_bytes == stats["memory_usage_bytes"]
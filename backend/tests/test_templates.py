@@ -15,6 +15,8 @@ from unittest.mock import patch, MagicMock
 from fastapi.testclient import TestClient
 from services.template_engine import TemplateEngine
 from services.template_registry import TemplateRegistry
+from services import template_preview_service as preview_service_module
+from services.render_cache import RenderCache
 from services.template_preview_service import TemplatePreviewService
 from models.resume_schema import Resume
 from main import app
@@ -351,6 +353,82 @@ class TestPreviewGeneration:
             # Note: cache_hit might not be True due to different sample data hashing
 
 
+class TestPreviewPrecompute:
+    """Test precomputed preview index"""
+    
+    @pytest.mark.asyncio
+    async def test_precompute_writes_content_hashed_index(self, tmp_path, monkeypatch):
+        """Precompute renders each template x sample set once and skips unchanged entries"""
+        service = TemplatePreviewService(cache_dir=tmp_path)
+        renders = []
+        
+        async def fake_screenshot(html_content, template_id, retries=2):
+            renders.append(template_id)
+            return b"\x89PNG" + html_content.encode()
+        
+        monkeypatch.setattr(TemplateEngine, "render_preview", staticmethod(lambda template_id, resume_json=None, **_: f"<html>{resume_json['name']}</html>"))
+        monkeypatch.setattr(service, "generate_screenshot", fake_screenshot)
+        
+        summary = await service.precompute_previews(template_ids=["executive_compact"])
+        assert summary["rendered"] == 2 and summary["failed"] == 0
+        
+        png_bytes, etag = service.get_indexed_preview("executive_compact", "empty")
+        assert png_bytes.startswith(b"\x89PNG")
+        assert (tmp_path / "index" / f"{etag}.png").exists()
+        
+        # A fresh service reads the persisted index and skips unchanged bundles
+        reloaded = TemplatePreviewService(cache_dir=tmp_path)
+        monkeypatch.setattr(reloaded, "generate_screenshot", fake_screenshot)
+        summary = await reloaded.precompute_previews(template_ids=["executive_compact"])
+        assert summary["skipped"] == 2 and len(renders) == 2
+        assert reloaded.get_indexed_etag("executive_compact", "empty") == etag
+        
+        # An edited template is not served from the stale index entry
+        fingerprint = RenderCache.bundle_fingerprint
+        monkeypatch.setattr(RenderCache, "bundle_fingerprint", staticmethod(lambda template_id: fingerprint(template_id) + "|edited"))
+        assert reloaded.get_indexed_etag("executive_compact", "empty") is None
+        assert reloaded.get_indexed_preview("executive_compact", "empty") is None
+    
+    @pytest.mark.asyncio
+    async def test_warmup_leaves_the_shared_browser_open(self, tmp_path, monkeypatch):
+        """Precompute runs on its own service and never closes the browser serving requests"""
+        monkeypatch.setenv("TEMPLATE_PREVIEW_CACHE_DIR", str(tmp_path))
+        monkeypatch.setattr(preview_service_module, "_preview_service", None)
+        shared = preview_service_module.get_template_preview_service()
+        shared._browser = MagicMock()
+        closed = []
+        
+        async def fake_precompute(self, force=False):
+            return {"rendered": 0}
+        
+        async def fake_close(self):
+            closed.append(self)
+        
+        monkeypatch.setattr(TemplatePreviewService, "precompute_previews", fake_precompute)
+        monkeypatch.setattr(TemplatePreviewService, "_close_browser", fake_close)
+        await preview_service_module.warm_template_previews()
+        
+        assert len(closed) == 1 and closed[0] is not shared
+        assert shared._browser is not None
+    
+    def test_live_preview_uses_the_precompute_sample_data(self, monkeypatch):
+        """The live path renders the same sample data the index is built from"""
+        monkeypatch.setattr(TemplateEngine, "render_preview", staticmethod(lambda template_id, resume_json=None, **_: "<html></html>"))
+        response = client.get("/api/templates/preview/executive_compact?format=json&cache=false")
+        assert response.status_code == 200
+        service = preview_service_module.get_template_preview_service()
+        assert response.json()["preview_data"] == service.get_sample_data("executive_compact")
+    
+    def test_memory_cache_evicts_least_recently_used(self, tmp_path):
+        """Memory cache eviction pops the least recently used entry"""
+        service = TemplatePreviewService(cache_dir=tmp_path, memory_cache_size=2)
+        service._remember("a", 1)
+        service._remember("b", 2)
+        service._memory_cache.move_to_end("a")
+        service._remember("c", 3)
+        assert list(service._memory_cache) == ["a", "c"]
+
+
 class TestMetadataEndpoint:
     """Test metadata API endpoint"""
     
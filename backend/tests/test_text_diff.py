@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import random
+from pathlib import Path
+import sys
+
+ROOT = Path(__file__).resolve().parents[2]
+BACKEND = ROOT / "backend"
+if str(BACKEND) not in sys.path:
+    sys.path.insert(0, str(BACKEND))
+
+from utils import text_diff
+from utils.resume_diff import ResumeDiffAnalyzer
+from utils.text_diff import diff_opcodes, edit_distance, similarity
+
+
+def apply(a, b, opcodes):
+    result, i, j = [], 0, 0
+    for tag, i1, i2, j1, j2 in opcodes:
+        assert (i1, j1) == (i, j)
+        if tag == "equal":
+            assert a[i1:i2] == b[j1:j2]
+            result += a[i1:i2]
+        else:
+            result += b[j1:j2]
+        i, j = i2, j2
+    assert (i, j) == (len(a), len(b))
+    return result
+
+
+def lcs_length(a, b):
+    row = [0] * (len(b) + 1)
+    for x in a:
+        previous = 0
+        for j, y in enumerate(b):
+            previous, row[j + 1] = row[j + 1], previous + 1 if x == y else max(row[j + 1], row[j])
+    return row[-1]
+
+
+def test_edit_scripts_rebuild_the_new_side():
+    rng = random.Random(5)
+    for _ in range(500):
+        alphabet = rng.choice(["ab", "abcdef", [f"w{i}" for i in range(30)]])
+        a = [rng.choice(alphabet) for _ in range(rng.randint(0, 40))]
+        b = [rng.choice(alphabet) for _ in range(rng.randint(0, 40))]
+        assert apply(a, b, diff_opcodes(a, b)) == b
+
+
+def test_myers_fallback_is_minimal(monkeypatch):
+    monkeypatch.setattr(text_diff, "MAX_ANCHOR_OCCURRENCES", 0)
+    rng = random.Random(9)
+    for _ in range(300):
+        a = [rng.choice("abc") for _ in range(rng.randint(0, 25))]
+        b = [rng.choice("abc") for _ in range(rng.randint(0, 25))]
+        matched = sum(i2 - i1 for tag, i1, i2, _, _ in diff_opcodes(a, b) if tag == "equal")
+        assert matched == lcs_length(a, b)
+
+
+def test_similarity_is_token_level():
+    original = "Led checkout redesign that lifted conversion by 12%".split()
+    tailored = "Spearheaded checkout redesign that lifted conversion by 12%".split()
+
+    opcodes = diff_opcodes(original, tailored)
+    assert opcodes[0] == ("replace", 0, 1, 0, 1)
+    assert edit_distance(opcodes) == 1
+    assert similarity(original, tailored, opcodes) == 1 - 1 / 8
+    assert similarity([], []) == 1.0
+
+
+def test_analyze_resume_diff_reports_section_changes_and_context():
+    original = "\n".join([
+        "JANE DOE", "jane@example.com", "",
+        "EXPERIENCE", *(f"• Shipped feature {n} for the payments team" for n in range(10)), "",
+        "SKILLS", "SQL, Python",
+    ])
+    tailored = original.replace("feature 5 for", "feature 5 with experimentation for").replace(
+        "SQL, Python", "SQL, Python, Looker, dbt, Airflow, Tableau")
+
+    analysis = ResumeDiffAnalyzer().analyze_resume_diff(original, tailored, "PM")
+
+    assert sorted(analysis["summary"]["sections_modified"]) == ["experience", "skills"]
+    assert analysis["section_changes"]["skills"]["change_type"] == "modified"
+    assert analysis["section_changes"]["skills"]["specific_changes"] == [
+        {"type": "replaced", "original": "Python", "tailored": "Python, Looker, dbt, Airflow, Tableau"}
+    ]
+    assert "experience" not in analysis["section_changes"]  # two inserted words in ~70 stay above the 0.95 threshold
+
+    detailed = analysis["detailed_diff"]
+    assert [line["type"] for line in detailed[:8]] == ["unchanged"] * 3 + ["removed", "added"] + ["unchanged"] * 3
+    assert detailed[3]["content"] == "• Shipped feature 5 for the payments team"
+    assert analysis["content_changes"]["word_count_change"] == 6
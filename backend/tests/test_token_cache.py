@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from pathlib import Path
+import sys
+import time
+import uuid
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+BACKEND = ROOT / "backend"
+if str(BACKEND) not in sys.path:
+    sys.path.insert(0, str(BACKEND))
+
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import models.file_metadata  # noqa: F401
+from models.user import Base, User, UserSession
+from utils import auth, token_cache
+from utils.auth import AuthManager
+from utils.session_activity import SessionActivityTracker
+from utils.token_cache import VerifiedTokenCache
+
+
+@pytest.fixture
+def auth_env(monkeypatch):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    user = User(id=uuid.uuid4(), email="cache@example.com", is_active=True)
+    db.add(user)
+    db.flush()
+    session = UserSession(id=uuid.uuid4(), user_id=user.id, session_token=uuid.uuid4().hex,
+                          expires_at=datetime.utcnow() + timedelta(hours=1))
+    db.add(session)
+    db.commit()
+
+    cache = VerifiedTokenCache(ttl_seconds=60)
+    monkeypatch.setattr(token_cache, "_token_cache", cache)
+    monkeypatch.setattr(auth, "get_session_activity_tracker",
+                        lambda: SessionActivityTracker(session_factory=Session, enabled=False))
+    token = AuthManager.create_access_token({"sub": str(user.id), "session_id": str(session.id)})
+
+    decodes = []
+    real_decode = auth.jwt.decode
+    monkeypatch.setattr(auth.jwt, "decode", lambda *a, **kw: decodes.append(1) or real_decode(*a, **kw))
+    return db, session, token, cache, decodes
+
+
+def _verify(db, token):
+    return AuthManager.verify_token(HTTPAuthorizationCredentials(scheme="Bearer", credentials=token), db)
+
+
+def test_repeat_requests_skip_decode_and_session_lookup(auth_env):
+    db, _, token, cache, decodes = auth_env
+    first = _verify(db, token)
+    second = _verify(db, token)
+    assert first.id == second.id
+    assert len(decodes) == 1
+    assert cache.get_stats()["hits"] >= 1
+    assert AuthManager.decode_token(token)["sub"] == str(first.id)
+    assert len(decodes) == 1
+
+
+def test_session_revocation_invalidates_cached_token(auth_env):
+    db, session, token, cache, decodes = auth_env
+    _verify(db, token)
+
+    session.is_active = False
+    db.commit()
+    assert cache.invalidate_session(session.id) == 1
+
+    with pytest.raises(HTTPException) as exc:
+        _verify(db, token)
+    assert exc.value.detail == "Session not found"
+    assert len(decodes) == 2
+
+
+def test_entries_never_outlive_token_exp():
+    cache = VerifiedTokenCache(ttl_seconds=60)
+    assert cache.put("expired", {"sub": "u", "exp": time.time() - 1}) is None
+    entry = cache.put("short", {"sub": "u", "exp": time.time() + 5})
+    assert entry.expires_at - time.monotonic() <= 5
+    assert cache.invalidate_user("u") == 1
+    assert cache.get("short") is None
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from pathlib import Path
+import sys
+
+ROOT = Path(__file__).resolve().parents[2]
+BACKEND = ROOT / "backend"
+if str(BACKEND) not in sys.path:
+    sys.path.insert(0, str(BACKEND))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import models.file_metadata  # noqa: F401
+from models.user import Base
+from services.webhook_logger import (
+    WebhookEvent, WebhookEventHourlyRollup, WebhookEventStatus, WebhookLogger
+)
+
+
+def _logger():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    return WebhookLogger(sessionmaker(bind=engine)())
+
+
+def test_rollups_track_status_transitions_and_match_raw_aggregates():
+    webhook_logger = _logger()
+    db = webhook_logger.db
+    now = datetime.utcnow()
+
+    # Historical events spread over the last few days, backfilled into rollups
+    for hours_ago in (2, 5, 30, 70, 200):
+        db.add(WebhookEvent(event_type="invoice.paid", status=WebhookEventStatus.PROCESSED,
+                            created_at=now - timedelta(hours=hours_ago),
+                            processed_at=now - timedelta(hours=hours_ago) + timedelta(seconds=4)))
+    db.add(WebhookEvent(event_type="invoice.payment_failed", status=WebhookEventStatus.FAILED,
+                        created_at=now - timedelta(hours=3)))
+    db.commit()
+    assert webhook_logger.rebuild_hourly_rollups() == 6
+
+    # Live events move between rollup rows as they change status
+    retried = webhook_logger.log_webhook_received("customer.subscription.updated", b"{}", "sig")
+    webhook_logger.log_processing_start(str(retried.id))
+    webhook_logger.log_processing_failure(str(retried.id), "timeout", will_retry=True)
+    webhook_logger.log_processing_start(str(retried.id))
+    webhook_logger.log_processing_success(str(retried.id), {"ok": True})
+    ignored = webhook_logger.log_webhook_received("charge.refunded", b"{}", "sig")
+    webhook_logger.log_processing_ignored(str(ignored.id), "unsupported")
+    pending = webhook_logger.log_webhook_received("invoice.paid", b"{}", "sig")
+
+    live_rows = db.query(WebhookEventHourlyRollup).filter(
+        WebhookEventHourlyRollup.event_count != 0,
+        WebhookEventHourlyRollup.status.notin_([WebhookEventStatus.PROCESSED, WebhookEventStatus.FAILED])
+        | (WebhookEventHourlyRollup.event_type == "customer.subscription.updated"),
+    ).all()
+    assert sorted((row.event_type, row.status.value, row.event_count) for row in live_rows) == [
+        ("charge.refunded", "ignored", 1),
+        ("customer.subscription.updated", "processed", 1),
+        ("invoice.paid", "received", 1),
+    ]
+
+    for hours in (24, 24 * 7, 24 * 30):
+        fast = webhook_logger.get_webhook_statistics(hours_back=hours)
+        raw = webhook_logger.get_webhook_statistics(hours_back=hours, use_rollups=False)
+        for key in ("total_events", "status_breakdown", "event_type_breakdown", "failed_events", "success_rate"):
+            assert fast[key] == raw[key], (hours, key)
+        assert abs(fast["average_processing_time_seconds"] - raw["average_processing_time_seconds"]) < 0.05
+
+    day = webhook_logger.get_webhook_statistics(hours_back=24)
+    assert day["total_events"] == 6
+    assert day["status_breakdown"]["processed"] == 3 and day["failed_events"] == 1
+    assert webhook_logger.get_webhook_statistics(hours_back=24 * 30)["total_events"] == 9
+    assert pending.status == WebhookEventStatus.RECEIVED
@@ -2,13 +2,16 @@ from fastapi import HTTPException, Depends, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import os
+import uuid
 from typing import Optional
 from sqlalchemy.orm import Session
 
 from config.database import get_db
 from models.user import User, UserSession
+from utils.session_activity import get_session_activity_tracker
+from utils.token_cache import get_token_cache
 
 # Security configuration
 from config.security import get_security_settings
@@ -45,10 +48,40 @@ class AuthManager:
         encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
         return encoded_jwt
     
+    @staticmethod
+    def decode_token(token: str) -> dict:
+        """Decode a JWT, reusing the cached claims when this token was seen recently"""
+        cache = get_token_cache()
+        cached = cache.get(token)
+        if cached is not None:
+            return cached.claims
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        cache.put(token, payload)
+        return payload
+    
     @staticmethod
     def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
+        token = credentials.credentials
+        token_cache = get_token_cache()
+        cached = token_cache.get(token)
+        
+        # Fast path: token and session were verified within the cache window, so only
+        # the user row is loaded (fresh, through this request's session)
+        if cached is not None and cached.session_verified:
+            user = db.get(User, uuid.UUID(cached.user_id))
+            if not user or not user.is_active:
+                token_cache.invalidate_user(cached.user_id)
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Invalid or inactive user",
+                    headers={"WWW-Authenticate": "Bearer"},
+                )
+            if cached.session_id:
+                get_session_activity_tracker().touch(uuid.UUID(cached.session_id))
+            return user
+        
         try:
-            payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
+            payload = cached.claims if cached is not None else jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
             user_id: str = payload.get("sub")
             session_id: str = payload.get("session_id")
             
@@ -61,7 +94,6 @@ class AuthManager:
             
             # Convert string user_id back to UUID for database query
             try:
-                import uuid
                 user_uuid = uuid.UUID(user_id)
             except ValueError:
                 raise HTTPException(
@@ -79,6 +111,8 @@ class AuthManager:
                     headers={"WWW-Authenticate": "Bearer"},
                 )
             
+            session_expires_at = None
+            
             # Verify session if session_id is provided
             if session_id:
                 # Convert string session_id back to UUID for database query
@@ -111,9 +145,12 @@ class AuthManager:
                         headers={"WWW-Authenticate": "Bearer"},
                     )
                 
-                # Update last activity
-                session.last_activity = datetime.utcnow()
-                db.commit()
+                # Record activity; written in batches by the write-behind tracker
+                get_session_activity_tracker().touch(session.id)
+                session_expires_at = session.expires_at.replace(tzinfo=timezone.utc).timestamp()
+            
+            # Repeat requests with this token skip the decode and session lookup
+            token_cache.put(token, payload, session_verified=True, not_after=session_expires_at)
             
             return user
             
@@ -1,16 +1,18 @@
-import smtplib
+import asyncio
+import concurrent.futures
 import os
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.base import MIMEBase
 from email import encoders
-from typing import List, Optional, Dict, Any
-from jinja2 import Template
+from typing import List, Optional, Dict, Any, Tuple
+from jinja2 import Environment, FileSystemLoader, Template, TemplateNotFound
 from pathlib import Path
 import logging
 from datetime import datetime
 
 from config.security import get_security_settings
+from utils.mail_delivery import get_mail_delivery
 
 logger = logging.getLogger(__name__)
 
@@ -21,49 +23,27 @@ class EmailService:
         self.settings = get_security_settings()
         self.template_dir = Path(__file__).parent.parent / "templates" / "emails"
         self._ensure_template_dir()
+        # Compiled templates are cached by the environment (re-read only when
+        # the file changes); built-in fallbacks are compiled once per name
+        self._templates = Environment(loader=FileSystemLoader(str(self.template_dir)), auto_reload=True)
+        self._default_templates: Dict[str, Template] = {}
+        self.send_timeout = float(os.getenv("EMAIL_SEND_TIMEOUT", "60"))
     
     def _ensure_template_dir(self):
         """Ensure the email templates directory exists"""
         self.template_dir.mkdir(parents=True, exist_ok=True)
     
-    def _get_smtp_connection(self):
-        """Get SMTP connection"""
+    def _get_template(self, template_name: str) -> Template:
+        """Get the compiled email template"""
         try:
-            logger.info(f"🔗 Connecting to SMTP server: {self.settings.smtp_server}:{self.settings.smtp_port}")
-            
-            # Create SMTP connection
-            server = smtplib.SMTP(self.settings.smtp_server, self.settings.smtp_port)
-            
-            if self.settings.smtp_use_tls:
-                logger.info("🔐 Starting TLS encryption")
-                server.starttls()
-            
-            if self.settings.smtp_username and self.settings.smtp_password:
-                logger.info(f"🔑 Authenticating with username: {self.settings.smtp_username}")
-                server.login(self.settings.smtp_username, self.settings.smtp_password)
-                logger.info("✅ SMTP authentication successful")
-            
-            return server
-        except smtplib.SMTPAuthenticationError as e:
-            logger.error(f"❌ SMTP authentication failed: {e}")
-            logger.error(f"   Username: {self.settings.smtp_username}")
-            logger.error(f"   Server: {self.settings.smtp_server}:{self.settings.smtp_port}")
-            logger.error(f"   TLS: {self.settings.smtp_use_tls}")
-            raise
-        except Exception as e:
-            logger.error(f"❌ Failed to connect to SMTP server: {e}")
-            raise
-    
-    def _load_template(self, template_name: str) -> str:
-        """Load email template"""
-        template_path = self.template_dir / f"{template_name}.html"
-        
-        if not template_path.exists():
-            # Return a default template if file doesn't exist
-            return self._get_default_template(template_name)
-        
-        with open(template_path, 'r', encoding='utf-8') as f:
-            return f.read()
+            return self._templates.get_template(f"{template_name}.html")
+        except TemplateNotFound:
+            template = self._default_templates.get(template_name)
+            if template is None:
+                # Return a default template if file doesn't exist
+                template = self._templates.from_string(self._get_default_template(template_name))
+                self._default_templates[template_name] = template
+            return template
     
     def _get_default_template(self, template_name: str) -> str:
         """Get default email template"""
@@ -323,69 +303,152 @@ class EmailService:
         
         return base_template.replace("{{ content }}", content)
     
-    def send_email(
+    def _build_message(
+        self,
+        to_email: str,
+        subject: str,
+        template_name: str,
+        template_data: Dict[str, Any],
+        attachments: Optional[List[str]] = None
+    ) -> MIMEMultipart:
+        """Render a template into a ready-to-send message"""
+        # Add common template data
+        template_data = {
+            **template_data,
+            'app_name': self.settings.email_from_name,
+            'subject': subject,
+            'current_year': datetime.now().year
+        }
+        html_body = self._get_template(template_name).render(**template_data)
+        
+        # Create message
+        msg = MIMEMultipart('alternative')
+        msg['Subject'] = subject
+        msg['From'] = f"{self.settings.email_from_name} <{self.settings.email_from}>"
+        msg['To'] = to_email
+        
+        # Add HTML body
+        msg.attach(MIMEText(html_body, 'html'))
+        
+        # Add attachments if provided
+        if attachments:
+            for attachment in attachments:
+                self._add_attachment(msg, attachment)
+        
+        return msg
+    
+    @staticmethod
+    def _resolved(value: bool) -> "concurrent.futures.Future[bool]":
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        future.set_result(value)
+        return future
+    
+    def deliver_email(
         self, 
         to_email: str, 
         subject: str, 
         template_name: str, 
         template_data: Dict[str, Any],
         attachments: Optional[List[str]] = None
-    ) -> bool:
-        """Send email using template"""
+    ) -> "concurrent.futures.Future[bool]":
+        """
+        Render an email and queue it for background delivery without waiting
+        
+        Returns:
+            Future resolving to True once the email was accepted by the SMTP server
+        """
+        return self._queue_email(to_email, subject, template_name, template_data, attachments)[0]
+    
+    def _queue_email(
+        self, 
+        to_email: str, 
+        subject: str, 
+        template_name: str, 
+        template_data: Dict[str, Any],
+        attachments: Optional[List[str]] = None
+    ) -> "Tuple[concurrent.futures.Future[bool], Optional[concurrent.futures.Future[bool]]]":
+        """(result, queued message) futures; the second is None when nothing was queued"""
         try:
-            # Load and render template
-            template_content = self._load_template(template_name)
-            template = Template(template_content)
-            
-            # Add common template data
-            template_data.update({
-                'app_name': self.settings.email_from_name,
-                'subject': subject,
-                'current_year': datetime.now().year
-            })
-            
-            html_body = template.render(**template_data)
-            
-            # Create message
-            msg = MIMEMultipart('alternative')
-            msg['Subject'] = subject
-            msg['From'] = f"{self.settings.email_from_name} <{self.settings.email_from}>"
-            msg['To'] = to_email
-            
-            # Add HTML body
-            html_part = MIMEText(html_body, 'html')
-            msg.attach(html_part)
-            
-            # Add attachments if provided
-            if attachments:
-                for attachment in attachments:
-                    self._add_attachment(msg, attachment)
-            
-            # Send email
-            if self.settings.environment == "development" and (not self.settings.smtp_username or not self.settings.smtp_password):
-                # In development without SMTP, just log the email
-                logger.info(f"📧 Email would be sent to {to_email}")
-                logger.info(f"📧 Subject: {subject}")
-                logger.info(f"📧 Template: {template_name}")
-                logger.info(f"📧 Data: {template_data}")
-                return True
-            
-            try:
-                with self._get_smtp_connection() as server:
-                    server.send_message(msg)
-                    logger.info(f"✅ Email sent successfully to {to_email}")
-                    return True
-            except Exception as smtp_error:
-                logger.error(f"❌ SMTP send failed to {to_email}: {smtp_error}")
-                # In development, we'll still return True to not block the flow
-                if self.settings.environment == "development":
-                    logger.info(f"📧 Development mode: Email would be sent to {to_email}")
-                    return True
-                return False
-                
+            msg = self._build_message(to_email, subject, template_name, template_data, attachments)
         except Exception as e:
             logger.error(f"❌ Failed to send email to {to_email}: {e}")
-            return False
+            return self._resolved(False), None
+        
+        if self.settings.environment == "development" and (not self.settings.smtp_username or not self.settings.smtp_password):
+            # In development without SMTP, just log the email
+            logger.info(f"📧 Email would be sent to {to_email}")
+            logger.info(f"📧 Subject: {subject}")
+            logger.info(f"📧 Template: {template_name}")
+            logger.info(f"📧 Data: {template_data}")
+            return self._resolved(True), None
+        
+        result: concurrent.futures.Future = concurrent.futures.Future()
+        
+        def _on_sent(sent: concurrent.futures.Future):
+            # Cancelled means the message was withdrawn before a worker picked it up
+            ok = not sent.cancelled() and sent.result()
+            if ok:
+                logger.info(f"✅ Email sent successfully to {to_email}")
+            elif self.settings.environment == "development":
+                # In development, we'll still return True to not block the flow
+                logger.info(f"📧 Development mode: Email would be sent to {to_email}")
+                ok = True
+            result.set_result(ok)
+        
+        queued = get_mail_delivery().submit(msg)
+        queued.add_done_callback(_on_sent)
+        return result, queued
+    
+    def _withdraw(self, queued: Optional[concurrent.futures.Future], to_email: str) -> bool:
+        """
+        Called when a sender stops waiting. Returns True if the message was
+        still queued and will not be sent, False if a worker is already sending it.
+        """
+        if queued is None or queued.cancel():
+            logger.error(f"❌ Timed out sending email to {to_email}; message withdrawn from the queue")
+            return True
+        return False
+    
+    async def send_email(
+        self, 
+        to_email: str, 
+        subject: str, 
+        template_name: str, 
+        template_data: Dict[str, Any],
+        attachments: Optional[List[str]] = None
+    ) -> bool:
+        """
+        Send email using template (awaits delivery through the pooled send queue).
+        
+        After ``send_timeout`` a message still waiting in the queue is withdrawn
+        and False is returned, so False always means the email was not sent. A
+        message already being sent is awaited; the SMTP timeout bounds that.
+        """
+        result, queued = self._queue_email(to_email, subject, template_name, template_data, attachments)
+        delivered = asyncio.wrap_future(result)
+        try:
+            return await asyncio.wait_for(asyncio.shield(delivered), timeout=self.send_timeout)
+        except asyncio.TimeoutError:
+            if self._withdraw(queued, to_email):
+                return False
+            return await delivered
+    
+    def send_email_sync(
+        self, 
+        to_email: str, 
+        subject: str, 
+        template_name: str, 
+        template_data: Dict[str, Any],
+        attachments: Optional[List[str]] = None
+    ) -> bool:
+        """Send email using template, blocking until it is delivered (same timeout rules as ``send_email``)"""
+        result, queued = self._queue_email(to_email, subject, template_name, template_data, attachments)
+        try:
+            return result.result(timeout=self.send_timeout)
+        except concurrent.futures.TimeoutError:
+            if self._withdraw(queued, to_email):
+                return False
+            return result.result()
     
     def _add_attachment(self, msg: MIMEMultipart, file_path: str):
         """Add attachment to email"""
@@ -419,7 +482,7 @@ class EmailService:
             'verification_token': verification_token
         }
         
-        return self.send_email(
+        return self.send_email_sync(
             to_email=user_email,
             subject="Verify your ApplyAI account",
             template_name="verification",
@@ -441,7 +504,7 @@ class EmailService:
             'reset_token': reset_token
         }
         
-        return self.send_email(
+        return self.send_email_sync(
             to_email=user_email,
             subject="Reset your ApplyAI password",
             template_name="password_reset",
@@ -455,7 +518,7 @@ class EmailService:
             'app_url': self.settings.get_cors_origins()[0] if self.settings.get_cors_origins() else "http://localhost:3000"
         }
         
-        return self.send_email(
+        return self.send_email_sync(
             to_email=user_email,
             subject="Welcome to ApplyAI! 🎉",
             template_name="welcome",
@@ -469,7 +532,7 @@ class EmailService:
             'change_time': datetime.now().strftime("%Y-%m-%d %H:%M:%S UTC")
         }
         
-        return self.send_email(
+        return self.send_email_sync(
             to_email=user_email,
             subject="Your ApplyAI password has been changed",
             template_name="password_changed",
@@ -478,7 +541,7 @@ class EmailService:
     
     # Subscription Lifecycle Email Methods
     
-    def send_payment_failure_reminder(self, user_email: str, user_name: str, period_end: datetime) -> bool:
+    async def send_payment_failure_reminder(self, user_email: str, user_name: str, period_end: datetime) -> bool:
         """Send payment failure reminder email"""
         template_data = {
             'user_name': user_name or user_email.split('@')[0],
@@ -487,14 +550,14 @@ class EmailService:
             'update_payment_url': self._get_frontend_url() + "/subscription"
         }
         
-        return self.send_email(
+        return await self.send_email(
             to_email=user_email,
             subject="Payment Issue - Action Required for Your ApplyAI Pro Subscription",
             template_name="payment_failure_reminder",
             template_data=template_data
         )
     
-    def send_final_grace_warning(self, user_email: str, user_name: str, period_end: datetime) -> bool:
+    async def send_final_grace_warning(self, user_email: str, user_name: str, period_end: datetime) -> bool:
         """Send final grace period warning email"""
         template_data = {
             'user_name': user_name or user_email.split('@')[0],
@@ -502,42 +565,42 @@ class EmailService:
             'update_payment_url': self._get_frontend_url() + "/subscription"
         }
         
-        return self.send_email(
+        return await self.send_email(
             to_email=user_email,
             subject="Final Notice - Your ApplyAI Pro Subscription Will Be Canceled",
             template_name="final_grace_warning",
             template_data=template_data
         )
     
-    def send_downgrade_notification(self, user_email: str, user_name: str) -> bool:
+    async def send_downgrade_notification(self, user_email: str, user_name: str) -> bool:
         """Send downgrade notification email"""
         template_data = {
             'user_name': user_name or user_email.split('@')[0],
             'upgrade_url': self._get_frontend_url() + "/pricing"
         }
         
-        return self.send_email(
+        return await self.send_email(
             to_email=user_email,
             subject="Your ApplyAI Account Has Been Downgraded to Free",
             template_name="downgrade_notification",
             template_data=template_data
         )
     
-    def send_subscription_expired_notification(self, user_email: str, user_name: str) -> bool:
+    async def send_subscription_expired_notification(self, user_email: str, user_name: str) -> bool:
         """Send subscription expired notification email"""
         template_data = {
             'user_name': user_name or user_email.split('@')[0],
             'upgrade_url': self._get_frontend_url() + "/pricing"
         }
         
-        return self.send_email(
+        return await self.send_email(
             to_email=user_email,
             subject="Your ApplyAI Pro Subscription Has Expired",
             template_name="subscription_expired",
             template_data=template_data
         )
     
-    def send_renewal_reminder(self, user_email: str, user_name: str, renewal_date: datetime, 
+    async def send_renewal_reminder(self, user_email: str, user_name: str, renewal_date: datetime, 
                             days_before: int, reminder_type: str) -> bool:
         """Send renewal reminder email"""
         template_data = {
@@ -554,7 +617,7 @@ class EmailService:
             "one_day": "Your ApplyAI Pro Subscription Renews Tomorrow"
         }
         
-        return self.send_email(
+        return await self.send_email(
             to_email=user_email,
             subject=subject_map.get(reminder_type, "ApplyAI Pro Subscription Renewal Reminder"),
             template_name="renewal_reminder",
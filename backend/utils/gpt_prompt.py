@@ -1,10 +1,14 @@
 import os
 import openai
-import re
 import time
 from typing import Optional, Dict, Any, Set, TYPE_CHECKING
 from dotenv import load_dotenv
 
+from utils.llm_coalescer import get_llm_coalescer
+from utils.llm_metrics import track_llm_call
+from utils.prompt_budget import AssembledPrompt, PromptSection, assemble_prompt, strip_jd_boilerplate
+from utils.resume_segments import detect_existing_sections
+
 if TYPE_CHECKING:
     from models.user import TailoringMode
 
@@ -39,7 +43,8 @@ class GPTProcessor:
             self.client = openai.OpenAI(
                 api_key=self.api_key,
                 http_client=http_client,
-                timeout=60.0  # 60 second timeout for API calls
+                timeout=60.0,  # 60 second timeout for API calls
+                max_retries=0  # retried (and counted) by track_llm_call
             )
             print("✅ OpenAI client initialized with 60s timeout")
         except Exception as e:
@@ -49,7 +54,7 @@ class GPTProcessor:
                 import httpx
                 # Create basic HTTP client without any proxy settings
                 http_client = httpx.Client()
-                self.client = openai.OpenAI(api_key=self.api_key, http_client=http_client)
+                self.client = openai.OpenAI(api_key=self.api_key, http_client=http_client, max_retries=0)
                 print("✅ OpenAI client initialized with fallback HTTP client")
             except Exception as e2:
                 print(f"❌ All OpenAI initialization methods failed: {e2}")
@@ -58,79 +63,16 @@ class GPTProcessor:
     
     def _detect_existing_sections(self, resume_text: str) -> Set[str]:
         """
-        Robustly detect existing sections in a resume.
+        Detect which of summary/skills/education the resume already has.
         Returns a set of normalized section names that exist.
         """
-        existing_sections = set()
-        text_lower = resume_text.lower()
-        
-        # Comprehensive section patterns - covers all common variations
-        section_patterns = {
-            'summary': [
-                r'\b(professional\s+summary|summary|career\s+summary|profile|objective|career\s+objective|professional\s+profile|executive\s+summary|personal\s+statement|overview)\b',
-                r'\b(qualifications\s+summary|career\s+highlights|professional\s+overview)\b'
-            ],
-            'skills': [
-                r'\b(skills|technical\s+skills|core\s+competencies|competencies|expertise|technical\s+expertise|key\s+skills|professional\s+skills)\b',
-                r'\b(technologies|tools\s+and\s+technologies|programming\s+languages|software\s+skills|technical\s+proficiencies)\b',
-                r'\b(core\s+skills|relevant\s+skills|technical\s+competencies)\b'
-            ],
-            'education': [
-                r'\b(education|academic\s+background|educational\s+background|qualifications|academic\s+qualifications)\b',
-                r'\b(degrees|certifications\s+and\s+education|training\s+and\s+education|academic\s+credentials)\b',
-                r'\b(university|college|bachelor|master|phd|degree)\b'
-            ]
-        }
-        
-        # Check each section type
-        for section_type, patterns in section_patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, text_lower):
-                    existing_sections.add(section_type)
-                    break  # Found this section type, move to next
-        
-        # Additional heuristic checks for edge cases
-        lines = resume_text.split('\n')
-        for line in lines:
-            line_clean = line.strip()
-            if not line_clean:
-                continue
-                
-            line_lower = line_clean.lower()
-            
-            # Check for section headers (lines that are short, uppercase, or end with colon)
-            if len(line_clean) < 50 and (
-                line_clean.isupper() or 
-                line_clean.endswith(':') or 
-                (len(line_clean.split()) <= 3 and any(word.capitalize() == word for word in line_clean.split()))
-            ):
-                # Check if it matches any section patterns
-                for section_type, patterns in section_patterns.items():
-                    for pattern in patterns:
-                        if re.search(pattern, line_lower):
-                            existing_sections.add(section_type)
-                            break
-        
-        # Special detection for common degree patterns (for education)
-        degree_patterns = [
-            r'\b(b\.?s\.?|bachelor|b\.?a\.?|master|m\.?s\.?|m\.?a\.?|phd|ph\.?d\.?|doctorate|mba)\b',
-            r'\b(associate|diploma|certificate)\b.*\b(degree|program)\b',
-            r'\b\d{4}\b.*\b(graduated|graduation|degree|university|college)\b'
-        ]
-        
-        for pattern in degree_patterns:
-            if re.search(pattern, text_lower):
-                existing_sections.add('education')
-                break
-        
-        return existing_sections
+        return detect_existing_sections(resume_text)
 
     def tailor_resume(self, resume_text: str, job_description: str, job_title: str = "Product Manager", optional_sections: Optional[Dict[str, Any]] = None, tailoring_mode: Optional['TailoringMode'] = None) -> Optional[str]:
         """Tailor resume using direct OpenAI API call"""
         try:
             if optional_sections is None:
                 optional_sections = {}
-            prompt = self._create_tailoring_prompt(resume_text, job_description, job_title, optional_sections, tailoring_mode)
             
             # Choose system prompt based on tailoring mode
             if tailoring_mode and tailoring_mode.value == 'light':
@@ -230,6 +172,10 @@ PROCESS STEPS FOR ETHICAL TRANSFORMATION:
 6. Verify no new metrics or achievements have been invented
 7. Confirm all job titles, companies, and dates are preserved exactly"""
 
+            assembled = self._assemble_tailoring_prompt(resume_text, job_description, job_title, optional_sections, tailoring_mode, system_prompt=system_content)
+            prompt = assembled.text
+            print(f"📏 Prompt: {assembled.input_tokens} input tokens, max_tokens={assembled.max_tokens}")
+
             self._lazy_init()  # Initialize OpenAI client if needed
             
             # Add timeout protection for OpenAI API call
@@ -239,49 +185,49 @@ PROCESS STEPS FOR ETHICAL TRANSFORMATION:
             print(f"🤖 Making OpenAI API call with 60s timeout...")
             start_time = time.time()
             
-            # Use ThreadPoolExecutor to add timeout to synchronous OpenAI call
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                future = executor.submit(
-                    self.client.chat.completions.create,
-                    model="gpt-4o-mini",
-                    messages=[
-                        {
-                            "role": "system",
-                            "content": system_content
-                        },
-                        {
-                            "role": "user", 
-                            "content": prompt
-                        }
-                    ],
-                    max_tokens=8000,
-                    temperature=0.1,
-                    timeout=60  # 60 second timeout
-                )
-                
-                try:
-                    # Wait for completion with timeout
-                    response = future.result(timeout=65)  # 65s total timeout (5s buffer)
-                    elapsed = time.time() - start_time
-                    print(f"✅ OpenAI API call completed in {elapsed:.1f}s")
-                except concurrent.futures.TimeoutError:
-                    print(f"⏱️ OpenAI API call timed out after 65 seconds")
-                    future.cancel()
-                    return None
-            
-            ai_response = response.choices[0].message.content
+            messages = [
+                {
+                    "role": "system",
+                    "content": system_content
+                },
+                {
+                    "role": "user", 
+                    "content": prompt
+                }
+            ]
             
-            # Log the AI response for debugging
-            print("=" * 80)
-            print("🤖 AI GENERATED RESPONSE:")
-            print("=" * 80)
-            print(repr(ai_response))
-            print("=" * 80)
-            print("📝 AI RESPONSE (FORMATTED):")
-            print("=" * 80)
-            print(ai_response)
-            print("=" * 80)
+            # Use ThreadPoolExecutor to add timeout to synchronous OpenAI call;
+            # identical concurrent requests share one call
+            try:
+                with track_llm_call("resume_tailoring", "gpt-4o-mini") as call, \
+                        concurrent.futures.ThreadPoolExecutor() as executor:
+                    future = executor.submit(
+                        get_llm_coalescer().run,
+                        "gpt-4o-mini",
+                        [system_content, prompt, {"max_tokens": assembled.max_tokens, "temperature": 0.1}],
+                        call.wrap(lambda: self.client.chat.completions.create(
+                            model="gpt-4o-mini",
+                            messages=messages,
+                            max_tokens=assembled.max_tokens,
+                            temperature=0.1,
+                            timeout=60  # 60 second timeout
+                        ))
+                    )
+                    
+                    try:
+                        # Wait for completion with timeout
+                        response = future.result(timeout=65)  # 65s total timeout (5s buffer)
+                    except concurrent.futures.TimeoutError:
+                        future.cancel()
+                        raise
+                    ai_response = response.choices[0].message.content
+                    call.set_output(ai_response)
+            except concurrent.futures.TimeoutError:
+                print(f"⏱️ OpenAI API call timed out after 65 seconds")
+                return None
             
+            elapsed = time.time() - start_time
+            print(f"✅ OpenAI API call completed in {elapsed:.1f}s")
             return ai_response
             
         except Exception as e:
@@ -296,12 +242,10 @@ PROCESS STEPS FOR ETHICAL TRANSFORMATION:
             prompt = self._create_cover_letter_prompt(resume_text, job_description, job_title, cover_letter_options)
             
             self._lazy_init()  # Initialize OpenAI client if needed
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": """You are a professional cover letter specialist who creates compelling, personalized cover letters that perfectly complement tailored resumes. Your cover letters are engaging, authentic, and demonstrate genuine interest in both the role and the company.
+            messages = [
+                {
+                    "role": "system",
+                    "content": """You are a professional cover letter specialist who creates compelling, personalized cover letters that perfectly complement tailored resumes. Your cover letters are engaging, authentic, and demonstrate genuine interest in both the role and the company.
 
 YOUR MISSION: Create a cover letter that tells a compelling story connecting the candidate's background to this specific opportunity. The cover letter should feel personal, show research about the role, and position the candidate as the ideal fit.
 
@@ -312,15 +256,24 @@ FORMATTING RULES:
 - NO placeholder text like [Your Name] or [Company Name] 
 - Write as if it's a complete letter ready to send
 - Use proper greeting and closing"""
-                    },
-                    {
-                        "role": "user", 
-                        "content": prompt
-                    }
-                ],
-                max_tokens=4000,
-                temperature=0.3
-            )
+                },
+                {
+                    "role": "user", 
+                    "content": prompt
+                }
+            ]
+            with track_llm_call("cover_letter", "gpt-4o-mini") as call:
+                response = get_llm_coalescer().run(
+                    "gpt-4o-mini",
+                    [messages, {"max_tokens": 4000, "temperature": 0.3}],
+                    call.wrap(lambda: self.client.chat.completions.create(
+                        model="gpt-4o-mini",
+                        messages=messages,
+                        max_tokens=4000,
+                        temperature=0.3
+                    ))
+                )
+                call.set_output(response.choices[0].message.content)
             
             return response.choices[0].message.content
             
@@ -332,6 +285,14 @@ FORMATTING RULES:
         """
         Create a prompt for AGGRESSIVE resume transformation with intelligent section handling and tailoring mode differentiation
         """
+        return self._assemble_tailoring_prompt(resume_text, job_description, job_title, optional_sections, tailoring_mode).text
+
+    def _assemble_tailoring_prompt(self, resume_text: str, job_description: str, job_title: str = "", optional_sections: Optional[Dict[str, Any]] = None, tailoring_mode: Optional['TailoringMode'] = None, system_prompt: str = "") -> AssembledPrompt:
+        """
+        Build the tailoring prompt with the mode's static instructions first (so
+        the provider's prompt cache covers them) and the request-specific
+        sections after, within the prompt token budget
+        """
         
         # Handle optional sections
         if optional_sections is None:
@@ -437,7 +398,7 @@ Add a skills section that includes:
         if existing_sections:
             detected_sections_info = f"""
 ⚠️ IMPORTANT - EXISTING SECTIONS DETECTED:
-The original resume already contains these sections: {', '.join(existing_sections).upper()}
+The original resume already contains these sections: {', '.join(sorted(existing_sections)).upper()}
 - For existing sections: ENHANCE and IMPROVE them, do not duplicate
 - For new sections: ADD them in appropriate locations
 - Maintain the overall structure while improving content quality
@@ -571,15 +532,14 @@ Apply moderate tailoring that balances optimization with authenticity:
 
 """
         
-        return f"""
+        # Everything up to the template example depends only on the tailoring mode
+        static_prefix = f"""
 🎯 TRANSFORM THIS RESUME TO PERFECTLY MATCH THE JOB
 
 YOUR GOAL: Rewrite EVERY bullet and section to directly address JD requirements. Transform dramatically—use JD's exact phrases, emphasize relevant skills/metrics, and showcase problem-solving/impact.
 
 {tailoring_instructions}
 
-{detected_sections_info}
-
 CRITICAL RULES:
 • ONE-PAGE ONLY: Include 5 DETAILED bullets per role, 35-50 words per bullet. Prioritize high-impact, JD-relevant content with comprehensive metrics and achievements.
 • PROFESSIONAL SUMMARY: Write 100-150 words in first person as a natural story. Start with where you've been, what you've learned, what you've accomplished, and where you're headed. Let it flow like you're explaining your career path to someone who asked "So what do you do?" No buzzwords, no forced enthusiasm - just your actual journey.
@@ -625,23 +585,30 @@ Stanford Graduate School of Business | 2018                Design: Figma, Sketch
                                                           Project Management: Jira, Asana, Trello
 Bachelor of Science in Computer Science                    Data Visualization: Tableau, Looker, Power BI
 University of California, Berkeley | 2016
+"""
 
-{optional_instructions}
-
-## 📋 JOB ANALYSIS & TRANSFORMATION:
+        ratio = 1.3 if tailoring_mode is not None and tailoring_mode.value == "light" else 2.5
+        return assemble_prompt(
+            static_prefix,
+            [
+                PromptSection("detected_sections", detected_sections_info),
+                PromptSection("optional_instructions", optional_instructions),
+                PromptSection("job", f"""## 📋 JOB ANALYSIS & TRANSFORMATION:
 
 **Target Job:** {f"Title: {job_title}" if job_title else ""}
 
 **Job Description to Match:**
-{job_description}
-
-**Original Resume to Transform:**
-{resume_text}
+{strip_jd_boilerplate(job_description)}""", trim_priority=1, min_tokens=800),
+                PromptSection("resume", f"""**Original Resume to Transform:**
+{resume_text}"""),
+                PromptSection("deliverable", """## 🚀 DELIVERABLE:
 
-## 🚀 DELIVERABLE:
-
-Return ONLY the transformed resume in plain text, starting with name. Ensure clean spacing, alignment, and one-page fit.
-"""
+Return ONLY the transformed resume in plain text, starting with name. Ensure clean spacing, alignment, and one-page fit."""),
+            ],
+            output_basis=resume_text,
+            output_ratio=ratio,
+            system_prompt=system_prompt,
+        )
 
     def _create_cover_letter_prompt(self, resume_text: str, job_description: str, job_title: str = "", cover_letter_options: Optional[Dict[str, Any]] = None) -> str:
         """Create a prompt for generating personalized cover letters"""
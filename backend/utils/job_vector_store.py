@@ -0,0 +1,383 @@
+"""
+Incremental job-description vector store
+
+``JobVectorStore`` wraps one FAISS index that grows as job descriptions come
+in, instead of being rebuilt from the current request's jobs:
+
+- chunks are keyed by the sha256 of their normalized text, so a job description
+  that is submitted again adds nothing
+- embeddings go through ``EmbeddingCache`` (SQLite, keyed by embedder + chunk
+  hash), so re-indexing or rebuilding never pays for the same chunk twice
+- each save writes a new version directory and then atomically swaps the
+  ``CURRENT`` pointer file, so readers never see a half-written index
+- embedding (a network call for OpenAI) and saving happen outside the store
+  lock, which only covers the in-memory append and search, so searches don't
+  queue behind each other or behind indexing
+
+The store is loaded once per process by ``get_job_vector_store`` and shared by
+every ``LangChainResumeProcessor``. ``LocalHashEmbedder`` is a deterministic,
+dependency-free embedder for tests and offline development
+(``JOB_VECTOR_EMBEDDER=local``).
+"""
+
+import hashlib
+import logging
+import os
+import re
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set
+
+import numpy as np
+
+try:
+    from langchain_core.embeddings import Embeddings
+    from langchain.schema import Document
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+    from langchain_community.vectorstores import FAISS
+except ImportError:  # pragma: no cover - LangChain is optional (see langchain_processor)
+    Embeddings = object
+    Document = RecursiveCharacterTextSplitter = FAISS = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE_PATH = "vector_stores/job_descriptions"
+_POINTER_FILE = "CURRENT"
+_WORD_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+
+
+def chunk_hash(text: str) -> str:
+    """Content hash of a chunk (whitespace- and case-normalized)"""
+    normalized = " ".join(text.split()).lower()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class LocalHashEmbedder(Embeddings):
+    """
+    Deterministic bag-of-words embedder (hashing trick over unigrams and bigrams,
+    L2-normalized). No network or model download; good enough for tests and
+    offline development, not for production relevance.
+    """
+
+    def __init__(self, dimensions: int = 256):
+        self.dimensions = dimensions
+        self.name = f"local-hash-{dimensions}"
+
+    def _embed(self, text: str) -> List[float]:
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        words = _WORD_RE.findall(text.lower())
+        for token in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+            digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], "little") % self.dimensions
+            vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+        norm = float(np.linalg.norm(vector))
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+
+class EmbeddingCache:
+    """On-disk embedding cache keyed by ``(namespace, chunk hash)``"""
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "namespace TEXT NOT NULL, hash TEXT NOT NULL, vector BLOB NOT NULL, "
+                "PRIMARY KEY (namespace, hash))"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get_many(self, namespace: str, hashes: List[str]) -> Dict[str, List[float]]:
+        found: Dict[str, List[float]] = {}
+        conn = self._connect()
+        for start in range(0, len(hashes), 500):
+            batch = hashes[start:start + 500]
+            rows = conn.execute(
+                f"SELECT hash, vector FROM embeddings WHERE namespace = ? AND hash IN ({','.join('?' * len(batch))})",
+                [namespace, *batch],
+            )
+            for digest, blob in rows:
+                found[digest] = np.frombuffer(blob, dtype=np.float32).tolist()
+        return found
+
+    def put_many(self, namespace: str, vectors: Dict[str, List[float]]) -> None:
+        if not vectors:
+            return
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (namespace, hash, vector) VALUES (?, ?, ?)",
+                [(namespace, digest, np.asarray(vector, dtype=np.float32).tobytes())
+                 for digest, vector in vectors.items()],
+            )
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that serves document embeddings from an ``EmbeddingCache``"""
+
+    def __init__(self, embeddings, cache: EmbeddingCache, namespace: Optional[str] = None):
+        self.embeddings = embeddings
+        self.cache = cache
+        self.namespace = namespace or getattr(embeddings, "name", None) or getattr(
+            embeddings, "model", type(embeddings).__name__
+        )
+        self.stats = {"cache_hits": 0, "embedded": 0}
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        hashes = [chunk_hash(text) for text in texts]
+        vectors = self.cache.get_many(self.namespace, list(set(hashes)))
+        missing = {digest: text for digest, text in zip(hashes, texts) if digest not in vectors}
+        self.stats["cache_hits"] += len(texts) - len(missing)
+        if missing:
+            embedded = dict(zip(missing, self.embeddings.embed_documents(list(missing.values()))))
+            self.cache.put_many(self.namespace, embedded)
+            vectors.update(embedded)
+            self.stats["embedded"] += len(missing)
+        return [vectors[digest] for digest in hashes]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embeddings.embed_query(text)
+
+
+class JobVectorStore:
+    """Append-only, content-deduplicated FAISS store of job description chunks"""
+
+    def __init__(
+        self,
+        path: str,
+        embeddings: Embeddings,
+        chunk_size: int = 1500,
+        chunk_overlap: int = 200,
+        keep_versions: int = 2,
+    ):
+        """
+        Args:
+            path: Store directory (holds version directories and the ``CURRENT`` pointer)
+            embeddings: Embedder for chunks and queries (usually ``CachedEmbeddings``)
+            chunk_size: Characters per chunk
+            chunk_overlap: Overlap between consecutive chunks
+            keep_versions: Saved versions kept on disk, including the current one
+        """
+        self.path = path
+        self.embeddings = embeddings
+        self.keep_versions = max(1, keep_versions)
+        self.text_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            separators=["\n\n", "\n", ".", "!", "?", ",", " ", ""]
+        )
+
+        self._index: Optional["FAISS"] = None
+        self._hashes: Set[str] = set()
+        self._loaded = False
+        self._lock = threading.RLock()
+        # Saves run outside ``_lock``; ``_save_lock`` orders them and drops stale snapshots
+        self._save_lock = threading.Lock()
+        self._generation = 0
+        self._saved_generation = 0
+        self.stats = {"jobs_added": 0, "chunks_added": 0, "duplicate_chunks": 0, "saves": 0}
+
+    # Persistence
+
+    def _current_dir(self) -> Optional[str]:
+        pointer = os.path.join(self.path, _POINTER_FILE)
+        if os.path.exists(pointer):
+            with open(pointer, "r", encoding="utf-8") as f:
+                version = f.read().strip()
+            if version and os.path.isdir(os.path.join(self.path, version)):
+                return os.path.join(self.path, version)
+        # Layout written before versioning: index files directly in ``path``
+        if os.path.exists(os.path.join(self.path, "index.faiss")):
+            return self.path
+        return None
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            directory = self._current_dir()
+            if directory is not None:
+                try:
+                    self._index = FAISS.load_local(directory, self.embeddings)
+                    self._hashes = {
+                        document.metadata.get("chunk_hash") or chunk_hash(document.page_content)
+                        for document in self._index.docstore._dict.values()
+                    }
+                    logger.info(f"Loaded job vector store ({len(self._hashes)} chunks) from {directory}")
+                except Exception as e:
+                    logger.error(f"Failed to load job vector store from {directory}: {e}")
+                    self._index = None
+                    self._hashes = set()
+            self._loaded = True
+
+    def _save(self, snapshot: bytes, generation: int) -> None:
+        """Write a serialized index as a new version directory, then atomically point ``CURRENT`` at it"""
+        with self._save_lock:
+            if generation <= self._saved_generation:
+                return  # a newer snapshot is already on disk
+            self._write_version(FAISS.deserialize_from_bytes(snapshot, self.embeddings))
+            self._saved_generation = generation
+
+    def _write_version(self, index: "FAISS") -> None:
+        os.makedirs(self.path, exist_ok=True)
+        version = f"v-{int(time.time() * 1000)}-{uuid.uuid4().hex[:8]}"
+        index.save_local(os.path.join(self.path, version))
+
+        pointer = os.path.join(self.path, _POINTER_FILE)
+        tmp_pointer = f"{pointer}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_pointer, "w", encoding="utf-8") as f:
+            f.write(version)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_pointer, pointer)
+        self.stats["saves"] += 1
+
+        versions = sorted(  # names start with the save time in ms
+            name for name in os.listdir(self.path)
+            if name.startswith("v-") and os.path.isdir(os.path.join(self.path, name))
+        )
+        for stale in versions[:-self.keep_versions]:
+            if stale != version:
+                shutil.rmtree(os.path.join(self.path, stale), ignore_errors=True)
+
+    # Public API
+
+    def add_jobs(self, job_descriptions: Iterable[Dict[str, str]]) -> int:
+        """
+        Split, dedupe, embed and append job descriptions, then persist.
+
+        Returns:
+            Number of new chunks added (0 when everything was already indexed)
+        """
+        self._ensure_loaded()
+        documents = [
+            Document(
+                page_content=job.get("job_description", ""),
+                metadata={
+                    "job_id": job.get("id"),
+                    "job_url": job.get("url", ""),
+                    "job_title": job.get("job_title", ""),
+                    "created_at": datetime.now().isoformat()
+                }
+            )
+            for job in job_descriptions
+            if job.get("job_description")
+        ]
+        chunks = self.text_splitter.split_documents(documents)
+
+        with self._lock:
+            known = set(self._hashes)
+        new_chunks = []
+        for chunk in chunks:
+            digest = chunk_hash(chunk.page_content)
+            if digest in known:
+                self.stats["duplicate_chunks"] += 1
+                continue
+            known.add(digest)
+            chunk.metadata["chunk_hash"] = digest
+            new_chunks.append(chunk)
+        if not new_chunks:
+            return 0
+
+        # Embed without the lock; searches keep running meanwhile
+        vectors = self.embeddings.embed_documents([chunk.page_content for chunk in new_chunks])
+
+        with self._lock:
+            # Drop chunks another caller indexed while we were embedding
+            fresh = [(chunk, vector) for chunk, vector in zip(new_chunks, vectors)
+                     if chunk.metadata["chunk_hash"] not in self._hashes]
+            self.stats["duplicate_chunks"] += len(new_chunks) - len(fresh)
+            if not fresh:
+                return 0
+            text_embeddings = [(chunk.page_content, vector) for chunk, vector in fresh]
+            metadatas = [chunk.metadata for chunk, _ in fresh]
+            ids = [chunk.metadata["chunk_hash"] for chunk, _ in fresh]
+            if self._index is None:
+                self._index = FAISS.from_embeddings(text_embeddings, self.embeddings, metadatas=metadatas, ids=ids)
+            else:
+                self._index.add_embeddings(text_embeddings, metadatas=metadatas, ids=ids)
+            self._hashes.update(ids)
+            self._generation += 1
+            generation = self._generation
+            snapshot = self._index.serialize_to_bytes()
+
+            self.stats["jobs_added"] += len(documents)
+            self.stats["chunks_added"] += len(fresh)
+
+        self._save(snapshot, generation)
+        return len(fresh)
+
+    def similarity_search(self, query: str, k: int = 3) -> List["Document"]:
+        self._ensure_loaded()
+        if self._index is None:
+            return []
+        # Embed the query (a network call) before taking the lock; the in-memory search is fast
+        vector = self.embeddings.embed_query(query)
+        with self._lock:
+            index = self._index
+            return index.similarity_search_by_vector(vector, k=min(k, index.index.ntotal))
+
+    @property
+    def ntotal(self) -> int:
+        self._ensure_loaded()
+        return self._index.index.ntotal if self._index is not None else 0
+
+    def is_available(self) -> bool:
+        return self.ntotal > 0
+
+
+_stores: Dict[str, JobVectorStore] = {}
+_stores_lock = threading.Lock()
+
+
+def create_job_embeddings(api_key: Optional[str] = None, cache_path: Optional[str] = None) -> Optional[Embeddings]:
+    """
+    Embedder for the job store, wrapped in the on-disk embedding cache.
+
+    ``JOB_VECTOR_EMBEDDER=local`` selects ``LocalHashEmbedder``; otherwise
+    OpenAI embeddings are used (None when they cannot be created).
+    """
+    if os.getenv("JOB_VECTOR_EMBEDDER", "openai").lower() == "local":
+        base = LocalHashEmbedder(int(os.getenv("JOB_VECTOR_LOCAL_DIMENSIONS", "256")))
+    else:
+        try:
+            from langchain_openai import OpenAIEmbeddings
+            base = OpenAIEmbeddings(api_key=api_key)
+        except Exception as e:
+            logger.warning(f"OpenAI embeddings not available: {e}")
+            return None
+    cache = EmbeddingCache(cache_path or os.getenv("JOB_VECTOR_EMBEDDING_CACHE", "vector_stores/embedding_cache.sqlite3"))
+    return CachedEmbeddings(base, cache)
+
+
+def get_job_vector_store(embeddings: Embeddings, path: Optional[str] = None) -> Optional[JobVectorStore]:
+    """Get the process-wide store for ``path`` (created on first use, loaded lazily once)"""
+    if FAISS is None or embeddings is None:
+        return None
+    path = path or os.getenv("JOB_VECTOR_STORE_PATH", DEFAULT_STORE_PATH)
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = JobVectorStore(path, embeddings)
+            _stores[path] = store
+        return store
@@ -1,5 +1,4 @@
 import os
-import re
 from typing import Optional, List, Dict, Any, Set, TYPE_CHECKING
 from dotenv import load_dotenv
 
@@ -34,6 +33,13 @@ import json
 import uuid
 from datetime import datetime
 
+from utils.job_vector_store import create_job_embeddings, get_job_vector_store
+from utils.llm_coalescer import get_llm_coalescer
+from utils.llm_metrics import track_llm_call
+from utils.stage_tracing import trace_stage
+from utils.prompt_budget import PromptSection, assemble_prompt, get_prompt_budget, strip_jd_boilerplate
+from utils.resume_segments import detect_existing_sections
+
 class LangChainResumeProcessor:
     def __init__(self):
         load_dotenv()
@@ -49,7 +55,7 @@ class LangChainResumeProcessor:
         
         self.langchain_available = LANGCHAIN_AVAILABLE
         
-        # Initialize vector store for job descriptions
+        # Process-wide incremental job vector store (utils.job_vector_store), bound on first use
         self.job_vectorstore = None
         self.resume_history = {}  # Track resume versions
         
@@ -82,7 +88,7 @@ class LangChainResumeProcessor:
                 api_key=self.api_key,
                 max_tokens=8000,
                 request_timeout=60,  # 60 second timeout
-                max_retries=2  # Retry up to 2 times on failure
+                max_retries=0  # retried (and counted) by track_llm_call
             )
             print("✅ LangChain OpenAI initialized with 60s timeout")
         except Exception as e:
@@ -90,18 +96,17 @@ class LangChainResumeProcessor:
             print("⚠️  Using fallback - resume generation may not work properly")
             self.llm = None
         
+        # Job embeddings don't depend on the chat model (and may be local)
+        try:
+            # Embeddings are served from the on-disk chunk cache where possible
+            self.embeddings = create_job_embeddings(self.api_key)
+            self.job_vectorstore = get_job_vector_store(self.embeddings)
+            print("✅ Job embeddings initialized successfully")
+        except Exception as e:
+            print(f"⚠️ Job embeddings not available: {e}")
+            self.embeddings = None
+        
         if self.llm is not None:
-            # Initialize LangChain components
-            try:
-                # Initialize embeddings without custom HTTP client
-                self.embeddings = OpenAIEmbeddings(
-                    api_key=self.api_key
-                )
-                print("✅ OpenAI Embeddings initialized successfully")
-            except Exception as e:
-                print(f"⚠️ OpenAI Embeddings not available: {e}")
-                self.embeddings = None
-            
             # Initialize memory for conversation tracking
             self.memory = ConversationBufferWindowMemory(
                 k=5,  # Remember last 5 interactions
@@ -110,113 +115,20 @@ class LangChainResumeProcessor:
     
     def _detect_existing_sections(self, resume_text: str) -> Set[str]:
         """
-        Robustly detect existing sections in a resume.
+        Detect which of summary/skills/education the resume already has.
         Returns a set of normalized section names that exist.
         """
-        existing_sections = set()
-        text_lower = resume_text.lower()
-        
-        # Comprehensive section patterns - covers all common variations
-        section_patterns = {
-            'summary': [
-                r'\b(professional\s+summary|summary|career\s+summary|profile|objective|career\s+objective|professional\s+profile|executive\s+summary|personal\s+statement|overview)\b',
-                r'\b(qualifications\s+summary|career\s+highlights|professional\s+overview)\b'
-            ],
-            'skills': [
-                r'\b(skills|technical\s+skills|core\s+competencies|competencies|expertise|technical\s+expertise|key\s+skills|professional\s+skills)\b',
-                r'\b(technologies|tools\s+and\s+technologies|programming\s+languages|software\s+skills|technical\s+proficiencies)\b',
-                r'\b(core\s+skills|relevant\s+skills|technical\s+competencies)\b'
-            ],
-            'education': [
-                r'\b(education|academic\s+background|educational\s+background|qualifications|academic\s+qualifications)\b',
-                r'\b(degrees|certifications\s+and\s+education|training\s+and\s+education|academic\s+credentials)\b',
-                r'\b(university|college|bachelor|master|phd|degree)\b'
-            ]
-        }
-        
-        # Check each section type
-        for section_type, patterns in section_patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, text_lower):
-                    existing_sections.add(section_type)
-                    break  # Found this section type, move to next
-        
-        # Additional heuristic checks for edge cases
-        lines = resume_text.split('\n')
-        for line in lines:
-            line_clean = line.strip()
-            if not line_clean:
-                continue
-                
-            line_lower = line_clean.lower()
-            
-            # Check for section headers (lines that are short, uppercase, or end with colon)
-            if len(line_clean) < 50 and (
-                line_clean.isupper() or 
-                line_clean.endswith(':') or 
-                (len(line_clean.split()) <= 3 and any(word.capitalize() == word for word in line_clean.split()))
-            ):
-                # Check if it matches any section patterns
-                for section_type, patterns in section_patterns.items():
-                    for pattern in patterns:
-                        if re.search(pattern, line_lower):
-                            existing_sections.add(section_type)
-                            break
-        
-        # Special detection for common degree patterns (for education)
-        degree_patterns = [
-            r'\b(b\.?s\.?|bachelor|b\.?a\.?|master|m\.?s\.?|m\.?a\.?|phd|ph\.?d\.?|doctorate|mba)\b',
-            r'\b(associate|diploma|certificate)\b.*\b(degree|program)\b',
-            r'\b\d{4}\b.*\b(graduated|graduation|degree|university|college)\b'
-        ]
-        
-        for pattern in degree_patterns:
-            if re.search(pattern, text_lower):
-                existing_sections.add('education')
-                break
-        
-        return existing_sections
+        return detect_existing_sections(resume_text)
         
     def initialize_job_vectorstore(self, job_descriptions: List[Dict[str, str]]):
-        """Initialize FAISS vector store with job descriptions"""
+        """Add job descriptions to the shared vector store (new chunks only)"""
         self._lazy_init()  # Initialize OpenAI components if needed
-        if not self.langchain_available or not self.embeddings:
+        if not self.langchain_available or not self.job_vectorstore:
             print("⚠️ Vector store not available - RAG features disabled")
             return False
             
         try:
-            documents = []
-            for job in job_descriptions:
-                # Create document with metadata
-                doc = Document(
-                    page_content=job.get("job_description", ""),
-                    metadata={
-                        "job_id": job.get("id"),
-                        "job_url": job.get("url", ""),
-                        "job_title": job.get("job_title", ""),
-                        "created_at": datetime.now().isoformat()
-                    }
-                )
-                documents.append(doc)
-            
-            # Split documents for better retrieval
-            text_splitter = RecursiveCharacterTextSplitter(
-                chunk_size=1500,
-                chunk_overlap=200,
-                separators=["\n\n", "\n", ".", "!", "?", ",", " ", ""]
-            )
-            
-            split_docs = text_splitter.split_documents(documents)
-            
-            # Create FAISS vector store
-            self.job_vectorstore = FAISS.from_documents(
-                split_docs, 
-                self.embeddings
-            )
-            
-            # Save vector store
-            self.job_vectorstore.save_local("vector_stores/job_descriptions")
-            
+            self.job_vectorstore.add_jobs(job_descriptions)
             return True
             
         except Exception as e:
@@ -224,19 +136,13 @@ class LangChainResumeProcessor:
             return False
     
     def load_job_vectorstore(self):
-        """Load existing job vector store"""
+        """Whether the shared job vector store has content (it is loaded from disk once per process)"""
         self._lazy_init()  # Initialize OpenAI components if needed
-        if not self.langchain_available or not self.embeddings:
+        if not self.langchain_available or not self.job_vectorstore:
             return False
             
         try:
-            if os.path.exists("vector_stores/job_descriptions"):
-                self.job_vectorstore = FAISS.load_local(
-                    "vector_stores/job_descriptions", 
-                    self.embeddings
-                )
-                return True
-            return False
+            return self.job_vectorstore.is_available()
         except Exception as e:
             print(f"Error loading vector store: {str(e)}")
             return False
@@ -248,26 +154,26 @@ class LangChainResumeProcessor:
         
         try:
             # Retrieve similar job descriptions
-            similar_docs = self.job_vectorstore.similarity_search(query, k=k)
+            with trace_stage("rag_retrieval", k=k):
+                similar_docs = self.job_vectorstore.similarity_search(query, k=k)
             return similar_docs
         except Exception as e:
             print(f"Error retrieving similar jobs: {str(e)}")
             return []
     
     def create_enhanced_tailoring_prompt(self, resume_text: str, job_description: str, job_title: str, similar_jobs: List[Document]) -> str:
-        """Create enhanced prompt with RAG context"""
+        """Create enhanced prompt with RAG context (static instructions first, then the request)"""
         
         # Extract insights from similar jobs
         similar_job_insights = ""
         if similar_jobs:
-            similar_job_insights = "\n## SIMILAR JOB ANALYSIS:\n"
+            similar_job_insights = "## SIMILAR JOB ANALYSIS:\n"
             for i, doc in enumerate(similar_jobs, 1):
                 similar_job_insights += f"\nSimilar Job {i}:\n"
                 similar_job_insights += f"- Content: {doc.page_content[:200]}...\n"
                 similar_job_insights += f"- URL: {doc.metadata.get('job_url', 'N/A')}\n"
         
-        prompt = f"""
-🔥 AGGRESSIVELY TRANSFORM THIS RESUME FOR MAXIMUM JOB MATCH
+        static_prefix = """🔥 AGGRESSIVELY TRANSFORM THIS RESUME FOR MAXIMUM JOB MATCH
 
 You are a resume transformation specialist. Your job is to DRAMATICALLY rewrite this resume so it appears to be custom-made for this specific position. Every bullet point should be transformed to use the exact language, metrics, and focus areas from the job description.
 
@@ -281,8 +187,6 @@ ENHANCED RESUME FORMATTING RULES:
 • SKILLS INTEGRATION: Seamlessly incorporate job-relevant skills and technologies
 • OUTPUT: Plain text only. No markdown, asterisks, or special formatting. Follow the STATIC TEMPLATE exactly.
 
-{similar_job_insights}
-
 🚨 ENHANCED TRANSFORMATION RULES:
 
 1. **COMPREHENSIVE BULLET REWRITE**
@@ -327,35 +231,36 @@ ENHANCED RESUME FORMATTING RULES:
    - "Worked with data" → "Leveraged advanced analytics and machine learning algorithms to inform product strategy, resulting in 3x user engagement and 25% revenue growth"
    - "Improved processes" → "Architected scalable workflows and automation systems reducing time-to-market by 60% while maintaining 99.9% quality standards"
 
-TARGET JOB:
+"""
+        budget = get_prompt_budget()
+        return assemble_prompt(
+            static_prefix,
+            [
+                PromptSection("similar_jobs", similar_job_insights, trim_priority=0, max_tokens=budget.rag_context_tokens),
+                PromptSection("job", f"""TARGET JOB:
 Title: {job_title}
-Description: {job_description}
-
-ORIGINAL RESUME:
-{resume_text}
+Description: {strip_jd_boilerplate(job_description)}""", trim_priority=1, min_tokens=800),
+                PromptSection("resume", f"""ORIGINAL RESUME:
+{resume_text}"""),
+                PromptSection("deliverable", """CRITICAL: Transform the ENTIRE resume - all roles, all sections. Create 4-5 detailed, impactful bullets per role with comprehensive metrics and achievements. Do not stop after the first job!
 
-CRITICAL: Transform the ENTIRE resume - all roles, all sections. Create 4-5 detailed, impactful bullets per role with comprehensive metrics and achievements. Do not stop after the first job!
-
-DELIVER: A completely transformed, detailed resume that looks custom-written for this exact role. Start with contact info and make every line count with sophisticated language and measurable impact.
-"""
-        return prompt
+DELIVER: A completely transformed, detailed resume that looks custom-written for this exact role. Start with contact info and make every line count with sophisticated language and measurable impact."""),
+            ],
+            output_basis=resume_text,
+            output_ratio=2.5,
+            budget=budget,
+        ).text
     
     def tailor_resume_with_rag(self, resume_text: str, job_description: str, job_title: str = "Product Manager", optional_sections: dict = None, tailoring_mode: Optional['TailoringMode'] = None) -> Optional[Dict[str, Any]]:
         """Tailor resume using RAG with similar job descriptions"""
         try:
-            if not self.job_vectorstore:
-                print("No job vectorstore available. Loading...")
-                self.load_job_vectorstore()
-            
-            if not self.job_vectorstore:
+            if not self.load_job_vectorstore():
                 print("Warning: No job vectorstore available for RAG")
                 return None
             
             # Search for similar job descriptions
-            similar_jobs = self.job_vectorstore.similarity_search(
-                job_description,
-                k=min(3, self.job_vectorstore.index.ntotal) if hasattr(self.job_vectorstore, 'index') else 3
-            )
+            with trace_stage("rag_retrieval", k=3):
+                similar_jobs = self.job_vectorstore.similarity_search(job_description, k=3)
             
             similar_jobs_context = ""
             if similar_jobs:
@@ -471,7 +376,7 @@ Add an education section with the following information:
             if existing_sections:
                 detected_sections_info = f"""
 ⚠️ IMPORTANT - EXISTING SECTIONS DETECTED:
-The original resume already contains these sections: {', '.join(existing_sections).upper()}
+The original resume already contains these sections: {', '.join(sorted(existing_sections)).upper()}
 - For existing sections: ENHANCE and IMPROVE them, do not duplicate
 - For new sections: ADD them in appropriate locations
 - Maintain the overall structure while improving content quality
@@ -643,10 +548,9 @@ Apply moderate tailoring that balances optimization with authenticity:
 
 """
             
-            # Create enhanced prompt using similar jobs
-            rag_prompt = PromptTemplate(
-                input_variables=["resume_text", "job_description", "job_title", "similar_jobs", "optional_instructions", "detected_sections_info", "tailoring_instructions"],
-                template="""You are an elite resume transformation specialist with 20+ years in design and software engineering. You dramatically rework resumes to perfectly match job descriptions, using exact language, metrics, and focus areas from the JD while preserving core truths from the original.
+            # Static instructions (only the tailoring mode varies) come first so the
+            # provider's prompt cache covers them; request-specific sections follow
+            static_prefix = """You are an elite resume transformation specialist with 20+ years in design and software engineering. You dramatically rework resumes to perfectly match job descriptions, using exact language, metrics, and focus areas from the JD while preserving core truths from the original.
 
 YOUR MISSION: Aggressively rewrite every bullet point to align with the employer's needs. Reframe experiences as if the candidate has been doing this specific role already. Preserve facts—do not invent new experiences, metrics, or details.
 
@@ -688,10 +592,7 @@ PROCESS STEPS FOR ACCURACY:
 3. Ensure every bullet is specific, results-oriented, and mirrors JD language naturally (avoid stuffing).
 4. Optimize for ATS: Integrate keywords seamlessly; keep structure simple.
 
-{detected_sections_info}
-
-{tailoring_instructions}
-
+""" + tailoring_instructions + """
 🎯 TRANSFORM THIS RESUME TO PERFECTLY MATCH THE JOB
 
 YOUR GOAL: Rewrite EVERY bullet and section to directly address JD requirements. Transform dramatically—use JD's exact phrases, emphasize relevant skills/metrics, and showcase problem-solving/impact.
@@ -778,15 +679,6 @@ SKILLS
 Category: Skill1, Skill2, Skill3
 Category: Skill4, Skill5, Skill6
 
-TARGET JOB:
-Title: {job_title}
-Description: {job_description}
-
-{optional_instructions}
-
-SIMILAR JOBS CONTEXT (use these insights):
-{similar_jobs}
-
 TRANSFORMATION RULES:
 1. Transform EVERY bullet point to directly address the requirements from the target job and patterns from similar jobs
 2. Use the exact terminology and keywords from the job description
@@ -798,37 +690,44 @@ TRANSFORMATION RULES:
 8. NEVER DUPLICATE SECTIONS - enhance what exists, add what's missing
 9. ENSURE EXCELLENT VISUAL FORMATTING with proper spacing
 
-ORIGINAL RESUME:
-{resume_text}
-
-Return ONLY the transformed resume in plain text, starting with name. Create a detailed, impactful resume that showcases the candidate's expertise and achievements with natural, flowing language that sounds human and authentic. Focus on professional presentation, comprehensive content, and measurable results that align perfectly with the target role.
-            """)
+"""
             
+            budget = get_prompt_budget()
+            assembled = assemble_prompt(
+                static_prefix,
+                [
+                    PromptSection("detected_sections", detected_sections_info),
+                    PromptSection("job", f"""TARGET JOB:
+Title: {job_title}
+Description: {strip_jd_boilerplate(job_description)}""", trim_priority=1, min_tokens=800),
+                    PromptSection("optional_instructions", optional_instructions),
+                    PromptSection("similar_jobs", f"""SIMILAR JOBS CONTEXT (use these insights):
+{similar_jobs_context}""", trim_priority=0, max_tokens=budget.rag_context_tokens),
+                    PromptSection("resume", f"""ORIGINAL RESUME:
+{resume_text}"""),
+                    PromptSection("deliverable", """Return ONLY the transformed resume in plain text, starting with name. Create a detailed, impactful resume that showcases the candidate's expertise and achievements with natural, flowing language that sounds human and authentic. Focus on professional presentation, comprehensive content, and measurable results that align perfectly with the target role."""),
+                ],
+                output_basis=resume_text,
+                output_ratio=2.5,
+                budget=budget,
+            )
+            print(f"📏 RAG prompt: {assembled.input_tokens} input tokens, max_tokens={assembled.max_tokens}, trimmed={assembled.trimmed_tokens}")
             
             # Create chain and run
             self._lazy_init()  # Initialize OpenAI components if needed
-            chain = rag_prompt | self.llm | StrOutputParser()
+            # The message (not just its text) carries the token usage
+            llm = self.llm.bind(max_tokens=assembled.max_tokens)
             
-            tailored_resume = chain.invoke({
-                "resume_text": resume_text,
-                "job_description": job_description,
-                "job_title": job_title,
-                "similar_jobs": similar_jobs_context,
-                "optional_instructions": optional_instructions,
-                "detected_sections_info": detected_sections_info,
-                "tailoring_instructions": tailoring_instructions
-            })
-            
-            # Log the AI response for debugging
-            print("=" * 80)
-            print("🤖 LANGCHAIN AI GENERATED RESPONSE:")
-            print("=" * 80)
-            print(repr(tailored_resume))
-            print("=" * 80)
-            print("📝 LANGCHAIN AI RESPONSE (FORMATTED):")
-            print("=" * 80)
-            print(tailored_resume)
-            print("=" * 80)
+            # Identical concurrent requests (retries, duplicate tabs) share one call
+            model_name = getattr(self.llm, "model_name", "gpt-4o-mini")
+            with track_llm_call("resume_tailoring_rag", model_name) as call:
+                message = get_llm_coalescer().run(
+                    model_name,
+                    [assembled.text, {"max_tokens": assembled.max_tokens, "temperature": self.llm.temperature}],
+                    call.wrap(lambda: llm.invoke(assembled.text))
+                )
+                tailored_resume = StrOutputParser().invoke(message)
+                call.set_output(tailored_resume)
             
             return {
                 "tailored_resume": tailored_resume,
@@ -0,0 +1,154 @@
+"""
+Single-flight coalescing and per-model concurrency limits for LLM calls
+
+Identical requests often arrive together: a batch retry overlaps the original
+attempt, or two tabs submit the same resume and job description. Callers pass
+a fingerprint of the normalized request (model, sampling parameters and prompt
+text) together with a zero-argument function that makes the call:
+
+    response = get_llm_coalescer().run(model, fingerprint_parts, lambda: client.create(...))
+
+The first caller for a fingerprint becomes the leader. It waits for a slot in
+the model's concurrency limit and makes the call. Callers arriving with the same
+fingerprint while it is in flight wait on the leader's future and get its result
+or exception. Nothing is cached after the call completes, so a later identical
+request (e.g. a deliberate regenerate) still reaches the model.
+"""
+
+import concurrent.futures
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def prompt_fingerprint(model: str, parts: Iterable[Any]) -> str:
+    """sha256 over the model and whitespace-normalized request parts"""
+    digest = hashlib.sha256(model.encode("utf-8"))
+    for part in parts:
+        if not isinstance(part, str):
+            part = json.dumps(part, sort_keys=True, default=str)
+        digest.update(b"\x1f")
+        digest.update(" ".join(part.split()).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class _ModelLimit:
+    __slots__ = ("semaphore", "limit", "in_flight", "peak_in_flight", "queued")
+
+    def __init__(self, limit: int):
+        self.semaphore = threading.BoundedSemaphore(limit)
+        self.limit = limit
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.queued = 0
+
+
+class LLMRequestCoalescer:
+    """Thread-safe single-flight map in front of per-model concurrency limits"""
+
+    def __init__(self, default_limit: int = 8, model_limits: Optional[Dict[str, int]] = None):
+        """
+        Args:
+            default_limit: Concurrent calls allowed per model unless overridden
+            model_limits: Per-model concurrent call limits
+        """
+        self.default_limit = max(1, default_limit)
+        self.model_limits = {model: max(1, limit) for model, limit in (model_limits or {}).items()}
+        self._inflight: Dict[str, concurrent.futures.Future] = {}
+        self._limits: Dict[str, _ModelLimit] = {}
+        self._lock = threading.Lock()
+        self.stats = {"calls": 0, "executed": 0, "deduplicated": 0, "errors": 0}
+
+    def _limit_for(self, model: str) -> _ModelLimit:
+        limit = self._limits.get(model)
+        if limit is None:
+            limit = self._limits[model] = _ModelLimit(self.model_limits.get(model, self.default_limit))
+        return limit
+
+    def run(self, model: str, fingerprint_parts: Iterable[Any], call: Callable[[], Any]) -> Any:
+        """Make ``call`` unless an identical request is already in flight, then share its outcome"""
+        key = prompt_fingerprint(model, fingerprint_parts)
+        with self._lock:
+            self.stats["calls"] += 1
+            future = self._inflight.get(key)
+            if future is not None:
+                self.stats["deduplicated"] += 1
+                leader = False
+            else:
+                future = self._inflight[key] = concurrent.futures.Future()
+                limit = self._limit_for(model)
+                leader = True
+
+        if not leader:
+            logger.info(f"Coalesced identical {model} request {key[:12]} with the in-flight call")
+            return future.result()
+
+        try:
+            with self._lock:
+                limit.queued += 1
+            limit.semaphore.acquire()
+            with self._lock:
+                limit.queued -= 1
+                limit.in_flight += 1
+                limit.peak_in_flight = max(limit.peak_in_flight, limit.in_flight)
+                self.stats["executed"] += 1
+            try:
+                result = call()
+            finally:
+                with self._lock:
+                    limit.in_flight -= 1
+                limit.semaphore.release()
+        except BaseException as e:
+            with self._lock:
+                self.stats["errors"] += 1
+                self._inflight.pop(key, None)
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            self._inflight.pop(key, None)
+        future.set_result(result)
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.stats,
+                "in_flight_requests": len(self._inflight),
+                "models": {
+                    model: {"limit": limit.limit, "in_flight": limit.in_flight,
+                            "peak_in_flight": limit.peak_in_flight, "queued": limit.queued}
+                    for model, limit in self._limits.items()
+                },
+            }
+
+
+_coalescer: Optional[LLMRequestCoalescer] = None
+_coalescer_lock = threading.Lock()
+
+
+def get_llm_coalescer() -> LLMRequestCoalescer:
+    """
+    Get the process-wide coalescer. ``LLM_MODEL_CONCURRENCY`` sets the default
+    per-model limit and ``LLM_MODEL_LIMITS`` overrides it per model, e.g.
+    ``gpt-4o-mini=16,gpt-4o=4``.
+    """
+    global _coalescer
+    if _coalescer is None:
+        with _coalescer_lock:
+            if _coalescer is None:
+                overrides = {}
+                for item in os.getenv("LLM_MODEL_LIMITS", "").split(","):
+                    model, _, value = item.partition("=")
+                    if model.strip() and value.strip().isdigit():
+                        overrides[model.strip()] = int(value)
+                _coalescer = LLMRequestCoalescer(
+                    default_limit=int(os.getenv("LLM_MODEL_CONCURRENCY", "8")),
+                    model_limits=overrides,
+                )
+    return _coalescer
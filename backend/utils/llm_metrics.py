@@ -0,0 +1,379 @@
+"""
+LLM call instrumentation
+
+Every model call goes through ``track_llm_call``, which records one
+``LLMCallRecord``:
+
+- queue wait: from the call being requested to the provider request starting.
+  This covers the coalescer's per-model concurrency limit and any executor
+  hand-off.
+- time to first token (streamed calls only) and total latency
+- prompt/completion tokens and estimated cost, from the provider's usage
+- retries, the model, and the outcome (ok, error, timeout, or coalesced onto
+  an identical in-flight call)
+
+Usage:
+
+    with track_llm_call("resume_tailoring", model) as call:
+        response = get_llm_coalescer().run(model, parts, call.wrap(lambda: client.chat.completions.create(...)))
+        call.set_output(response.choices[0].message.content)
+
+``wrap`` retries transient provider errors itself (``LLM_MAX_RETRIES``), so
+clients should be created with their own retries disabled to keep the count
+honest.
+
+Records are aggregated into per-(operation, model) histograms (see
+``get_llm_metrics().snapshot()``, served at
+``/api/admin/analytics/llm-metrics``). Each call is logged as one JSON line
+instead of the full response text. Errors and retried calls are always
+logged. Successful calls are logged at ``LLM_LOG_SAMPLE_RATE`` with a short
+output preview. Inside a traced batch job (see ``utils.stage_tracing``), each
+call is also timed as that job's ``llm`` stage.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import threading
+import time
+from bisect import bisect_left
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+import openai
+
+from utils.stage_tracing import trace_stage
+
+logger = logging.getLogger(__name__)
+
+# USD per 1M (prompt, completion) tokens; matched by longest model-name prefix
+MODEL_PRICING: Dict[str, Tuple[float, float]] = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4-turbo": (10.00, 30.00),
+    "gpt-4": (30.00, 60.00),
+    "gpt-3.5-turbo": (0.50, 1.50),
+}
+
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 20000, 30000, 60000, 120000)
+TOKEN_BUCKETS = (100, 250, 500, 1000, 2000, 4000, 8000, 16000, 32000)
+COST_BUCKETS_USD = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5)
+
+RETRYABLE_ERRORS = (openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError)
+PREVIEW_CHARS = 200
+
+
+def estimate_cost(model: str, prompt_tokens: Optional[int], completion_tokens: Optional[int]) -> Optional[float]:
+    """Estimated USD cost of a call, or None for unknown models or usage"""
+    if prompt_tokens is None and completion_tokens is None:
+        return None
+    for prefix in sorted(MODEL_PRICING, key=len, reverse=True):
+        if model.startswith(prefix):
+            prompt_price, completion_price = MODEL_PRICING[prefix]
+            return ((prompt_tokens or 0) * prompt_price + (completion_tokens or 0) * completion_price) / 1_000_000
+    return None
+
+
+def extract_usage(response: Any) -> Tuple[Optional[int], Optional[int]]:
+    """(prompt, completion) tokens from an OpenAI completion or a LangChain message"""
+    usage = getattr(response, "usage", None)
+    if usage is not None and getattr(usage, "prompt_tokens", None) is not None:
+        return usage.prompt_tokens, usage.completion_tokens
+    usage = getattr(response, "usage_metadata", None)
+    if usage:
+        return usage.get("input_tokens"), usage.get("output_tokens")
+    usage = (getattr(response, "response_metadata", None) or {}).get("token_usage")
+    if usage:
+        return usage.get("prompt_tokens"), usage.get("completion_tokens")
+    return None, None
+
+
+@dataclass
+class LLMCallRecord:
+    """One model call as seen by its caller"""
+
+    operation: str
+    model: str
+    status: str  # "ok", "error", "timeout" or "coalesced"
+    queue_wait_ms: Optional[float]
+    ttft_ms: Optional[float]
+    latency_ms: float
+    prompt_tokens: Optional[int]
+    completion_tokens: Optional[int]
+    cost_usd: Optional[float]
+    retries: int
+    error: Optional[str] = None
+
+
+class Histogram:
+    """Fixed-bucket histogram with bucket-interpolated percentiles"""
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = self.bounds[i - 1] if i > 0 else self.min
+                upper = self.bounds[i] if i < len(self.bounds) else self.max
+                lower, upper = max(lower, self.min), min(upper, self.max)
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.max
+
+    def snapshot(self) -> Dict[str, Any]:
+        cumulative, buckets = 0, []
+        for bound, bucket_count in zip(self.bounds + ("+Inf",), self.counts):
+            cumulative += bucket_count
+            buckets.append({"le": bound, "count": cumulative})
+        return {
+            "count": self.count,
+            "sum": round(self.total, 6),
+            "min": self.min,
+            "max": self.max,
+            "mean": round(self.total / self.count, 6) if self.count else None,
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+            "buckets": buckets,
+        }
+
+
+class _CallStats:
+    def __init__(self):
+        self.calls = 0
+        self.statuses: Dict[str, int] = {}
+        self.retries = 0
+        self.histograms = {
+            "queue_wait_ms": Histogram(LATENCY_BUCKETS_MS),
+            "ttft_ms": Histogram(LATENCY_BUCKETS_MS),
+            "latency_ms": Histogram(LATENCY_BUCKETS_MS),
+            "prompt_tokens": Histogram(TOKEN_BUCKETS),
+            "completion_tokens": Histogram(TOKEN_BUCKETS),
+            "cost_usd": Histogram(COST_BUCKETS_USD),
+        }
+
+
+class LLMMetrics:
+    """Thread-safe per-(operation, model) aggregation of call records"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[Tuple[str, str], _CallStats] = {}
+        self.since = datetime.utcnow()
+
+    def record(self, record: LLMCallRecord) -> None:
+        with self._lock:
+            stats = self._stats.get((record.operation, record.model))
+            if stats is None:
+                stats = self._stats[(record.operation, record.model)] = _CallStats()
+            stats.calls += 1
+            stats.statuses[record.status] = stats.statuses.get(record.status, 0) + 1
+            stats.retries += record.retries
+            for name, histogram in stats.histograms.items():
+                value = getattr(record, name)
+                if value is not None:
+                    histogram.observe(value)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            calls: List[Dict[str, Any]] = [
+                {
+                    "operation": operation,
+                    "model": model,
+                    "calls": stats.calls,
+                    "statuses": dict(stats.statuses),
+                    "retries": stats.retries,
+                    "cost_usd_total": round(stats.histograms["cost_usd"].total, 6),
+                    "histograms": {name: histogram.snapshot() for name, histogram in stats.histograms.items()},
+                }
+                for (operation, model), stats in sorted(self._stats.items())
+            ]
+            return {
+                "since": self.since.isoformat(),
+                "total_calls": sum(entry["calls"] for entry in calls),
+                "total_cost_usd": round(sum(entry["cost_usd_total"] for entry in calls), 6),
+                "calls": calls,
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+            self.since = datetime.utcnow()
+
+
+class LLMCallTracker:
+    """Timing and usage of one model call; see ``track_llm_call``"""
+
+    def __init__(self, operation: str, model: str, max_retries: int, sample_rate: float):
+        self.operation = operation
+        self.model = model
+        self.max_retries = max_retries
+        self.sample_rate = sample_rate
+        self.requested_at = time.perf_counter()
+        self.started_at: Optional[float] = None
+        self.first_token_at: Optional[float] = None
+        self.retries = 0
+        self.prompt_tokens: Optional[int] = None
+        self.completion_tokens: Optional[int] = None
+        self.output: Optional[str] = None
+
+    def _started(self) -> None:
+        self.started_at = time.perf_counter()
+
+    def _backoff(self, attempt: int, error: Exception) -> Optional[float]:
+        """Seconds to wait before retrying, or None to give up"""
+        if attempt >= self.max_retries or not isinstance(error, RETRYABLE_ERRORS):
+            return None
+        self.retries += 1
+        logger.warning(f"Retrying {self.operation} ({self.model}) after {type(error).__name__}: {error}")
+        return min(8.0, 0.5 * 2 ** attempt) * (0.5 + random.random() / 2)
+
+    def _finished(self, response: Any) -> Any:
+        self.prompt_tokens, self.completion_tokens = extract_usage(response)
+        return response
+
+    def wrap(self, call: Callable[[], Any]) -> Callable[[], Any]:
+        """``call`` with timing, retries and usage capture; runs only if this caller makes the request"""
+        def run():
+            self._started()
+            attempt = 0
+            while True:
+                try:
+                    return self._finished(call())
+                except Exception as e:
+                    delay = self._backoff(attempt, e)
+                    if delay is None:
+                        raise
+                    attempt += 1
+                    time.sleep(delay)
+        return run
+
+    async def run_async(self, call: Callable[[], Awaitable[Any]]) -> Any:
+        """Async counterpart of ``wrap``: await ``call()`` with timing, retries and usage capture"""
+        self._started()
+        attempt = 0
+        while True:
+            try:
+                return self._finished(await call())
+            except Exception as e:
+                delay = self._backoff(attempt, e)
+                if delay is None:
+                    raise
+                attempt += 1
+                await asyncio.sleep(delay)
+
+    def first_token(self) -> None:
+        """Mark the first streamed token (streaming callers only)"""
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+
+    def set_output(self, text: Optional[str]) -> None:
+        """Response text, used only for the sampled log preview"""
+        self.output = text
+
+    def record(self, status: str, error: Optional[str] = None) -> LLMCallRecord:
+        now = time.perf_counter()
+        if status == "ok" and self.started_at is None:
+            status = "coalesced"  # an identical in-flight call made the request
+        ms = lambda start, end: round((end - start) * 1000, 1) if start is not None and end is not None else None
+        return LLMCallRecord(
+            operation=self.operation,
+            model=self.model,
+            status=status,
+            queue_wait_ms=ms(self.requested_at, self.started_at),
+            ttft_ms=ms(self.started_at, self.first_token_at),
+            latency_ms=ms(self.requested_at, now),
+            prompt_tokens=self.prompt_tokens,
+            completion_tokens=self.completion_tokens,
+            cost_usd=estimate_cost(self.model, self.prompt_tokens, self.completion_tokens),
+            retries=self.retries,
+            error=error,
+        )
+
+
+class track_llm_call:
+    """
+    Context manager (sync or async) that records one model call.
+
+    Args:
+        operation: What the call is for, e.g. "resume_tailoring"
+        model: Model name, used for pricing and grouping
+    """
+
+    def __init__(self, operation: str, model: str):
+        self.tracker = LLMCallTracker(
+            operation,
+            model,
+            max_retries=int(os.getenv("LLM_MAX_RETRIES", "2")),
+            sample_rate=float(os.getenv("LLM_LOG_SAMPLE_RATE", "0.1")),
+        )
+        # The call is also the "llm" stage of the active job trace, if any
+        self.stage = trace_stage("llm", operation=operation, model=model)
+
+    def __enter__(self) -> LLMCallTracker:
+        self.stage.__enter__()
+        return self.tracker
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            record = self.tracker.record("ok")
+        elif issubclass(exc_type, (TimeoutError, asyncio.TimeoutError, openai.APITimeoutError)):
+            record = self.tracker.record("timeout", str(exc) or exc_type.__name__)
+        else:
+            record = self.tracker.record("error", str(exc) or exc_type.__name__)
+        get_llm_metrics().record(record)
+        self._log(record)
+        if self.stage.span is not None:
+            self.stage.span.attributes.update(status=record.status, prompt_tokens=record.prompt_tokens,
+                                              completion_tokens=record.completion_tokens, retries=record.retries)
+        self.stage.__exit__(exc_type, exc, tb)
+
+    async def __aenter__(self) -> LLMCallTracker:
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self.__exit__(exc_type, exc, tb)
+
+    def _log(self, record: LLMCallRecord) -> None:
+        fields = {key: value for key, value in asdict(record).items() if value is not None}
+        if record.status in ("error", "timeout") or record.retries:
+            logger.warning(f"LLM call: {json.dumps(fields)}")
+        elif random.random() < self.tracker.sample_rate:
+            if self.tracker.output:
+                fields["output_chars"] = len(self.tracker.output)
+                fields["output_preview"] = self.tracker.output[:PREVIEW_CHARS]
+            logger.info(f"LLM call: {json.dumps(fields)}")
+
+
+_metrics: Optional[LLMMetrics] = None
+_metrics_lock = threading.Lock()
+
+
+def get_llm_metrics() -> LLMMetrics:
+    """Process-wide LLM call metrics"""
+    global _metrics
+    if _metrics is None:
+        with _metrics_lock:
+            if _metrics is None:
+                _metrics = LLMMetrics()
+    return _metrics
@@ -0,0 +1,49 @@
+"""
+Thread-safe LRU for memoizing pure builds
+
+``LRUCache.get_or_build(key, build)`` returns the cached value for ``key`` or
+calls ``build()`` outside the lock and stores the result, evicting the least
+recently used entry past ``max_entries`` (0 disables caching). Because
+``build`` runs unlocked, a concurrent miss on the same key builds twice and the
+last result wins, which is harmless for pure builds and keeps slow builds from
+serializing every other lookup.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, TypeVar
+
+V = TypeVar("V")
+
+
+class LRUCache(Generic[V]):
+    """Thread-safe LRU of built values with hit/miss counters"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max(0, max_entries)
+        self._entries: "OrderedDict[Hashable, V]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0}
+
+    def get_or_build(self, key: Hashable, build: Callable[[], V]) -> V:
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return cached
+            self.stats["misses"] += 1
+
+        value = build()
+        if self.max_entries:
+            with self._lock:
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.stats = {"hits": 0, "misses": 0}
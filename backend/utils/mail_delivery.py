@@ -0,0 +1,310 @@
+"""
+Outbound mail delivery
+
+Messages are handed to a process-wide ``MailDelivery`` whose event loop runs in
+a background thread, so callers on any thread or event loop can submit mail
+without blocking on SMTP. The loop owns:
+
+- ``SMTPConnectionPool``: up to ``max_connections`` persistent aiosmtplib
+  connections. Connect, STARTTLS and AUTH happen once per connection. Idle
+  connections are checked with NOOP before reuse and reopened when the server
+  has dropped them.
+- A send queue drained by ``concurrency`` workers, which bounds how many
+  messages are in flight at once.
+"""
+
+import asyncio
+import atexit
+import concurrent.futures
+import logging
+import os
+import threading
+import time
+from email.message import Message
+from typing import Any, Dict, List, Optional
+
+import aiosmtplib
+
+logger = logging.getLogger(__name__)
+
+# Errors after which a connection is presumed dead and the message is retried
+# once on a fresh connection
+_CONNECTION_ERRORS = (aiosmtplib.SMTPServerDisconnected, aiosmtplib.SMTPConnectError, ConnectionError, OSError)
+
+
+class _PooledConnection:
+    __slots__ = ("smtp", "last_used", "messages_sent")
+
+    def __init__(self, smtp: aiosmtplib.SMTP):
+        self.smtp = smtp
+        self.last_used = time.monotonic()
+        self.messages_sent = 0
+
+
+class SMTPConnectionPool:
+    """Reconnecting pool of authenticated SMTP connections (single event loop)"""
+
+    def __init__(
+        self,
+        hostname: str,
+        port: int,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        start_tls: bool = True,
+        max_connections: int = 4,
+        idle_check_seconds: float = 30.0,
+        max_messages_per_connection: int = 500,
+        timeout: float = 30.0,
+    ):
+        """
+        Args:
+            hostname: SMTP server host
+            port: SMTP server port
+            username: AUTH username (AUTH is skipped without username and password)
+            password: AUTH password
+            start_tls: Issue STARTTLS after connecting
+            max_connections: Maximum open connections
+            idle_check_seconds: Send NOOP before reusing a connection idle this long
+            max_messages_per_connection: Recycle a connection after this many messages
+            timeout: Socket timeout for SMTP commands
+        """
+        self.hostname = hostname
+        self.port = port
+        self.username = username
+        self.password = password
+        self.start_tls = start_tls
+        self.max_connections = max(1, max_connections)
+        self.idle_check_seconds = idle_check_seconds
+        self.max_messages_per_connection = max(1, max_messages_per_connection)
+        self.timeout = timeout
+
+        self._idle: List[_PooledConnection] = []
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.stats = {"connections_opened": 0, "connections_reused": 0, "reconnects": 0, "messages_sent": 0}
+
+    async def _open(self) -> _PooledConnection:
+        smtp = aiosmtplib.SMTP(hostname=self.hostname, port=self.port, timeout=self.timeout, start_tls=False)
+        await smtp.connect()
+        try:
+            if self.start_tls:
+                await smtp.starttls()
+            if self.username and self.password:
+                await smtp.login(self.username, self.password)
+        except Exception:
+            smtp.close()
+            raise
+        self.stats["connections_opened"] += 1
+        return _PooledConnection(smtp)
+
+    @staticmethod
+    async def _discard(connection: _PooledConnection) -> None:
+        try:
+            if connection.smtp.is_connected:
+                await connection.smtp.quit()
+        except Exception:
+            connection.smtp.close()
+
+    async def _checkout(self) -> _PooledConnection:
+        while self._idle:
+            connection = self._idle.pop()
+            if not connection.smtp.is_connected:
+                # Dropped by the server while idle
+                self.stats["reconnects"] += 1
+                continue
+            if time.monotonic() - connection.last_used >= self.idle_check_seconds:
+                try:
+                    await connection.smtp.noop()
+                except Exception:
+                    self.stats["reconnects"] += 1
+                    await self._discard(connection)
+                    continue
+            self.stats["connections_reused"] += 1
+            return connection
+        return await self._open()
+
+    def _checkin(self, connection: _PooledConnection) -> None:
+        connection.last_used = time.monotonic()
+        connection.messages_sent += 1
+        if connection.messages_sent >= self.max_messages_per_connection:
+            asyncio.ensure_future(self._discard(connection))
+        else:
+            self._idle.append(connection)
+
+    async def send(self, message: Message) -> None:
+        """Send one message, retrying once on a fresh connection if the pooled one died"""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_connections)
+        async with self._slots:
+            connection = await self._checkout()
+            try:
+                await connection.smtp.send_message(message)
+            except _CONNECTION_ERRORS as e:
+                logger.warning(f"SMTP connection lost ({e}); reconnecting")
+                self.stats["reconnects"] += 1
+                await self._discard(connection)
+                connection = await self._open()
+                try:
+                    await connection.smtp.send_message(message)
+                except _CONNECTION_ERRORS:
+                    await self._discard(connection)
+                    raise
+                except aiosmtplib.SMTPException:
+                    self._checkin(connection)
+                    raise
+            except aiosmtplib.SMTPException:
+                # Rejected by the server; the connection itself is still usable
+                self._checkin(connection)
+                raise
+            except BaseException:
+                await self._discard(connection)
+                raise
+            self._checkin(connection)
+            self.stats["messages_sent"] += 1
+
+    async def close(self) -> None:
+        self._slots = None  # bound to the closing event loop
+        idle, self._idle = self._idle, []
+        for connection in idle:
+            await self._discard(connection)
+
+
+class MailDelivery:
+    """Background send queue with bounded concurrency over an ``SMTPConnectionPool``"""
+
+    def __init__(self, pool: SMTPConnectionPool, concurrency: Optional[int] = None):
+        self.pool = pool
+        self.concurrency = max(1, concurrency or pool.max_connections)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.stats = {"queued": 0, "sent": 0, "failed": 0}
+
+    def _run(self, ready: threading.Event) -> None:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        workers = [loop.create_task(self._worker()) for _ in range(self.concurrency)]
+        ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            loop.run_until_complete(asyncio.gather(*workers, return_exceptions=True))
+            self._fail_pending()
+            loop.run_until_complete(self.pool.close())
+            loop.close()
+
+    def _fail_pending(self) -> None:
+        """Resolve futures of messages still queued at shutdown so no caller waits forever"""
+        while not self._queue.empty():
+            message, future = self._queue.get_nowait()
+            self._queue.task_done()
+            if future.set_running_or_notify_cancel():
+                self.stats["failed"] += 1
+                logger.error(f"❌ Mail delivery stopped before sending to {message.get('To')}")
+                future.set_result(False)
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            ready = threading.Event()
+            self._thread = threading.Thread(target=self._run, args=(ready,), name="mail-delivery", daemon=True)
+            self._thread.start()
+            ready.wait()
+
+    async def _worker(self) -> None:
+        while True:
+            message, future = await self._queue.get()
+            try:
+                if future.set_running_or_notify_cancel():
+                    try:
+                        await self.pool.send(message)
+                        self.stats["sent"] += 1
+                        future.set_result(True)
+                    except Exception as e:
+                        self.stats["failed"] += 1
+                        logger.error(f"❌ SMTP send failed to {message.get('To')}: {e}")
+                        future.set_result(False)
+                    except asyncio.CancelledError:
+                        # Delivery thread stopping mid-send
+                        self.stats["failed"] += 1
+                        future.set_result(False)
+                        raise
+            finally:
+                self._queue.task_done()
+
+    def submit(self, message: Message) -> "concurrent.futures.Future[bool]":
+        """
+        Queue a message for delivery.
+
+        Returns:
+            Future resolving to True once the server accepted the message, or
+            False if delivery failed
+        """
+        self.start()
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        self.stats["queued"] += 1
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, (message, future))
+        return future
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """Block until every queued message has been attempted"""
+        if self._loop is None or not self._loop.is_running():
+            return
+        asyncio.run_coroutine_threadsafe(self._queue.join(), self._loop).result(timeout)
+
+    def stop(self, timeout: Optional[float] = 30.0) -> None:
+        """Flush the queue, close pooled connections and stop the delivery thread"""
+        try:
+            self.flush(timeout)
+        except concurrent.futures.TimeoutError:
+            logger.warning("Timed out flushing the mail queue; pending messages dropped")
+        with self._lock:
+            if self._loop is not None and self._loop.is_running():
+                self._loop.call_soon_threadsafe(self._loop.stop)
+            if self._thread is not None:
+                self._thread.join(timeout)
+            self._thread = None
+            self._loop = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        pending = self._queue.qsize() if self._queue is not None else 0
+        return {**self.stats, "pending": pending, "concurrency": self.concurrency, "pool": dict(self.pool.stats)}
+
+
+_mail_delivery: Optional[MailDelivery] = None
+_mail_delivery_lock = threading.Lock()
+
+
+def get_mail_delivery() -> MailDelivery:
+    """Get the process-wide mail delivery queue, configured from security settings"""
+    global _mail_delivery
+    if _mail_delivery is None:
+        with _mail_delivery_lock:
+            if _mail_delivery is None:
+                from config.security import get_security_settings
+
+                settings = get_security_settings()
+                pool = SMTPConnectionPool(
+                    hostname=settings.smtp_server,
+                    port=settings.smtp_port,
+                    username=settings.smtp_username,
+                    password=settings.smtp_password,
+                    start_tls=settings.smtp_use_tls,
+                    max_connections=int(os.getenv("SMTP_POOL_SIZE", "4")),
+                    idle_check_seconds=float(os.getenv("SMTP_IDLE_CHECK_SECONDS", "30")),
+                    max_messages_per_connection=int(os.getenv("SMTP_MAX_MESSAGES_PER_CONNECTION", "500")),
+                )
+                _mail_delivery = MailDelivery(pool, concurrency=int(os.getenv("MAIL_SEND_CONCURRENCY", "0")) or None)
+                atexit.register(_mail_delivery.stop)
+    return _mail_delivery
+
+
+def shutdown_mail_delivery(timeout: float = 30.0) -> None:
+    """Flush queued mail and close SMTP connections (application shutdown)"""
+    if _mail_delivery is not None:
+        _mail_delivery.stop(timeout)
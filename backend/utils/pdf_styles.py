@@ -0,0 +1,85 @@
+"""
+Shared ReportLab style sets
+
+Every PDF renderer used to build its paragraph styles (and often a whole
+``getSampleStyleSheet()``) for each document. The values depend only on the
+formatting configuration, so the styles for one configuration are identical
+from one PDF to the next.
+
+``get_style_registry().get(key, build)`` builds a configuration's styles once
+per process and returns the same read-only mapping afterwards. ``key`` is a
+hashable description of everything ``build`` reads, for example
+``("advanced", template, color_scheme, font_family, font_size, line_spacing)``.
+Callers must not modify the returned styles. To vary a style, derive a new
+``ParagraphStyle`` with ``parent=``.
+
+The first lookup also loads the metrics of the standard fonts the templates
+use, so later builds only pay for layout.
+"""
+
+import os
+import threading
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Callable, Hashable, Mapping, Optional
+
+from reportlab.lib.styles import ParagraphStyle, StyleSheet1, getSampleStyleSheet
+from reportlab.pdfbase import pdfmetrics
+
+from utils.lru import LRUCache
+
+StyleSet = Mapping[str, ParagraphStyle]
+
+# Every font family the formatting options map to (Calibri/Arial and Garamond
+# fall back to Helvetica and Times)
+STANDARD_FONTS = (
+    "Helvetica", "Helvetica-Bold", "Helvetica-Oblique", "Helvetica-BoldOblique",
+    "Times-Roman", "Times-Bold", "Times-Italic", "Times-BoldItalic",
+)
+
+_fonts_lock = threading.Lock()
+_fonts_registered = False
+
+
+def register_fonts() -> None:
+    """Load the standard font metrics once per process"""
+    global _fonts_registered
+    if _fonts_registered:
+        return
+    with _fonts_lock:
+        if not _fonts_registered:
+            for font_name in STANDARD_FONTS:
+                pdfmetrics.getFont(font_name)
+            _fonts_registered = True
+
+
+@lru_cache(maxsize=1)
+def sample_styles() -> StyleSheet1:
+    """ReportLab's sample style sheet, built once and shared as a parent for custom styles"""
+    register_fonts()
+    return getSampleStyleSheet()
+
+
+class StyleRegistry(LRUCache[StyleSet]):
+    """Thread-safe LRU of built style sets keyed by formatting configuration"""
+
+    def get(self, key: Hashable, build: Callable[[], Mapping[str, ParagraphStyle]]) -> StyleSet:
+        def build_styles() -> StyleSet:
+            register_fonts()
+            return MappingProxyType(dict(build()))
+
+        return self.get_or_build(key, build_styles)
+
+
+_registry: Optional[StyleRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_style_registry() -> StyleRegistry:
+    """Process-wide registry, sized by ``PDF_STYLE_CACHE_SIZE`` (0 disables it)"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = StyleRegistry(int(os.getenv("PDF_STYLE_CACHE_SIZE", "512")))
+    return _registry
@@ -0,0 +1,269 @@
+"""
+Prompt assembly with cache-friendly layout and a token budget
+
+OpenAI caches prompt prefixes: when the first ~1k+ tokens of a request are
+byte-identical to a recent request, those tokens are served from cache (cheaper
+and faster). Our tailoring prompts used to interleave per-request values
+(detected sections, similar jobs, the job title) with the large static
+instruction blocks, so no two requests shared a useful prefix.
+
+``assemble_prompt`` takes a static prefix (instruction blocks that only depend
+on the tailoring mode) followed by request-specific ``PromptSection``s, and:
+
+- keeps the static prefix first and untouched
+- trims sections that carry a ``trim_priority`` (lowest first, never below
+  their ``min_tokens``) until the whole input fits ``max_input_tokens``
+- sizes the completion's ``max_tokens`` from the resume being rewritten
+  instead of always asking for 8000
+
+``strip_jd_boilerplate`` removes benefits/perks sections (only under an
+explicit heading such as "Benefits:") and EEO, E-Verify or accommodation
+statements from scraped job descriptions. They cost tokens and never change
+the tailored resume. Benefit words in the body of a posting are left alone,
+because for roles like a benefits analyst or a health insurer they are the job.
+"""
+
+import math
+import os
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+# Lines that introduce a section of a job posting
+_HEADING_NAMES = re.compile(
+    r"^(about|overview|the role|role|responsibilities|requirements|qualifications|preferred|nice to have|"
+    r"what you('|’)ll do|what you will do|who you are|what we('|’)re looking for|skills|experience|"
+    r"benefits|perks|compensation|what we offer|why join|equal|eeo|accommodation|diversity|pay transparency)\b",
+    re.IGNORECASE,
+)
+# Whole heading text (matched with fullmatch) of a benefits or EEO block
+_BOILERPLATE_HEADING = re.compile(
+    r"(our |your )?(benefits|perks|(benefits|perks)( and| &) (benefits|perks)|(salary|compensation|pay)( and| &) benefits|"
+    r"what we offer|why join( us| [\w .&-]+)?|why you('|’)ll love( it)?( here| working here)?|"
+    r"equal (employment )?opportunity( employer| statement)?|eeo( statement)?|accommodations?|reasonable accommodations?|"
+    r"our commitment to (diversity|inclusion)( and| &)?( inclusion| diversity)?|diversity( and| &)? inclusion|"
+    r"pay transparency|privacy notice|applicant privacy( notice)?)",
+    re.IGNORECASE,
+)
+# EEO, E-Verify and accommodation phrasing; benefit keywords are deliberately absent
+_BOILERPLATE_SENTENCE = re.compile(
+    r"(?<!\w)(equal (employment )?opportunity|without regard to|reasonable accommodations?|e-verify|affirmative action|"
+    r"protected veteran|applicant privacy|pay transparency|unsolicited (resumes|agency))",
+    re.IGNORECASE,
+)
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
+_APPROX_TOKEN = re.compile(r"\w+|[^\w\s]")
+
+_encoding = None
+_encoding_loaded = False
+_encoding_lock = threading.Lock()
+
+
+def _get_encoding():
+    """tiktoken encoding, or None when tiktoken or its encoding files are unavailable"""
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        with _encoding_lock:
+            if not _encoding_loaded:
+                try:
+                    import tiktoken
+                    _encoding = tiktoken.get_encoding(os.getenv("PROMPT_TOKEN_ENCODING", "cl100k_base"))
+                except Exception:
+                    _encoding = None
+                _encoding_loaded = True
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """Token count of ``text`` (exact with tiktoken, otherwise a close word-piece estimate)"""
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return sum(math.ceil(len(piece) / 4) for piece in _APPROX_TOKEN.findall(text))
+
+
+def truncate_to_tokens(text: str, max_tokens: int, marker: str = "...") -> str:
+    """Cut ``text`` to at most ``max_tokens`` tokens, at a word boundary, ending with ``marker``"""
+    if count_tokens(text) <= max_tokens:
+        return text
+    if max_tokens <= count_tokens(marker):
+        return ""
+    limit = max_tokens - count_tokens(marker)
+    encoding = _get_encoding()
+    if encoding is not None:
+        cut = encoding.decode(encoding.encode(text, disallowed_special=())[:limit])
+    else:
+        cut = text[:limit * 4]
+        while cut and count_tokens(cut) > limit:
+            cut = cut[:int(len(cut) * 0.9)]
+    boundary = max(cut.rfind("\n"), cut.rfind(" "))
+    if boundary > len(cut) // 2:
+        cut = cut[:boundary]
+    return cut.rstrip() + marker
+
+
+def _is_heading(line: str) -> bool:
+    stripped = line.strip()
+    if not stripped or stripped[0] in "-•·" or stripped.startswith("* "):
+        return False
+    text = stripped.strip("#*_ ").rstrip(":").strip()
+    if not text or len(text.split()) > 8 or text.endswith((".", ",")):
+        return False
+    return (stripped.endswith(":") or stripped.startswith("#") or stripped.startswith("**")
+            or (text.isupper() and len(text) > 3) or bool(_HEADING_NAMES.match(text)))
+
+
+def _is_boilerplate_heading(line: str) -> bool:
+    """An explicit heading (ends with ":", markdown, or ALL CAPS) naming a benefits/EEO block"""
+    stripped = line.strip()
+    text = stripped.strip("#*_ ").rstrip(":").strip()
+    explicit = (stripped.endswith(":") or stripped.startswith("#")
+                or (stripped.startswith("**") and stripped.rstrip(":").endswith("**"))
+                or (text.isupper() and len(text) > 3))
+    return explicit and bool(_BOILERPLATE_HEADING.fullmatch(text))
+
+
+def strip_jd_boilerplate(job_description: str) -> str:
+    """Drop benefits/EEO sections under explicit headings and EEO/accommodation sentences"""
+    if not job_description:
+        return job_description
+
+    kept: List[str] = []
+    skipping = False
+    for line in job_description.splitlines():
+        if _is_heading(line):
+            skipping = _is_boilerplate_heading(line)
+            if skipping:
+                continue
+        elif skipping:
+            continue
+
+        if _BOILERPLATE_SENTENCE.search(line):
+            sentences = [s for s in _SENTENCE_SPLIT.split(line) if not _BOILERPLATE_SENTENCE.search(s)]
+            line = " ".join(sentences)
+            if not line.strip():
+                continue
+        kept.append(line)
+
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(kept)).strip()
+
+
+@dataclass
+class PromptBudget:
+    """Token limits for one tailoring request"""
+    max_input_tokens: int = 12000
+    rag_context_tokens: int = 600
+    min_output_tokens: int = 2000
+    max_output_tokens: int = 8000
+    output_overhead_tokens: int = 800  # summary/skills sections the model adds
+    context_window: int = 128000
+
+    @classmethod
+    def from_env(cls) -> "PromptBudget":
+        defaults = cls()
+        return cls(
+            max_input_tokens=int(os.getenv("PROMPT_MAX_INPUT_TOKENS", defaults.max_input_tokens)),
+            rag_context_tokens=int(os.getenv("PROMPT_RAG_CONTEXT_TOKENS", defaults.rag_context_tokens)),
+            min_output_tokens=int(os.getenv("PROMPT_MIN_OUTPUT_TOKENS", defaults.min_output_tokens)),
+            max_output_tokens=int(os.getenv("PROMPT_MAX_OUTPUT_TOKENS", defaults.max_output_tokens)),
+        )
+
+    def output_tokens_for(self, basis_tokens: int, input_tokens: int, ratio: float) -> int:
+        """Completion budget for rewriting ``basis_tokens`` of resume, ``ratio`` times longer"""
+        wanted = int(basis_tokens * ratio) + self.output_overhead_tokens
+        wanted = min(max(wanted, self.min_output_tokens), self.max_output_tokens)
+        return max(1, min(wanted, self.context_window - input_tokens))
+
+
+@dataclass
+class PromptSection:
+    """Request-specific part of a prompt, placed after the static prefix"""
+    name: str
+    text: str
+    trim_priority: Optional[int] = None  # lower is trimmed first; None is never trimmed
+    min_tokens: int = 0
+    max_tokens: Optional[int] = None  # cap applied regardless of the overall budget
+
+
+@dataclass
+class AssembledPrompt:
+    text: str
+    static_prefix: str
+    input_tokens: int
+    max_tokens: int
+    trimmed_tokens: Dict[str, int] = field(default_factory=dict)
+
+
+def assemble_prompt(
+    static_prefix: str,
+    sections: List[PromptSection],
+    output_basis: str,
+    output_ratio: float = 2.0,
+    system_prompt: str = "",
+    budget: Optional[PromptBudget] = None,
+) -> AssembledPrompt:
+    """
+    Build ``static_prefix`` + sections within ``budget``.
+
+    Args:
+        static_prefix: Instructions that are identical for every request of this kind
+        sections: Request-specific sections, in prompt order
+        output_basis: Text the model rewrites (the resume); sizes ``max_tokens``
+        output_ratio: Expected output tokens per ``output_basis`` token
+        system_prompt: System message sent alongside, counted against the input budget
+        budget: Limits to apply (defaults to ``get_prompt_budget()``)
+    """
+    budget = budget or get_prompt_budget()
+    trimmed: Dict[str, int] = {}
+    texts = {}
+    for section in sections:
+        text = section.text.strip("\n")
+        if section.max_tokens is not None:
+            before = count_tokens(text)
+            text = truncate_to_tokens(text, section.max_tokens)
+            if before > count_tokens(text):
+                trimmed[section.name] = before - count_tokens(text)
+        texts[section.name] = text
+
+    fixed = count_tokens(system_prompt) + count_tokens(static_prefix)
+    total = fixed + sum(count_tokens(text) for text in texts.values())
+    trimmable = sorted((s for s in sections if s.trim_priority is not None), key=lambda s: s.trim_priority)
+    for section in trimmable:
+        over = total - budget.max_input_tokens
+        if over <= 0:
+            break
+        current = count_tokens(texts[section.name])
+        target = max(section.min_tokens, current - over)
+        if target < current:
+            texts[section.name] = truncate_to_tokens(texts[section.name], target)
+            removed = current - count_tokens(texts[section.name])
+            trimmed[section.name] = trimmed.get(section.name, 0) + removed
+            total -= removed
+
+    body = "\n\n".join(texts[s.name] for s in sections if texts[s.name].strip())
+    text = static_prefix.rstrip("\n") + "\n\n" + body + "\n"
+    input_tokens = count_tokens(system_prompt) + count_tokens(text)
+    return AssembledPrompt(
+        text=text,
+        static_prefix=static_prefix,
+        input_tokens=input_tokens,
+        max_tokens=budget.output_tokens_for(count_tokens(output_basis), input_tokens, output_ratio),
+        trimmed_tokens=trimmed,
+    )
+
+
+_budget: Optional[PromptBudget] = None
+_budget_lock = threading.Lock()
+
+
+def get_prompt_budget() -> PromptBudget:
+    """Process-wide budget from ``PROMPT_*`` environment variables"""
+    global _budget
+    if _budget is None:
+        with _budget_lock:
+            if _budget is None:
+                _budget = PromptBudget.from_env()
+    return _budget
@@ -1,10 +1,11 @@
-import difflib
 import re
 from typing import Dict, List, Tuple, Any
-from Levenshtein import distance
 from datetime import datetime
 import json
 
+from utils.resume_segments import segment_resume
+from utils.text_diff import Opcode, diff_opcodes, similarity
+
 class ResumeDiffAnalyzer:
     def __init__(self):
         self.diff_types = {
@@ -22,98 +23,42 @@ class ResumeDiffAnalyzer:
         original_sections = self._parse_resume_sections(original_text)
         tailored_sections = self._parse_resume_sections(tailored_text)
         
+        # Tokenize once; every analysis below reuses these words
+        original_words = original_text.split()
+        tailored_words = tailored_text.split()
+        
         # Analyze different types of changes
         diff_analysis = {
             "job_title": job_title,
             "analysis_timestamp": datetime.now().isoformat(),
             "summary": self._create_diff_summary(original_sections, tailored_sections),
             "section_changes": self._analyze_section_changes(original_sections, tailored_sections),
-            "content_changes": self._analyze_content_changes(original_text, tailored_text),
-            "enhancement_score": self._calculate_enhancement_score(original_text, tailored_text),
-            "detailed_diff": self._create_detailed_diff(original_text, tailored_text)
+            "content_changes": self._analyze_content_changes(original_text, tailored_text, original_words, tailored_words),
+            "enhancement_score": self._calculate_enhancement_score(original_text, tailored_text, original_words, tailored_words),
+            "detailed_diff": self._create_detailed_diff(original_sections, tailored_sections)
         }
         
         return diff_analysis
     
     def _parse_resume_sections(self, text: str) -> Dict[str, str]:
         """Parse resume into logical sections"""
+        segmented = segment_resume(text)
         sections = {}
-        current_section = "header"
-        current_content = []
         
-        lines = text.split('\n')
+        # Everything above the first section header (name, contact, intro)
+        first_header = segmented.sections[0].header_line if segmented.sections else len(segmented.lines)
+        header = [line for line in segmented.lines[:first_header] if line]
+        if header:
+            sections['header'] = '\n'.join(header)
         
-        for line in lines:
-            line = line.strip()
-            if not line:
+        for section in segmented.sections:
+            if not section.lines:
                 continue
-            
-            # Detect section headers
-            if self._is_section_header(line):
-                # Save previous section
-                if current_content:
-                    sections[current_section] = '\n'.join(current_content)
-                
-                # Start new section
-                current_section = self._normalize_section_name(line)
-                current_content = []
-            else:
-                current_content.append(line)
-        
-        # Save last section
-        if current_content:
-            sections[current_section] = '\n'.join(current_content)
+            content = '\n'.join(section.lines)
+            sections[section.key] = f"{sections[section.key]}\n{content}" if section.key in sections else content
         
         return sections
     
-    def _is_section_header(self, line: str) -> bool:
-        """Determine if line is a section header"""
-        common_headers = [
-            'professional summary', 'summary', 'objective', 'profile',
-            'experience', 'work experience', 'professional experience', 'employment',
-            'education', 'academic background',
-            'skills', 'technical skills', 'core competencies', 'expertise',
-            'projects', 'key projects', 'notable projects',
-            'certifications', 'licenses', 'achievements', 'awards',
-            'languages', 'interests', 'volunteer', 'activities'
-        ]
-        
-        line_lower = line.lower().strip()
-        
-        # Check exact matches
-        if line_lower in common_headers:
-            return True
-        
-        # Check partial matches
-        for header in common_headers:
-            if header in line_lower and len(line_lower) < 50:
-                return True
-        
-        # Check if all caps and short (likely header)
-        if line.isupper() and len(line) < 40 and len(line.split()) <= 4:
-            return True
-        
-        return False
-    
-    def _normalize_section_name(self, header: str) -> str:
-        """Normalize section names for comparison"""
-        header_lower = header.lower().strip()
-        
-        if 'summary' in header_lower or 'objective' in header_lower or 'profile' in header_lower:
-            return 'summary'
-        elif 'experience' in header_lower or 'employment' in header_lower:
-            return 'experience'
-        elif 'education' in header_lower:
-            return 'education'
-        elif 'skill' in header_lower or 'competenc' in header_lower or 'expertise' in header_lower:
-            return 'skills'
-        elif 'project' in header_lower:
-            return 'projects'
-        elif 'certification' in header_lower or 'license' in header_lower:
-            return 'certifications'
-        else:
-            return header_lower.replace(' ', '_')
-    
     def _create_diff_summary(self, original_sections: Dict, tailored_sections: Dict) -> Dict[str, Any]:
         """Create high-level summary of changes"""
         
@@ -162,24 +107,27 @@ class ResumeDiffAnalyzer:
                     "description": f"{section.title()} section removed",
                     "original_preview": original_content[:200] + "..." if len(original_content) > 200 else original_content
                 }
-            elif original_content and tailored_content:
-                # Section was potentially modified
-                similarity = self._calculate_similarity(original_content, tailored_content)
+            elif original_content and tailored_content and original_content != tailored_content:
+                # Section was potentially modified: diff its words once, reuse the edit script
+                original_tokens = original_content.split()
+                tailored_tokens = tailored_content.split()
+                opcodes = diff_opcodes(original_tokens, tailored_tokens)
+                section_similarity = similarity(original_tokens, tailored_tokens, opcodes)
                 
-                if similarity < 0.8:  # Significant changes
-                    changes = self._identify_specific_changes(original_content, tailored_content)
+                if section_similarity < 0.8:  # Significant changes
+                    changes = self._identify_specific_changes(original_tokens, tailored_tokens, opcodes)
                     section_analysis[section] = {
                         "change_type": "modified",
-                        "similarity_score": round(similarity, 3),
+                        "similarity_score": round(section_similarity, 3),
                         "description": f"{section.title()} section significantly modified",
                         "specific_changes": changes,
                         "original_length": len(original_content),
                         "tailored_length": len(tailored_content)
                     }
-                elif similarity < 0.95:  # Minor enhancements
+                elif section_similarity < 0.95:  # Minor enhancements
                     section_analysis[section] = {
                         "change_type": "enhanced",
-                        "similarity_score": round(similarity, 3),
+                        "similarity_score": round(section_similarity, 3),
                         "description": f"{section.title()} section enhanced with better language",
                         "original_length": len(original_content),
                         "tailored_length": len(tailored_content)
@@ -187,41 +135,40 @@ class ResumeDiffAnalyzer:
         
         return section_analysis
     
-    def _identify_specific_changes(self, original: str, tailored: str) -> List[Dict[str, str]]:
-        """Identify specific changes between two text blocks"""
+    def _identify_specific_changes(self, original: List[str], tailored: List[str], opcodes: List[Opcode]) -> List[Dict[str, str]]:
+        """Identify specific changes between two token lists from their edit script"""
         changes = []
         
-        # Use difflib to find differences
-        matcher = difflib.SequenceMatcher(None, original.split(), tailored.split())
-        
-        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        for tag, i1, i2, j1, j2 in opcodes:
             if tag == 'replace':
                 changes.append({
                     "type": "replaced",
-                    "original": " ".join(original.split()[i1:i2]),
-                    "tailored": " ".join(tailored.split()[j1:j2])
+                    "original": " ".join(original[i1:i2]),
+                    "tailored": " ".join(tailored[j1:j2])
                 })
             elif tag == 'delete':
                 changes.append({
                     "type": "removed",
-                    "original": " ".join(original.split()[i1:i2]),
+                    "original": " ".join(original[i1:i2]),
                     "tailored": ""
                 })
             elif tag == 'insert':
                 changes.append({
                     "type": "added",
                     "original": "",
-                    "tailored": " ".join(tailored.split()[j1:j2])
+                    "tailored": " ".join(tailored[j1:j2])
                 })
+            if len(changes) == 10:
+                break  # Limit to top 10 changes for readability
         
-        return changes[:10]  # Limit to top 10 changes for readability
+        return changes
     
-    def _analyze_content_changes(self, original: str, tailored: str) -> Dict[str, Any]:
+    def _analyze_content_changes(self, original: str, tailored: str, original_tokens: List[str], tailored_tokens: List[str]) -> Dict[str, Any]:
         """Analyze overall content changes"""
         
         # Word-level analysis
-        original_words = set(original.lower().split())
-        tailored_words = set(tailored.lower().split())
+        original_words = {word.lower() for word in original_tokens}
+        tailored_words = {word.lower() for word in tailored_tokens}
         
         added_words = tailored_words - original_words
         removed_words = original_words - tailored_words
@@ -242,7 +189,7 @@ class ResumeDiffAnalyzer:
         tailored_action_verbs = action_verbs & tailored_words
         
         return {
-            "word_count_change": len(tailored.split()) - len(original.split()),
+            "word_count_change": len(tailored_tokens) - len(original_tokens),
             "sentence_count_change": tailored_sentences - original_sentences,
             "words_added": len(added_words),
             "words_removed": len(removed_words),
@@ -253,19 +200,7 @@ class ResumeDiffAnalyzer:
             "new_keywords": list(added_words)[:20]  # Top 20 new keywords
         }
     
-    def _calculate_similarity(self, text1: str, text2: str) -> float:
-        """Calculate similarity between two texts"""
-        # Use Levenshtein distance for character-level similarity
-        max_len = max(len(text1), len(text2))
-        if max_len == 0:
-            return 1.0
-        
-        edit_distance = distance(text1, text2)
-        similarity = 1 - (edit_distance / max_len)
-        
-        return max(0.0, similarity)
-    
-    def _calculate_enhancement_score(self, original: str, tailored: str) -> Dict[str, Any]:
+    def _calculate_enhancement_score(self, original: str, tailored: str, original_tokens: List[str], tailored_tokens: List[str]) -> Dict[str, Any]:
         """Calculate overall enhancement score"""
         
         # Factors for enhancement scoring
@@ -278,8 +213,8 @@ class ResumeDiffAnalyzer:
             'revenue', 'growth', 'performance', 'results', 'impact', 'value'
         }
         
-        original_pro_words = len([w for w in original.lower().split() if w in professional_keywords])
-        tailored_pro_words = len([w for w in tailored.lower().split() if w in professional_keywords])
+        original_pro_words = sum(1 for w in original_tokens if w.lower() in professional_keywords)
+        tailored_pro_words = sum(1 for w in tailored_tokens if w.lower() in professional_keywords)
         
         professional_enhancement = tailored_pro_words / max(original_pro_words, 1)
         
@@ -309,41 +244,35 @@ class ResumeDiffAnalyzer:
         else:
             return "Minimal enhancement - consider further optimization"
     
-    def _create_detailed_diff(self, original: str, tailored: str) -> List[Dict[str, str]]:
-        """Create detailed line-by-line diff"""
+    def _create_detailed_diff(self, original_sections: Dict[str, str], tailored_sections: Dict[str, str],
+                              context: int = 3, limit: int = 50) -> List[Dict[str, str]]:
+        """Create detailed line-by-line diff, section by section, with unchanged context lines around changes"""
         
         diff_lines = []
-        differ = difflib.unified_diff(
-            original.splitlines(),
-            tailored.splitlines(),
-            fromfile='Original Resume',
-            tofile='Tailored Resume',
-            lineterm=''
-        )
-        
-        for line in differ:
-            if line.startswith('+++') or line.startswith('---') or line.startswith('@@'):
+        section_order = list(original_sections) + [s for s in tailored_sections if s not in original_sections]
+        
+        for section in section_order:
+            original_lines = original_sections.get(section, "").splitlines()
+            tailored_lines = tailored_sections.get(section, "").splitlines()
+            if original_lines == tailored_lines:
                 continue
-            elif line.startswith('+'):
-                diff_lines.append({
-                    "type": "added",
-                    "content": line[1:],
-                    "marker": "✅"
-                })
-            elif line.startswith('-'):
-                diff_lines.append({
-                    "type": "removed", 
-                    "content": line[1:],
-                    "marker": "❌"
-                })
-            else:
-                diff_lines.append({
-                    "type": "unchanged",
-                    "content": line,
-                    "marker": "="
-                })
+            
+            for tag, i1, i2, j1, j2 in diff_opcodes(original_lines, tailored_lines):
+                if tag == 'equal':
+                    unchanged = original_lines[i1:i2]
+                    before = unchanged[:context] if i1 > 0 else []
+                    after = unchanged[-context:] if i2 < len(original_lines) else []
+                    if len(before) + len(after) < len(unchanged):
+                        unchanged = before + after
+                    diff_lines.extend({"type": "unchanged", "content": line, "marker": "="} for line in unchanged)
+                    continue
+                diff_lines.extend({"type": "removed", "content": line, "marker": "❌"} for line in original_lines[i1:i2])
+                diff_lines.extend({"type": "added", "content": line, "marker": "✅"} for line in tailored_lines[j1:j2])
+            
+            if len(diff_lines) >= limit:
+                break
         
-        return diff_lines[:50]  # Limit for performance
+        return diff_lines[:limit]  # Limit for performance
     
     def create_diff_report(self, diff_analysis: Dict[str, Any]) -> str:
         """Create human-readable diff report"""
@@ -12,45 +12,68 @@ except ImportError:
 from docx import Document
 from reportlab.lib.pagesizes import letter
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.styles import ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.pdfgen import canvas
-from typing import Optional, Tuple
+from typing import Dict, Optional, Tuple
 import tempfile
-from reportlab.lib.enums import TA_LEFT
+from reportlab.lib.enums import TA_JUSTIFY, TA_LEFT
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
-from reportlab.lib.colors import black, blue
+from reportlab.lib.colors import HexColor, black, blue
+
+from utils.pdf_styles import get_style_registry, sample_styles
 
 class ResumeEditor:
     def __init__(self):
-        self.styles = getSampleStyleSheet()
-        self._setup_custom_styles()
+        # Shared by every editor in the process; treat as read-only
+        self.styles = get_style_registry().get(("resume_editor",), self._build_custom_styles)
+    
+    @staticmethod
+    def _build_custom_styles() -> Dict[str, ParagraphStyle]:
+        """Sample styles plus the custom styles for resume formatting"""
+        base = sample_styles()
+        return {
+            **base.byName,
+            'ResumeHeading': ParagraphStyle(
+                name='ResumeHeading',
+                parent=base['Heading1'],
+                fontSize=14,
+                spaceAfter=12,
+                spaceBefore=6
+            ),
+            'ResumeSection': ParagraphStyle(
+                name='ResumeSection',
+                parent=base['Heading2'],
+                fontSize=12,
+                spaceAfter=8,
+                spaceBefore=8
+            ),
+            'ResumeBody': ParagraphStyle(
+                name='ResumeBody',
+                parent=base['Normal'],
+                fontSize=10,
+                spaceAfter=4
+            ),
+        }
     
-    def _setup_custom_styles(self):
-        """Setup custom styles for resume formatting"""
-        self.styles.add(ParagraphStyle(
-            name='ResumeHeading',
-            parent=self.styles['Heading1'],
-            fontSize=14,
-            spaceAfter=12,
-            spaceBefore=6
-        ))
-        
-        self.styles.add(ParagraphStyle(
-            name='ResumeSection',
-            parent=self.styles['Heading2'],
-            fontSize=12,
-            spaceAfter=8,
-            spaceBefore=8
-        ))
-        
-        self.styles.add(ParagraphStyle(
-            name='ResumeBody',
-            parent=self.styles['Normal'],
-            fontSize=10,
-            spaceAfter=4
-        ))
+    @staticmethod
+    def _build_reference_styles() -> Dict[str, ParagraphStyle]:
+        """Styles of the reference format used by ``create_tailored_resume_pdf_improved``"""
+        blue = HexColor('#4472C4')
+        black = HexColor('#000000')
+        return {
+            'name': ParagraphStyle('Name', fontName='Helvetica-Bold', fontSize=18, textColor=blue, spaceAfter=2, alignment=TA_LEFT),
+            'title': ParagraphStyle('Title', fontName='Helvetica-Bold', fontSize=14, textColor=blue, spaceAfter=6, alignment=TA_LEFT),
+            'contact': ParagraphStyle('Contact', fontName='Helvetica', fontSize=10, textColor=black, spaceAfter=12, alignment=TA_LEFT),
+            'section': ParagraphStyle('Section', fontName='Helvetica-Bold', fontSize=11, textColor=blue, spaceBefore=12, spaceAfter=6, alignment=TA_LEFT),
+            'job_title': ParagraphStyle('JobTitle', fontName='Helvetica-Bold', fontSize=10, textColor=black, spaceBefore=6, spaceAfter=0, alignment=TA_LEFT),
+            'company': ParagraphStyle('Company', fontName='Helvetica-Bold', fontSize=10, textColor=black, spaceBefore=2, spaceAfter=3, alignment=TA_LEFT),
+            'bullet': ParagraphStyle('Bullet', fontName='Helvetica', fontSize=10, textColor=black, leftIndent=12, firstLineIndent=-12, spaceAfter=3, alignment=TA_JUSTIFY),
+            'body': ParagraphStyle('Body', fontName='Helvetica', fontSize=10, textColor=black, spaceAfter=6, alignment=TA_JUSTIFY),
+            'skills_cat': ParagraphStyle('SkillsCat', fontName='Helvetica-Bold', fontSize=10, textColor=black, spaceAfter=2, alignment=TA_LEFT),
+            'skills': ParagraphStyle('Skills', fontName='Helvetica', fontSize=10, textColor=black, spaceAfter=3, alignment=TA_LEFT),
+        }
     
     def extract_text_from_file(self, file_path: str) -> Optional[str]:
         """
@@ -1150,11 +1173,8 @@ class ResumeEditor:
         try:
             # Import everything we need
             from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-            from reportlab.lib.styles import ParagraphStyle
             from reportlab.lib.pagesizes import letter as LETTER_SIZE
-            from reportlab.lib.colors import HexColor
             from reportlab.lib.units import inch as INCH_UNIT
-            from reportlab.lib.enums import TA_LEFT, TA_JUSTIFY
             import re
             
             # Fix bullet text issues
@@ -1171,21 +1191,12 @@ class ResumeEditor:
                 allowSplitting=1
             )
             
-            # Professional colors
-            blue = HexColor('#4472C4')
-            black = HexColor('#000000')
-            
             # REFERENCE FORMAT STYLES - Exactly matching your beautiful resume
-            name_style = ParagraphStyle('Name', fontName='Helvetica-Bold', fontSize=18, textColor=blue, spaceAfter=2, alignment=TA_LEFT)
-            title_style = ParagraphStyle('Title', fontName='Helvetica-Bold', fontSize=14, textColor=blue, spaceAfter=6, alignment=TA_LEFT)
-            contact_style = ParagraphStyle('Contact', fontName='Helvetica', fontSize=10, textColor=black, spaceAfter=12, alignment=TA_LEFT)
-            section_style = ParagraphStyle('Section', fontName='Helvetica-Bold', fontSize=11, textColor=blue, spaceBefore=12, spaceAfter=6, alignment=TA_LEFT)
-            job_title_style = ParagraphStyle('JobTitle', fontName='Helvetica-Bold', fontSize=10, textColor=black, spaceBefore=6, spaceAfter=0, alignment=TA_LEFT)
-            company_style = ParagraphStyle('Company', fontName='Helvetica-Bold', fontSize=10, textColor=black, spaceBefore=2, spaceAfter=3, alignment=TA_LEFT)
-            bullet_style = ParagraphStyle('Bullet', fontName='Helvetica', fontSize=10, textColor=black, leftIndent=12, firstLineIndent=-12, spaceAfter=3, alignment=TA_JUSTIFY)
-            body_style = ParagraphStyle('Body', fontName='Helvetica', fontSize=10, textColor=black, spaceAfter=6, alignment=TA_JUSTIFY)
-            skills_cat_style = ParagraphStyle('SkillsCat', fontName='Helvetica-Bold', fontSize=10, textColor=black, spaceAfter=2, alignment=TA_LEFT)
-            skills_style = ParagraphStyle('Skills', fontName='Helvetica', fontSize=10, textColor=black, spaceAfter=3, alignment=TA_LEFT)
+            styles = get_style_registry().get(("resume_editor", "reference"), self._build_reference_styles)
+            name_style, title_style, contact_style = styles['name'], styles['title'], styles['contact']
+            section_style, job_title_style, company_style = styles['section'], styles['job_title'], styles['company']
+            bullet_style, body_style = styles['bullet'], styles['body']
+            skills_cat_style, skills_style = styles['skills_cat'], styles['skills']
             
             # Parse resume text into clean structure
             lines = [line.strip() for line in tailored_text.split('\n') if line.strip()]
@@ -2726,7 +2737,7 @@ class ResumeEditor:
         """
         try:
             from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak
-            from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+            from reportlab.lib.styles import ParagraphStyle
             from reportlab.lib.pagesizes import letter
             from reportlab.lib.colors import black, blue
             from reportlab.lib.units import inch
@@ -2743,7 +2754,7 @@ class ResumeEditor:
             )
             
             # Get base styles and create custom ones
-            styles = getSampleStyleSheet()
+            styles = sample_styles()
             
             # Define custom styles that match your original formatting
             name_style = ParagraphStyle(
@@ -2898,7 +2909,7 @@ class ResumeEditor:
         """
         try:
             from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-            from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+            from reportlab.lib.styles import ParagraphStyle
             from reportlab.lib.pagesizes import letter
             from reportlab.lib.colors import HexColor
             from reportlab.lib.units import inch
@@ -2915,7 +2926,7 @@ class ResumeEditor:
             )
             
             # Get base styles
-            styles = getSampleStyleSheet()
+            styles = sample_styles()
             professional_blue = HexColor('#2c5aa0')
             
             # Define styles
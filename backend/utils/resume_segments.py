@@ -0,0 +1,365 @@
+"""
+Shared resume segmentation
+
+Several code paths used to split the same resume text into sections with their
+own regex heuristics: prompt building (which sections already exist), the
+structured parser, the diff analyzer, the schema parser used by the template
+engine, and the DOCX/display formatters. A single tailor-and-render request
+segmented the text four to six times, and the answers disagreed (one parser
+took "Experience with Python..." for a header, another made the candidate's
+name a section).
+
+``segment_resume`` does it once, in one pass over the lines with one compiled
+header pattern, and returns an immutable ``SegmentedResume``:
+
+- ``contact``: name, headline and contact lines from the top of the resume
+- ``intro``: any other text before the first section header
+- ``sections``: each header with its line span, inline content and body
+- ``bullets``: every bullet line (and inline "a • b • c" items) with its section
+
+Results are memoized by a hash of the text, so every consumer of the same
+resume shares one segmentation. Consumers map it to their own shapes.
+"""
+
+import hashlib
+import os
+import re
+import threading
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+
+from utils.lru import LRUCache
+
+# Normalized section key -> header spellings (matched case-insensitively, whole line)
+SECTION_ALIASES: Dict[str, Tuple[str, ...]] = {
+    "summary": (
+        "summary", "professional summary", "executive summary", "career summary", "qualifications summary",
+        "summary of qualifications", "profile", "professional profile", "objective", "career objective",
+        "about me", "about", "overview", "professional overview", "personal statement", "career highlights",
+    ),
+    "experience": (
+        "experience", "work experience", "professional experience", "relevant experience", "employment",
+        "employment history", "work history", "career history", "professional background",
+    ),
+    "education": (
+        "education", "academic background", "educational background", "academic qualifications",
+        "academic history", "academic credentials", "education and training", "training and education",
+        "certifications and education", "qualifications", "degrees",
+    ),
+    "skills": (
+        "skills", "technical skills", "core competencies", "competencies", "key skills", "core skills",
+        "professional skills", "relevant skills", "technical competencies", "technical proficiencies",
+        "areas of expertise", "expertise", "technical expertise", "technologies", "tools and technologies",
+        "tools", "programming languages", "software skills", "skills and tools",
+    ),
+    "projects": (
+        "projects", "key projects", "notable projects", "personal projects", "academic projects",
+        "professional projects", "selected projects",
+    ),
+    "certifications": (
+        "certifications", "certificates", "licenses", "licenses and certifications",
+        "certifications and licenses",
+    ),
+    "awards": (
+        "awards", "achievements", "honors", "recognition", "accomplishments", "awards and honors",
+        "honors and awards", "certifications and awards", "key achievements",
+    ),
+    "publications": ("publications", "papers", "research"),
+    "languages": ("languages",),
+    "volunteer": ("volunteer", "volunteering", "volunteer experience", "community involvement"),
+    "interests": ("interests", "hobbies", "hobbies and interests"),
+    "activities": ("activities", "leadership and activities", "extracurricular activities"),
+}
+
+
+def _alias_pattern(alias: str) -> str:
+    words = [r"(?:and|&)" if word == "and" else re.escape(word) for word in alias.split()]
+    return r"\s+".join(words)
+
+
+# Whole-line header, optionally wrapped in markdown, optionally followed by
+# inline content after ":", " - ", " | " or " • " ("Skills: Python, SQL").
+# Inline headers only open a section inside another when styled as headers.
+_HEADER_RE = re.compile(
+    r"^[#*_\s]*(?:"
+    + "|".join(
+        f"(?P<{key}>{'|'.join(_alias_pattern(a) for a in sorted(aliases, key=len, reverse=True))})"
+        for key, aliases in SECTION_ALIASES.items()
+    )
+    + r")[*_]*\s*(?:$|(?::|\s[-–—|•]|[|•])\s*(?P<inline>.*)$)",
+    re.IGNORECASE,
+)
+_BULLET_RE = re.compile(r"^(?:[•●▪■◦·▸►‣➢✓]|[-*–—](?=\s))\s*(?P<text>.+)$")
+_EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+_PHONE_RE = re.compile(r"(?<![\w/])(?:\+?\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}(?!\w)")
+_LINK_RE = re.compile(r"(?:https?://|www\.)\S+|\b(?:linkedin\.com|github\.com)/\S+", re.IGNORECASE)
+_LOCATION_RE = re.compile(r"^[A-Z][A-Za-z.'-]*(?:\s[A-Z][A-Za-z.'-]*){0,2},\s*(?:[A-Z]{2}|[A-Z][a-z]+(?:\s[A-Z][a-z]+)?)$")
+_NAME_RE = re.compile(r"^[A-Za-z][A-Za-z\s\-.'&]+$")
+_FIELD_SPLIT_RE = re.compile(r"\s*[|•·]\s*")
+
+_CONTACT_SCAN_LINES = 8
+
+
+@dataclass(frozen=True, slots=True)
+class ResumeSection:
+    """One headed section. Line numbers index ``SegmentedResume.lines``."""
+    key: str  # normalized ("experience"), or the header lower_snake_cased when not a known section
+    title: str  # header as written, without markdown or trailing colon
+    header_line: int
+    start: int  # first body line
+    end: int  # one past the last body line
+    inline: str  # content on the header line itself ("Skills: Python, SQL")
+    body: Tuple[str, ...]  # stripped lines start..end (blank lines kept), inline content first
+
+    @property
+    def lines(self) -> Tuple[str, ...]:
+        """Non-blank body lines"""
+        return tuple(line for line in self.body if line)
+
+    @property
+    def text(self) -> str:
+        """Body with blank lines kept (entry boundaries), trimmed"""
+        return "\n".join(self.body).strip()
+
+
+@dataclass(frozen=True, slots=True)
+class Bullet:
+    line: int
+    text: str  # without the bullet marker
+    section: Optional[str]  # key of the enclosing section
+
+
+@dataclass(frozen=True, slots=True)
+class ContactBlock:
+    """Name, headline and contact lines at the top of the resume"""
+    name: str = ""
+    headline: Optional[str] = None
+    lines: Tuple[str, ...] = ()
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    location: Optional[str] = None
+    links: Tuple[str, ...] = ()
+    start: int = 0
+    end: int = 0
+
+
+@dataclass(frozen=True, slots=True)
+class SegmentedResume:
+    text_hash: str
+    lines: Tuple[str, ...]  # every line of the text, stripped
+    contact: ContactBlock
+    intro: Tuple[str, ...]  # non-blank lines between the contact block and the first section
+    sections: Tuple[ResumeSection, ...]
+    bullets: Tuple[Bullet, ...]
+
+    @property
+    def keys(self) -> FrozenSet[str]:
+        return frozenset(section.key for section in self.sections)
+
+    def section(self, key: str) -> Optional[ResumeSection]:
+        """First section with ``key``"""
+        return next((section for section in self.sections if section.key == key), None)
+
+    def section_text(self, key: str) -> str:
+        """Text of every section with ``key``, in order (resumes sometimes repeat a header)"""
+        return "\n\n".join(section.text for section in self.sections if section.key == key and section.text)
+
+    def section_lines(self, key: str) -> List[str]:
+        return [line for section in self.sections if section.key == key for line in section.lines]
+
+
+def split_inline_bullets(line: str, min_separators: int = 2) -> List[str]:
+    """``"a • b • c"`` -> ``["a", "b", "c"]``; other lines unchanged"""
+    if line.count("•") >= min_separators and not line.startswith("•"):
+        return [part.strip() for part in line.split("•") if part.strip()]
+    return [line]
+
+
+def _header_key(title: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", title.lower()).strip("_")
+
+
+def _match_header(line: str, allow_generic: bool, in_section: bool = False) -> Optional[Tuple[str, str, str]]:
+    """(key, title, inline) if ``line`` is a section header"""
+    if _BULLET_RE.match(line):
+        return None
+    match = _HEADER_RE.match(line)
+    if match:
+        key = next(key for key in SECTION_ALIASES if match.group(key))
+        title, inline = match.group(key), (match.group("inline") or "").strip(" *_")
+        # Inside a known section, "Tools: Python, Kafka" or "Languages: Go, SQL"
+        # is a labelled line of that section unless the label is styled as a header
+        if inline and in_section and not (title.isupper() or line[0] in "#*_"):
+            return None
+        return key, title, inline
+
+    # Unknown sections only count when written like a header: short and all caps
+    title = line.strip("#*_ ").rstrip(":").strip()
+    if (not allow_generic or not title or len(title) >= 40 or len(title.split()) > 4 or not title.isupper()
+            or any(char in title for char in "@|,.()/")):
+        return None
+    return _header_key(title), title, ""
+
+
+def _is_contact_line(line: str) -> bool:
+    return bool(_EMAIL_RE.search(line) or _PHONE_RE.search(line) or _LINK_RE.search(line)
+                or _LOCATION_RE.match(line) or re.search(r"\b(linkedin|github)\b", line, re.IGNORECASE))
+
+
+def _name_from_contact_line(line: str) -> str:
+    """Leading name in ``"Jane Doe | jane@x.com | 555-0100"``"""
+    candidate = re.split(r"[|•·,@]", line, maxsplit=1)[0]
+    candidate = _PHONE_RE.sub("", candidate).strip()
+    if _EMAIL_RE.search(line) and "@" in candidate:
+        return ""
+    return candidate if _NAME_RE.match(candidate) and 1 <= len(candidate.split()) <= 5 else ""
+
+
+def _looks_like_name(line: str) -> bool:
+    return bool(_NAME_RE.match(line)) and 1 <= len(line.split()) <= 5 and len(line) <= 60
+
+
+def _looks_like_headline(line: str) -> bool:
+    return len(line) <= 80 and len(line.split()) <= 12 and not line.endswith(".") and not _BULLET_RE.match(line)
+
+
+def _contact_block(lines: Tuple[str, ...], end: int) -> Tuple[ContactBlock, Tuple[str, ...]]:
+    """Contact block from the non-blank lines before ``end``, plus the rest of them"""
+    indexes = [i for i in range(end) if lines[i]]
+    if not indexes:
+        return ContactBlock(), ()
+
+    name, headline, contact_lines = "", None, []
+    first = lines[indexes[0]]
+    taken = 0
+    if _is_contact_line(first):
+        name = _name_from_contact_line(first)
+        contact_lines.append(first)
+        taken = 1
+    elif _looks_like_name(first):
+        name = first
+        taken = 1
+
+    while taken < min(len(indexes), _CONTACT_SCAN_LINES):
+        line = lines[indexes[taken]]
+        if _is_contact_line(line):
+            contact_lines.append(line)
+        elif name and headline is None and _looks_like_headline(line):
+            headline = line
+        else:
+            break
+        taken += 1
+
+    email = phone = location = None
+    links: List[str] = []
+    for line in contact_lines:
+        if email is None and (match := _EMAIL_RE.search(line)):
+            email = match.group(0)
+        if phone is None and (match := _PHONE_RE.search(line)):
+            phone = match.group(0).strip()
+        links.extend(match.rstrip(".,;)") for match in _LINK_RE.findall(line))
+        if location is None:
+            location = next((part for part in _FIELD_SPLIT_RE.split(line) if _LOCATION_RE.match(part)), None)
+
+    contact = ContactBlock(
+        name=name,
+        headline=headline,
+        lines=tuple(contact_lines),
+        email=email,
+        phone=phone,
+        location=location,
+        links=tuple(dict.fromkeys(links)),
+        start=indexes[0],
+        end=indexes[taken - 1] + 1 if taken else indexes[0],
+    )
+    return contact, tuple(lines[i] for i in indexes[taken:])
+
+
+def _segment(text: str, text_hash: str) -> SegmentedResume:
+    lines = tuple(line.strip() for line in text.replace("\r\n", "\n").replace("\r", "\n").split("\n"))
+
+    headers: List[Tuple[int, str, str, str]] = []
+    bullets: List[Bullet] = []
+    # Until a contact line or a known header is seen, an all-caps line is more
+    # likely the name or headline than an unknown section
+    anchored = False
+    for index, line in enumerate(lines):
+        if not line:
+            continue
+        in_section = bool(headers) and headers[-1][1] in SECTION_ALIASES
+        header = _match_header(line, allow_generic=anchored, in_section=in_section)
+        anchored = anchored or header is not None or _is_contact_line(line)
+        if header:
+            key, title, inline = header
+            headers.append((index, key, title, inline))
+            body_lines = [inline] if inline else []
+        else:
+            body_lines = [line]
+
+        section_key = headers[-1][1] if headers else None
+        for body_line in body_lines:
+            bullet = _BULLET_RE.match(body_line)
+            if bullet:
+                bullets.append(Bullet(index, bullet.group("text").strip(), section_key))
+                continue
+            # "ACHIEVEMENTS • a • b" puts the first item right after the header
+            parts = split_inline_bullets(body_line, min_separators=1 if header else 2)
+            if len(parts) > 1:
+                bullets.extend(Bullet(index, part, section_key) for part in parts)
+
+    sections = []
+    for position, (index, key, title, inline) in enumerate(headers):
+        end = headers[position + 1][0] if position + 1 < len(headers) else len(lines)
+        body = ((inline,) if inline else ()) + lines[index + 1:end]
+        sections.append(ResumeSection(key, title.strip(), index, index + 1, end, inline, body))
+
+    contact, intro = _contact_block(lines, headers[0][0] if headers else len(lines))
+    return SegmentedResume(text_hash, lines, contact, intro, tuple(sections), tuple(bullets))
+
+
+class _SegmentCache(LRUCache[SegmentedResume]):
+    """Thread-safe LRU of segmentations keyed by text hash"""
+
+    def get_or_segment(self, text: str) -> SegmentedResume:
+        key = hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).hexdigest()
+        return self.get_or_build(key, lambda: _segment(text, key))
+
+
+_cache: Optional[_SegmentCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_segment_cache() -> _SegmentCache:
+    """Process-wide cache, sized by ``RESUME_SEGMENT_CACHE_SIZE`` (0 disables it)"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = _SegmentCache(int(os.getenv("RESUME_SEGMENT_CACHE_SIZE", "256")))
+    return _cache
+
+
+def segment_resume(text: str) -> SegmentedResume:
+    """Segment ``text`` (memoized by content hash)"""
+    return get_segment_cache().get_or_segment(text or "")
+
+
+_DEGREE_PATTERNS = (
+    re.compile(r"\b(b\.?s\.?|bachelor|b\.?a\.?|master|m\.?s\.?|m\.?a\.?|phd|ph\.?d\.?|doctorate|mba)\b", re.IGNORECASE),
+    re.compile(r"\b(associate|diploma|certificate)\b.*\b(degree|program)\b", re.IGNORECASE),
+    re.compile(r"\b(university|college)\b", re.IGNORECASE),
+)
+PROMPT_SECTIONS = ("summary", "skills", "education")
+
+
+def detect_existing_sections(resume_text: str) -> Set[str]:
+    """
+    Which of summary/skills/education the resume already has, for the
+    tailoring prompts. Education also counts when a degree or school is
+    mentioned without an Education header.
+    """
+    segmented = segment_resume(resume_text)
+    existing = {key for key in segmented.keys if key in PROMPT_SECTIONS}
+    if "education" not in existing and any(pattern.search(resume_text) for pattern in _DEGREE_PATTERNS):
+        existing.add("education")
+    return existing
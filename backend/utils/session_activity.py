@@ -0,0 +1,213 @@
+"""
+Write-behind tracking of UserSession.last_activity
+
+Authenticated requests only record "session X was seen at T" in memory. A
+background thread periodically coalesces those timestamps and writes them with a
+few batched ``UPDATE user_sessions SET last_activity = :ts WHERE id IN (...)``
+statements, so request handling never takes the database write lock just to
+bump an activity timestamp. Pending timestamps are flushed again at shutdown.
+"""
+
+import atexit
+import logging
+import os
+import threading
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import or_, update
+
+from models.user import UserSession
+
+logger = logging.getLogger(__name__)
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+class SessionActivityTracker:
+    """Coalesces last-activity updates and flushes them in batches"""
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable] = None,
+        flush_interval: float = 5.0,
+        batch_size: int = 500,
+        max_pending: int = 10000,
+        enabled: bool = True,
+    ):
+        """
+        Args:
+            session_factory: Callable returning a new SQLAlchemy session
+                (defaults to ``config.database.SessionLocal``)
+            flush_interval: Seconds between background flushes; also the
+                granularity at which stored timestamps are coalesced
+            batch_size: Maximum ids per ``WHERE id IN (...)`` statement
+            max_pending: Flush inline once this many sessions are pending
+            enabled: When False, ``touch`` writes through immediately
+        """
+        self._session_factory = session_factory
+        self.flush_interval = max(0.1, flush_interval)
+        self.batch_size = max(1, batch_size)
+        self.max_pending = max(1, max_pending)
+        self.enabled = enabled
+
+        self._pending: Dict[uuid.UUID, datetime] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.stats = {
+            "touches": 0,
+            "flushes": 0,
+            "sessions_written": 0,
+            "statements": 0,
+            "errors": 0,
+        }
+
+    def _new_session(self):
+        if self._session_factory is None:
+            from config.database import SessionLocal
+            self._session_factory = SessionLocal
+        return self._session_factory()
+
+    def touch(self, session_id: uuid.UUID, seen_at: Optional[datetime] = None) -> None:
+        """Record activity for a session without touching the database"""
+        seen_at = seen_at or datetime.utcnow()
+
+        if not self.enabled:
+            self._write({session_id: seen_at})
+            return
+
+        with self._lock:
+            previous = self._pending.get(session_id)
+            if previous is None or seen_at > previous:
+                self._pending[session_id] = seen_at
+            self.stats["touches"] += 1
+            pending_count = len(self._pending)
+
+        self._ensure_started()
+        if pending_count >= self.max_pending:
+            self.flush()
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self) -> int:
+        """
+        Write all pending timestamps to the database.
+
+        Returns:
+            Number of sessions written
+        """
+        with self._lock:
+            if not self._pending:
+                return 0
+            pending, self._pending = self._pending, {}
+
+        with self._flush_lock:
+            written = self._write(pending)
+
+        if written < len(pending):
+            # Put back whatever failed so the next flush retries it
+            with self._lock:
+                for session_id, seen_at in pending.items():
+                    current = self._pending.get(session_id)
+                    if current is None or seen_at > current:
+                        self._pending[session_id] = seen_at
+        return written
+
+    def _bucket(self, seen_at: datetime) -> datetime:
+        """Round down to the flush interval so sessions seen together share one UPDATE"""
+        seconds = (seen_at - _EPOCH).total_seconds()
+        return _EPOCH + timedelta(seconds=seconds - seconds % self.flush_interval)
+
+    def _write(self, pending: Dict[uuid.UUID, datetime]) -> int:
+        buckets: Dict[datetime, List[uuid.UUID]] = {}
+        for session_id, seen_at in pending.items():
+            buckets.setdefault(self._bucket(seen_at), []).append(session_id)
+
+        db = self._new_session()
+        try:
+            statements = 0
+            for seen_at, session_ids in buckets.items():
+                for start in range(0, len(session_ids), self.batch_size):
+                    chunk = session_ids[start:start + self.batch_size]
+                    db.execute(
+                        update(UserSession)
+                        .where(
+                            UserSession.id.in_(chunk),
+                            or_(UserSession.last_activity.is_(None), UserSession.last_activity < seen_at),
+                        )
+                        .values(last_activity=seen_at)
+                        .execution_options(synchronize_session=False)
+                    )
+                    statements += 1
+            db.commit()
+            self.stats["flushes"] += 1
+            self.stats["statements"] += statements
+            self.stats["sessions_written"] += len(pending)
+            return len(pending)
+        except Exception as e:
+            db.rollback()
+            self.stats["errors"] += 1
+            logger.warning(f"Failed to flush session activity for {len(pending)} sessions: {e}")
+            return 0
+        finally:
+            db.close()
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop_event.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="session-activity-flusher", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.warning(f"Session activity flusher error: {e}")
+
+    def stop(self) -> int:
+        """Stop the background flusher and write whatever is still pending"""
+        self._stop_event.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive() and thread is not threading.current_thread():
+            thread.join(timeout=self.flush_interval + 1)
+        self._thread = None
+        return self.flush()
+
+
+_tracker: Optional[SessionActivityTracker] = None
+_tracker_lock = threading.Lock()
+
+
+def get_session_activity_tracker() -> SessionActivityTracker:
+    """Get the process-wide session activity tracker"""
+    global _tracker
+    if _tracker is None:
+        with _tracker_lock:
+            if _tracker is None:
+                _tracker = SessionActivityTracker(
+                    flush_interval=float(os.getenv("SESSION_ACTIVITY_FLUSH_INTERVAL", "5")),
+                    batch_size=int(os.getenv("SESSION_ACTIVITY_BATCH_SIZE", "500")),
+                    enabled=os.getenv("SESSION_ACTIVITY_WRITE_BEHIND", "true").lower() == "true",
+                )
+                atexit.register(_tracker.stop)
+    return _tracker
+
+
+def flush_session_activity() -> int:
+    """Stop the tracker (if it was used) and flush pending activity; used at shutdown"""
+    if _tracker is None:
+        return 0
+    return _tracker.stop()
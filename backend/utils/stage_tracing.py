@@ -0,0 +1,276 @@
+"""
+Per-stage latency tracing
+
+``phase8_metrics`` only records how long each batch job took as a whole. To
+see where that time goes, the enhanced batch pipeline runs each job under a
+``JobTrace`` and marks its stages with ``trace_stage``:
+
+    trace = JobTrace("job 1", job_url=url)
+    with trace.activate(), trace_stage("job"):
+        with trace_stage("scrape"):
+            job_data = scrape(url)
+        ...
+
+``trace_stage`` records into the trace that is active in the current context.
+Library code (LLM calls, RAG retrieval, parsing, HTML and PDF rendering) can
+therefore mark its own stages, and those marks cost nothing when no trace is
+active. Spans nest by context too. Worker threads join the trace when they
+run in a copy of the caller's context (``asyncio.to_thread``,
+``contextvars.copy_context().run``).
+
+A trace has a per-stage breakdown (``summary()``). ``aggregate_stages`` turns
+many traces into per-stage p50/p95. ``to_chrome_trace`` and ``to_otlp_json``
+export traces for chrome://tracing or Perfetto, or for the OTLP/HTTP JSON
+endpoint of an OpenTelemetry collector (``POST /v1/traces``).
+"""
+
+import contextvars
+import hashlib
+import math
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+_current_trace: contextvars.ContextVar[Optional["JobTrace"]] = contextvars.ContextVar("stage_trace", default=None)
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("stage_span", default=None)
+
+SERVICE_NAME = "apply-ai-backend"
+
+
+class Span:
+    """One timed stage of a trace"""
+
+    __slots__ = ("name", "span_id", "parent_id", "start_ns", "duration_ns", "thread_id", "attributes", "error", "_started")
+
+    def __init__(self, name: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.name = name
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        # Wall clock for export, monotonic clock for the duration
+        self.start_ns = time.time_ns()
+        self._started = time.perf_counter_ns()
+        self.duration_ns: Optional[int] = None
+        self.thread_id = threading.get_ident()
+        self.attributes = attributes
+        self.error: Optional[str] = None
+
+    def finish(self, error: Optional[str] = None) -> None:
+        self.duration_ns = time.perf_counter_ns() - self._started
+        self.error = error
+
+    @property
+    def end_ns(self) -> int:
+        return self.start_ns + (self.duration_ns or 0)
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.duration_ns or 0) / 1e6
+
+
+class JobTrace:
+    """The finished spans of one job"""
+
+    def __init__(self, name: str, **attributes: Any):
+        self.name = name
+        self.attributes = attributes
+        self._spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def activate(self) -> Iterator["JobTrace"]:
+        """Make this the trace ``trace_stage`` records into for the current context"""
+        trace_token = _current_trace.set(self)
+        span_token = _current_span.set(None)
+        try:
+            yield self
+        finally:
+            _current_span.reset(span_token)
+            _current_trace.reset(trace_token)
+
+    def add(self, span: Span) -> None:
+        with self._lock:
+            self._spans.append(span)
+
+    @property
+    def spans(self) -> List[Span]:
+        """Finished spans in start order"""
+        with self._lock:
+            return sorted(self._spans, key=lambda span: span.start_ns)
+
+    @property
+    def total_ms(self) -> float:
+        spans = self.spans
+        if not spans:
+            return 0.0
+        return (max(span.end_ns for span in spans) - spans[0].start_ns) / 1e6
+
+    def stage_totals(self) -> Dict[str, float]:
+        """Milliseconds spent per stage name. Parent stages include their children."""
+        totals: Dict[str, float] = {}
+        for span in self.spans:
+            totals[span.name] = totals.get(span.name, 0.0) + span.duration_ms
+        return totals
+
+    def summary(self) -> Dict[str, Any]:
+        spans = self.spans
+        return {
+            "total_ms": round(self.total_ms, 2),
+            "stages": {name: round(ms, 2) for name, ms in self.stage_totals().items()},
+            "errors": {span.name: span.error for span in spans if span.error},
+            "span_count": len(spans),
+        }
+
+
+class trace_stage:
+    """
+    Context manager (sync or async) that times one stage of the active trace.
+
+    Yields the ``Span``, so callers can add attributes, or ``None`` when no
+    trace is active.
+    """
+
+    def __init__(self, name: str, **attributes: Any):
+        self.name = name
+        self.attributes = attributes
+        self.span: Optional[Span] = None
+        self._trace: Optional[JobTrace] = None
+        self._token: Optional[contextvars.Token] = None
+
+    def __enter__(self) -> Optional[Span]:
+        self._trace = _current_trace.get()
+        if self._trace is None:
+            return None
+        parent = _current_span.get()
+        self.span = Span(self.name, parent.span_id if parent else None, dict(self.attributes))
+        self._token = _current_span.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self.span is None:
+            return
+        try:
+            _current_span.reset(self._token)
+        except ValueError:
+            # Exited from another context; that context never saw this span as current
+            pass
+        self.span.finish(exc_type.__name__ if exc_type else None)
+        self._trace.add(self.span)
+
+    async def __aenter__(self) -> Optional[Span]:
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self.__exit__(exc_type, exc, tb)
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """Linearly interpolated percentile, ``q`` in [0, 1]"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q
+    low = math.floor(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def _distribution(values: List[float]) -> Dict[str, Any]:
+    return {
+        "count": len(values),
+        "mean_ms": round(sum(values) / len(values), 2),
+        "p50_ms": round(percentile(values, 0.5), 2),
+        "p95_ms": round(percentile(values, 0.95), 2),
+        "max_ms": round(max(values), 2),
+    }
+
+
+def aggregate_stages(traces: Iterable[JobTrace]) -> Dict[str, Any]:
+    """Per-stage distribution of the per-job totals of ``traces``"""
+    job_totals: List[float] = []
+    per_stage: Dict[str, List[float]] = {}
+    for trace in traces:
+        totals = trace.stage_totals()
+        if not totals:
+            continue
+        job_totals.append(trace.total_ms)
+        for name, ms in totals.items():
+            per_stage.setdefault(name, []).append(ms)
+    return {
+        "jobs": len(job_totals),
+        "total": _distribution(job_totals) if job_totals else None,
+        "stages": {name: _distribution(values) for name, values in per_stage.items()},
+    }
+
+
+def to_chrome_trace(traces: Iterable[JobTrace]) -> Dict[str, Any]:
+    """Chrome trace-event JSON: one process per job, one lane per thread it used"""
+    events: List[Dict[str, Any]] = []
+    for pid, trace in enumerate(traces, 1):
+        events.append({"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": trace.name}})
+        lanes: Dict[int, int] = {}
+        for span in trace.spans:
+            args = dict(span.attributes)
+            if span.error:
+                args["error"] = span.error
+            events.append({
+                "name": span.name,
+                "cat": "stage",
+                "ph": "X",
+                "ts": span.start_ns / 1000,
+                "dur": span.duration_ns / 1000,
+                "pid": pid,
+                "tid": lanes.setdefault(span.thread_id, len(lanes) + 1),
+                "args": args,
+            })
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def otlp_trace_id(key: str) -> str:
+    """32 hex digit trace id: the UUID itself for UUID keys (batch ids), else a hash"""
+    try:
+        return uuid.UUID(key).hex
+    except ValueError:
+        return hashlib.sha256(key.encode()).hexdigest()[:32]
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items() if value is not None]
+
+
+def to_otlp_json(traces: Iterable[JobTrace], trace_id: str, service_name: str = SERVICE_NAME) -> Dict[str, Any]:
+    """OTLP/JSON ``ExportTraceServiceRequest`` with every job's spans in one trace"""
+    spans: List[Dict[str, Any]] = []
+    for trace in traces:
+        for span in trace.spans:
+            # Job-level attributes go on each job's root span
+            attributes = {**trace.attributes, **span.attributes} if span.parent_id is None else span.attributes
+            spans.append({
+                "traceId": trace_id,
+                "spanId": span.span_id,
+                "parentSpanId": span.parent_id or "",
+                "name": span.name,
+                "kind": 1,  # SPAN_KIND_INTERNAL
+                "startTimeUnixNano": str(span.start_ns),
+                "endTimeUnixNano": str(span.end_ns),
+                "attributes": _otlp_attributes(attributes),
+                "status": {"code": 2, "message": span.error} if span.error else {},
+            })
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": _otlp_attributes({"service.name": service_name})},
+            "scopeSpans": [{"scope": {"name": __name__}, "spans": spans}],
+        }]
+    }
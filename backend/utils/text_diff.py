@@ -0,0 +1,186 @@
+"""
+Token-level diff engine
+
+``difflib.SequenceMatcher`` is quadratic in the worst case and re-scans its
+inputs for every call, and character-level Levenshtein over whole resumes is
+O(N * M). Resumes diff well at the word (or line) level, and most of a tailored
+resume lines up with the original, so this engine:
+
+- trims the common prefix and suffix of each region
+- seeds matches only from rare tokens (the histogram heuristic git uses),
+  extends each seed into a matching run, and splits the region around the
+  longest run
+- falls back to Myers' O((N + M) D) algorithm with the linear-space middle
+  snake when the region has no rare shared token
+
+``diff_opcodes`` returns difflib-style ``(tag, i1, i2, j1, j2)`` opcodes, so
+callers can swap it in for ``SequenceMatcher.get_opcodes``. ``similarity``
+derives a 0-1 score from the edit script instead of a second pass.
+"""
+
+from typing import Dict, Hashable, List, Sequence, Tuple
+
+Opcode = Tuple[str, int, int, int, int]
+
+# Tokens occurring more often than this on the old side are too common to seed
+# an anchor ("the", "and", bullet markers); larger values cost time, not quality
+MAX_ANCHOR_OCCURRENCES = 4
+
+
+def _intern(a: Sequence[Hashable], b: Sequence[Hashable]) -> Tuple[List[int], List[int]]:
+    """Map tokens to small ints so the inner loops compare ints"""
+    ids: Dict[Hashable, int] = {}
+    return ([ids.setdefault(token, len(ids)) for token in a],
+            [ids.setdefault(token, len(ids)) for token in b])
+
+
+def _middle_snake(a: List[int], a0: int, a1: int, b: List[int], b0: int, b1: int) -> Tuple[int, int, int, int]:
+    """
+    Myers' middle snake of a[a0:a1] vs b[b0:b1] in O(N + M) space.
+
+    Returns (x, y, u, v): the snake runs from (x, y) to (u, v) in absolute
+    indexes, and splits the edit script into two halves of at most D/2 edits.
+    """
+    n, m = a1 - a0, b1 - b0
+    delta = n - m
+    odd = delta & 1
+    limit = (n + m + 1) // 2 + 1
+    forward = [0] * (2 * limit + 1)
+    backward = [0] * (2 * limit + 1)
+
+    for d in range(limit):
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and forward[k - 1] < forward[k + 1]):
+                x = forward[k + 1]
+            else:
+                x = forward[k - 1] + 1
+            y = x - k
+            start_x, start_y = x, y
+            while x < n and y < m and a[a0 + x] == b[b0 + y]:
+                x += 1
+                y += 1
+            forward[k] = x
+            if odd and -(d - 1) <= delta - k <= d - 1 and x + backward[delta - k] >= n:
+                return a0 + start_x, b0 + start_y, a0 + x, b0 + y
+
+        for k in range(-d, d + 1, 2):
+            # Same walk over the reversed sequences
+            if k == -d or (k != d and backward[k - 1] < backward[k + 1]):
+                x = backward[k + 1]
+            else:
+                x = backward[k - 1] + 1
+            y = x - k
+            start_x, start_y = x, y
+            while x < n and y < m and a[a1 - 1 - x] == b[b1 - 1 - y]:
+                x += 1
+                y += 1
+            backward[k] = x
+            if not odd and -d <= delta - k <= d and x + forward[delta - k] >= n:
+                return a1 - x, b1 - y, a1 - start_x, b1 - start_y
+
+    raise AssertionError("middle snake not found")  # unreachable for valid input
+
+
+def _anchor(a: List[int], a0: int, a1: int, b: List[int], b0: int, b1: int):
+    """Longest matching run through a rare shared token, as (-length, occurrences, i, j, length), or None"""
+    positions: Dict[int, List[int]] = {}
+    for i in range(a0, a1):
+        positions.setdefault(a[i], []).append(i)
+
+    best = None
+    j = b0
+    while j < b1:
+        candidates = positions.get(b[j])
+        if not candidates or len(candidates) > MAX_ANCHOR_OCCURRENCES:
+            j += 1
+            continue
+        next_j = j + 1
+        for i in candidates:
+            start_i, start_j = i, j
+            while start_i > a0 and start_j > b0 and a[start_i - 1] == b[start_j - 1]:
+                start_i -= 1
+                start_j -= 1
+            end_i, end_j = i + 1, j + 1
+            while end_i < a1 and end_j < b1 and a[end_i] == b[end_j]:
+                end_i += 1
+                end_j += 1
+            key = (start_i - end_i, len(candidates), start_i, start_j, end_i - start_i)
+            if best is None or key < best:
+                best = key
+            next_j = max(next_j, end_j)
+        j = next_j
+    return best
+
+
+def _matching_blocks(a: List[int], b: List[int]) -> List[Tuple[int, int, int]]:
+    """(i, j, size) runs with a[i:i+size] == b[j:j+size], in order"""
+    blocks: List[Tuple[int, int, int]] = []
+    regions = [(0, len(a), 0, len(b))]
+    while regions:
+        a0, a1, b0, b1 = regions.pop()
+        start = 0
+        while a0 + start < a1 and b0 + start < b1 and a[a0 + start] == b[b0 + start]:
+            start += 1
+        if start:
+            blocks.append((a0, b0, start))
+            a0, b0 = a0 + start, b0 + start
+        end = 0
+        while a1 - end > a0 and b1 - end > b0 and a[a1 - 1 - end] == b[b1 - 1 - end]:
+            end += 1
+        if end:
+            blocks.append((a1 - end, b1 - end, end))
+            a1, b1 = a1 - end, b1 - end
+        if a0 == a1 or b0 == b1:
+            continue
+
+        anchor = _anchor(a, a0, a1, b, b0, b1)
+        if anchor is not None:
+            _, _, i, j, size = anchor
+            blocks.append((i, j, size))
+            regions.append((a0, i, b0, j))
+            regions.append((i + size, a1, j + size, b1))
+            continue
+        if not set(a[a0:a1]).intersection(b[b0:b1]):
+            continue  # nothing in common: one replace
+
+        x, y, u, v = _middle_snake(a, a0, a1, b, b0, b1)
+        if u > x:
+            blocks.append((x, y, u - x))
+        regions.append((a0, x, b0, y))
+        regions.append((u, a1, v, b1))
+
+    blocks.sort()
+    return blocks
+
+
+def diff_opcodes(a: Sequence[Hashable], b: Sequence[Hashable]) -> List[Opcode]:
+    """Edit script turning ``a`` into ``b`` as difflib-style opcodes"""
+    ids_a, ids_b = _intern(a, b)
+    opcodes: List[Opcode] = []
+    i = j = 0
+    for block_i, block_j, size in _matching_blocks(ids_a, ids_b) + [(len(a), len(b), 0)]:
+        if i < block_i and j < block_j:
+            opcodes.append(("replace", i, block_i, j, block_j))
+        elif i < block_i:
+            opcodes.append(("delete", i, block_i, j, j))
+        elif j < block_j:
+            opcodes.append(("insert", i, i, j, block_j))
+        if size:
+            opcodes.append(("equal", block_i, block_i + size, block_j, block_j + size))
+        i, j = block_i + size, block_j + size
+    return opcodes
+
+
+def edit_distance(opcodes: List[Opcode]) -> int:
+    """Tokens inserted, deleted or substituted by an edit script"""
+    return sum(max(i2 - i1, j2 - j1) for tag, i1, i2, j1, j2 in opcodes if tag != "equal")
+
+
+def similarity(a: Sequence[Hashable], b: Sequence[Hashable], opcodes: List[Opcode] = None) -> float:
+    """1 - edit distance / longer length, at token granularity"""
+    longest = max(len(a), len(b))
+    if longest == 0:
+        return 1.0
+    if opcodes is None:
+        opcodes = diff_opcodes(a, b)
+    return max(0.0, 1 - edit_distance(opcodes) / longest)
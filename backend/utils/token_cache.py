@@ -0,0 +1,188 @@
+"""
+Short-lived cache of verified access tokens
+
+Maps ``sha256(token)`` to the decoded claims and, once ``AuthManager.verify_token``
+has checked it, the fact that the token's session was active. Entries live for
+at most ``ttl_seconds`` and never past the token's ``exp`` or its session's
+``expires_at``. Revocation paths (logout, session revoke, password reset) call
+``invalidate_session`` / ``invalidate_user`` so a revoked token stops working
+immediately rather than at the end of the window.
+
+Only claims and verification state are cached, not ``User`` rows: callers still
+load the user through their own DB session so usage counters and subscription
+state are never served stale.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Set
+
+
+@dataclass(slots=True)
+class VerifiedToken:
+    """Cached verification result for one access token"""
+    claims: Dict[str, Any]
+    user_id: Optional[str]
+    session_id: Optional[str]
+    expires_at: float  # monotonic deadline
+    session_verified: bool = False
+
+
+class VerifiedTokenCache:
+    """Thread-safe LRU + TTL cache of verified tokens keyed by token hash"""
+
+    def __init__(self, ttl_seconds: float = 60.0, max_entries: int = 10000, enabled: bool = True):
+        self.ttl_seconds = max(0.0, ttl_seconds)
+        self.max_entries = max(1, max_entries)
+        self.enabled = enabled and self.ttl_seconds > 0
+
+        self._entries: "OrderedDict[str, VerifiedToken]" = OrderedDict()
+        self._by_user: Dict[str, Set[str]] = {}
+        self._by_session: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0, "evictions": 0}
+
+    @staticmethod
+    def token_key(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def get(self, token: str) -> Optional[VerifiedToken]:
+        if not self.enabled:
+            return None
+        key = self.token_key(token)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            if entry.expires_at <= now:
+                self._remove(key)
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return entry
+
+    def put(
+        self,
+        token: str,
+        claims: Dict[str, Any],
+        session_verified: bool = False,
+        not_after: Optional[float] = None,
+    ) -> Optional[VerifiedToken]:
+        """
+        Cache a decoded (and optionally session-verified) token.
+
+        Args:
+            token: Raw bearer token
+            claims: Decoded JWT claims
+            session_verified: True once the user and session were checked in the DB
+            not_after: Extra wall-clock (epoch seconds) bound, e.g. the session's expiry
+
+        Returns:
+            The cached entry, or None if the token is already past its bounds
+        """
+        if not self.enabled:
+            return None
+
+        wall_now = time.time()
+        lifetime = self.ttl_seconds
+        for bound in (claims.get("exp"), not_after):
+            if bound is not None:
+                lifetime = min(lifetime, float(bound) - wall_now)
+        if lifetime <= 0:
+            return None
+
+        user_id = claims.get("sub")
+        session_id = claims.get("session_id")
+        entry = VerifiedToken(
+            claims=dict(claims),
+            user_id=str(user_id) if user_id else None,
+            session_id=str(session_id) if session_id else None,
+            expires_at=time.monotonic() + lifetime,
+            session_verified=session_verified,
+        )
+        key = self.token_key(token)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            if entry.user_id:
+                self._by_user.setdefault(entry.user_id, set()).add(key)
+            if entry.session_id:
+                self._by_session.setdefault(entry.session_id, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.stats["evictions"] += 1
+        return entry
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for index, value in ((self._by_user, entry.user_id), (self._by_session, entry.session_id)):
+            if value and value in index:
+                index[value].discard(key)
+                if not index[value]:
+                    del index[value]
+
+    def _invalidate(self, index: Dict[str, Set[str]], value: Any) -> int:
+        if value is None:
+            return 0
+        with self._lock:
+            keys = list(index.get(str(value), ()))
+            for key in keys:
+                self._remove(key)
+            self.stats["invalidations"] += len(keys)
+            return len(keys)
+
+    def invalidate_token(self, token: str) -> int:
+        with self._lock:
+            key = self.token_key(token)
+            if key not in self._entries:
+                return 0
+            self._remove(key)
+            self.stats["invalidations"] += 1
+            return 1
+
+    def invalidate_session(self, session_id: Any) -> int:
+        """Drop every cached token belonging to a session"""
+        return self._invalidate(self._by_session, session_id)
+
+    def invalidate_user(self, user_id: Any) -> int:
+        """Drop every cached token belonging to a user (password change, deactivation)"""
+        return self._invalidate(self._by_user, user_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_user.clear()
+            self._by_session.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self.stats, "entries": len(self._entries), "ttl_seconds": self.ttl_seconds}
+
+
+_token_cache: Optional[VerifiedTokenCache] = None
+_token_cache_lock = threading.Lock()
+
+
+def get_token_cache() -> VerifiedTokenCache:
+    """Get the process-wide verified token cache"""
+    global _token_cache
+    if _token_cache is None:
+        with _token_cache_lock:
+            if _token_cache is None:
+                _token_cache = VerifiedTokenCache(
+                    ttl_seconds=float(os.getenv("AUTH_TOKEN_CACHE_TTL", "60")),
+                    max_entries=int(os.getenv("AUTH_TOKEN_CACHE_MAX_ENTRIES", "10000")),
+                    enabled=os.getenv("AUTH_TOKEN_CACHE_ENABLED", "true").lower() == "true",
+                )
+    return _token_cache